@@ -8,3 +8,4 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         """Import signals when the app is ready"""
+        from . import cache_invalidation  # noqa: F401
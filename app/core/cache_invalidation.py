@@ -0,0 +1,59 @@
+"""Signal receivers that invalidate cached dashboard sections and lookups.
+
+Plan and membership changes are also announced after commit, so other
+processes and requests don't re-cache the data from before the change.
+
+Registered from CoreConfig.ready().
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from webhooks.services.billing import BillingService
+from webhooks.services.dashboard_cache import dashboard_cache
+
+from .models import Integration, Plan, Workspace, WorkspaceMember
+from .services.plan_catalog import plan_catalog
+from .services.seat_counter import seat_counter
+
+
+@receiver(post_save, sender=Workspace)
+def invalidate_workspace_dashboard(sender, instance, **kwargs):
+    """Rebuild plan-dependent dashboard sections after a workspace change"""
+    dashboard_cache.invalidate(str(instance.uuid), "plan")
+
+
+@receiver(post_save, sender=Workspace)
+@receiver(post_delete, sender=Workspace)
+def invalidate_customer_workspace(sender, instance, **kwargs):
+    """Drop the cached Stripe customer -> workspace mapping"""
+    if instance.stripe_customer_id:
+        BillingService.forget_workspace_ref(instance.stripe_customer_id)
+
+
+@receiver(post_save, sender=Integration)
+@receiver(post_delete, sender=Integration)
+def invalidate_integration_dashboard(sender, instance, **kwargs):
+    """Rebuild dashboard integration flags when an integration changes"""
+    try:
+        workspace = instance.workspace
+    except Workspace.DoesNotExist:
+        return  # Deleted along with its workspace
+    dashboard_cache.invalidate(str(workspace.uuid), "integrations")
+
+
+@receiver(post_save, sender=Plan)
+@receiver(post_delete, sender=Plan)
+def invalidate_plan_catalog(sender, instance, **kwargs):
+    """Reload plans here now and in every process once committed"""
+    plan_catalog.invalidate()
+    transaction.on_commit(plan_catalog.publish_change)
+
+
+@receiver(post_save, sender=WorkspaceMember)
+@receiver(post_delete, sender=WorkspaceMember)
+def invalidate_seat_count(sender, instance, **kwargs):
+    """Recount a workspace's active members after a membership change"""
+    workspace_id = instance.workspace_id
+    seat_counter.invalidate(workspace_id)
+    transaction.on_commit(lambda: seat_counter.invalidate(workspace_id))
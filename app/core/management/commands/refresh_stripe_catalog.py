@@ -0,0 +1,30 @@
+"""Reload the cached Stripe product and price catalog.
+
+Run on a schedule (e.g. every 15 minutes from cron) so plan and pricing
+pages always render from a recent catalog. Billing webhooks reload it on
+product and price changes in between.
+
+Usage:
+    python manage.py refresh_stripe_catalog
+"""
+
+from typing import Any
+
+from core.services.stripe_catalog import stripe_catalog
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """Reload the cached Stripe product and price catalog."""
+
+    help = "Reload the cached Stripe product and price catalog"
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Execute the command."""
+        if not stripe_catalog.refresh():
+            raise CommandError("Stripe returned no prices; kept the cached catalog")
+
+        prices = stripe_catalog.get_prices() or []
+        self.stdout.write(
+            self.style.SUCCESS(f"Refreshed Stripe catalog ({len(prices)} prices)")
+        )
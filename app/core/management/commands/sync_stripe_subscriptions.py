@@ -1,30 +1,54 @@
 """Management command to sync Stripe subscription state to workspaces.
 
-This command fetches all subscriptions from Stripe and updates the
+This command streams all subscriptions from Stripe and updates the
 corresponding workspace billing state. Use for initial sync or recovery.
+
+Subscriptions are processed one Stripe page at a time, so memory stays flat
+however many subscriptions the account has. Each page costs one workspace
+query and one bulk UPDATE, product names are fetched once per product, and
+the next page is requested while the current one is applied. Progress lines
+include the last processed subscription ID, which can be passed to
+``--starting-after`` to resume an interrupted run.
 """
 
 import logging
+import time
 from argparse import ArgumentParser
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
 from typing import Any
 
 import stripe
 from core.models import Workspace
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
-from webhooks.services.billing import STRIPE_STATUS_MAPPING, BillingService
+from webhooks.services.billing import STRIPE_STATUS_MAPPING
 
 logger = logging.getLogger(__name__)
 
+# Stripe's maximum page size for list endpoints
+PAGE_SIZE = 100
+
+# Workspace fields written by the sync
+SYNC_FIELDS = [
+    "subscription_status",
+    "subscription_plan",
+    "billing_cycle_anchor",
+    "trial_end_date",
+]
+
 
 class Command(BaseCommand):
     """Django management command to sync Stripe subscriptions globally.
 
-    Fetches all subscriptions from Stripe and updates matching workspaces.
+    Streams all subscriptions from Stripe and updates matching workspaces.
 
     Usage:
         python manage.py sync_stripe_subscriptions
         python manage.py sync_stripe_subscriptions --dry-run
+        python manage.py sync_stripe_subscriptions --concurrency 8
+        python manage.py sync_stripe_subscriptions --starting-after sub_123
     """
 
     help = "Sync subscription state from Stripe to all workspaces"
@@ -40,6 +64,17 @@ class Command(BaseCommand):
             action="store_true",
             help="Show what would be synced without making changes",
         )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Parallel Stripe requests for page prefetch and products (default: 4)",
+        )
+        parser.add_argument(
+            "--starting-after",
+            default=None,
+            help="Resume after this subscription ID (printed with progress)",
+        )
 
     def _configure_stripe(self) -> None:
         """Configure Stripe API and verify connection."""
@@ -54,28 +89,44 @@ class Command(BaseCommand):
                 "Failed to connect to Stripe. Check your STRIPE_SECRET_KEY."
             ) from err
 
-    def _fetch_all_subscriptions(self) -> list:
-        """Fetch all subscriptions from Stripe with pagination."""
-        self.stdout.write("Fetching subscriptions from Stripe...")
+    def _fetch_page(self, starting_after: str | None) -> Any:
+        """Fetch one page of subscriptions from Stripe.
+
+        Args:
+            starting_after: Subscription ID to continue after, or None.
 
-        subscriptions = []
-        starting_after = None
+        Returns:
+            Stripe list response with data and has_more.
+        """
+        params: dict = {"limit": PAGE_SIZE, "expand": ["data.items.data.price"]}
+        if starting_after:
+            params["starting_after"] = starting_after
+        return stripe.Subscription.list(**params)
 
-        while True:
-            params: dict = {"limit": 100, "expand": ["data.items.data.price"]}
-            if starting_after:
-                params["starting_after"] = starting_after
+    def _iter_pages(
+        self, pool: ThreadPoolExecutor, starting_after: str | None
+    ) -> Iterator[list]:
+        """Lazily yield pages of subscriptions from Stripe.
 
-            response = stripe.Subscription.list(**params)
-            subscriptions.extend(response.data)
+        The next page is requested in the background while the caller
+        processes the current one.
 
-            if not response.has_more:
-                break
-            if response.data:
-                starting_after = response.data[-1].id
+        Args:
+            pool: Executor used to prefetch the next page.
+            starting_after: Subscription ID to start after, or None.
 
-        self.stdout.write(f"Found {len(subscriptions)} subscription(s) in Stripe")
-        return subscriptions
+        Yields:
+            Lists of Stripe Subscription objects.
+        """
+        future: Future | None = pool.submit(self._fetch_page, starting_after)
+        while future is not None:
+            response = future.result()
+            page = list(response.data)
+            future = None
+            if response.has_more and page:
+                future = pool.submit(self._fetch_page, page[-1].id)
+            if page:
+                yield page
 
     def _build_customer_subscription_map(
         self, subscriptions: list
@@ -84,28 +135,39 @@ class Command(BaseCommand):
         customer_subscriptions: dict[str, stripe.Subscription] = {}
 
         for sub in subscriptions:
-            customer_id = sub.customer
-            if isinstance(customer_id, stripe.Customer):
-                customer_id = customer_id.id
-
+            customer_id = self._get_customer_id(sub)
             existing = customer_subscriptions.get(customer_id)
 
-            if existing is None:
+            if existing is None or self._is_more_relevant(sub.status, existing.status):
                 customer_subscriptions[customer_id] = sub
-            elif sub.status in ("active", "trialing", "past_due"):
-                if existing.status not in ("active", "trialing"):
-                    customer_subscriptions[customer_id] = sub
 
         return customer_subscriptions
 
+    def _get_customer_id(self, sub: stripe.Subscription) -> str:
+        """Get the customer ID of a subscription."""
+        customer_id = sub.customer
+        if isinstance(customer_id, stripe.Customer):
+            customer_id = customer_id.id
+        return customer_id
+
+    def _is_more_relevant(self, status: str, existing_status: str) -> bool:
+        """Check whether a subscription status supersedes an earlier one."""
+        return status in ("active", "trialing", "past_due") and existing_status not in (
+            "active",
+            "trialing",
+        )
+
     def handle(self, *args, **options) -> None:
         """Execute the command.
 
         Args:
             *args: Positional arguments.
-            **options: Command options including dry_run.
+            **options: Command options including dry_run, concurrency and
+                starting_after.
         """
         dry_run = options["dry_run"]
+        concurrency = max(1, options["concurrency"])
+        starting_after = options["starting_after"]
 
         if dry_run:
             self.stdout.write(
@@ -122,17 +184,31 @@ class Command(BaseCommand):
             "errors": 0,
         }
 
-        subscriptions = self._fetch_all_subscriptions()
-        self.stdout.write("")
+        self._product_names: dict[str, str | None] = {}
+        # Status of the subscription already applied per customer, so a more
+        # relevant subscription on a later page still wins
+        applied: dict[str, str] = {}
+        processed = 0
+        started = time.monotonic()
 
-        customer_subscriptions = self._build_customer_subscription_map(subscriptions)
-        customer_count = len(customer_subscriptions)
-        self.stdout.write(f"Processing {customer_count} unique customer(s)")
+        if starting_after:
+            self.stdout.write(f"Resuming after {starting_after}")
+        self.stdout.write("Streaming subscriptions from Stripe...")
         self.stdout.write("-" * 50)
 
-        for customer_id, sub in customer_subscriptions.items():
-            self._process_subscription(customer_id, sub, dry_run, results)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for page in self._iter_pages(pool, starting_after):
+                self._process_chunk(page, pool, applied, dry_run, results)
+                processed += len(page)
+                elapsed = max(time.monotonic() - started, 1e-6)
+                self.stdout.write(
+                    f"  Progress: {processed} subscription(s), "
+                    f"{processed / elapsed:.1f}/s, cursor {page[-1].id}"
+                )
 
+        self.stdout.write("")
+        self.stdout.write(f"Found {processed} subscription(s) in Stripe")
+        self.stdout.write(f"Processed {len(applied)} unique customer(s)")
         self._print_summary(results, dry_run)
 
     def _safe_get(self, obj: Any, key: str) -> Any:
@@ -143,8 +219,12 @@ class Command(BaseCommand):
             return obj.get(key)
         return getattr(obj, key, None)
 
-    def _get_product_name(self, sub: stripe.Subscription) -> str | None:
-        """Extract product name from subscription."""
+    def _get_product(self, sub: stripe.Subscription) -> Any:
+        """Get the product of a subscription's first item.
+
+        Returns:
+            A product ID string, an expanded product, or None.
+        """
         # Use safe access - handles both dict-like and object access
         items = self._safe_get(sub, "items")
         items_data = self._safe_get(items, "data")
@@ -152,19 +232,45 @@ class Command(BaseCommand):
         if not items_data or len(items_data) == 0:
             return None
 
-        first_item = items_data[0]
-        price = self._safe_get(first_item, "price")
-        product = self._safe_get(price, "product")
+        price = self._safe_get(items_data[0], "price")
+        return self._safe_get(price, "product")
+
+    def _retrieve_product_name(self, product_id: str) -> str | None:
+        """Retrieve a product's name from Stripe."""
+        try:
+            return stripe.Product.retrieve(product_id).name
+        except stripe.error.StripeError:
+            return None
+
+    def _resolve_product_names(self, subs: list, pool: ThreadPoolExecutor) -> None:
+        """Retrieve names of products not seen before, in parallel.
+
+        Args:
+            subs: Subscriptions whose products need names.
+            pool: Executor for the Product.retrieve calls.
+        """
+        missing = {
+            product
+            for product in map(self._get_product, subs)
+            if isinstance(product, str) and product not in self._product_names
+        }
+        for product_id, name in zip(
+            missing, pool.map(self._retrieve_product_name, missing), strict=True
+        ):
+            self._product_names[product_id] = name
+
+    def _get_product_name(self, sub: stripe.Subscription) -> str | None:
+        """Extract product name from subscription."""
+        product = self._get_product(sub)
 
         if product is None:
             return None
         if isinstance(product, stripe.Product):
             return product.name
         if isinstance(product, str):
-            try:
-                return stripe.Product.retrieve(product).name
-            except stripe.error.StripeError:
-                return None
+            if product not in self._product_names:
+                self._product_names[product] = self._retrieve_product_name(product)
+            return self._product_names[product]
         return self._safe_get(product, "name")
 
     def _normalize_plan_name(self, product_name: str | None) -> str | None:
@@ -173,49 +279,106 @@ class Command(BaseCommand):
             return None
         return product_name.lower().replace("notipus ", "").replace(" plan", "").strip()
 
-    def _process_subscription(
+    def _process_chunk(
         self,
-        customer_id: str,
-        sub: stripe.Subscription,
+        subs: list,
+        pool: ThreadPoolExecutor,
+        applied: dict[str, str],
         dry_run: bool,
         results: dict,
     ) -> None:
-        """Process a single subscription and sync to workspace.
+        """Sync one page of subscriptions to their workspaces.
 
         Args:
-            customer_id: Stripe customer ID.
-            sub: Stripe Subscription object.
+            subs: Stripe Subscription objects from one page.
+            pool: Executor for product lookups.
+            applied: Customer ID to status of the subscription already
+                applied in an earlier page; updated in place.
             dry_run: If True, don't make actual changes.
             results: Dictionary to track operation counts.
         """
-        try:
-            workspace = Workspace.objects.filter(stripe_customer_id=customer_id).first()
-
-            if not workspace:
-                self.stdout.write(f"  SKIP: No workspace for customer {customer_id}")
-                results["skipped_no_workspace"] += 1
-                return
+        customer_subscriptions = {
+            customer_id: sub
+            for customer_id, sub in self._build_customer_subscription_map(subs).items()
+            if customer_id not in applied
+            or self._is_more_relevant(sub.status, applied[customer_id])
+        }
+        if not customer_subscriptions:
+            return
 
-            internal_status = STRIPE_STATUS_MAPPING.get(sub.status, "active")
-            plan_name = self._normalize_plan_name(self._get_product_name(sub))
+        workspaces: dict[str, Workspace] = {}
+        for workspace in Workspace.objects.filter(
+            stripe_customer_id__in=list(customer_subscriptions)
+        ).order_by("pk"):
+            workspaces.setdefault(workspace.stripe_customer_id, workspace)
 
-            changes = self._get_changes(workspace, internal_status, plan_name)
+        self._resolve_product_names(
+            [s for c, s in customer_subscriptions.items() if c in workspaces], pool
+        )
 
-            if not changes:
+        to_update: list[tuple[Workspace, str, list[str]]] = []
+        for customer_id, sub in customer_subscriptions.items():
+            first_seen = customer_id not in applied
+            applied[customer_id] = sub.status
+            try:
+                workspace = workspaces.get(customer_id)
+                if not workspace:
+                    if first_seen:
+                        self.stdout.write(
+                            f"  SKIP: No workspace for customer {customer_id}"
+                        )
+                        results["skipped_no_workspace"] += 1
+                    continue
+
+                changes = self._stage_changes(workspace, sub)
+                if first_seen and not changes:
+                    self.stdout.write(
+                        f"  OK: {workspace.name} ({customer_id}) - already in sync"
+                    )
+                    results["synced"] += 1
+                elif changes:
+                    to_update.append((workspace, customer_id, changes))
+
+            except Exception as e:
                 self.stdout.write(
-                    f"  OK: {workspace.name} ({customer_id}) - already in sync"
+                    self.style.ERROR(f"  ERROR processing {customer_id}: {e!s}")
                 )
-                results["synced"] += 1
-                return
+                results["errors"] += 1
+                logger.exception(f"Error processing customer {customer_id}")
 
-            self._apply_changes(workspace, customer_id, changes, dry_run, results)
+        self._apply_changes(to_update, dry_run, results)
 
-        except Exception as e:
-            self.stdout.write(
-                self.style.ERROR(f"  ERROR processing {customer_id}: {e!s}")
-            )
-            results["errors"] += 1
-            logger.exception(f"Error processing customer {customer_id}")
+    def _stage_changes(self, workspace: Workspace, sub: stripe.Subscription) -> list:
+        """Set a subscription's billing state on a workspace in memory.
+
+        Mirrors BillingService.sync_workspace_from_stripe.
+
+        Args:
+            workspace: Workspace to update (not saved).
+            sub: The customer's most relevant subscription.
+
+        Returns:
+            Descriptions of status and plan changes; empty if in sync.
+        """
+        internal_status = STRIPE_STATUS_MAPPING.get(sub.status, "active")
+        plan_name = self._normalize_plan_name(self._get_product_name(sub))
+
+        changes = self._get_changes(workspace, internal_status, plan_name)
+        if not changes:
+            return changes
+
+        workspace.subscription_status = internal_status
+        if plan_name:
+            workspace.subscription_plan = plan_name
+
+        period_end = self._safe_get(sub, "current_period_end")
+        if isinstance(period_end, int):
+            workspace.billing_cycle_anchor = period_end
+            if sub.status == "trialing":
+                workspace.trial_end_date = datetime.fromtimestamp(
+                    period_end, tz=timezone.utc
+                )
+        return changes
 
     def _get_changes(
         self, workspace: Workspace, status: str, plan: str | None
@@ -230,32 +393,48 @@ class Command(BaseCommand):
 
     def _apply_changes(
         self,
-        workspace: Workspace,
-        customer_id: str,
-        changes: list[str],
+        to_update: list[tuple[Workspace, str, list[str]]],
         dry_run: bool,
         results: dict,
     ) -> None:
-        """Apply sync changes to workspace."""
-        change_str = ", ".join(changes)
+        """Write one chunk's changed workspaces in a single bulk UPDATE.
+
+        Args:
+            to_update: (workspace, customer ID, change descriptions) tuples.
+            dry_run: If True, only report the changes.
+            results: Dictionary to track operation counts.
+        """
+        if not to_update:
+            return
 
         if dry_run:
-            self.stdout.write(
-                self.style.WARNING(f"  WOULD UPDATE: {workspace.name} - {change_str}")
-            )
-            results["synced"] += 1
+            for workspace, _, changes in to_update:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"  WOULD UPDATE: {workspace.name} - {', '.join(changes)}"
+                    )
+                )
+            results["synced"] += len(to_update)
             return
 
-        if BillingService.sync_workspace_from_stripe(customer_id):
-            self.stdout.write(
-                self.style.SUCCESS(f"  SYNCED: {workspace.name} - {change_str}")
+        try:
+            Workspace.objects.bulk_update(
+                [workspace for workspace, _, _ in to_update], SYNC_FIELDS
             )
-            results["synced"] += 1
-        else:
+        except Exception as e:
+            for workspace, _, _ in to_update:
+                self.stdout.write(
+                    self.style.ERROR(f"  ERROR: Failed to sync {workspace.name}")
+                )
+            results["errors"] += len(to_update)
+            logger.error(f"Error bulk updating workspaces from Stripe: {e!s}")
+            return
+
+        for workspace, _, changes in to_update:
             self.stdout.write(
-                self.style.ERROR(f"  ERROR: Failed to sync {workspace.name}")
+                self.style.SUCCESS(f"  SYNCED: {workspace.name} - {', '.join(changes)}")
             )
-            results["errors"] += 1
+        results["synced"] += len(to_update)
 
     def _print_summary(self, results: dict, dry_run: bool) -> None:
         """Print a summary of operations performed.
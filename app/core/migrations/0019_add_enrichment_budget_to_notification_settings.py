@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_add_person_model_and_hunter_integration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationsettings',
+            name='enrichment_budget_ms',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:05
+"""Add the event ledger table.
+
+On PostgreSQL the plain table created by CreateModel is replaced with one
+range-partitioned by month on occurred_at, plus a DEFAULT partition.
+Monthly partitions are created on demand by webhooks.services.event_ledger
+and dropped by the maintain_event_ledger command. Partitioned tables need
+the partition key in the primary key, so it is (id, occurred_at) there.
+"""
+
+from django.db import migrations, models
+
+PARTITIONED_TABLE_SQL = """
+DROP TABLE core_eventledgerentry;
+CREATE SEQUENCE core_eventledgerentry_id_seq;
+CREATE TABLE core_eventledgerentry (
+    id bigint NOT NULL DEFAULT nextval('core_eventledgerentry_id_seq'),
+    workspace_uuid uuid NOT NULL,
+    occurred_at timestamp with time zone NOT NULL,
+    provider varchar(20) NOT NULL,
+    event_type varchar(50) NOT NULL,
+    external_id varchar(255) NOT NULL,
+    customer_id varchar(255) NOT NULL,
+    customer_email varchar(254) NOT NULL,
+    amount numeric(12, 2) NULL,
+    currency varchar(3) NOT NULL,
+    status varchar(20) NOT NULL,
+    record jsonb NOT NULL,
+    PRIMARY KEY (id, occurred_at)
+) PARTITION BY RANGE (occurred_at);
+ALTER SEQUENCE core_eventledgerentry_id_seq OWNED BY core_eventledgerentry.id;
+CREATE TABLE core_eventledgerentry_default
+    PARTITION OF core_eventledgerentry DEFAULT;
+CREATE INDEX ledger_ws_occurred_idx
+    ON core_eventledgerentry (workspace_uuid, occurred_at);
+CREATE INDEX ledger_ws_customer_idx
+    ON core_eventledgerentry (workspace_uuid, customer_id);
+"""
+
+
+def partition_ledger_on_postgresql(apps, schema_editor):
+    """Recreate the (still empty) ledger table as a partitioned table."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(PARTITIONED_TABLE_SQL)
+
+
+def reverse_partition_ledger(apps, schema_editor):
+    """Reverse migration - no-op, the table is dropped by CreateModel."""
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_add_enrichment_budget_to_notification_settings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('workspace_uuid', models.UUIDField()),
+                ('occurred_at', models.DateTimeField()),
+                ('provider', models.CharField(max_length=20)),
+                ('event_type', models.CharField(max_length=50)),
+                ('external_id', models.CharField(max_length=255)),
+                ('customer_id', models.CharField(blank=True, default='', max_length=255)),
+                ('customer_email', models.CharField(blank=True, default='', max_length=254)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12, null=True)),
+                ('currency', models.CharField(default='USD', max_length=3)),
+                ('status', models.CharField(blank=True, default='', max_length=20)),
+                ('record', models.JSONField(default=dict)),
+            ],
+            options={
+                'verbose_name': 'Event Ledger Entry',
+                'verbose_name_plural': 'Event Ledger Entries',
+                'indexes': [models.Index(fields=['workspace_uuid', 'occurred_at'], name='ledger_ws_occurred_idx'), models.Index(fields=['workspace_uuid', 'customer_id'], name='ledger_ws_customer_idx')],
+            },
+        ),
+        migrations.RunPython(
+            partition_ledger_on_postgresql,
+            reverse_partition_ledger,
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0020_add_event_ledger"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="workspace",
+            name="stripe_customer_id",
+            field=models.CharField(
+                blank=True, db_index=True, default="", max_length=255
+            ),
+        ),
+    ]
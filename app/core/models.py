@@ -83,7 +83,10 @@ class Workspace(models.Model):
     )
     trial_end_date = models.DateTimeField(default=get_trial_end_date)
     billing_cycle_anchor = models.IntegerField(null=True, blank=True)
-    stripe_customer_id = models.CharField(max_length=255, blank=True, default="")
+    # Indexed: every billing webhook resolves its workspace by customer ID
+    stripe_customer_id = models.CharField(
+        max_length=255, blank=True, default="", db_index=True
+    )
     payment_method_added = models.BooleanField(default=False)
 
     class Meta:
@@ -718,6 +721,9 @@ class NotificationSettings(models.Model):
     Attributes:
         workspace: The workspace these settings belong to.
         notify_*: Boolean flags for each notification type.
+        enrichment_budget_ms: Per-severity overrides of the enrichment latency
+            budget in milliseconds (e.g. {"error": 1000}). Missing severities
+            fall back to settings.ENRICHMENT_BUDGET_MS.
     """
 
     workspace = models.OneToOneField(
@@ -746,6 +752,9 @@ class NotificationSettings(models.Model):
     notify_shopify_order_updated = models.BooleanField(default=True)
     notify_shopify_order_paid = models.BooleanField(default=True)
 
+    # Enrichment latency budget overrides, keyed by notification severity
+    enrichment_budget_ms = models.JSONField(default=dict, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -898,3 +907,64 @@ class WebAuthnChallenge(models.Model):
         """
         user_str = self.user.username if self.user else "Anonymous"
         return f"{self.challenge_type} challenge for {user_str}"
+
+
+class EventLedgerEntry(models.Model):
+    """Append-only record of a processed webhook event.
+
+    Durable history behind the 7-day Redis activity data, used for usage
+    reporting, customer history and insights. Rows are written in batches
+    by webhooks.services.event_ledger and never updated.
+
+    On PostgreSQL the table is range-partitioned by month on occurred_at
+    (see migration 0020), so retention is handled by dropping whole
+    partitions rather than deleting rows.
+
+    Attributes:
+        workspace_uuid: UUID of the workspace the event belongs to.
+        occurred_at: When the event was processed (partition key).
+        provider: Source provider (stripe, shopify, chargify).
+        event_type: Normalized event type (e.g. payment_success).
+        external_id: Provider's ID for the event's object.
+        customer_id: Provider's customer ID.
+        customer_email: Customer email, if known.
+        amount: Event amount, if any.
+        currency: ISO currency code.
+        status: Normalized status.
+        record: The full enriched activity record.
+    """
+
+    workspace_uuid = models.UUIDField()
+    occurred_at = models.DateTimeField()
+    provider = models.CharField(max_length=20)
+    event_type = models.CharField(max_length=50)
+    external_id = models.CharField(max_length=255)
+    customer_id = models.CharField(max_length=255, blank=True, default="")
+    customer_email = models.CharField(max_length=254, blank=True, default="")
+    amount = models.DecimalField(max_digits=12, decimal_places=2, null=True)
+    currency = models.CharField(max_length=3, default="USD")
+    status = models.CharField(max_length=20, blank=True, default="")
+    record = models.JSONField(default=dict)
+
+    class Meta:
+        app_label = "core"
+        verbose_name = "Event Ledger Entry"
+        verbose_name_plural = "Event Ledger Entries"
+        indexes = [
+            models.Index(
+                fields=["workspace_uuid", "occurred_at"],
+                name="ledger_ws_occurred_idx",
+            ),
+            models.Index(
+                fields=["workspace_uuid", "customer_id"],
+                name="ledger_ws_customer_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Return string representation of the ledger entry.
+
+        Returns:
+            Event type, provider and time.
+        """
+        return f"{self.event_type} from {self.provider} at {self.occurred_at}"
@@ -15,6 +15,10 @@ from django.contrib import messages
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect
 
+from .services.plan_catalog import plan_catalog
+from .services.seat_counter import seat_counter
+from .workspace_context import get_workspace_context, resolve_workspace_context
+
 if TYPE_CHECKING:
     from core.models import Workspace, WorkspaceMember
 
@@ -28,12 +32,7 @@ def get_workspace_member(user) -> "WorkspaceMember | None":
     Returns:
         The user's active WorkspaceMember instance, or None if not found.
     """
-    from core.models import WorkspaceMember
-
-    if not user.is_authenticated:
-        return None
-
-    return WorkspaceMember.objects.filter(user=user, is_active=True).first()
+    return resolve_workspace_context(user).member
 
 
 def get_workspace_for_user(user) -> "Workspace | None":
@@ -63,7 +62,7 @@ def require_workspace(view_func: Callable) -> Callable:
 
     @wraps(view_func)
     def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
-        member = get_workspace_member(request.user)
+        member = get_workspace_context(request).member
         if not member:
             messages.info(request, "Please create or join a workspace first.")
             return redirect("core:create_workspace")
@@ -94,7 +93,7 @@ def require_role(*allowed_roles: str) -> Callable:
     def decorator(view_func: Callable) -> Callable:
         @wraps(view_func)
         def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
-            member = get_workspace_member(request.user)
+            member = get_workspace_context(request).member
             if not member:
                 messages.error(request, "You must be a member of a workspace.")
                 return redirect("core:create_workspace")
@@ -200,6 +199,20 @@ def can_change_role(
     return new_role in ("admin", "user")
 
 
+def _get_max_users(workspace: "Workspace") -> int:
+    """Get the user limit of a workspace's plan from the plan catalog.
+
+    Args:
+        workspace: The workspace to check.
+
+    Returns:
+        The plan's max_users, or 1 if the plan isn't found (trial or
+        misconfigured).
+    """
+    plan = plan_catalog.get(workspace.subscription_plan)
+    return plan.max_users if plan else 1
+
+
 def can_invite_user(workspace: "Workspace") -> tuple[bool, str]:
     """Check if the workspace can invite another user based on plan limits.
 
@@ -209,19 +222,8 @@ def can_invite_user(workspace: "Workspace") -> tuple[bool, str]:
     Returns:
         Tuple of (allowed, message). If not allowed, message explains why.
     """
-    from core.models import Plan, WorkspaceMember
-
-    current_count = WorkspaceMember.objects.filter(
-        workspace=workspace, is_active=True
-    ).count()
-
-    # Get the plan's max_users
-    try:
-        plan = Plan.objects.get(name=workspace.subscription_plan, is_active=True)
-        max_users = plan.max_users
-    except Plan.DoesNotExist:
-        # Default to 1 if plan not found (trial or misconfigured)
-        max_users = 1
+    current_count = seat_counter.get(workspace.id)
+    max_users = _get_max_users(workspace)
 
     if current_count >= max_users:
         user_word = "users" if max_users > 1 else "user"
@@ -243,17 +245,8 @@ def get_remaining_seats(workspace: "Workspace") -> int:
     Returns:
         Number of remaining seats (0 if at limit or over).
     """
-    from core.models import Plan, WorkspaceMember
-
-    current_count = WorkspaceMember.objects.filter(
-        workspace=workspace, is_active=True
-    ).count()
-
-    try:
-        plan = Plan.objects.get(name=workspace.subscription_plan, is_active=True)
-        max_users = plan.max_users
-    except Plan.DoesNotExist:
-        max_users = 1
+    current_count = seat_counter.get(workspace.id)
+    max_users = _get_max_users(workspace)
 
     return max(0, max_users - current_count)
 
@@ -10,11 +10,14 @@ from datetime import datetime
 from datetime import timezone as dt_timezone
 from typing import Any
 
-from core.models import Integration, Plan, UserProfile, Workspace, WorkspaceMember
+from core.models import Integration, Plan, Workspace
+from core.workspace_context import WorkspaceContext, resolve_workspace_context
 from django.contrib.auth.models import User
-from django.db.models import QuerySet
+from django.db.models import Count, Q, QuerySet
 from django.utils import timezone
+from webhooks.services.dashboard_cache import dashboard_cache
 from webhooks.services.database_lookup import DatabaseLookupService
+from webhooks.services.processing_lanes import processing_lanes
 from webhooks.services.rate_limiter import rate_limiter
 
 logger = logging.getLogger(__name__)
@@ -30,78 +33,95 @@ class DashboardService:
         """Initialize the dashboard service with dependencies."""
         self.db_service = DatabaseLookupService()
 
-    def get_dashboard_data(self, user: User) -> dict[str, Any] | None:
+    def get_dashboard_data(
+        self, user: User, context: WorkspaceContext | None = None
+    ) -> dict[str, Any] | None:
         """Get all dashboard data for a user.
 
         Args:
             user: Django User instance.
+            context: The request's WorkspaceContext, if already resolved.
 
         Returns:
             Dict with dashboard data or None if user has no workspace.
         """
-        # Try to get workspace from WorkspaceMember first
-        member = WorkspaceMember.objects.filter(user=user, is_active=True).first()
-        workspace = None
-        user_profile = None
-
-        if member:
-            workspace = member.workspace
-        else:
-            # Fall back to UserProfile for backward compatibility
-            try:
-                user_profile = UserProfile.objects.get(user=user)
-                workspace = user_profile.workspace
-            except UserProfile.DoesNotExist:
-                return None
+        if context is None:
+            context = resolve_workspace_context(user)
 
+        workspace = context.workspace
         if not workspace:
             return None
 
-        # Try to get user_profile if we don't have it yet
-        if not user_profile:
-            try:
-                user_profile = UserProfile.objects.get(user=user)
-            except UserProfile.DoesNotExist:
-                user_profile = None
+        member = context.member
+        user_profile = context.user_profile
+
+        # Sections that hit the database or Redis come from the workspace's
+        # snapshot and are rebuilt only when invalidated
+        sections = dashboard_cache.get_sections(
+            str(workspace.uuid),
+            {
+                "integrations": lambda: self._get_integration_flags(workspace),
+                "activity": lambda: self._get_recent_activity(workspace),
+                "usage": lambda: self._get_usage_data(workspace),
+            },
+            extra_versions={
+                "plan": (
+                    f"{workspace.subscription_plan}:{workspace.subscription_status}"
+                ),
+            },
+        )
 
         return {
             "workspace": workspace,
             "user_profile": user_profile,
             "member": member,
-            "integrations": self._get_integration_data(workspace),
-            "recent_activity": self._get_recent_activity(workspace),
-            "usage_data": self._get_usage_data(workspace),
+            "integrations": {
+                # Lazy; only queried if a template iterates it
+                "integrations": self._get_active_integrations(workspace),
+                **sections["integrations"],
+            },
+            "recent_activity": sections["activity"],
+            "usage_data": sections["usage"],
             "trial_info": self._get_trial_info(workspace),
+            "queue_stats": self._get_queue_stats(workspace, user),
         }
 
-    def _get_integration_data(self, workspace: Workspace) -> dict[str, Any]:
-        """Get integration status and data for the workspace.
+    def _get_active_integrations(self, workspace: Workspace) -> QuerySet[Integration]:
+        """Get the workspace's active integrations.
 
         Args:
             workspace: Workspace model instance.
 
         Returns:
-            Dictionary with integration status flags.
+            Unevaluated queryset of active integrations.
         """
-        integrations: QuerySet[Integration] = Integration.objects.filter(
-            workspace=workspace, is_active=True
-        )
+        return Integration.objects.filter(workspace=workspace, is_active=True)
 
-        return {
-            "integrations": integrations,
-            "has_slack": integrations.filter(
-                integration_type="slack_notifications"
-            ).exists(),
-            "has_shopify": integrations.filter(integration_type="shopify").exists(),
-            "has_chargify": integrations.filter(integration_type="chargify").exists(),
-            "has_stripe": integrations.filter(
-                integration_type="stripe_customer"
-            ).exists(),
-        }
+    def _get_integration_flags(self, workspace: Workspace) -> dict[str, bool]:
+        """Get which integration types the workspace has, in one query.
+
+        Args:
+            workspace: Workspace model instance.
+
+        Returns:
+            Dictionary with has_slack, has_shopify, has_chargify and
+            has_stripe flags.
+        """
+        counts = self._get_active_integrations(workspace).aggregate(
+            has_slack=Count("id", filter=Q(integration_type="slack_notifications")),
+            has_shopify=Count("id", filter=Q(integration_type="shopify")),
+            has_chargify=Count("id", filter=Q(integration_type="chargify")),
+            has_stripe=Count("id", filter=Q(integration_type="stripe_customer")),
+        )
+        return {flag: count > 0 for flag, count in counts.items()}
 
     def _get_recent_activity(self, workspace: Workspace) -> list[dict[str, Any]]:
         """Get and process recent webhook activity for the workspace.
 
+        Reads the activity rollups maintained at write time. Workspaces with
+        no rollups yet (history stored before rollups existed) fall back to
+        grouping raw records here.
+
         Args:
             workspace: Workspace model instance.
 
@@ -109,9 +129,16 @@ class DashboardService:
             List of recent activity records, deduplicated with counts.
         """
         try:
+            workspace_id = str(workspace.uuid)
+            rollups = self.db_service.get_activity_rollups(
+                workspace_id, days=7, limit=15
+            )
+            if rollups:
+                return self._build_activity_from_rollups(rollups)
+
             # Fetch more records than needed to allow for deduplication
             recent_activity_raw = self.db_service.get_recent_webhook_activity(
-                days=7, limit=100
+                days=7, limit=100, workspace_id=workspace_id
             )
             transformed = self._transform_activity_data(recent_activity_raw)
             deduplicated = self._deduplicate_activity(transformed)
@@ -121,6 +148,45 @@ class DashboardService:
             logger.warning(f"Error getting recent activity: {e!s}")
             return []
 
+    def _build_activity_from_rollups(
+        self, rollups: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Turn activity rollups into dashboard activity items.
+
+        Args:
+            rollups: Rollups from DatabaseLookupService.get_activity_rollups,
+                already grouped and ordered most recent first.
+
+        Returns:
+            List of activity items with event_count (and total_amount for
+            groups of several paid events).
+        """
+        activity: list[dict[str, Any]] = []
+        for rollup in rollups:
+            transformed = self._transform_activity_data([rollup["latest"]])
+            if not transformed:
+                continue
+            item = transformed[0]
+            item["event_count"] = rollup["event_count"]
+            if rollup["event_count"] > 1 and rollup["total_amount"] > 0:
+                item["total_amount"] = rollup["total_amount"]
+            activity.append(item)
+        return activity
+
+    def build_activity_item(self, record: dict[str, Any]) -> dict[str, Any] | None:
+        """Turn a single raw activity record into a dashboard activity item.
+
+        Used for records pushed to the live activity stream.
+
+        Args:
+            record: Raw activity record as stored in Redis.
+
+        Returns:
+            Activity item, or None if the record couldn't be processed.
+        """
+        transformed = self._transform_activity_data([record])
+        return transformed[0] if transformed else None
+
     def _transform_activity_data(
         self, raw_activity: list[dict[str, Any]]
     ) -> list[dict[str, Any]]:
@@ -285,6 +351,30 @@ class DashboardService:
                 "usage_percentage": 0,
             }
 
+    def _get_queue_stats(self, workspace: Workspace, user: User) -> dict[str, Any]:
+        """Get processing queue wait for the workspace.
+
+        Staff users also get every workspace's stats, noisiest first, so
+        tenants crowding the workers are visible.
+
+        Args:
+            workspace: Workspace model instance.
+            user: Django User instance.
+
+        Returns:
+            Dictionary with queue_stats and tenant_queue_stats.
+        """
+        try:
+            return {
+                "queue_stats": processing_lanes.tenant_stats(str(workspace.uuid)),
+                "tenant_queue_stats": (
+                    processing_lanes.all_tenant_stats()[:10] if user.is_staff else []
+                ),
+            }
+        except Exception as e:
+            logger.warning(f"Error getting queue stats: {e!s}")
+            return {"queue_stats": {}, "tenant_queue_stats": []}
+
     def _get_trial_info(self, workspace: Workspace) -> dict[str, Any]:
         """Get trial information for the workspace.
 
@@ -321,7 +411,8 @@ class BillingService:
     ) -> list[dict[str, Any]]:
         """Get available plans for upgrade, excluding current plan.
 
-        Fetches plans from Stripe if available, falls back to local database.
+        Reads plans from the cached Stripe catalog if available, falls back
+        to the local database.
 
         Args:
             current_plan: Name of the current subscription plan.
@@ -342,20 +433,24 @@ class BillingService:
     def _get_plans_from_stripe(
         self, current_plan: str, include_free: bool = False
     ) -> list[dict[str, Any]]:
-        """Fetch available plans from Stripe.
+        """Get available plans from the cached Stripe catalog.
+
+        Never calls Stripe while rendering; see core.services.stripe_catalog.
 
         Args:
             current_plan: Name of the current subscription plan to exclude.
             include_free: Whether to include the free plan.
 
         Returns:
-            List of plan dictionaries from Stripe, or empty list on failure.
+            List of plan dictionaries from Stripe, or empty list if the
+            catalog isn't cached yet or on failure.
         """
         try:
-            from core.services.stripe import StripeAPI
+            from core.services.stripe_catalog import stripe_catalog
 
-            stripe_api = StripeAPI()
-            prices = stripe_api.list_prices(active_only=True)
+            prices = stripe_catalog.get_prices()
+            if not prices:
+                return []
 
             # Filter to monthly recurring prices and exclude current plan
             plans = []
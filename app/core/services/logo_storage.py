@@ -8,6 +8,7 @@ import logging
 
 import requests
 from core.models import Company
+from webhooks.services.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -86,8 +87,9 @@ class LogoStorageService:
         """
         try:
             # Make request with timeout and size limit
-            response = requests.get(
+            response = http_client.get(
                 url,
+                service="logo",
                 timeout=REQUEST_TIMEOUT,
                 stream=True,
                 headers={
@@ -0,0 +1,210 @@
+"""In-process catalog of active subscription plans.
+
+Permission and seat checks need a plan's limits on nearly every request,
+but plans change only a few times a year. Each process keeps an immutable
+snapshot of the active Plan rows and reads limits from memory:
+
+    snapshot         PlanSnapshot(version, plans={name: PlanInfo})
+    "plan_catalog_version"   shared version, bumped on every Plan change
+    "plan_catalog"           Redis pub/sub channel announcing new versions
+
+The snapshot is loaded on first use. Saving or deleting a Plan drops the
+local snapshot right away and, once the transaction commits, bumps the
+shared version and publishes it. A listener thread in every process drops
+its snapshot when a message arrives. Without Redis (or if a message is
+lost), processes compare the shared version every VERSION_CHECK_SECONDS.
+
+Usage:
+    from core.services.plan_catalog import plan_catalog
+
+    plan = plan_catalog.get(workspace.subscription_plan)
+    max_users = plan.max_users if plan else 1
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Any
+
+from django.core.cache import cache
+from webhooks.services.redis_client import get_redis_client, redis_key
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PlanInfo:
+    """Read-only copy of a Plan row."""
+
+    name: str
+    display_name: str
+    description: str
+    price_monthly: Decimal
+    price_yearly: Decimal | None
+    max_users: int
+    max_integrations: int
+    max_monthly_notifications: int
+    features: tuple
+    stripe_price_id_monthly: str
+    stripe_price_id_yearly: str
+
+
+@dataclass(frozen=True)
+class PlanSnapshot:
+    """One immutable version of the catalog."""
+
+    version: int
+    plans: MappingProxyType
+
+
+class PlanCatalog:
+    """Process-wide, versioned cache of active plans.
+
+    Attributes:
+        VERSION_KEY: Cache key of the shared catalog version.
+        CHANNEL: Pub/sub channel on which new versions are announced.
+        VERSION_CHECK_SECONDS: How often a process compares its snapshot
+            with the shared version, in case a message was missed.
+        RECONNECT_SECONDS: Delay before the listener resubscribes.
+    """
+
+    VERSION_KEY = "plan_catalog_version"
+    CHANNEL = "plan_catalog"
+    VERSION_CHECK_SECONDS = 30
+    RECONNECT_SECONDS = 5
+
+    def __init__(self) -> None:
+        """Initialize with no snapshot loaded."""
+        self._snapshot: PlanSnapshot | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._listener: threading.Thread | None = None
+
+    def get(self, name: str | None) -> PlanInfo | None:
+        """Get an active plan by name.
+
+        Args:
+            name: Plan name, e.g. "pro".
+
+        Returns:
+            The plan, or None if there's no active plan with that name.
+        """
+        return self.snapshot().plans.get(name)
+
+    def snapshot(self) -> PlanSnapshot:
+        """Get the current snapshot, loading it if needed.
+
+        Returns:
+            The current PlanSnapshot.
+        """
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self._checked_at > self.VERSION_CHECK_SECONDS:
+            self._checked_at = now
+            if self._get_shared_version() != snapshot.version:
+                snapshot = None
+
+        if snapshot is None:
+            snapshot = self._load()
+        return snapshot
+
+    def _load(self) -> PlanSnapshot:
+        """Load active plans from the database into a new snapshot."""
+        from core.models import Plan
+
+        with self._lock:
+            version = self._get_shared_version()
+            plans = {
+                plan.name: PlanInfo(
+                    name=plan.name,
+                    display_name=plan.display_name,
+                    description=plan.description,
+                    price_monthly=plan.price_monthly,
+                    price_yearly=plan.price_yearly,
+                    max_users=plan.max_users,
+                    max_integrations=plan.max_integrations,
+                    max_monthly_notifications=plan.max_monthly_notifications,
+                    features=tuple(plan.features or ()),
+                    stripe_price_id_monthly=plan.stripe_price_id_monthly,
+                    stripe_price_id_yearly=plan.stripe_price_id_yearly,
+                )
+                for plan in Plan.objects.filter(is_active=True)
+            }
+            snapshot = PlanSnapshot(version=version, plans=MappingProxyType(plans))
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+
+        self._start_listener()
+        return snapshot
+
+    def _get_shared_version(self) -> int:
+        """Get the shared catalog version (0 if unset or unreadable)."""
+        try:
+            return int(cache.get(self.VERSION_KEY) or 0)
+        except Exception as e:
+            logger.warning(f"Failed to read plan catalog version: {e}")
+            return 0
+
+    def invalidate(self) -> None:
+        """Drop this process's snapshot; the next read reloads it."""
+        self._snapshot = None
+
+    def publish_change(self) -> None:
+        """Tell every process that the plans changed.
+
+        Called after a Plan change commits.
+        """
+        self.invalidate()
+        try:
+            cache.add(self.VERSION_KEY, 0, timeout=None)
+            version = cache.incr(self.VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"Failed to bump plan catalog version: {e}")
+            return
+
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            redis_client.publish(redis_key(self.CHANNEL), version)
+        except Exception as e:
+            logger.warning(f"Failed to publish plan catalog version: {e}")
+
+    def _start_listener(self) -> None:
+        """Start the pub/sub listener thread once per process, if on Redis."""
+        if self._listener is not None:
+            return
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return
+
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen,
+                    args=(redis_client,),
+                    name="plan-catalog-listener",
+                    daemon=True,
+                )
+                self._listener.start()
+
+    def _listen(self, redis_client: Any) -> None:
+        """Drop the snapshot whenever a new version is announced."""
+        while True:
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(redis_key(self.CHANNEL))
+                # Changes published while we weren't subscribed
+                self.invalidate()
+                for _message in pubsub.listen():
+                    self.invalidate()
+            except Exception as e:
+                logger.warning(f"Plan catalog listener disconnected: {e}")
+            time.sleep(self.RECONNECT_SECONDS)
+
+
+# Module-level singleton instance
+plan_catalog = PlanCatalog()
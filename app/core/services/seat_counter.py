@@ -0,0 +1,83 @@
+"""Cached count of active members per workspace.
+
+Seat checks compare a workspace's active member count with its plan's
+max_users. The count is kept in the cache under
+``workspace_seats:{workspace_id}`` and dropped whenever a WorkspaceMember
+is saved or deleted, so it's recounted at most once per membership change.
+
+Usage:
+    from core.services.seat_counter import seat_counter
+
+    used = seat_counter.get(workspace.id)
+"""
+
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class SeatCounter:
+    """Cache of active member counts.
+
+    Attributes:
+        CACHE_TTL: Lifetime of a count, bounding drift from writes that
+            bypass signals (e.g. QuerySet.update()).
+    """
+
+    CACHE_TTL = 24 * 60 * 60
+
+    def _get_cache_key(self, workspace_id: int) -> str:
+        """Get the cache key of a workspace's count.
+
+        Args:
+            workspace_id: Workspace primary key.
+
+        Returns:
+            Cache key string.
+        """
+        return f"workspace_seats:{workspace_id}"
+
+    def get(self, workspace_id: int) -> int:
+        """Get the number of active members in a workspace.
+
+        Args:
+            workspace_id: Workspace primary key.
+
+        Returns:
+            Active member count.
+        """
+        from core.models import WorkspaceMember
+
+        key = self._get_cache_key(workspace_id)
+        try:
+            count = cache.get(key)
+            if count is not None:
+                return count
+        except Exception as e:
+            logger.warning(f"Failed to read seat count for {workspace_id}: {e}")
+
+        count = WorkspaceMember.objects.filter(
+            workspace_id=workspace_id, is_active=True
+        ).count()
+        try:
+            cache.set(key, count, timeout=self.CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to cache seat count for {workspace_id}: {e}")
+        return count
+
+    def invalidate(self, workspace_id: int) -> None:
+        """Drop a workspace's count after its membership changed.
+
+        Args:
+            workspace_id: Workspace primary key.
+        """
+        try:
+            cache.delete(self._get_cache_key(workspace_id))
+        except Exception as e:
+            logger.warning(f"Failed to clear seat count for {workspace_id}: {e}")
+
+
+# Module-level singleton instance
+seat_counter = SeatCounter()
@@ -0,0 +1,382 @@
+"""Background provisioning of Shopify webhook subscriptions.
+
+Connecting a store subscribes it to several webhook topics, and changing
+event categories or disconnecting adds or removes them. Shopify's REST
+Admin API takes one request per subscription, so these run concurrently
+on the shared HTTP client, in a background thread started once the
+view's transaction commits. Views return right away; the job's progress
+is kept in the cache under ``shopify_webhook_job:{integration_id}``:
+
+    {"action": "subscribe", "state": "running", "created": 0, ...}
+
+where state is one of "pending", "running", "succeeded" or "failed".
+Jobs run in daemon threads, so a restart can cut one short; a pending or
+running status not updated within STALE_AFTER seconds reads as failed.
+
+Usage:
+    from core.services.shopify_webhooks import shopify_webhooks
+
+    shopify_webhooks.subscribe(integration, address, topics, categories)
+    status = shopify_webhooks.get_status(integration.id)
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from webhooks.services.http_client import http_client
+
+if TYPE_CHECKING:
+    from core.models import Integration
+
+logger = logging.getLogger(__name__)
+
+# Timeout for a single Shopify Admin API request (seconds)
+API_TIMEOUT = 30
+
+
+class ShopifyWebhookJobs:
+    """Creates and deletes Shopify webhook subscriptions off the request path.
+
+    Attributes:
+        MAX_WORKERS: Concurrent requests per job.
+        STATUS_TTL: How long a job's status stays available for polling.
+        STALE_AFTER: Seconds after which an unfinished job is reported as
+            failed (a job makes a few rounds of API_TIMEOUT requests).
+    """
+
+    MAX_WORKERS = 8
+    STATUS_TTL = 60 * 60
+    STALE_AFTER = 10 * API_TIMEOUT
+
+    def _get_api_url(self, shop: str, path: str) -> str:
+        """Build a REST Admin API URL.
+
+        Args:
+            shop: The shop domain.
+            path: Path below the versioned API root, e.g. "webhooks.json".
+
+        Returns:
+            The full URL.
+        """
+        return f"https://{shop}/admin/api/{settings.SHOPIFY_API_VERSION}/{path}"
+
+    def _get_status_key(self, integration_id: int) -> str:
+        """Get the cache key of an integration's job status.
+
+        Args:
+            integration_id: Integration primary key.
+
+        Returns:
+            Cache key string.
+        """
+        return f"shopify_webhook_job:{integration_id}"
+
+    def get_status(self, integration_id: int) -> dict[str, Any] | None:
+        """Get the status of an integration's latest job.
+
+        Args:
+            integration_id: Integration primary key.
+
+        Returns:
+            Status dict, or None if no job ran within STATUS_TTL. A pending
+            or running job that stopped updating is reported as failed.
+        """
+        try:
+            status = cache.get(self._get_status_key(integration_id))
+        except Exception as e:
+            logger.warning(f"Failed to read Shopify webhook job {integration_id}: {e}")
+            return None
+
+        if (
+            status
+            and status["state"] in ("pending", "running")
+            and time.time() - status.get("updated_at", 0) > self.STALE_AFTER
+        ):
+            return {
+                **status,
+                "state": "failed",
+                "error": "The webhook setup was interrupted. Please try again.",
+            }
+        return status
+
+    def _set_status(
+        self, integration_id: int, action: str, state: str, **details: Any
+    ) -> None:
+        """Record an integration's job status.
+
+        Args:
+            integration_id: Integration primary key.
+            action: "subscribe" or "unsubscribe".
+            state: "pending", "running", "succeeded" or "failed".
+            **details: Extra fields, e.g. counts or an error message.
+        """
+        status = {
+            "action": action,
+            "state": state,
+            "updated_at": time.time(),
+            **details,
+        }
+        try:
+            cache.set(
+                self._get_status_key(integration_id), status, timeout=self.STATUS_TTL
+            )
+        except Exception as e:
+            logger.warning(f"Failed to save Shopify webhook job {integration_id}: {e}")
+
+    def create_subscriptions(
+        self, shop: str, access_token: str, address: str, topics: list[str]
+    ) -> list[int]:
+        """Subscribe a shop to webhook topics concurrently.
+
+        Args:
+            shop: The shop domain.
+            access_token: The Shopify access token.
+            address: URL Shopify delivers the webhooks to.
+            topics: Webhook topics, e.g. "orders/create".
+
+        Returns:
+            IDs of the created subscriptions, in topic order. Topics that
+            failed or were already subscribed (422) are left out.
+        """
+        url = self._get_api_url(shop, "webhooks.json")
+        headers = {
+            "X-Shopify-Access-Token": access_token,
+            "Content-Type": "application/json",
+        }
+
+        def create(topic: str) -> int | None:
+            try:
+                response = http_client.post(
+                    url,
+                    service="shopify",
+                    headers=headers,
+                    json={
+                        "webhook": {
+                            "topic": topic,
+                            "address": address,
+                            "format": "json",
+                        }
+                    },
+                    timeout=API_TIMEOUT,
+                )
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Error creating Shopify webhook for {topic}: {e!s}")
+                return None
+
+            if response.status_code == 201:
+                webhook_id = response.json().get("webhook", {}).get("id")
+                if webhook_id:
+                    logger.info(f"Created Shopify webhook for {topic}: {webhook_id}")
+                return webhook_id
+            if response.status_code == 422:
+                # Webhook might already exist - this is okay
+                logger.info(f"Shopify webhook for {topic} may already exist")
+            else:
+                logger.warning(
+                    f"Failed to create Shopify webhook for {topic}: "
+                    f"{response.status_code} - {response.text}"
+                )
+            return None
+
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as pool:
+            results = list(pool.map(create, topics))
+        return [webhook_id for webhook_id in results if webhook_id]
+
+    def delete_subscriptions(
+        self, shop: str, access_token: str, webhook_ids: list[int]
+    ) -> int:
+        """Delete webhook subscriptions concurrently.
+
+        Args:
+            shop: The shop domain.
+            access_token: The Shopify access token.
+            webhook_ids: IDs of the subscriptions to delete.
+
+        Returns:
+            Number of subscriptions that are gone (deleted or not found).
+        """
+        headers = {"X-Shopify-Access-Token": access_token}
+
+        def delete(webhook_id: int) -> bool:
+            try:
+                response = http_client.delete(
+                    self._get_api_url(shop, f"webhooks/{webhook_id}.json"),
+                    service="shopify",
+                    headers=headers,
+                    timeout=API_TIMEOUT,
+                )
+            except requests.exceptions.RequestException as e:
+                # Log but don't fail - the webhook might already be deleted
+                logger.warning(f"Error deleting Shopify webhook {webhook_id}: {e!s}")
+                return False
+
+            if response.status_code in (200, 204, 404):
+                logger.info(f"Deleted Shopify webhook {webhook_id}")
+                return True
+            logger.warning(
+                f"Failed to delete Shopify webhook {webhook_id}: {response.status_code}"
+            )
+            return False
+
+        if not webhook_ids:
+            return 0
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as pool:
+            return sum(pool.map(delete, webhook_ids))
+
+    def subscribe(
+        self,
+        integration: "Integration",
+        address: str,
+        topics: list[str],
+        categories: list[str],
+    ) -> None:
+        """Replace an integration's subscriptions once the transaction commits.
+
+        The new topics are subscribed first; only if at least one
+        subscription was created are the integration's previous ones
+        deleted and its webhook_ids and enabled_categories updated.
+
+        Args:
+            integration: The Shopify integration, with credentials saved.
+            address: URL Shopify delivers the webhooks to.
+            topics: Webhook topics to subscribe to.
+            categories: Event categories the topics belong to.
+        """
+        self._set_status(integration.id, "subscribe", "pending")
+        args = (
+            integration.id,
+            integration.integration_settings.get("shop_domain"),
+            integration.oauth_credentials.get("access_token"),
+            address,
+            topics,
+            categories,
+            list(integration.integration_settings.get("webhook_ids", [])),
+        )
+        transaction.on_commit(lambda: self._start("subscribe", self._subscribe, args))
+
+    def unsubscribe(self, integration: "Integration") -> None:
+        """Delete an integration's subscriptions once the transaction commits.
+
+        Args:
+            integration: The Shopify integration being disconnected.
+        """
+        shop = integration.integration_settings.get("shop_domain")
+        access_token = integration.oauth_credentials.get("access_token")
+        webhook_ids = list(integration.integration_settings.get("webhook_ids", []))
+        if not shop or not access_token:
+            return
+
+        self._set_status(integration.id, "unsubscribe", "pending")
+        args = (integration.id, shop, access_token, webhook_ids)
+        transaction.on_commit(
+            lambda: self._start("unsubscribe", self._unsubscribe, args)
+        )
+
+    def _start(self, action: str, target: Callable, args: tuple) -> None:
+        """Run a job in a background thread.
+
+        Args:
+            action: "subscribe" or "unsubscribe".
+            target: The job function.
+            args: Its arguments, starting with the integration ID.
+        """
+
+        def run() -> None:
+            try:
+                self._run(action, target, args)
+            finally:
+                # The thread opened its own DB connection
+                connection.close()
+
+        threading.Thread(
+            target=run, name=f"shopify-webhooks-{action}", daemon=True
+        ).start()
+
+    def _run(self, action: str, target: Callable, args: tuple) -> None:
+        """Run a job, recording its outcome."""
+        integration_id = args[0]
+        self._set_status(integration_id, action, "running")
+        try:
+            target(*args)
+        except Exception as e:
+            logger.exception(f"Shopify webhook {action} job failed: {e}")
+            self._set_status(integration_id, action, "failed", error="Unexpected error")
+
+    def _subscribe(
+        self,
+        integration_id: int,
+        shop: str | None,
+        access_token: str | None,
+        address: str,
+        topics: list[str],
+        categories: list[str],
+        previous_ids: list[int],
+    ) -> None:
+        """Create new subscriptions, save them, then delete stale ones."""
+        from core.models import Integration
+
+        if not shop or not access_token:
+            self._set_status(
+                integration_id, "subscribe", "failed", error="Missing credentials"
+            )
+            return
+
+        webhook_ids = self.create_subscriptions(shop, access_token, address, topics)
+        if topics and not webhook_ids:
+            logger.warning(f"No webhooks created for shop {shop}")
+            self._set_status(
+                integration_id,
+                "subscribe",
+                "failed",
+                error=(
+                    "Could not create webhooks. You may need to configure "
+                    "webhooks manually in Shopify admin."
+                ),
+            )
+            return
+        logger.info(f"Created {len(webhook_ids)} webhooks for shop {shop}")
+
+        with transaction.atomic():
+            integration = Integration.objects.select_for_update().get(pk=integration_id)
+            integration.integration_settings["webhook_ids"] = webhook_ids
+            integration.integration_settings["enabled_categories"] = categories
+            integration.save(update_fields=["integration_settings", "updated_at"])
+
+        stale_ids = [i for i in previous_ids if i not in webhook_ids]
+        deleted = self.delete_subscriptions(shop, access_token, stale_ids)
+        self._set_status(
+            integration_id,
+            "subscribe",
+            "succeeded",
+            created=len(webhook_ids),
+            deleted=deleted,
+        )
+
+    def _unsubscribe(
+        self,
+        integration_id: int,
+        shop: str,
+        access_token: str,
+        webhook_ids: list[int],
+    ) -> None:
+        """Delete an integration's subscriptions."""
+        deleted = self.delete_subscriptions(shop, access_token, webhook_ids)
+        self._set_status(
+            integration_id,
+            "unsubscribe",
+            "succeeded",
+            deleted=deleted,
+            failed=len(webhook_ids) - deleted,
+        )
+
+
+# Module-level singleton instance
+shopify_webhooks = ShopifyWebhookJobs()
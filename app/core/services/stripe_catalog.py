@@ -0,0 +1,243 @@
+"""Local cache of the Stripe product and price catalog.
+
+Plan and pricing pages read the catalog from here instead of calling
+Stripe on every render. There are two layers:
+
+    in-process copy    reused for LOCAL_TTL seconds without any I/O
+    cache (Redis)      "stripe_catalog": {"prices": [...], "refreshed_at": ...}
+
+The catalog is reloaded from Stripe in three situations. A schedule runs
+``manage.py refresh_stripe_catalog``. A product.* or price.* event on the
+billing webhook marks it stale and starts a background reload. A read
+that finds it older than REFRESH_SECONDS starts a background reload and
+serves the current copy meanwhile. Neither reads nor the webhook call
+Stripe themselves. When nothing is cached yet
+(cold start), get_prices() returns None so the caller can fall back to the
+Plan table while a background reload fills the cache.
+
+Usage:
+    from core.services.stripe_catalog import stripe_catalog
+
+    prices = stripe_catalog.get_prices()
+    if prices is None:
+        ...  # use the Plan table
+"""
+
+import logging
+import threading
+import time
+from typing import Any
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Stripe event type prefixes that change the catalog
+CATALOG_EVENT_PREFIXES = ("product.", "price.")
+
+
+class StripeCatalog:
+    """Two-level cache of active Stripe prices with their products.
+
+    Attributes:
+        CACHE_KEY: Cache key of the shared catalog.
+        LOCK_KEY: Cache key that lets one process reload at a time.
+        VERSION_KEY: Cache key counting invalidations, so a reload that
+            overlapped one can tell its listing may predate the change.
+        LOCAL_TTL: Seconds the in-process copy is used before re-reading
+            the cache (bounds how long other workers lag a reload).
+        REFRESH_SECONDS: Age after which a read starts a background reload.
+        CACHE_TTL: Lifetime of the shared copy, long enough to ride out
+            Stripe outages.
+        LOCK_SECONDS: Maximum duration of one reload.
+        REFRESH_ATTEMPTS: Listings one reload makes while invalidations
+            keep arriving.
+    """
+
+    CACHE_KEY = "stripe_catalog"
+    LOCK_KEY = "stripe_catalog_refresh_lock"
+    VERSION_KEY = "stripe_catalog_version"
+    LOCAL_TTL = 60
+    REFRESH_SECONDS = 60 * 60
+    CACHE_TTL = 7 * 24 * 60 * 60
+    LOCK_SECONDS = 60
+    REFRESH_ATTEMPTS = 3
+
+    def __init__(self) -> None:
+        """Initialize with an empty in-process copy."""
+        self._local: dict[str, Any] | None = None
+        self._local_loaded_at = 0.0
+        self._local_lock = threading.Lock()
+
+    def get_prices(self) -> list[dict[str, Any]] | None:
+        """Get the cached active prices, in StripeAPI.list_prices format.
+
+        Never calls Stripe; a missing or aging catalog is reloaded in the
+        background.
+
+        Returns:
+            List of price dictionaries, or None if nothing is cached yet.
+        """
+        catalog = self._get_catalog()
+        if catalog is None:
+            self._refresh_in_background()
+            return None
+
+        if time.time() - catalog["refreshed_at"] > self.REFRESH_SECONDS:
+            self._refresh_in_background()
+        return catalog["prices"]
+
+    def _get_catalog(self) -> dict[str, Any] | None:
+        """Get the catalog from the in-process copy or the shared cache.
+
+        Returns:
+            Catalog dictionary, or None if not cached.
+        """
+        now = time.monotonic()
+        with self._local_lock:
+            if self._local is not None and now - self._local_loaded_at < self.LOCAL_TTL:
+                return self._local
+
+        try:
+            catalog = cache.get(self.CACHE_KEY)
+        except Exception as e:
+            logger.warning(f"Failed to read Stripe catalog cache: {e}")
+            catalog = None
+
+        with self._local_lock:
+            if catalog is not None:
+                self._local, self._local_loaded_at = catalog, now
+            return catalog or self._local
+
+    def refresh(self) -> bool:
+        """Reload the catalog from Stripe and share it.
+
+        An empty or failed listing keeps the current catalog, since
+        StripeAPI.list_prices reports errors as an empty list.
+
+        If the catalog is invalidated while Stripe is being listed, the
+        listing may predate the change, so it is stored and listed again.
+        When invalidations outlast REFRESH_ATTEMPTS listings, the last one
+        is stored marked stale so the next read reloads it.
+
+        Returns:
+            True if the catalog was reloaded, False otherwise.
+        """
+        from core.services.stripe import StripeAPI
+
+        for _ in range(self.REFRESH_ATTEMPTS):
+            version = self._get_version()
+            prices = StripeAPI().list_prices(active_only=True)
+            if not prices:
+                logger.warning("Stripe returned no prices; keeping cached catalog")
+                return False
+
+            self._store({"prices": prices, "refreshed_at": time.time()})
+            if self._get_version() == version:
+                logger.info(f"Refreshed Stripe catalog with {len(prices)} prices")
+                return True
+            logger.info("Stripe catalog changed during refresh; listing again")
+
+        self._store({"prices": prices, "refreshed_at": 0.0})
+        logger.warning(
+            f"Stripe catalog kept changing during {self.REFRESH_ATTEMPTS} "
+            "listings; stored it marked stale"
+        )
+        return True
+
+    def _store(self, catalog: dict[str, Any]) -> None:
+        """Share a catalog and make it the in-process copy.
+
+        Args:
+            catalog: Catalog dictionary.
+        """
+        try:
+            cache.set(self.CACHE_KEY, catalog, timeout=self.CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to store Stripe catalog: {e}")
+
+        with self._local_lock:
+            self._local, self._local_loaded_at = catalog, time.monotonic()
+
+    def _get_version(self) -> int | None:
+        """Get the shared invalidation count.
+
+        Returns:
+            Number of invalidations, or None if the cache can't be read.
+        """
+        try:
+            return cache.get(self.VERSION_KEY, 0)
+        except Exception as e:
+            logger.warning(f"Failed to read Stripe catalog version: {e}")
+            return None
+
+    def invalidate(self) -> None:
+        """Mark the catalog stale after a product or price changed in Stripe.
+
+        Called from the billing webhook, which doesn't wait for Stripe: the
+        reload runs in the background, one process at a time, and reads
+        keep serving the current copy meanwhile. If the reload fails, the
+        stale mark makes the next read retry. A reload already running
+        sees the invalidation count change and lists Stripe again. Other
+        workers pick up the new catalog within LOCAL_TTL seconds.
+        """
+        try:
+            cache.add(self.VERSION_KEY, 0, timeout=self.CACHE_TTL)
+            cache.incr(self.VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"Failed to count Stripe catalog invalidation: {e}")
+
+        catalog = self._get_catalog()
+        if catalog is not None:
+            stale = {**catalog, "refreshed_at": 0.0}
+            try:
+                cache.set(self.CACHE_KEY, stale, timeout=self.CACHE_TTL)
+            except Exception as e:
+                logger.warning(f"Failed to mark Stripe catalog stale: {e}")
+            with self._local_lock:
+                self._local = stale
+
+        self._refresh_in_background()
+
+    def _refresh_in_background(self) -> None:
+        """Start a background reload unless another process is reloading."""
+        try:
+            if not cache.add(self.LOCK_KEY, 1, timeout=self.LOCK_SECONDS):
+                return
+        except Exception as e:
+            logger.warning(f"Failed to take Stripe catalog refresh lock: {e}")
+            return
+
+        threading.Thread(
+            target=self._refresh_and_unlock,
+            name="stripe-catalog-refresh",
+            daemon=True,
+        ).start()
+
+    def _refresh_and_unlock(self) -> None:
+        """Reload the catalog, then release the refresh lock."""
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Background Stripe catalog refresh failed: {e}")
+        finally:
+            try:
+                cache.delete(self.LOCK_KEY)
+            except Exception:
+                pass  # The lock expires on its own
+
+
+def is_catalog_event(event_type: str | None) -> bool:
+    """Check whether a Stripe event type changes the catalog.
+
+    Args:
+        event_type: Stripe event type, e.g. "price.updated".
+
+    Returns:
+        True for product.* and price.* events.
+    """
+    return bool(event_type) and event_type.startswith(CATALOG_EVENT_PREFIXES)
+
+
+# Module-level singleton instance
+stripe_catalog = StripeCatalog()
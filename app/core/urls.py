@@ -120,6 +120,11 @@ urlpatterns = [
         views.update_shopify_events,
         name="update_shopify_events",
     ),
+    path(
+        "api/shopify/webhook-status/",
+        views.shopify_webhook_status,
+        name="shopify_webhook_status",
+    ),
     # WebAuthn endpoints
     path(
         "webauthn/register/begin/",
@@ -167,4 +172,8 @@ urlpatterns = [
         views.update_notification_settings,
         name="update_notification_settings",
     ),
+    path("api/usage/series/", views.usage_series, name="usage_series"),
+    path("api/activity/stream/", views.activity_stream, name="activity_stream"),
+    path("api/lookup/", views.lookup_api, name="lookup_api"),
+    path("lookup/", views.activity_lookup, name="activity_lookup"),
 ]
@@ -22,8 +22,12 @@ from .billing import (
     upgrade_plan,
 )
 from .dashboard import (
+    activity_lookup,
+    activity_stream,
     create_workspace,
     dashboard,
+    lookup_api,
+    usage_series,
     workspace_settings,
 )
 from .errors import (
@@ -45,6 +49,7 @@ from .integrations import (
     integrations,
     shopify_connect,
     shopify_connect_callback,
+    shopify_webhook_status,
     slack_connect,
     slack_connect_callback,
     test_slack,
@@ -83,6 +88,10 @@ __all__ = [
     "dashboard",
     "create_workspace",
     "workspace_settings",
+    "usage_series",
+    "activity_stream",
+    "lookup_api",
+    "activity_lookup",
     # Integrations
     "integrations",
     "integrate_slack",
@@ -99,6 +108,7 @@ __all__ = [
     "disconnect_shopify",
     "disconnect_hunter",
     "update_shopify_events",
+    "shopify_webhook_status",
     "test_slack",
     "get_slack_channels",
     "configure_slack",
@@ -12,6 +12,7 @@ from django.contrib.auth import login
 from django.contrib.auth.models import User
 from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
 from django.shortcuts import redirect
+from webhooks.services.http_client import http_client
 
 from ..models import UserProfile
 
@@ -77,8 +78,9 @@ def _get_slack_token(code: str) -> dict[str, Any] | None:
         Token data dictionary, or None on failure.
     """
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://slack.com/api/openid.connect.token",
+            service="slack",
             data={
                 "client_id": settings.SLACK_CLIENT_ID,
                 "client_secret": settings.SLACK_CLIENT_SECRET,
@@ -111,8 +113,9 @@ def _get_slack_user_info(access_token: str) -> dict[str, Any] | None:
         User info dictionary, or None on failure.
     """
     try:
-        response = requests.get(
+        response = http_client.get(
             "https://slack.com/api/openid.connect.userInfo",
+            service="slack",
             headers={"Authorization": f"Bearer {access_token}"},
             timeout=SLACK_API_TIMEOUT,
         )
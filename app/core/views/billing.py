@@ -14,14 +14,24 @@ from django.shortcuts import redirect, render
 from django.utils import timezone
 from webhooks.services.rate_limiter import rate_limiter
 
-from ..models import Plan
-from ..permissions import get_workspace_for_user
+from ..models import Plan, Workspace
+from ..services.plan_catalog import plan_catalog
+from ..workspace_context import get_workspace_context
 
 logger = logging.getLogger(__name__)
 
 
-# Use centralized permission function instead of duplicating logic
-_get_user_workspace = get_workspace_for_user
+def _get_user_workspace(request: HttpRequest) -> Workspace | None:
+    """Get the workspace of the user's active membership.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        The member's workspace, or None without an active membership.
+    """
+    member = get_workspace_context(request).member
+    return member.workspace if member else None
 
 
 def select_plan(request: HttpRequest) -> HttpResponse | HttpResponseRedirect:
@@ -36,7 +46,7 @@ def select_plan(request: HttpRequest) -> HttpResponse | HttpResponseRedirect:
     if request.method == "POST":
         selected_plan = request.POST.get("plan")
         # Validate against available plans
-        if Plan.objects.filter(name=selected_plan, is_active=True).exists():
+        if plan_catalog.get(selected_plan) is not None:
             request.session["selected_plan"] = selected_plan
             return redirect("core:plan_selected")
 
@@ -91,7 +101,7 @@ def billing_dashboard(request: HttpRequest) -> HttpResponse | HttpResponseRedire
     """
     from core.services.dashboard import BillingService
 
-    workspace = _get_user_workspace(request.user)
+    workspace = _get_user_workspace(request)
     if not workspace:
         return redirect("core:create_workspace")
 
@@ -122,7 +132,7 @@ def upgrade_plan(request: HttpRequest) -> HttpResponse | HttpResponseRedirect:
     """
     from core.services.dashboard import BillingService
 
-    workspace = _get_user_workspace(request.user)
+    workspace = _get_user_workspace(request)
     if not workspace:
         return redirect("core:create_workspace")
 
@@ -147,7 +157,7 @@ def payment_methods(request: HttpRequest) -> HttpResponse | HttpResponseRedirect
     Returns:
         Payment methods page or redirect to workspace creation.
     """
-    workspace = _get_user_workspace(request.user)
+    workspace = _get_user_workspace(request)
     if not workspace:
         return redirect("core:create_workspace")
 
@@ -179,7 +189,7 @@ def billing_history(request: HttpRequest) -> HttpResponse | HttpResponseRedirect
 
     from core.services.stripe import StripeAPI
 
-    workspace = _get_user_workspace(request.user)
+    workspace = _get_user_workspace(request)
     if not workspace:
         return redirect("core:create_workspace")
 
@@ -212,11 +222,9 @@ def billing_history(request: HttpRequest) -> HttpResponse | HttpResponseRedirect
     # Get current month billing amount from Plan model
     current_month_amount = 0.00
     if workspace.subscription_status != "trial":
-        try:
-            plan = Plan.objects.get(name=workspace.subscription_plan, is_active=True)
+        plan = plan_catalog.get(workspace.subscription_plan)
+        if plan is not None:
             current_month_amount = float(plan.price_monthly)
-        except Plan.DoesNotExist:
-            current_month_amount = 0.00
 
     # Get rate limit info for next payment date
     is_allowed, rate_limit_info = rate_limiter.check_rate_limit(workspace)
@@ -252,7 +260,7 @@ def checkout(
     from core.services.stripe import StripeAPI
     from django.conf import settings as django_settings
 
-    workspace = _get_user_workspace(request.user)
+    workspace = _get_user_workspace(request)
     if not workspace:
         return redirect("core:create_workspace")
 
@@ -330,7 +338,7 @@ def billing_portal(request: HttpRequest) -> HttpResponse | HttpResponseRedirect:
     """
     from core.services.stripe import StripeAPI
 
-    workspace = _get_user_workspace(request.user)
+    workspace = _get_user_workspace(request)
     if not workspace:
         return redirect("core:create_workspace")
 
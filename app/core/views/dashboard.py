@@ -3,15 +3,25 @@
 This module handles the main dashboard and workspace settings.
 """
 
+import json
 import logging
+from collections.abc import AsyncIterator
 from typing import Any
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
 
 from ..models import UserProfile, Workspace, WorkspaceMember
+from ..workspace_context import aresolve_workspace_context, get_workspace_context
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +39,9 @@ def dashboard(request: HttpRequest) -> HttpResponse | HttpResponseRedirect:
     from core.services.dashboard import DashboardService
 
     dashboard_service = DashboardService()
-    dashboard_data = dashboard_service.get_dashboard_data(request.user)
+    dashboard_data = dashboard_service.get_dashboard_data(
+        request.user, get_workspace_context(request)
+    )
 
     if not dashboard_data:
         # User doesn't have a workspace yet
@@ -50,6 +62,7 @@ def dashboard(request: HttpRequest) -> HttpResponse | HttpResponseRedirect:
         "recent_activity": dashboard_data["recent_activity"],
         **dashboard_data["usage_data"],  # rate_limit_info, usage_stats, etc.
         **dashboard_data["trial_info"],  # trial_days_remaining, is_trial, etc.
+        **dashboard_data["queue_stats"],  # queue_stats, tenant_queue_stats
     }
 
     return render(request, "core/dashboard.html.j2", context)
@@ -183,29 +196,268 @@ def workspace_settings(request: HttpRequest) -> HttpResponse | HttpResponseRedir
     Returns:
         Settings page or redirect to workspace creation.
     """
+    workspace = get_workspace_context(request).workspace
+    if workspace is None:
+        return redirect("core:create_workspace")
+
+    if request.method == "POST":
+        workspace.name = request.POST.get("name", workspace.name)
+        workspace.shop_domain = request.POST.get("shop_domain", workspace.shop_domain)
+        workspace.save()
+        messages.success(request, "Workspace settings updated!")
+        return redirect("core:workspace_settings")
+
+    context = {"workspace": workspace}
+    return render(request, "core/workspace_settings.html.j2", context)
+
+
+@login_required
+def usage_series(request: HttpRequest) -> JsonResponse:
+    """Get usage chart series for the user's workspace.
+
+    Query parameters: resolution (minute, hour, day), points, group_by
+    (provider, event_type, outcome) and optional provider, event_type and
+    outcome filters.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        JSON response with aligned series or error.
+    """
+    from webhooks.services.usage_metrics import usage_metrics
+
+    workspace = get_workspace_context(request).workspace
+    if workspace is None:
+        return JsonResponse({"error": "Workspace not found"}, status=404)
+
     try:
-        # Try to get workspace from WorkspaceMember first
-        member = WorkspaceMember.objects.filter(
-            user=request.user, is_active=True
-        ).first()
-        if member:
-            workspace = member.workspace
-        else:
-            # Fall back to UserProfile for backward compatibility
-            user_profile = UserProfile.objects.get(user=request.user)
-            workspace = user_profile.workspace
-
-        if request.method == "POST":
-            workspace.name = request.POST.get("name", workspace.name)
-            workspace.shop_domain = request.POST.get(
-                "shop_domain", workspace.shop_domain
+        points = int(request.GET.get("points", 24))
+        series = usage_metrics.get_series(
+            str(workspace.uuid),
+            resolution=request.GET.get("resolution", "hour"),
+            points=points,
+            group_by=request.GET.get("group_by", "outcome"),
+            provider=request.GET.get("provider") or None,
+            event_type=request.GET.get("event_type") or None,
+            outcome=request.GET.get("outcome") or None,
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse(series)
+
+
+LOOKUP_PAGE_SIZE = 20
+MAX_LOOKUP_PAGE_SIZE = 100
+LOOKUP_FIELD_LABELS = [
+    ("customer_id", "Customer ID"),
+    ("external_id", "External ID"),
+    ("email", "Email"),
+]
+
+
+def _parse_lookup_cursor(raw: str | None) -> str | None:
+    """Validate a lookup pagination cursor from a query parameter.
+
+    Args:
+        raw: Query parameter value, possibly empty.
+
+    Returns:
+        The cursor, or None for the first page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    from webhooks.services.redis_client import parse_index_cursor
+
+    if not raw:
+        return None
+    parse_index_cursor(raw)
+    return raw
+
+
+@login_required
+def lookup_api(request: HttpRequest) -> JsonResponse:
+    """Look up the workspace's events by customer ID, external ID or email.
+
+    Query parameters: field (customer_id, external_id, email), value,
+    source (records for enriched activity, webhooks for raw payloads),
+    limit and before (the next_before cursor of the previous page).
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        JSON response with one page of results and the next cursor, or error.
+    """
+    from webhooks.services.database_lookup import DatabaseLookupService
+    from webhooks.services.webhook_storage import webhook_storage_service
+
+    workspace = get_workspace_context(request).workspace
+    if workspace is None:
+        return JsonResponse({"error": "Workspace not found"}, status=404)
+
+    field = request.GET.get("field", "customer_id")
+    value = request.GET.get("value", "")
+    source = request.GET.get("source", "records")
+    try:
+        before = _parse_lookup_cursor(request.GET.get("before"))
+        limit = int(request.GET.get("limit", LOOKUP_PAGE_SIZE))
+        limit = max(1, min(limit, MAX_LOOKUP_PAGE_SIZE))
+
+        if source == "records":
+            page = DatabaseLookupService().lookup_records(
+                str(workspace.uuid), field, value, limit=limit, before=before
             )
-            workspace.save()
-            messages.success(request, "Workspace settings updated!")
-            return redirect("core:workspace_settings")
+            return JsonResponse(
+                {"results": page["records"], "next_before": page["next_before"]}
+            )
+        if source == "webhooks":
+            page = webhook_storage_service.lookup_webhooks(
+                str(workspace.uuid),
+                field,
+                value,
+                limit=limit,
+                before=before,
+            )
+            return JsonResponse(
+                {"results": page["webhooks"], "next_before": page["next_before"]}
+            )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
 
-        context = {"workspace": workspace}
-        return render(request, "core/workspace_settings.html.j2", context)
+    return JsonResponse({"error": f"Unknown source: {source}"}, status=400)
 
-    except UserProfile.DoesNotExist:
-        return redirect("core:create_workspace")
+
+@login_required
+def activity_lookup(request: HttpRequest) -> HttpResponse | HttpResponseRedirect:
+    """Support page to find a customer's activity and raw webhooks.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        Lookup page or redirect to the dashboard.
+    """
+    from core.services.dashboard import DashboardService
+    from webhooks.services.database_lookup import DatabaseLookupService
+    from webhooks.services.webhook_storage import webhook_storage_service
+
+    workspace = get_workspace_context(request).workspace
+    if workspace is None:
+        return redirect("core:dashboard")
+
+    field = request.GET.get("field", "customer_id")
+    value = request.GET.get("value", "").strip()
+    context: dict[str, Any] = {
+        "workspace": workspace,
+        "organization": workspace,  # Alias for template compatibility
+        "lookup_fields": LOOKUP_FIELD_LABELS,
+        "field": field,
+        "value": value,
+        "activities": [],
+        "webhooks": [],
+        "next_before": None,
+        "webhooks_next_before": None,
+    }
+
+    if value:
+        try:
+            before = _parse_lookup_cursor(request.GET.get("before"))
+            webhooks_before = _parse_lookup_cursor(request.GET.get("webhooks_before"))
+            records = DatabaseLookupService().lookup_records(
+                str(workspace.uuid), field, value, LOOKUP_PAGE_SIZE, before
+            )
+            webhooks = webhook_storage_service.lookup_webhooks(
+                str(workspace.uuid),
+                field,
+                value,
+                LOOKUP_PAGE_SIZE,
+                webhooks_before,
+            )
+        except ValueError as e:
+            messages.error(request, str(e))
+        else:
+            dashboard_service = DashboardService()
+            context["activities"] = [
+                item
+                for item in map(
+                    dashboard_service.build_activity_item, records["records"]
+                )
+                if item
+            ]
+            context["next_before"] = records["next_before"]
+            context["webhooks"] = webhooks["webhooks"]
+            context["webhooks_next_before"] = webhooks["next_before"]
+
+    return render(request, "core/activity_lookup.html.j2", context)
+
+
+def _format_activity_event(event_id: int, record: dict[str, Any]) -> str:
+    """Format an activity record as a server-sent event.
+
+    Args:
+        event_id: Stream event ID (sent back as Last-Event-ID on reconnect).
+        record: Raw activity record.
+
+    Returns:
+        SSE "activity" event with the record and its rendered list item.
+    """
+    from core.services.dashboard import DashboardService
+
+    item = DashboardService().build_activity_item(record)
+    html = (
+        render_to_string("core/partials/_activity_item.html.j2", {"activity": item})
+        if item
+        else ""
+    )
+    data = json.dumps({"record": record, "html": html})
+    return f"id: {event_id}\nevent: activity\ndata: {data}\n\n"
+
+
+@login_required
+async def activity_stream(request: HttpRequest) -> HttpResponse:
+    """Stream new activity for the user's workspace as server-sent events.
+
+    An async view, so an open dashboard tab holds a coroutine rather than
+    a worker thread. Browsers reconnect automatically and send the
+    Last-Event-ID header; records published since that event are replayed
+    before live ones. The "last_event_id" query parameter does the same
+    for clients that can't set headers.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        text/event-stream response, or 404 if the user has no workspace.
+    """
+    from webhooks.services.activity_stream import activity_stream as stream
+
+    context = await aresolve_workspace_context(await request.auser())
+    workspace = context.workspace
+    if workspace is None:
+        return JsonResponse({"error": "Workspace not found"}, status=404)
+
+    last_event_id: int | None = None
+    raw_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    if raw_id:
+        try:
+            last_event_id = int(raw_id)
+        except ValueError:
+            last_event_id = None
+
+    async def events() -> AsyncIterator[str]:
+        # Reconnect delay the browser should use, in milliseconds
+        yield "retry: 3000\n\n"
+        async for item in stream.stream(str(workspace.uuid), last_event_id):
+            if item is None:
+                yield ": keepalive\n\n"
+            else:
+                yield _format_activity_event(*item)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx-style proxies from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -24,7 +24,7 @@ from django.contrib.auth.decorators import login_required
 from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
 from django.shortcuts import redirect, render
 
-from ...models import UserProfile, WorkspaceMember
+from ...workspace_context import get_workspace_context
 
 # Import all integration views for re-export
 from .chargify import integrate_chargify
@@ -34,6 +34,7 @@ from .shopify import (
     integrate_shopify,
     shopify_connect,
     shopify_connect_callback,
+    shopify_webhook_status,
     update_shopify_events,
 )
 from .slack import (
@@ -73,6 +74,7 @@ __all__ = [
     "shopify_connect_callback",
     "disconnect_shopify",
     "update_shopify_events",
+    "shopify_webhook_status",
     # Chargify
     "integrate_chargify",
     # Hunter.io
@@ -96,16 +98,9 @@ def integrations(request: HttpRequest) -> HttpResponse | HttpResponseRedirect:
     """
     from core.services.dashboard import IntegrationService
 
-    # Try WorkspaceMember first
-    member = WorkspaceMember.objects.filter(user=request.user, is_active=True).first()
-    if member:
-        workspace = member.workspace
-    else:
-        try:
-            user_profile = UserProfile.objects.get(user=request.user)
-            workspace = user_profile.workspace
-        except UserProfile.DoesNotExist:
-            return redirect("core:create_workspace")
+    workspace = get_workspace_context(request).workspace
+    if workspace is None:
+        return redirect("core:create_workspace")
 
     integration_service = IntegrationService()
     context = integration_service.get_integration_overview(workspace)
@@ -11,7 +11,8 @@ from django.contrib import messages
 from django.http import HttpRequest, HttpResponseRedirect
 from django.shortcuts import redirect
 
-from ...models import UserProfile, Workspace, WorkspaceMember
+from ...models import Workspace
+from ...workspace_context import get_workspace_context
 
 logger = logging.getLogger(__name__)
 
@@ -72,20 +73,7 @@ def get_user_workspace(request: HttpRequest) -> Workspace | None:
     Returns:
         The user's workspace or None if not found.
     """
-    if not request.user.is_authenticated:
-        return None
-
-    # Try WorkspaceMember first
-    member = WorkspaceMember.objects.filter(user=request.user, is_active=True).first()
-    if member:
-        return member.workspace
-
-    # Fall back to UserProfile for backward compatibility
-    try:
-        user_profile = UserProfile.objects.get(user=request.user)
-        return user_profile.workspace
-    except UserProfile.DoesNotExist:
-        return None
+    return get_workspace_context(request).workspace
 
 
 def require_workspace(
@@ -127,16 +115,13 @@ def require_admin_role(
     if not request.user.is_authenticated:
         return None, redirect("account_login")
 
-    # Get workspace membership
-    member = WorkspaceMember.objects.filter(user=request.user, is_active=True).first()
+    context = get_workspace_context(request)
+    member = context.member
     if member is None:
-        # Fall back to UserProfile for backward compatibility
-        try:
-            user_profile = UserProfile.objects.get(user=request.user)
-            # UserProfile users are treated as owners for backward compatibility
-            return user_profile.workspace, None
-        except UserProfile.DoesNotExist:
-            return None, redirect("core:create_workspace")
+        # UserProfile users are treated as owners for backward compatibility
+        if context.workspace is not None:
+            return context.workspace, None
+        return None, redirect("core:create_workspace")
 
     # Check role
     if member.role not in ("owner", "admin"):
@@ -2,7 +2,9 @@
 
 Handles Shopify OAuth 2.0 flow for receiving order and customer webhooks.
 Similar to Stripe Connect, this automatically creates webhook subscriptions
-after successful OAuth authorization.
+after successful OAuth authorization. Subscriptions are created and deleted
+by a background job (see core.services.shopify_webhooks) whose progress the
+integration page polls through shopify_webhook_status.
 """
 
 import hashlib
@@ -15,12 +17,15 @@ import requests
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+from django.http import HttpRequest, HttpResponse, HttpResponseRedirect, JsonResponse
 from django.shortcuts import redirect, render
+from webhooks.services.http_client import http_client
 
 from ...models import Integration, Workspace
+from ...services.shopify_webhooks import shopify_webhooks
 from .base import (
     DEFAULT_API_TIMEOUT,
+    get_user_workspace,
     require_admin_role,
     require_post_method,
     require_workspace,
@@ -127,6 +132,11 @@ def integrate_shopify(request: HttpRequest) -> HttpResponse | HttpResponseRedire
         "shopify_configured": bool(settings.SHOPIFY_CLIENT_ID),
         "event_categories": SHOPIFY_EVENT_CATEGORIES,
         "enabled_categories": enabled_categories,
+        "webhook_job": (
+            shopify_webhooks.get_status(existing_integration.id)
+            if existing_integration
+            else None
+        ),
     }
     return render(request, "core/integrate_shopify.html.j2", context)
 
@@ -215,7 +225,7 @@ def shopify_connect_callback(
     """Handle Shopify OAuth callback.
 
     Validates state parameter, exchanges authorization code for access token,
-    creates webhook subscriptions, and stores the integration.
+    stores the integration, and queues creation of its webhook subscriptions.
 
     Args:
         request: The HTTP request object.
@@ -291,18 +301,15 @@ def shopify_connect_callback(
         messages.error(request, "Shopify connection failed: Invalid response")
         return redirect("core:integrations")
 
-    # Create webhook subscriptions for enabled categories
-    webhook_result = _create_webhook_subscriptions(
-        request, workspace, shop, access_token, enabled_categories
+    # Keep the previous subscriptions' IDs so the job can replace them
+    existing_integration = Integration.objects.filter(
+        workspace=workspace, integration_type=INTEGRATION_TYPE
+    ).first()
+    previous_ids = (
+        existing_integration.integration_settings.get("webhook_ids", [])
+        if existing_integration
+        else []
     )
-    if webhook_result is None:
-        # Still save the integration but warn about webhook issues
-        logger.warning(
-            f"Webhook creation failed for shop {shop}, saving integration anyway"
-        )
-        webhook_ids = []
-    else:
-        webhook_ids = webhook_result
 
     # Store or update Shopify integration
     integration, created = Integration.objects.update_or_create(
@@ -315,18 +322,21 @@ def shopify_connect_callback(
             },
             "integration_settings": {
                 "shop_domain": shop,
-                "webhook_ids": webhook_ids,
+                "webhook_ids": previous_ids,
                 "enabled_categories": enabled_categories,
             },
             "is_active": True,
         },
     )
 
+    # Create webhook subscriptions for enabled categories in the background
+    _queue_webhook_subscriptions(integration, workspace, enabled_categories)
+
     action = "connected" if created else "reconnected"
     logger.info(f"Shopify {action} for workspace {workspace.name} (shop: {shop})")
     messages.success(
         request,
-        f"Shopify {action} successfully! You will now receive order notifications.",
+        f"Shopify {action} successfully! Webhook subscriptions are being set up.",
     )
     return redirect("core:integrations")
 
@@ -361,13 +371,13 @@ def disconnect_shopify(request: HttpRequest) -> HttpResponseRedirect:
         messages.warning(request, "No active Shopify integration found")
         return redirect("core:integrations")
 
-    # Try to delete webhook subscriptions from Shopify
-    _delete_webhook_subscriptions(integration)
-
     # Deactivate the integration
     integration.is_active = False
     integration.save()
 
+    # Delete webhook subscriptions from Shopify in the background
+    shopify_webhooks.unsubscribe(integration)
+
     messages.success(request, "Shopify disconnected successfully!")
     return redirect("core:integrations")
 
@@ -424,44 +434,56 @@ def update_shopify_events(request: HttpRequest) -> HttpResponseRedirect:
         messages.error(request, "Integration is missing required credentials")
         return redirect("core:integrate_shopify")
 
-    # Update webhooks if categories changed
+    # Update webhooks if categories changed. The job creates the new
+    # webhooks before deleting the old ones, and keeps the existing
+    # configuration if creation fails.
     if set(new_categories) != set(old_categories):
-        # Create new webhooks first (before deleting old ones) to minimize downtime
-        # and avoid losing webhooks if creation fails
-        new_webhook_ids = _create_webhook_subscriptions(
-            request, workspace, shop, access_token, new_categories
+        _queue_webhook_subscriptions(integration, workspace, new_categories)
+        logger.info(
+            f"Updating Shopify event categories for workspace {workspace.name}: "
+            f"{old_categories} -> {new_categories}"
         )
-
-        # Only delete old webhooks after new ones are created successfully
-        if new_webhook_ids is not None:
-            _delete_webhook_subscriptions(integration)
-
-            # Update integration settings
-            integration.integration_settings["enabled_categories"] = new_categories
-            integration.integration_settings["webhook_ids"] = new_webhook_ids
-            integration.save()
-
-            logger.info(
-                f"Updated Shopify event categories for workspace {workspace.name}: "
-                f"{old_categories} -> {new_categories}"
-            )
-            messages.success(request, "Event subscriptions updated successfully!")
-        else:
-            # Creation failed - keep existing webhooks
-            logger.error(
-                f"Failed to create new webhooks for workspace {workspace.name}, "
-                "keeping existing configuration"
-            )
-            messages.error(
-                request,
-                "Failed to update event subscriptions. Please try again.",
-            )
+        messages.info(request, "Updating event subscriptions...")
     else:
         messages.info(request, "No changes to event subscriptions")
 
     return redirect("core:integrate_shopify")
 
 
+@login_required
+def shopify_webhook_status(request: HttpRequest) -> JsonResponse:
+    """Report the progress of the workspace's Shopify webhook job.
+
+    Polled by the Shopify integration page after connecting, changing
+    event categories, or disconnecting.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        JSON response with the job status, or state "idle" if none is known.
+    """
+    workspace = get_user_workspace(request)
+    if not workspace:
+        return JsonResponse({"error": "Workspace not found"}, status=404)
+
+    integration = Integration.objects.filter(
+        workspace=workspace, integration_type=INTEGRATION_TYPE
+    ).first()
+    if not integration:
+        return JsonResponse({"error": "No Shopify integration found"}, status=404)
+
+    status = shopify_webhooks.get_status(integration.id) or {"state": "idle"}
+    return JsonResponse(
+        {
+            **status,
+            "webhook_count": len(
+                integration.integration_settings.get("webhook_ids", [])
+            ),
+        }
+    )
+
+
 def _normalize_shop_domain(shop_url: str) -> tuple[str | None, str | None]:
     """Normalize shop URL to myshopify.com domain.
 
@@ -581,8 +603,9 @@ def _exchange_code_for_token(request: HttpRequest, shop: str, code: str) -> dict
     token_url = f"https://{shop}/admin/oauth/access_token"
 
     try:
-        response = requests.post(
+        response = http_client.post(
             token_url,
+            service="shopify",
             data={
                 "client_id": settings.SHOPIFY_CLIENT_ID,
                 "client_secret": settings.SHOPIFY_CLIENT_SECRET,
@@ -614,121 +637,20 @@ def _exchange_code_for_token(request: HttpRequest, shop: str, code: str) -> dict
     return token_data
 
 
-def _create_webhook_subscriptions(
-    request: HttpRequest,
-    workspace: Workspace,
-    shop: str,
-    access_token: str,
-    enabled_categories: list[str] | None = None,
-) -> list[int] | None:
-    """Create webhook subscriptions on the Shopify store.
+def _queue_webhook_subscriptions(
+    integration: Integration, workspace: Workspace, enabled_categories: list[str]
+) -> None:
+    """Queue replacement of an integration's webhook subscriptions.
 
     Args:
-        request: The HTTP request object.
-        workspace: The user's workspace.
-        shop: The shop domain.
-        access_token: The Shopify access token.
-        enabled_categories: List of category keys to create webhooks for.
-            If None, uses all default categories.
-
-    Returns:
-        List of created webhook IDs or None if failed.
+        integration: The saved Shopify integration.
+        workspace: The integration's workspace.
+        enabled_categories: Category keys to subscribe to.
     """
-    if enabled_categories is None:
-        enabled_categories = _get_default_categories()
-
-    # Get topics for enabled categories
     topics = _get_topics_for_categories(enabled_categories)
     if not topics:
         logger.warning("No webhook topics to create - no categories enabled")
-        return []
-
-    webhook_url = f"{settings.BASE_URL}/webhook/customer/{workspace.uuid}/shopify/"
-    api_version = settings.SHOPIFY_API_VERSION
-    webhook_ids = []
-
-    headers = {
-        "X-Shopify-Access-Token": access_token,
-        "Content-Type": "application/json",
-    }
-
-    for topic in topics:
-        try:
-            response = requests.post(
-                f"https://{shop}/admin/api/{api_version}/webhooks.json",
-                headers=headers,
-                json={
-                    "webhook": {
-                        "topic": topic,
-                        "address": webhook_url,
-                        "format": "json",
-                    }
-                },
-                timeout=DEFAULT_API_TIMEOUT,
-            )
-
-            if response.status_code == 201:
-                webhook_data = response.json()
-                webhook_id = webhook_data.get("webhook", {}).get("id")
-                if webhook_id:
-                    webhook_ids.append(webhook_id)
-                    logger.info(f"Created Shopify webhook for {topic}: {webhook_id}")
-            elif response.status_code == 422:
-                # Webhook might already exist - this is okay
-                logger.info(f"Shopify webhook for {topic} may already exist")
-            else:
-                logger.warning(
-                    f"Failed to create Shopify webhook for {topic}: "
-                    f"{response.status_code} - {response.text}"
-                )
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error creating Shopify webhook for {topic}: {e!s}")
-
-    if not webhook_ids:
-        logger.warning(f"No webhooks created for shop {shop}")
-        messages.warning(
-            request,
-            "Connected to Shopify but could not create webhooks. "
-            "You may need to configure webhooks manually in Shopify admin.",
-        )
-        return None
-
-    logger.info(f"Created {len(webhook_ids)} webhooks for shop {shop}")
-    return webhook_ids
-
-
-def _delete_webhook_subscriptions(integration: Integration) -> None:
-    """Delete webhook subscriptions from the Shopify store.
-
-    Args:
-        integration: The Shopify integration.
-    """
-    shop = integration.integration_settings.get("shop_domain")
-    access_token = integration.oauth_credentials.get("access_token")
-    webhook_ids = integration.integration_settings.get("webhook_ids", [])
-
-    if not shop or not access_token:
         return
 
-    api_version = settings.SHOPIFY_API_VERSION
-    headers = {
-        "X-Shopify-Access-Token": access_token,
-    }
-
-    for webhook_id in webhook_ids:
-        try:
-            response = requests.delete(
-                f"https://{shop}/admin/api/{api_version}/webhooks/{webhook_id}.json",
-                headers=headers,
-                timeout=DEFAULT_API_TIMEOUT,
-            )
-            if response.status_code in (200, 204, 404):
-                logger.info(f"Deleted Shopify webhook {webhook_id}")
-            else:
-                logger.warning(
-                    f"Failed to delete Shopify webhook {webhook_id}: "
-                    f"{response.status_code}"
-                )
-        except requests.exceptions.RequestException as e:
-            # Log but don't fail - the webhook might already be deleted
-            logger.warning(f"Error deleting Shopify webhook {webhook_id}: {e!s}")
+    webhook_url = f"{settings.BASE_URL}/webhook/customer/{workspace.uuid}/shopify/"
+    shopify_webhooks.subscribe(integration, webhook_url, topics, enabled_categories)
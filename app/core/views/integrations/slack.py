@@ -12,6 +12,7 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.http import HttpRequest, HttpResponse, HttpResponseRedirect, JsonResponse
 from django.shortcuts import redirect
+from webhooks.services.http_client import http_client
 
 from ...models import Integration, Workspace
 from .base import (
@@ -78,8 +79,9 @@ def slack_connect_callback(
 
     # Exchange code for token
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://slack.com/api/oauth.v2.access",
+            service="slack",
             data={
                 "client_id": settings.SLACK_CLIENT_ID,
                 "client_secret": settings.SLACK_CLIENT_SECRET,
@@ -236,8 +238,9 @@ def _send_test_via_api(
         return
 
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://slack.com/api/chat.postMessage",
+            service="slack",
             headers={"Authorization": f"Bearer {access_token}"},
             json=_build_test_message(request, workspace, channel),
             timeout=DEFAULT_API_TIMEOUT,
@@ -264,8 +267,9 @@ def _send_test_via_webhook(
         workspace: The user's workspace.
     """
     try:
-        response = requests.post(
+        response = http_client.post(
             webhook_url,
+            service="slack",
             json=_build_test_message(request, workspace),
             timeout=DEFAULT_API_TIMEOUT,
         )
@@ -351,8 +355,9 @@ def get_slack_channels(request: HttpRequest) -> JsonResponse:
 
     try:
         # Fetch public channels
-        response = requests.get(
+        response = http_client.get(
             "https://slack.com/api/conversations.list",
+            service="slack",
             headers={"Authorization": f"Bearer {access_token}"},
             params={
                 "types": "public_channel",
@@ -10,7 +10,8 @@ from typing import Any
 from django.contrib.auth.decorators import login_required
 from django.http import HttpRequest, JsonResponse
 
-from ..models import NotificationSettings, UserProfile, WorkspaceMember
+from ..models import NotificationSettings
+from ..workspace_context import get_workspace_context
 
 logger = logging.getLogger(__name__)
 
@@ -26,16 +27,9 @@ def get_notification_settings(request: HttpRequest) -> JsonResponse:
         JSON response with notification settings or error.
     """
     try:
-        # Try WorkspaceMember first
-        member = WorkspaceMember.objects.filter(
-            user=request.user, is_active=True
-        ).first()
-        if member:
-            workspace = member.workspace
-        else:
-            # Fall back to UserProfile
-            user_profile = UserProfile.objects.get(user=request.user)
-            workspace = user_profile.workspace
+        workspace = get_workspace_context(request).workspace
+        if workspace is None:
+            return JsonResponse({"error": "User profile not found"}, status=404)
 
         settings_obj, created = NotificationSettings.objects.get_or_create(
             workspace=workspace
@@ -58,8 +52,6 @@ def get_notification_settings(request: HttpRequest) -> JsonResponse:
 
         return JsonResponse(settings_data)
 
-    except UserProfile.DoesNotExist:
-        return JsonResponse({"error": "User profile not found"}, status=404)
     except Exception:
         logger.exception("Error retrieving notification settings")
         return JsonResponse({"error": "An internal error occurred"}, status=500)
@@ -79,16 +71,9 @@ def update_notification_settings(request: HttpRequest) -> JsonResponse:
         return JsonResponse({"error": "Invalid request method"}, status=405)
 
     try:
-        # Try WorkspaceMember first
-        member = WorkspaceMember.objects.filter(
-            user=request.user, is_active=True
-        ).first()
-        if member:
-            workspace = member.workspace
-        else:
-            # Fall back to UserProfile
-            user_profile = UserProfile.objects.get(user=request.user)
-            workspace = user_profile.workspace
+        workspace = get_workspace_context(request).workspace
+        if workspace is None:
+            return JsonResponse({"error": "User profile not found"}, status=404)
 
         settings_obj, created = NotificationSettings.objects.get_or_create(
             workspace=workspace
@@ -105,8 +90,6 @@ def update_notification_settings(request: HttpRequest) -> JsonResponse:
 
         return JsonResponse({"success": True})
 
-    except UserProfile.DoesNotExist:
-        return JsonResponse({"error": "User profile not found"}, status=404)
     except json.JSONDecodeError:
         return JsonResponse({"error": "Invalid JSON data"}, status=400)
     except Exception:
@@ -0,0 +1,184 @@
+"""Request-scoped resolution of the user's workspace membership.
+
+Authenticated views need the user's active WorkspaceMember, its Workspace
+(falling back to the legacy UserProfile link) and sometimes the workspace's
+Plan. get_workspace_context() resolves them with one select_related query the
+first time it is called for a request and memoizes the result on the request.
+Async views call aresolve_workspace_context() instead.
+Permission decorators, view helpers and DashboardService read from it instead
+of querying again.
+
+Nothing is kept across requests: billing webhooks change subscription fields
+with QuerySet.update(), which sends no signals, so a session copy of the
+workspace could serve a stale plan.
+
+Usage:
+    from core.workspace_context import get_workspace_context
+
+    context = get_workspace_context(request)
+    if context.workspace is None:
+        return redirect("core:create_workspace")
+"""
+
+from typing import TYPE_CHECKING, Any
+
+from django.http import HttpRequest
+
+if TYPE_CHECKING:
+    from core.models import UserProfile, Workspace, WorkspaceMember
+    from core.services.plan_catalog import PlanInfo
+
+# Marks a UserProfile that hasn't been looked up yet (None means "has none")
+_NOT_LOADED = object()
+
+
+class WorkspaceContext:
+    """The workspace a user acts on, resolved once per request.
+
+    Attributes:
+        user: The user the context was resolved for.
+        member: The user's active WorkspaceMember, or None.
+        workspace: The member's workspace, else the UserProfile's, or None.
+    """
+
+    def __init__(
+        self,
+        user: Any,
+        member: "WorkspaceMember | None" = None,
+        workspace: "Workspace | None" = None,
+        user_profile: Any = _NOT_LOADED,
+    ) -> None:
+        """Initialize the context.
+
+        Args:
+            user: The user the context was resolved for.
+            member: The user's active membership, with workspace loaded.
+            workspace: The workspace the user acts on.
+            user_profile: The user's UserProfile if already fetched.
+        """
+        self.user = user
+        self.member = member
+        self.workspace = workspace
+        self._user_profile = user_profile
+
+    @property
+    def user_id(self) -> int | None:
+        """Primary key of the user, or None for anonymous users."""
+        return getattr(self.user, "pk", None)
+
+    @property
+    def role(self) -> str | None:
+        """The member's role, or None without an active membership."""
+        return self.member.role if self.member else None
+
+    @property
+    def user_profile(self) -> "UserProfile | None":
+        """The user's UserProfile, fetched on first access."""
+        if self._user_profile is _NOT_LOADED:
+            from core.models import UserProfile
+
+            self._user_profile = (
+                UserProfile.objects.filter(user=self.user).first()
+                if self.user_id is not None
+                else None
+            )
+        return self._user_profile
+
+    @property
+    def plan(self) -> "PlanInfo | None":
+        """The workspace's active plan, from the in-process plan catalog."""
+        from core.services.plan_catalog import plan_catalog
+
+        if self.workspace is None:
+            return None
+        return plan_catalog.get(self.workspace.subscription_plan)
+
+
+def resolve_workspace_context(user: Any) -> WorkspaceContext:
+    """Resolve a user's membership and workspace from the database.
+
+    Args:
+        user: The Django user object (may be anonymous).
+
+    Returns:
+        A WorkspaceContext; empty for anonymous users or users without a
+        workspace.
+    """
+    from core.models import UserProfile, WorkspaceMember
+
+    if not user.is_authenticated:
+        return WorkspaceContext(user, user_profile=None)
+
+    member = (
+        WorkspaceMember.objects.filter(user=user, is_active=True)
+        .select_related("workspace")
+        .first()
+    )
+    if member:
+        return WorkspaceContext(user, member, member.workspace)
+
+    # Fall back to UserProfile for backward compatibility
+    user_profile = (
+        UserProfile.objects.filter(user=user).select_related("workspace").first()
+    )
+    return WorkspaceContext(
+        user,
+        workspace=user_profile.workspace if user_profile else None,
+        user_profile=user_profile,
+    )
+
+
+async def aresolve_workspace_context(user: Any) -> WorkspaceContext:
+    """Resolve a user's membership and workspace from an async view.
+
+    Async counterpart of resolve_workspace_context().
+
+    Args:
+        user: The Django user object (may be anonymous), e.g. from
+            request.auser().
+
+    Returns:
+        A WorkspaceContext; empty for anonymous users or users without a
+        workspace.
+    """
+    from core.models import UserProfile, WorkspaceMember
+
+    if not user.is_authenticated:
+        return WorkspaceContext(user, user_profile=None)
+
+    member = (
+        await WorkspaceMember.objects.filter(user=user, is_active=True)
+        .select_related("workspace")
+        .afirst()
+    )
+    if member:
+        return WorkspaceContext(user, member, member.workspace)
+
+    # Fall back to UserProfile for backward compatibility
+    user_profile = (
+        await UserProfile.objects.filter(user=user).select_related("workspace").afirst()
+    )
+    return WorkspaceContext(
+        user,
+        workspace=user_profile.workspace if user_profile else None,
+        user_profile=user_profile,
+    )
+
+
+def get_workspace_context(request: HttpRequest) -> WorkspaceContext:
+    """Get the request's workspace context, resolving it on first use.
+
+    The context is re-resolved if request.user changed since (e.g. after
+    login).
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        The request's WorkspaceContext.
+    """
+    context = getattr(request, "_workspace_context", None)
+    if context is None or context.user_id != getattr(request.user, "pk", None):
+        context = resolve_workspace_context(request.user)
+        request._workspace_context = context
+    return context
@@ -450,6 +450,15 @@ LOGGING = {
 # Webhook debugging: When enabled, logs full webhook payloads for analysis
 LOG_WEBHOOKS = os.environ.get("LOG_WEBHOOKS", "False").lower() == "true"
 
+# Where logged webhooks are kept for 7 days: "redis" (default) or "segments",
+# append-only segment files under WEBHOOK_ARCHIVE_DIR that are rotated at
+# WEBHOOK_ARCHIVE_SEGMENT_MB. Use a local disk or volume (flock is required).
+WEBHOOK_ARCHIVE_BACKEND = os.environ.get("WEBHOOK_ARCHIVE_BACKEND", "redis")
+WEBHOOK_ARCHIVE_DIR = os.environ.get(
+    "WEBHOOK_ARCHIVE_DIR", str(BASE_DIR / "webhook_archive")
+)
+WEBHOOK_ARCHIVE_SEGMENT_MB = int(os.environ.get("WEBHOOK_ARCHIVE_SEGMENT_MB", "64"))
+
 # Provider configurations
 # Note: Shopify configurations removed - now handled per-tenant via Integration model
 # Individual organizations configure their own Shopify credentials through the
@@ -566,6 +575,58 @@ PLUGINS: dict = {
 # Auto-discover plugins from app/plugins/ package
 PLUGIN_AUTODISCOVER = True
 
+# Enrichment latency budget per notification severity (milliseconds).
+# Company/person enrichment that doesn't finish within the budget is left out
+# of that notification and completes in the background for the next one.
+# None waits without a limit. Workspaces can override these through
+# NotificationSettings.enrichment_budget_ms.
+ENRICHMENT_BUDGET_MS: dict[str, int | None] = {
+    "error": 1500,
+    "warning": 3000,
+    "success": 5000,
+    "info": 5000,
+}
+
+# Size of the shared worker pool running enrichment lookups
+ENRICHMENT_WORKERS = int(os.environ.get("ENRICHMENT_WORKERS", "8"))
+
+# Outbound HTTP client shared by integrations (see
+# webhooks.services.http_client). Each host keeps up to HTTP_CLIENT_POOL_SIZE
+# keep-alive connections and serves at most HTTP_CLIENT_MAX_PER_HOST requests
+# at once; HTTP_CLIENT_READ_TIMEOUT applies unless the caller passes a timeout.
+HTTP_CLIENT_POOL_SIZE = int(os.environ.get("HTTP_CLIENT_POOL_SIZE", "10"))
+HTTP_CLIENT_POOL_HOSTS = int(os.environ.get("HTTP_CLIENT_POOL_HOSTS", "50"))
+HTTP_CLIENT_MAX_PER_HOST = int(os.environ.get("HTTP_CLIENT_MAX_PER_HOST", "10"))
+HTTP_CLIENT_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CLIENT_CONNECT_TIMEOUT", "5"))
+HTTP_CLIENT_READ_TIMEOUT = float(os.environ.get("HTTP_CLIENT_READ_TIMEOUT", "30"))
+HTTP_CLIENT_RETRIES = int(os.environ.get("HTTP_CLIENT_RETRIES", "2"))
+HTTP_CLIENT_BACKOFF = float(os.environ.get("HTTP_CLIENT_BACKOFF", "0.5"))
+
+# Prometheus metrics at /metrics (see webhooks.services.metrics_exporter).
+# Scrapers send "Authorization: Bearer <METRICS_TOKEN>"; without a token the
+# endpoint is only served when DEBUG is on. Each worker adds its series to
+# the shared totals in Redis every METRICS_FLUSH_SECONDS.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "15"))
+
+# Redis commands, Redis round trips and SQL queries are counted per webhook
+# request and worker job (see webhooks.services.round_trips); this share of
+# them is also logged with a breakdown by call site.
+ROUND_TRIP_SAMPLE_RATE = float(os.environ.get("ROUND_TRIP_SAMPLE_RATE", "0.01"))
+
+# Event ledger: durable, append-only history of processed events in the
+# database (see webhooks.services.event_ledger). Records are buffered and
+# written in batches of EVENT_LEDGER_BATCH_SIZE or every EVENT_LEDGER_FLUSH_MS,
+# whichever comes first. On PostgreSQL the table is partitioned by month and
+# partitions older than EVENT_LEDGER_RETENTION_MONTHS are dropped by the
+# maintain_event_ledger command.
+EVENT_LEDGER_ENABLED = os.environ.get("EVENT_LEDGER_ENABLED", "True").lower() == "true"
+EVENT_LEDGER_BATCH_SIZE = int(os.environ.get("EVENT_LEDGER_BATCH_SIZE", "500"))
+EVENT_LEDGER_FLUSH_MS = int(os.environ.get("EVENT_LEDGER_FLUSH_MS", "1000"))
+EVENT_LEDGER_RETENTION_MONTHS = int(
+    os.environ.get("EVENT_LEDGER_RETENTION_MONTHS", "13")
+)
+
 
 # Note: Provider factories removed - now handled per-tenant
 
@@ -18,6 +18,7 @@ Including another URLconf
 from core.views import custom_404, custom_500
 from django.contrib import admin
 from django.urls import include, path
+from webhooks.webhook_router import metrics_endpoint
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -26,6 +27,7 @@ urlpatterns = [
     path(
         "webhook/", include("webhooks.urls")
     ),  # Mount webhooks at /webhook/ to match tests
+    path("metrics", metrics_endpoint, name="metrics"),  # Prometheus scrape target
 ]
 
 # Custom error handlers
@@ -23,6 +23,7 @@ from webhooks.models.rich_notification import (
     PersonInfo,
     RichNotification,
 )
+from webhooks.services.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -241,8 +242,9 @@ class SlackDestinationPlugin(BaseDestinationPlugin):
             raise ValueError("Missing 'webhook_url' in credentials")
 
         try:
-            response = requests.post(
+            response = http_client.post(
                 webhook_url,
+                service="slack",
                 json=formatted,
                 timeout=self.timeout,
             )
@@ -2,15 +2,58 @@
 
 This module provides helper functions for formatting content for Slack,
 including HTML to mrkdwn conversion.
+
+Conversion runs through one of three paths, cheapest first:
+- Plain text (no tags, no entities) is cleaned and escaped directly.
+- Markup limited to the common tag subset (a, b, strong, i, em, p, br) and
+  basic named entities is tokenized in a single regex pass.
+- Anything else goes through the full HTMLToSlackMrkdwnParser.
+
+All three paths share the same handlers and post-processing, so the output
+is identical; markup results are kept in a small content-hash LRU cache
+because the same company descriptions are converted on every notification.
 """
 
+import hashlib
 import re
+import threading
+from collections import OrderedDict
+from html import unescape
 from html.parser import HTMLParser
 from urllib.parse import urlparse
 
 # Maximum output length to prevent abuse
 MAX_OUTPUT_LENGTH = 2000
 
+# Maximum number of converted markup inputs kept in the result cache
+CONVERSION_CACHE_SIZE = 512
+
+# Translation table dropping ASCII control characters (except \n and \t)
+_CONTROL_CHARS_TABLE = dict.fromkeys(
+    [code for code in range(32) if chr(code) not in ("\n", "\t")] + [0x7F]
+)
+
+# Tags understood by the single-pass tokenizer. Attributes are only accepted
+# on <a>, and only a quoted href without entities, so the parsed values are
+# exactly what HTMLParser would report.
+_SIMPLE_TAG_PATTERN = re.compile(
+    r"<(?:"
+    r"(?P<open>b|strong|i|em|p)"
+    r"|a\s+href=(?:\"(?P<dq_href>[^\"<>&]*)\"|'(?P<sq_href>[^'<>&]*)')\s*"
+    r"|(?P<br>br)\s*/?"
+    r"|/(?P<close>a|b|strong|i|em|p)\s*"
+    r")>",
+    re.IGNORECASE,
+)
+
+# Any "&" that does not start one of the basic named entities
+_UNSUPPORTED_ENTITY_PATTERN = re.compile(r"&(?!(?:amp|lt|gt|quot|nbsp);)")
+
+_MULTIPLE_NEWLINES_PATTERN = re.compile(r"\n{3,}")
+
+_conversion_cache: OrderedDict[tuple[bytes, int], str] = OrderedDict()
+_conversion_cache_lock = threading.Lock()
+
 
 class HTMLToSlackMrkdwnParser(HTMLParser):
     """HTML parser that converts HTML to Slack mrkdwn format.
@@ -182,11 +225,7 @@ def _clean_control_characters(text: str) -> str:
         The cleaned text.
     """
     # Remove null bytes and ASCII control characters (except newline and tab)
-    return "".join(
-        char
-        for char in text
-        if char in ("\n", "\t") or (ord(char) >= 32 and char != "\x7f")
-    )
+    return text.translate(_CONTROL_CHARS_TABLE)
 
 
 def _escape_slack_mrkdwn(text: str) -> str:
@@ -289,6 +328,153 @@ def _fallback_strip_tags(html: str) -> str:
     return text
 
 
+def _parse_html(html: str) -> str:
+    """Convert HTML using the full HTML parser.
+
+    Args:
+        html: The HTML string to convert, already cleaned of control characters.
+
+    Returns:
+        The converted mrkdwn before newline collapsing, stripping,
+        injection sanitization and truncation.
+    """
+    try:
+        parser = HTMLToSlackMrkdwnParser()
+        parser.feed(html)
+        return parser.get_result()
+    except Exception:
+        # Fallback to regex stripping on any parse error
+        return _fallback_strip_tags(html)
+
+
+def _tokenize_simple_html(html: str) -> str | None:
+    """Convert HTML limited to the common tag subset in a single pass.
+
+    Drives the same HTMLToSlackMrkdwnParser handlers as the full parser, but
+    tokenizes with one regex scan instead of HTMLParser's state machine.
+
+    Args:
+        html: The HTML string to convert, already cleaned of control characters.
+
+    Returns:
+        The converted mrkdwn before post-processing, or None if the input
+        contains markup outside the supported subset.
+    """
+    handler = HTMLToSlackMrkdwnParser()
+    position = 0
+
+    for match in _SIMPLE_TAG_PATTERN.finditer(html):
+        if not _feed_simple_text(handler, html[position : match.start()]):
+            return None
+        position = match.end()
+
+        if match["open"]:
+            handler.handle_starttag(match["open"].lower(), [])
+        elif match["close"]:
+            handler.handle_endtag(match["close"].lower())
+        elif match["br"]:
+            handler.handle_starttag("br", [])
+            handler.handle_endtag("br")
+        else:
+            href = match["dq_href"]
+            if href is None:
+                href = match["sq_href"]
+            handler.handle_starttag("a", [("href", href)])
+
+    if not _feed_simple_text(handler, html[position:]):
+        return None
+
+    return handler.get_result()
+
+
+def _feed_simple_text(handler: HTMLToSlackMrkdwnParser, text: str) -> bool:
+    """Feed a text segment between tags to the handler.
+
+    Args:
+        handler: The parser whose handlers build the result.
+        text: The raw text segment.
+
+    Returns:
+        False if the segment contains markup the tokenizer does not support.
+    """
+    if not text:
+        return True
+    if "<" in text:
+        return False
+    if "&" in text:
+        if _UNSUPPORTED_ENTITY_PATTERN.search(text):
+            return False
+        text = unescape(text)
+    handler.handle_data(text)
+    return True
+
+
+def _finalize_mrkdwn(result: str, max_length: int) -> str:
+    """Apply the post-processing shared by all conversion paths.
+
+    Args:
+        result: The converted mrkdwn.
+        max_length: Maximum length of output.
+
+    Returns:
+        The collapsed, stripped, sanitized and truncated mrkdwn.
+    """
+    # Clean up multiple consecutive newlines
+    if "\n\n\n" in result:
+        result = _MULTIPLE_NEWLINES_PATTERN.sub("\n\n", result)
+
+    # Strip leading/trailing whitespace
+    result = result.strip()
+
+    # Defense-in-depth: sanitize any Slack injection patterns that might
+    # have gotten through (e.g., from malicious Brandfetch data). Every
+    # pattern starts with "<", so text without one cannot match.
+    if "<" in result:
+        result = _sanitize_slack_injection(result)
+
+    # Truncate if needed
+    if len(result) > max_length:
+        result = result[:max_length]
+
+    return result
+
+
+def _get_cached_conversion(key: tuple[bytes, int]) -> str | None:
+    """Look up a converted result and mark it as recently used.
+
+    Args:
+        key: Content hash and max length of the input.
+
+    Returns:
+        The cached mrkdwn, or None on a cache miss.
+    """
+    with _conversion_cache_lock:
+        result = _conversion_cache.get(key)
+        if result is not None:
+            _conversion_cache.move_to_end(key)
+        return result
+
+
+def _store_cached_conversion(key: tuple[bytes, int], result: str) -> None:
+    """Store a converted result, evicting the least recently used entry.
+
+    Args:
+        key: Content hash and max length of the input.
+        result: The converted mrkdwn.
+    """
+    with _conversion_cache_lock:
+        _conversion_cache[key] = result
+        _conversion_cache.move_to_end(key)
+        while len(_conversion_cache) > CONVERSION_CACHE_SIZE:
+            _conversion_cache.popitem(last=False)
+
+
+def _clear_conversion_cache() -> None:
+    """Drop all cached conversion results."""
+    with _conversion_cache_lock:
+        _conversion_cache.clear()
+
+
 def html_to_slack_mrkdwn(html: str | None, max_length: int = MAX_OUTPUT_LENGTH) -> str:
     """Convert HTML to Slack mrkdwn format.
 
@@ -320,26 +506,24 @@ def html_to_slack_mrkdwn(html: str | None, max_length: int = MAX_OUTPUT_LENGTH)
     # Clean control characters from input
     html = _clean_control_characters(html)
 
-    try:
-        parser = HTMLToSlackMrkdwnParser()
-        parser.feed(html)
-        result = parser.get_result()
-    except Exception:
-        # Fallback to regex stripping on any parse error
-        result = _fallback_strip_tags(html)
-
-    # Clean up multiple consecutive newlines
-    result = re.sub(r"\n{3,}", "\n\n", result)
-
-    # Strip leading/trailing whitespace
-    result = result.strip()
-
-    # Defense-in-depth: sanitize any Slack injection patterns that might
-    # have gotten through (e.g., from malicious Brandfetch data)
-    result = _sanitize_slack_injection(result)
-
-    # Truncate if needed
-    if len(result) > max_length:
-        result = result[:max_length]
-
+    # Fast path: plain text needs no parsing, only the same normalization
+    # and escaping that handle_data applies
+    if "<" not in html and "&" not in html:
+        text = _escape_slack_mrkdwn(html.replace("\xa0", " "))
+        return _finalize_mrkdwn(text, max_length)
+
+    digest = hashlib.blake2b(
+        html.encode("utf-8", "surrogatepass"), digest_size=16
+    ).digest()
+    key = (digest, max_length)
+    cached = _get_cached_conversion(key)
+    if cached is not None:
+        return cached
+
+    result = _tokenize_simple_html(html)
+    if result is None:
+        result = _parse_html(html)
+    result = _finalize_mrkdwn(result, max_length)
+
+    _store_cached_conversion(key, result)
     return result
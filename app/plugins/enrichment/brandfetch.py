@@ -11,6 +11,7 @@ import requests
 from django.conf import settings
 from plugins.base import PluginCapability, PluginMetadata, PluginType
 from plugins.enrichment.base import BaseEnrichmentPlugin
+from webhooks.services.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -120,8 +121,9 @@ class BrandfetchPlugin(BaseEnrichmentPlugin):
         }
 
         try:
-            response = requests.get(
+            response = http_client.get(
                 f"{self.base_url}/brands/{domain}",
+                service="brandfetch",
                 headers=headers,
                 timeout=self.timeout,
             )
@@ -23,6 +23,7 @@ from plugins.enrichment.base_email import (
     GDPRClaimedError,
     RateLimitError,
 )
+from webhooks.services.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -104,8 +105,9 @@ class HunterPlugin(BaseEmailEnrichmentPlugin):
             return False, "API key is required"
 
         try:
-            response = requests.get(
+            response = http_client.get(
                 f"{self.BASE_URL}/account",
+                service="hunter",
                 params={"api_key": api_key},
                 timeout=self.timeout,
             )
@@ -169,8 +171,9 @@ class HunterPlugin(BaseEmailEnrichmentPlugin):
             raise EmailNotFoundError(email)
 
         try:
-            response = requests.get(
+            response = http_client.get(
                 f"{self.BASE_URL}/people/find",
+                service="hunter",
                 params={"email": email, "api_key": api_key},
                 timeout=self.timeout,
             )
@@ -20,9 +20,15 @@ class WebhooksConfig(AppConfig):
         were queued by a previous server instance and process them.
 
         This prevents notification loss during deployments and restarts.
+
+        Round-trip counting hooks are installed in every process.
         """
         import os
 
+        from webhooks.services.round_trips import round_trips
+
+        round_trips.install()
+
         # Skip during migrations, tests, or management commands
         # RUN_MAIN is set by Django's runserver to avoid double execution
         if os.environ.get("RUN_MAIN") != "true":
@@ -0,0 +1,277 @@
+"""Load test the webhook ingest path with signed synthetic traffic.
+
+Sends Stripe, Shopify and Chargify webhooks to the load-test workspace at
+a fixed rate and reports requests per second, response time percentiles
+and the end-to-end time for each notification to reach Slack. Slack is
+replaced by a local stub, so nothing is sent to a real channel. See
+webhooks.management.load_harness for the scenarios.
+
+By default webhooks go through Django in this process, using the
+configured cache (Redis); --fake-redis uses a local-memory cache instead.
+With --url they go to a running server, which must be able to reach the
+Slack stub on this machine.
+
+The run creates (or reuses) the load-test workspace and its integrations
+in the configured database, and deactivates the integrations when it
+ends. It refuses to run with DEBUG off unless --allow-production is
+given.
+
+Usage:
+    python manage.py load_test_webhooks --rate 50 --count 2000
+    python manage.py load_test_webhooks --fake-redis --duration 60
+    python manage.py load_test_webhooks --url http://localhost:8000 \\
+        --mix stripe_signup=1,shopify_order=3 --concurrency 32
+    python manage.py load_test_webhooks --fixtures recorded.jsonl \\
+        --mix recorded=1
+"""
+
+import json
+import secrets
+from contextlib import ExitStack
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from webhooks.management.load_harness import (
+    SCENARIOS,
+    LoadReport,
+    LoadRunner,
+    SlackSink,
+    TrafficGenerator,
+    client_sender,
+    http_sender,
+    load_fixtures,
+    prepare_workspace,
+    release_workspace,
+)
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+def _parse_mix(value: str) -> dict[str, float]:
+    """Parse "scenario=weight,..." into a mix.
+
+    Args:
+        value: Comma-separated scenarios, each with an optional weight.
+
+    Returns:
+        Dict of scenario to weight.
+
+    Raises:
+        CommandError: If a weight isn't a number.
+    """
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.strip().partition("=")
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError as e:
+            raise CommandError(f"Invalid weight for {name}: {weight}") from e
+    return mix
+
+
+class Command(BaseCommand):
+    """Load test the webhook ingest path with signed synthetic traffic."""
+
+    help = "Load test the webhook ingest path with signed synthetic traffic"
+
+    def add_arguments(self, parser: Any) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=20,
+            help="Webhooks to send per second (default: 20)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Maximum requests in flight (default: 8)",
+        )
+        parser.add_argument(
+            "--count",
+            type=int,
+            help="Notifications to send (default: 200 unless --duration)",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            help="Seconds to keep sending, instead of --count",
+        )
+        parser.add_argument(
+            "--mix",
+            type=str,
+            help=f"Weighted scenarios, e.g. stripe_signup=1,shopify_order=3 "
+            f"(from: {', '.join(SCENARIOS)})",
+        )
+        parser.add_argument(
+            "--fixtures",
+            type=str,
+            help="JSON lines of recorded webhook storage records",
+        )
+        parser.add_argument(
+            "--url",
+            type=str,
+            help="Send to a running server at this URL instead of in-process",
+        )
+        parser.add_argument(
+            "--fake-redis",
+            action="store_true",
+            help="In-process only: use a local-memory cache instead of Redis",
+        )
+        parser.add_argument(
+            "--sink-host",
+            type=str,
+            default="127.0.0.1",
+            help="Address for the Slack stub to listen on (default: 127.0.0.1)",
+        )
+        parser.add_argument(
+            "--drain",
+            type=float,
+            default=45,
+            help="Seconds to wait for notifications to reach Slack (default: 45)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            help="Random seed, for a repeatable stream",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the report as JSON",
+        )
+        parser.add_argument(
+            "--allow-production",
+            action="store_true",
+            help="Run even with DEBUG off (writes the load-test workspace "
+            "to the configured database)",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Execute the command."""
+        if not settings.DEBUG and not options["allow_production"]:
+            raise CommandError(
+                "DEBUG is off: this creates a load-test workspace in the "
+                "configured database. Pass --allow-production to run anyway"
+            )
+        if options["url"] and options["fake_redis"]:
+            raise CommandError("--fake-redis only applies in-process")
+        if options["url"] is None and settings.DISABLE_BILLING:
+            self.stdout.write(
+                self.style.WARNING(
+                    "DISABLE_BILLING is set: Stripe webhooks will be rejected"
+                )
+            )
+
+        generator = self._get_generator(options)
+        count = options["count"]
+        if count is None and options["duration"] is None:
+            count = 200
+
+        sink = SlackSink(host=options["sink_host"])
+        sink.start()
+        try:
+            with ExitStack() as stack:
+                if options["fake_redis"]:
+                    stack.enter_context(override_settings(CACHES=LOCMEM_CACHES))
+                report = self._run(generator, sink, count, options)
+        finally:
+            sink.stop()
+
+        self._print_report(report.summary(), options["json"])
+
+    def _get_generator(self, options: dict[str, Any]) -> TrafficGenerator:
+        """Build the traffic generator from the options."""
+        fixtures = None
+        if options["fixtures"]:
+            try:
+                with open(options["fixtures"]) as f:
+                    fixtures = load_fixtures(f)
+            except (OSError, json.JSONDecodeError) as e:
+                raise CommandError(f"Cannot read fixtures: {e}") from e
+            self.stdout.write(f"Loaded {len(fixtures)} recorded webhooks")
+
+        mix = _parse_mix(options["mix"]) if options["mix"] else None
+        try:
+            return TrafficGenerator(mix, fixtures, options["seed"])
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+    def _run(
+        self,
+        generator: TrafficGenerator,
+        sink: SlackSink,
+        count: int | None,
+        options: dict[str, Any],
+    ) -> LoadReport:
+        """Prepare the workspace and send the traffic."""
+        secret = secrets.token_hex(16)
+        workspace = prepare_workspace(sink.url, secret)
+        if options["url"]:
+            send = http_sender(
+                options["url"], workspace, secret, options["concurrency"]
+            )
+            target = options["url"]
+        else:
+            send = client_sender(workspace, secret)
+            target = "in-process"
+
+        self.stdout.write(
+            f"Sending to {target} at {options['rate']:g}/s "
+            f"(concurrency {options['concurrency']}), "
+            f"Slack stub at {sink.url}"
+        )
+        try:
+            runner = LoadRunner(
+                send, generator, sink, options["rate"], options["concurrency"]
+            )
+            return runner.run(count, options["duration"], options["drain"])
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+        finally:
+            release_workspace(workspace)
+
+    def _print_report(self, summary: dict[str, Any], as_json: bool) -> None:
+        """Print the results."""
+        if as_json:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+
+        def times(values: dict[str, float | None]) -> str:
+            return "  ".join(
+                f"{name} {'-' if value is None else f'{value:g}ms'}"
+                for name, value in values.items()
+            )
+
+        statuses = ", ".join(
+            f"{status or 'error'}: {n}" for status, n in summary["statuses"].items()
+        )
+        scenarios = ", ".join(
+            f"{name}: {n}" for name, n in summary["scenarios"].items()
+        )
+        self.stdout.write("")
+        self.stdout.write(
+            f"Requests:       {summary['requests']} "
+            f"({summary['requests_per_second']:g}/s)"
+        )
+        self.stdout.write(f"Statuses:       {statuses}")
+        self.stdout.write(f"Response time:  {times(summary['response_ms'])}")
+        self.stdout.write(f"Notifications:  {summary['notifications']} ({scenarios})")
+        self.stdout.write(
+            f"Reached Slack:  {summary['delivered']} "
+            f"({summary['sink_messages']} messages)"
+        )
+        self.stdout.write(f"Time to Slack:  {times(summary['time_to_slack_ms'])}")
+
+        if summary["delivered"] < summary["notifications"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{summary['notifications'] - summary['delivered']} "
+                    "notifications did not reach Slack"
+                )
+            )
@@ -0,0 +1,93 @@
+"""Create upcoming event ledger partitions and drop expired ones.
+
+Run daily (e.g. from cron). On PostgreSQL this creates monthly partitions
+ahead of time and drops whole partitions older than the retention window,
+which is far cheaper than deleting rows; expired rows in the DEFAULT
+partition are deleted. On other databases expired rows are deleted
+instead.
+
+Usage:
+    python manage.py maintain_event_ledger
+    python manage.py maintain_event_ledger --retention-months 6 --dry-run
+"""
+
+from datetime import date
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from webhooks.services.event_ledger import (
+    drop_partitions_before,
+    ensure_partition,
+    is_partitioned,
+)
+
+
+def _add_months(month: date, months: int) -> date:
+    """Shift the first day of a month by a number of months.
+
+    Args:
+        month: First day of a month.
+        months: Months to add (negative to go back).
+
+    Returns:
+        First day of the resulting month.
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class Command(BaseCommand):
+    """Create upcoming event ledger partitions and drop expired ones."""
+
+    help = "Create upcoming event ledger partitions and drop expired ones"
+
+    def add_arguments(self, parser: Any) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=getattr(settings, "EVENT_LEDGER_RETENTION_MONTHS", 13),
+            help="Months of history to keep, including the current month",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=2,
+            help="Future monthly partitions to create (default: 2)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Show what would be dropped without dropping anything",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Execute the command."""
+        retention_months = options["retention_months"]
+        months_ahead = options["months_ahead"]
+        dry_run = options["dry_run"]
+
+        if retention_months < 1:
+            raise CommandError("--retention-months must be at least 1")
+
+        today = timezone.now().date()
+        current_month = date(today.year, today.month, 1)
+
+        if is_partitioned() and not dry_run:
+            for offset in range(months_ahead + 1):
+                ensure_partition(_add_months(current_month, offset))
+            self.stdout.write(
+                f"Ensured partitions through "
+                f"{_add_months(current_month, months_ahead):%Y-%m}"
+            )
+
+        cutoff = _add_months(current_month, -(retention_months - 1))
+        dropped = drop_partitions_before(cutoff, dry_run=dry_run)
+
+        verb = "Would drop" if dry_run else "Dropped"
+        if not dropped:
+            self.stdout.write(f"Nothing older than {cutoff:%Y-%m} to drop")
+        for name in dropped:
+            self.stdout.write(self.style.SUCCESS(f"{verb} {name}"))
@@ -1,6 +1,6 @@
 """Replay stored Shopify webhooks that were never processed.
 
-This command reads raw webhook payloads from Redis storage and re-processes
+This command reads raw webhook payloads from webhook storage and re-processes
 them through the notification pipeline. Use this to recover from situations
 where webhooks were received but notifications were lost due to worker
 recycling before timers could fire.
@@ -123,16 +123,16 @@ class Command(BaseCommand):
         self, workspace: Workspace, days: int
     ) -> dict[str, dict[str, Any]]:
         """Get unique orders from stored webhooks."""
-        webhooks = webhook_storage_service.get_recent_webhooks(
+        webhooks = webhook_storage_service.iter_webhooks(
             days=days,
-            limit=1000,
             provider="shopify",
             workspace_uuid=str(workspace.uuid),
         )
-        self.stdout.write(f"Found {len(webhooks)} stored webhooks")
 
+        found = 0
         orders: dict[str, dict[str, Any]] = {}
-        for webhook in reversed(webhooks):
+        for webhook in webhooks:
+            found += 1
             body = webhook.get("body", "{}")
             if isinstance(body, str):
                 try:
@@ -149,6 +149,7 @@ class Command(BaseCommand):
                 "topic": webhook.get("headers", {}).get("X-Shopify-Topic"),
             }
 
+        self.stdout.write(f"Found {found} stored webhooks")
         self.stdout.write(f"Found {len(orders)} unique orders to process")
         return orders
 
@@ -0,0 +1,862 @@
+"""Load testing of the webhook ingest path with signed synthetic traffic.
+
+Generates realistic Stripe, Shopify and Chargify webhooks, signs them the
+way each provider does, and posts them to the customer_*_webhook
+endpoints of a workspace at a fixed rate. Payloads come from templates
+or from recorded webhooks (webhook storage records), rewritten so each
+one is new to deduplication. Scenarios:
+
+    stripe_payment    one invoice.payment_succeeded (held for aggregation)
+    stripe_signup     the events of one Stripe signup, sharing an
+                      idempotency key: customer.created,
+                      customer.subscription.created, invoice.created,
+                      invoice.finalized, invoice.paid and
+                      invoice.payment_succeeded
+    shopify_order     one orders/paid
+    chargify_payment  one payment_success
+    recorded          one recorded webhook, re-signed
+
+Every notification carries its own customer email, loadtest-<n>@gmail.com
+(a free-mail domain, so company enrichment is skipped). A stub Slack sink
+(SlackSink), set as the workspace's incoming webhook, finds that email in
+each message and records when it arrived, which gives the end-to-end
+time from the first webhook of a notification to Slack.
+
+Requests are sent on a fixed schedule (open loop), so a slow server
+shows up as higher response times rather than a lower request rate.
+Response times are measured from when a request was due to be sent.
+
+Usage:
+    python manage.py load_test_webhooks --rate 50 --count 2000
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qsl, urlencode
+
+import requests
+from core.models import Integration, Workspace
+from django.test import Client
+
+SCENARIOS = (
+    "stripe_payment",
+    "stripe_signup",
+    "shopify_order",
+    "chargify_payment",
+    "recorded",
+)
+
+# Stripe events of one signup, in the order Stripe sends them
+STRIPE_SIGNUP_EVENTS = (
+    "customer.created",
+    "customer.subscription.created",
+    "invoice.created",
+    "invoice.finalized",
+    "invoice.paid",
+    "invoice.payment_succeeded",
+)
+
+# Headers not carried over from recorded webhooks
+RECORDED_SKIP_HEADERS = frozenset(
+    {
+        "content-length",
+        "content-type",
+        "host",
+        "stripe-signature",
+        "x-chargify-webhook-signature",
+        "x-chargify-webhook-signature-hmac-sha-256",
+        "x-chargify-webhook-timestamp",
+        "x-shopify-hmac-sha256",
+    }
+)
+
+# Workspace the load is sent to
+WORKSPACE_SLUG = "load-test"
+
+# Source integrations of the workspace, by webhook provider
+INTEGRATION_TYPES = {
+    "stripe": "stripe_customer",
+    "shopify": "shopify",
+    "chargify": "chargify",
+}
+
+MARKER_RE = re.compile(rb"loadtest-(\d+)@")
+EMAIL_RE = re.compile(r"[\w.+-]+(@|%40)[\w-]+(?:\.[\w-]+)+")
+
+
+def marker_email(seq: int) -> str:
+    """Get the customer email identifying a notification.
+
+    Args:
+        seq: Notification sequence number.
+
+    Returns:
+        The email address.
+    """
+    return f"loadtest-{seq}@gmail.com"
+
+
+def sign_stripe(body: bytes, secret: str, timestamp: int | None = None) -> str:
+    """Build a Stripe-Signature header value.
+
+    Args:
+        body: Request body.
+        secret: Endpoint signing secret.
+        timestamp: Signing time; defaults to now.
+
+    Returns:
+        The header value.
+    """
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    signature = hmac.new(
+        secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256
+    ).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def sign_shopify(body: bytes, secret: str) -> str:
+    """Build an X-Shopify-Hmac-SHA256 header value.
+
+    Args:
+        body: Request body.
+        secret: App secret.
+
+    Returns:
+        The header value.
+    """
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).digest()
+    return base64.b64encode(digest).decode()
+
+
+def sign_chargify(body: bytes, secret: str) -> str:
+    """Build an X-Chargify-Webhook-Signature-Hmac-Sha-256 header value.
+
+    Args:
+        body: Request body.
+        secret: Site shared key.
+
+    Returns:
+        The header value.
+    """
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+@dataclass
+class SyntheticWebhook:
+    """One webhook request to send.
+
+    Attributes:
+        provider: "stripe", "shopify" or "chargify".
+        seq: Sequence number of the notification it belongs to.
+        body: Request body.
+        content_type: Request content type.
+        headers: Provider headers other than the signature.
+    """
+
+    provider: str
+    seq: int
+    body: bytes
+    content_type: str = "application/json"
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def signed_headers(self, secret: str) -> dict[str, str]:
+        """Get the headers with a signature made now.
+
+        Stripe signatures expire, so webhooks are signed as they are sent.
+
+        Args:
+            secret: Webhook secret of the workspace's integration.
+
+        Returns:
+            Request headers.
+        """
+        headers = dict(self.headers)
+        if self.provider == "stripe":
+            headers["Stripe-Signature"] = sign_stripe(self.body, secret)
+        elif self.provider == "shopify":
+            headers["X-Shopify-Hmac-SHA256"] = sign_shopify(self.body, secret)
+        elif self.provider == "chargify":
+            headers["X-Chargify-Webhook-Signature-Hmac-Sha-256"] = sign_chargify(
+                self.body, secret
+            )
+        return headers
+
+
+def _unique_id(value: Any, offset: int) -> Any:
+    """Make a recorded id unique to a notification."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return value + offset
+    if isinstance(value, str) and value.isdigit():
+        return str(int(value) + offset)
+    if isinstance(value, str) and value:
+        return f"{value}_lt{offset}"
+    return value
+
+
+def _rewrite_ids(data: Any, offset: int) -> Any:
+    """Make every "id" and idempotency key in a JSON payload unique."""
+    if isinstance(data, dict):
+        return {
+            key: (
+                _unique_id(value, offset)
+                if key in ("id", "idempotency_key")
+                else _rewrite_ids(value, offset)
+            )
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [_rewrite_ids(value, offset) for value in data]
+    return data
+
+
+def rewrite_recorded(
+    record: dict[str, Any], seq: int, offset: int | None = None
+) -> SyntheticWebhook:
+    """Turn a recorded webhook into a new one for a notification.
+
+    Ids are made unique so deduplication doesn't drop the webhook, and
+    every email address is replaced with the notification's marker email.
+
+    Args:
+        record: Webhook storage record, with provider, headers and body.
+        seq: Notification sequence number.
+        offset: Number making ids unique; defaults to seq.
+
+    Returns:
+        The webhook, unsigned.
+    """
+    offset = seq if offset is None else offset
+    provider = record["provider"].rpartition("_")[2]
+    headers: dict[str, str] = {}
+    content_type = "application/json"
+    for name, value in (record.get("headers") or {}).items():
+        lowered = name.lower()
+        if lowered == "content-type":
+            content_type = value
+        if lowered in RECORDED_SKIP_HEADERS:
+            continue
+        # Webhook and event ids are checked for duplicates
+        headers[name] = f"{value}-lt{offset}" if lowered.endswith("-id") else value
+
+    body = record.get("body") or ""
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        fields = [
+            (key, str(_unique_id(value, offset)))
+            if key == "id" or key.endswith("[id]")
+            else (key, value)
+            for key, value in parse_qsl(body, keep_blank_values=True)
+        ]
+        body = urlencode(fields, safe="[]@")
+    else:
+        try:
+            body = json.dumps(_rewrite_ids(json.loads(body), offset))
+        except json.JSONDecodeError:
+            pass
+
+    local, domain = marker_email(seq).split("@")
+    body = EMAIL_RE.sub(lambda match: f"{local}{match.group(1)}{domain}", body)
+    return SyntheticWebhook(provider, seq, body.encode(), content_type, headers)
+
+
+def load_fixtures(lines: Iterable[str]) -> list[dict[str, Any]]:
+    """Read recorded webhooks, one webhook storage record per JSON line.
+
+    Args:
+        lines: JSON lines.
+
+    Returns:
+        Records of the providers this harness can sign.
+    """
+    records = []
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        provider = str(record.get("provider", "")).rpartition("_")[2]
+        if provider in ("stripe", "shopify", "chargify"):
+            records.append(record)
+    return records
+
+
+class TrafficGenerator:
+    """Builds the webhooks of each synthetic notification."""
+
+    def __init__(
+        self,
+        mix: dict[str, float] | None = None,
+        fixtures: list[dict[str, Any]] | None = None,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the generator.
+
+        Args:
+            mix: Relative weight of each scenario; defaults to every
+                scenario equally ("recorded" only with fixtures).
+            fixtures: Recorded webhooks for the "recorded" scenario.
+            seed: Random seed, for repeatable streams.
+
+        Raises:
+            ValueError: If the mix names an unknown scenario, or uses
+                "recorded" without fixtures.
+        """
+        self.fixtures = fixtures or []
+        if mix is None:
+            mix = {name: 1.0 for name in SCENARIOS}
+            if not self.fixtures:
+                del mix["recorded"]
+        unknown = set(mix) - set(SCENARIOS)
+        if unknown:
+            raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        if mix.get("recorded") and not self.fixtures:
+            raise ValueError("The recorded scenario needs fixtures")
+        self.mix = {name: weight for name, weight in mix.items() if weight > 0}
+        if not self.mix:
+            raise ValueError("No scenarios to generate")
+        self._random = random.Random(seed)
+        # Keeps ids apart between runs against the same database
+        self._run_id = uuid.uuid4().hex[:8]
+        self._number_base = int(self._run_id, 16) * 1_000_000
+
+    def notification(self, seq: int) -> tuple[str, list[SyntheticWebhook]]:
+        """Build the webhooks of one notification.
+
+        Args:
+            seq: Notification sequence number.
+
+        Returns:
+            Tuple of (scenario, webhooks in sending order).
+        """
+        scenario = self._random.choices(
+            list(self.mix), weights=list(self.mix.values())
+        )[0]
+        if scenario == "recorded":
+            record = self._random.choice(self.fixtures)
+            webhook = rewrite_recorded(record, seq, self._number_base + seq)
+            return scenario, [webhook]
+        return scenario, getattr(self, f"_{scenario}")(seq)
+
+    def _id(self, prefix: str, seq: int) -> str:
+        """Build an id unique to this run and notification."""
+        return f"{prefix}_lt{self._run_id}{seq}"
+
+    def _stripe_event(
+        self, seq: int, index: int, event_type: str, data: dict[str, Any]
+    ) -> SyntheticWebhook:
+        """Wrap an object in a Stripe event."""
+        event = {
+            "id": self._id(f"evt{index}", seq),
+            "object": "event",
+            "api_version": "2024-06-20",
+            "type": event_type,
+            "created": int(time.time()),
+            "livemode": False,
+            "request": {
+                "id": self._id("req", seq),
+                "idempotency_key": self._id("idem", seq),
+            },
+            "data": {"object": data},
+        }
+        return SyntheticWebhook("stripe", seq, json.dumps(event).encode())
+
+    def _stripe_invoice(self, seq: int, billing_reason: str) -> dict[str, Any]:
+        """Build a paid Stripe invoice."""
+        return {
+            "id": self._id("in", seq),
+            "object": "invoice",
+            "customer": self._id("cus", seq),
+            "customer_email": marker_email(seq),
+            "subscription": self._id("sub", seq),
+            "amount_paid": 4900,
+            "amount_due": 4900,
+            "currency": "usd",
+            "status": "paid",
+            "billing_reason": billing_reason,
+            "lines": {"data": [{"plan": {"amount": 4900, "interval": "month"}}]},
+        }
+
+    def _stripe_payment(self, seq: int) -> list[SyntheticWebhook]:
+        """Build a renewal payment."""
+        invoice = self._stripe_invoice(seq, "subscription_cycle")
+        return [self._stripe_event(seq, 0, "invoice.payment_succeeded", invoice)]
+
+    def _stripe_signup(self, seq: int) -> list[SyntheticWebhook]:
+        """Build the fan-out of one Stripe signup."""
+        customer = {
+            "id": self._id("cus", seq),
+            "object": "customer",
+            "email": marker_email(seq),
+        }
+        subscription = {
+            "id": self._id("sub", seq),
+            "object": "subscription",
+            "customer": self._id("cus", seq),
+            "status": "active",
+            "plan": {"amount": 4900, "interval": "month", "nickname": "Pro"},
+            "items": {"data": [{"price": {"unit_amount": 4900}}]},
+        }
+        invoice = self._stripe_invoice(seq, "subscription_create")
+        objects = {
+            "customer.created": customer,
+            "customer.subscription.created": subscription,
+        }
+        return [
+            self._stripe_event(seq, index, event_type, objects.get(event_type, invoice))
+            for index, event_type in enumerate(STRIPE_SIGNUP_EVENTS)
+        ]
+
+    def _shopify_order(self, seq: int) -> list[SyntheticWebhook]:
+        """Build a paid Shopify order."""
+        order = {
+            "id": self._number_base + seq,
+            "order_number": 1000 + seq,
+            "email": marker_email(seq),
+            "total_price": "29.99",
+            "currency": "USD",
+            "financial_status": "paid",
+            "line_items": [{"title": "T-shirt", "quantity": 1, "price": "29.99"}],
+            "customer": {
+                "id": self._number_base + seq,
+                "email": marker_email(seq),
+                "first_name": "Load",
+                "last_name": f"Test {seq}",
+            },
+        }
+        headers = {
+            "X-Shopify-Topic": "orders/paid",
+            "X-Shopify-Shop-Domain": "loadtest.myshopify.com",
+            "X-Shopify-Webhook-Id": self._id("wh", seq),
+        }
+        body = json.dumps(order).encode()
+        return [SyntheticWebhook("shopify", seq, body, headers=headers)]
+
+    def _chargify_payment(self, seq: int) -> list[SyntheticWebhook]:
+        """Build a Chargify payment."""
+        fields = {
+            "event": "payment_success",
+            "id": self._id("evt", seq),
+            "payload[subscription][id]": self._id("sub", seq),
+            "payload[subscription][customer][id]": self._id("cus", seq),
+            "payload[subscription][customer][email]": marker_email(seq),
+            "payload[subscription][customer][first_name]": "Load",
+            "payload[subscription][customer][last_name]": f"Test {seq}",
+            "payload[subscription][product][name]": "Pro",
+            "payload[transaction][id]": self._id("txn", seq),
+            "payload[transaction][amount_in_cents]": "4900",
+        }
+        return [
+            SyntheticWebhook(
+                "chargify",
+                seq,
+                urlencode(fields, safe="[]@").encode(),
+                "application/x-www-form-urlencoded",
+                {"X-Chargify-Webhook-Id": self._id("wh", seq)},
+            )
+        ]
+
+
+class _SinkHandler(BaseHTTPRequestHandler):
+    """Accepts Slack incoming-webhook posts."""
+
+    sink: "SlackSink"
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Record the message and answer like Slack."""
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.sink.record(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Don't log every request."""
+
+
+class SlackSink:
+    """Local stand-in for a Slack incoming webhook that records arrivals."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Initialize the sink; it listens once started.
+
+        Args:
+            host: Address to listen on.
+            port: Port to listen on; 0 picks a free one.
+        """
+        self._lock = threading.Lock()
+        self.arrivals: dict[int, float] = {}
+        self.messages = 0
+        self.unmatched = 0
+        handler = type("SinkHandler", (_SinkHandler,), {"sink": self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """URL to configure as the workspace's Slack webhook."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/services/loadtest"
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="slack-sink", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def record(self, body: bytes) -> None:
+        """Record a message's arrival for each notification it mentions.
+
+        Args:
+            body: Message body.
+        """
+        now = time.monotonic()
+        seqs = {int(match) for match in MARKER_RE.findall(body)}
+        with self._lock:
+            self.messages += 1
+            if not seqs:
+                self.unmatched += 1
+            for seq in seqs:
+                self.arrivals.setdefault(seq, now)
+
+    def delivered(self, seqs: Iterable[int]) -> int:
+        """Count the given notifications that have arrived.
+
+        Args:
+            seqs: Notification sequence numbers.
+
+        Returns:
+            Number that have arrived.
+        """
+        with self._lock:
+            return sum(1 for seq in seqs if seq in self.arrivals)
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Get a percentile by the nearest-rank method.
+
+    Args:
+        values: Observations.
+        q: Percentile, 0-100.
+
+    Returns:
+        The percentile, or None without observations.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+@dataclass
+class LoadReport:
+    """Results of a load test.
+
+    Attributes:
+        seconds: Time taken to send every request.
+        statuses: Responses by HTTP status (0 for connection errors).
+        response_times: Seconds from each request's due time to response.
+        scenarios: Notifications sent by scenario.
+        notifications: Notifications sent.
+        time_to_slack: Seconds from each delivered notification's first
+            webhook being due to its Slack message arriving.
+        sink_messages: Messages the Slack sink received.
+    """
+
+    seconds: float
+    statuses: Counter = field(default_factory=Counter)
+    response_times: list[float] = field(default_factory=list)
+    scenarios: Counter = field(default_factory=Counter)
+    notifications: int = 0
+    time_to_slack: list[float] = field(default_factory=list)
+    sink_messages: int = 0
+
+    @property
+    def requests(self) -> int:
+        """Requests sent."""
+        return len(self.response_times)
+
+    @property
+    def requests_per_second(self) -> float:
+        """Requests completed per second."""
+        return self.requests / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        """Summarize the results, with times in milliseconds.
+
+        Returns:
+            Dict of measurement name to value.
+        """
+
+        def ms(values: list[float], q: float) -> float | None:
+            value = percentile(values, q)
+            return None if value is None else round(value * 1000, 1)
+
+        return {
+            "requests": self.requests,
+            "requests_per_second": round(self.requests_per_second, 1),
+            "statuses": dict(sorted(self.statuses.items())),
+            "response_ms": {f"p{q}": ms(self.response_times, q) for q in (50, 95, 99)},
+            "notifications": self.notifications,
+            "scenarios": dict(sorted(self.scenarios.items())),
+            "delivered": len(self.time_to_slack),
+            "time_to_slack_ms": {
+                f"p{q}": ms(self.time_to_slack, q) for q in (50, 95, 99)
+            },
+            "sink_messages": self.sink_messages,
+        }
+
+
+class LoadRunner:
+    """Sends synthetic notifications on a schedule and measures the results."""
+
+    def __init__(
+        self,
+        send: Callable[[SyntheticWebhook], int],
+        generator: TrafficGenerator,
+        sink: SlackSink,
+        rate: float,
+        concurrency: int,
+    ) -> None:
+        """Initialize the runner.
+
+        Args:
+            send: Sends one webhook and returns the HTTP status.
+            generator: Builds the notifications.
+            sink: Slack sink the workspace notifies.
+            rate: Requests per second to send.
+            concurrency: Maximum requests in flight.
+
+        Raises:
+            ValueError: If rate or concurrency isn't positive.
+        """
+        if rate <= 0 or concurrency <= 0:
+            raise ValueError("Rate and concurrency must be positive")
+        self.send = send
+        self.generator = generator
+        self.sink = sink
+        self.rate = rate
+        self.concurrency = concurrency
+
+    def run(
+        self,
+        count: int | None = None,
+        duration: float | None = None,
+        drain: float = 45.0,
+    ) -> LoadReport:
+        """Send notifications, then wait for them to reach Slack.
+
+        Args:
+            count: Notifications to send.
+            duration: Seconds to keep sending, if count isn't given.
+            drain: Seconds to wait for outstanding Slack messages; the
+                Stripe aggregation delay is 30 seconds.
+
+        Returns:
+            The results.
+
+        Raises:
+            ValueError: If neither count nor duration is given.
+        """
+        if count is None and duration is None:
+            raise ValueError("Give a count or a duration")
+
+        report = LoadReport(seconds=0.0)
+        first_due: dict[int, float] = {}
+        lock = threading.Lock()
+        interval = 1.0 / self.rate
+
+        def send(webhook: SyntheticWebhook, due: float) -> None:
+            try:
+                status = self.send(webhook)
+            except Exception:
+                status = 0
+            elapsed = time.monotonic() - due
+            with lock:
+                report.statuses[status] += 1
+                report.response_times.append(elapsed)
+
+        start = time.monotonic()
+        sent = 0
+        seq = 0
+        with ThreadPoolExecutor(self.concurrency, "load-test") as executor:
+            futures = []
+            while count is None or seq < count:
+                if duration is not None and time.monotonic() - start >= duration:
+                    break
+                scenario, webhooks = self.generator.notification(seq)
+                report.scenarios[scenario] += 1
+                for webhook in webhooks:
+                    due = start + sent * interval
+                    delay = due - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    first_due.setdefault(seq, due)
+                    futures.append(executor.submit(send, webhook, due))
+                    sent += 1
+                seq += 1
+            wait(futures)
+        report.seconds = time.monotonic() - start
+        report.notifications = seq
+
+        deadline = time.monotonic() + drain
+        while (
+            self.sink.delivered(first_due) < len(first_due)
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.1)
+
+        report.sink_messages = self.sink.messages
+        report.time_to_slack = [
+            self.sink.arrivals[seq] - due
+            for seq, due in first_due.items()
+            if seq in self.sink.arrivals
+        ]
+        return report
+
+
+def prepare_workspace(slack_url: str, secret: str) -> Workspace:
+    """Create or update the load-test workspace.
+
+    The workspace is on the enterprise plan so rate limits don't apply,
+    has every source connected with the given secret, and notifies the
+    Slack sink. Call release_workspace() when the run is over.
+
+    Args:
+        slack_url: URL of the Slack sink.
+        secret: Webhook secret of every source integration.
+
+    Returns:
+        The workspace.
+    """
+    workspace, _ = Workspace.objects.update_or_create(
+        slug=WORKSPACE_SLUG,
+        defaults={
+            "name": "Load test",
+            "subscription_plan": "enterprise",
+            "subscription_status": "active",
+        },
+    )
+    for integration_type in INTEGRATION_TYPES.values():
+        Integration.objects.update_or_create(
+            workspace=workspace,
+            integration_type=integration_type,
+            defaults={"webhook_secret": secret, "is_active": True},
+        )
+    Integration.objects.update_or_create(
+        workspace=workspace,
+        integration_type="slack_notifications",
+        defaults={
+            "oauth_credentials": {"incoming_webhook": {"url": slack_url}},
+            "is_active": True,
+        },
+    )
+    return workspace
+
+
+def release_workspace(workspace: Workspace) -> int:
+    """Deactivate the load-test workspace's integrations after a run.
+
+    Args:
+        workspace: Workspace returned by prepare_workspace().
+
+    Returns:
+        Number of integrations deactivated.
+    """
+    return Integration.objects.filter(workspace=workspace, is_active=True).update(
+        is_active=False
+    )
+
+
+def webhook_path(workspace: Workspace, provider: str) -> str:
+    """Get the path of a workspace's webhook endpoint for a provider."""
+    return f"/webhook/customer/{workspace.uuid}/{provider}/"
+
+
+def http_sender(
+    base_url: str, workspace: Workspace, secret: str, concurrency: int
+) -> Callable[[SyntheticWebhook], int]:
+    """Send webhooks to a running server.
+
+    Args:
+        base_url: Server URL, e.g. "http://localhost:8000".
+        workspace: Workspace receiving the webhooks.
+        secret: Webhook secret of its integrations.
+        concurrency: Maximum requests in flight, to size the pool.
+
+    Returns:
+        Function sending one webhook and returning the HTTP status.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=1, pool_maxsize=concurrency
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    base_url = base_url.rstrip("/")
+
+    def send(webhook: SyntheticWebhook) -> int:
+        headers = webhook.signed_headers(secret)
+        headers["Content-Type"] = webhook.content_type
+        response = session.post(
+            base_url + webhook_path(workspace, webhook.provider),
+            data=webhook.body,
+            headers=headers,
+            timeout=30,
+        )
+        return response.status_code
+
+    return send
+
+
+def client_sender(
+    workspace: Workspace, secret: str
+) -> Callable[[SyntheticWebhook], int]:
+    """Send webhooks through the Django test client, in this process.
+
+    Args:
+        workspace: Workspace receiving the webhooks.
+        secret: Webhook secret of its integrations.
+
+    Returns:
+        Function sending one webhook and returning the HTTP status.
+    """
+    local = threading.local()
+
+    def send(webhook: SyntheticWebhook) -> int:
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = Client(raise_request_exception=False)
+        response = client.generic(
+            "POST",
+            webhook_path(workspace, webhook.provider),
+            webhook.body,
+            webhook.content_type,
+            secure=True,
+            headers=webhook.signed_headers(secret),
+        )
+        return response.status_code
+
+    return send
@@ -0,0 +1,247 @@
+"""Live activity stream for the dashboard.
+
+Every enriched activity record stored by DatabaseLookupService is published
+on a per-workspace Redis pub/sub channel, which the dashboard's server-sent
+events endpoint relays to open browser tabs.
+
+Pub/sub messages are fire-and-forget, so each record is also appended to a
+short per-workspace backlog (a sorted set scored by event ID). A client that
+reconnects with Last-Event-ID first replays the backlog entries after that
+ID, then continues with live messages; anything it missed while
+disconnected arrives without reloading the page.
+
+Event IDs come from a per-workspace sequence. On Redis a Lua script takes
+the next ID, adds the record to the backlog and publishes it in one step,
+so IDs follow publish order even with many workers publishing at once
+(record timestamps don't: they are taken before enrichment finishes).
+
+Usage:
+    from webhooks.services.activity_stream import activity_stream
+
+    activity_stream.publish(workspace_id, webhook_record)
+
+    async for item in activity_stream.stream(workspace_id, last_event_id):
+        ...
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from typing import Any
+
+from django.core.cache import cache
+
+from .redis_client import get_async_redis_client, get_redis_client, redis_key
+
+logger = logging.getLogger(__name__)
+
+# Takes the next event ID, stores the message in the backlog and publishes
+# it. KEYS: backlog, sequence. ARGV: record JSON, backlog size, TTL, channel.
+PUBLISH_SCRIPT = """
+local event_id = redis.call("INCR", KEYS[2])
+redis.call("EXPIRE", KEYS[2], ARGV[3])
+local message = '{"id": ' .. event_id .. ', "record": ' .. ARGV[1] .. '}'
+redis.call("ZADD", KEYS[1], event_id, message)
+redis.call("ZREMRANGEBYRANK", KEYS[1], 0, -(tonumber(ARGV[2]) + 1))
+redis.call("EXPIRE", KEYS[1], ARGV[3])
+redis.call("PUBLISH", ARGV[4], message)
+return event_id
+"""
+
+
+class ActivityStream:
+    """Publishes activity records and streams them to SSE clients.
+
+    Attributes:
+        BACKLOG_SIZE: Records kept per workspace for Last-Event-ID resume.
+        BACKLOG_TTL: Seconds an idle workspace's backlog is kept.
+        HEARTBEAT_SECONDS: Idle time after which stream() yields None so the
+            view can send a keep-alive comment.
+        MAX_STREAM_SECONDS: Lifetime of one stream; the browser reconnects
+            with Last-Event-ID, which spreads long-lived connections across
+            workers after deploys.
+        POLL_SECONDS: Backlog poll interval when the cache isn't Redis.
+    """
+
+    BACKLOG_SIZE = 200
+    BACKLOG_TTL = 60 * 60
+    HEARTBEAT_SECONDS = 15
+    MAX_STREAM_SECONDS = 5 * 60
+    POLL_SECONDS = 2
+
+    def _get_channel(self, workspace_id: str) -> str:
+        """Get the pub/sub channel name of a workspace.
+
+        Args:
+            workspace_id: Workspace UUID string.
+
+        Returns:
+            Channel name (namespaced like a cache key).
+        """
+        return redis_key(f"activity_stream:{workspace_id}")
+
+    def _get_backlog_key(self, workspace_id: str) -> str:
+        """Generate the cache key of a workspace's backlog.
+
+        Args:
+            workspace_id: Workspace UUID string.
+
+        Returns:
+            Cache key for the backlog.
+        """
+        return f"activity_stream_backlog:{workspace_id}"
+
+    def _get_sequence_key(self, workspace_id: str) -> str:
+        """Generate the cache key of a workspace's event ID sequence.
+
+        Args:
+            workspace_id: Workspace UUID string.
+
+        Returns:
+            Cache key for the sequence.
+        """
+        return f"activity_stream_seq:{workspace_id}"
+
+    def publish(self, workspace_id: str | None, record: dict[str, Any]) -> None:
+        """Publish an activity record to the workspace's live stream.
+
+        Never raises; a stream problem must not affect webhook processing.
+
+        Args:
+            workspace_id: Workspace UUID string, or None for global events.
+            record: Activity record as stored for the dashboard.
+        """
+        if not workspace_id:
+            return  # Notipus billing events have no dashboard to stream to
+
+        try:
+            redis_client = get_redis_client()
+            if redis_client is None:
+                self._simple_publish(workspace_id, record)
+                return
+
+            redis_client.eval(
+                PUBLISH_SCRIPT,
+                2,
+                redis_key(self._get_backlog_key(workspace_id)),
+                redis_key(self._get_sequence_key(workspace_id)),
+                json.dumps(record),
+                self.BACKLOG_SIZE,
+                self.BACKLOG_TTL,
+                self._get_channel(workspace_id),
+            )
+
+        except Exception as e:
+            logger.warning(f"Failed to publish activity for {workspace_id}: {e}")
+
+    def _simple_publish(self, workspace_id: str, record: dict[str, Any]) -> None:
+        """Append to the backlog only (fallback for non-Redis backends).
+
+        IDs continue from the newest backlog entry, which lives as long as
+        the Redis sequence key would.
+
+        Args:
+            workspace_id: Workspace UUID string.
+            record: Activity record.
+        """
+        key = self._get_backlog_key(workspace_id)
+        backlog = cache.get(key) or []
+        event_id = backlog[-1][0] + 1 if backlog else 1
+        backlog.append((event_id, record))
+        cache.set(key, backlog[-self.BACKLOG_SIZE :], timeout=self.BACKLOG_TTL)
+
+    async def stream(
+        self, workspace_id: str, last_event_id: int | None = None
+    ) -> AsyncIterator[tuple[int, dict[str, Any]] | None]:
+        """Stream a workspace's activity records as they are published.
+
+        Args:
+            workspace_id: Workspace UUID string.
+            last_event_id: ID of the last event the client received; newer
+                backlog entries are replayed first. None starts with live
+                events only.
+
+        Yields:
+            Tuples of (event_id, record), or None after HEARTBEAT_SECONDS
+            without events. Ends after MAX_STREAM_SECONDS.
+        """
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            async for item in self._poll_backlog(workspace_id, last_event_id):
+                yield item
+            return
+
+        pubsub = redis_client.pubsub()
+        try:
+            # Subscribe before reading the backlog so nothing published in
+            # between is missed; live copies of replayed events are dropped
+            await pubsub.subscribe(self._get_channel(workspace_id))
+            replayed: set[int] = set()
+
+            if last_event_id is not None:
+                backlog = await redis_client.zrangebyscore(
+                    redis_key(self._get_backlog_key(workspace_id)),
+                    f"({last_event_id}",
+                    "+inf",
+                )
+                for raw in backlog:
+                    event = json.loads(raw)
+                    replayed.add(event["id"])
+                    yield event["id"], event["record"]
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.MAX_STREAM_SECONDS
+            while loop.time() < deadline:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=self.HEARTBEAT_SECONDS
+                )
+                if message is None:
+                    yield None
+                    continue
+                event = json.loads(message["data"])
+                if event["id"] in replayed:
+                    continue
+                yield event["id"], event["record"]
+        finally:
+            await pubsub.aclose()
+            await redis_client.aclose()
+
+    async def _poll_backlog(
+        self, workspace_id: str, last_event_id: int | None
+    ) -> AsyncIterator[tuple[int, dict[str, Any]] | None]:
+        """Stream by polling the backlog (fallback for non-Redis backends).
+
+        Args:
+            workspace_id: Workspace UUID string.
+            last_event_id: ID of the last event the client received.
+
+        Yields:
+            Same as stream().
+        """
+        key = self._get_backlog_key(workspace_id)
+        backlog = await cache.aget(key) or []
+        if last_event_id is None:
+            last_event_id = backlog[-1][0] if backlog else 0
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.MAX_STREAM_SECONDS
+        idle_since = loop.time()
+        while True:
+            for event_id, record in backlog:
+                if event_id > last_event_id:
+                    last_event_id = event_id
+                    idle_since = loop.time()
+                    yield event_id, record
+
+            if loop.time() - idle_since >= self.HEARTBEAT_SECONDS:
+                idle_since = loop.time()
+                yield None
+            if loop.time() >= deadline:
+                return
+            await asyncio.sleep(self.POLL_SECONDS)
+            backlog = await cache.aget(key) or []
+
+
+# Module-level singleton instance
+activity_stream = ActivityStream()
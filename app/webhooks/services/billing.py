@@ -10,9 +10,13 @@ from typing import Any
 
 from core.models import Workspace
 from core.services.stripe import StripeAPI
+from django.core.cache import cache
 
 logger = logging.getLogger(__name__)
 
+# How long a Stripe customer -> workspace mapping is cached
+WORKSPACE_CACHE_TTL = 5 * 60
+
 # Map Stripe statuses to our internal statuses
 STRIPE_STATUS_MAPPING: dict[str, str] = {
     "active": "active",
@@ -82,6 +86,93 @@ class BillingService:
         # Convert "Notipus Pro Plan" or "Pro Plan" to "pro"
         return product_name.lower().replace("notipus ", "").replace(" plan", "").strip()
 
+    @staticmethod
+    def _get_workspace_cache_key(customer_id: str) -> str:
+        """Get the cache key of a customer's workspace reference.
+
+        Args:
+            customer_id: The Stripe customer ID.
+
+        Returns:
+            Cache key string.
+        """
+        return f"stripe_customer_workspace:{customer_id}"
+
+    @staticmethod
+    def get_workspace_ref(customer_id: str) -> dict[str, Any] | None:
+        """Resolve a Stripe customer to its workspace's id and name.
+
+        Served from the cache when possible, otherwise from the indexed
+        stripe_customer_id column. Misses aren't cached, so a workspace
+        linked to a customer at checkout is found on the next webhook.
+
+        Args:
+            customer_id: The Stripe customer ID.
+
+        Returns:
+            Dictionary with id and name, or None if no workspace matches.
+        """
+        key = BillingService._get_workspace_cache_key(customer_id)
+        try:
+            ref = cache.get(key)
+            if ref is not None:
+                return ref
+        except Exception as e:
+            logger.warning(f"Failed to read workspace cache for {customer_id}: {e}")
+
+        ref = (
+            Workspace.objects.filter(stripe_customer_id=customer_id)
+            .order_by("id")
+            .values("id", "name")
+            .first()
+        )
+        if ref is not None:
+            try:
+                cache.set(key, ref, timeout=WORKSPACE_CACHE_TTL)
+            except Exception as e:
+                logger.warning(f"Failed to cache workspace for {customer_id}: {e}")
+        return ref
+
+    @staticmethod
+    def forget_workspace_ref(customer_id: str) -> None:
+        """Drop a customer's cached workspace reference.
+
+        Args:
+            customer_id: The Stripe customer ID.
+        """
+        try:
+            cache.delete(BillingService._get_workspace_cache_key(customer_id))
+        except Exception as e:
+            logger.warning(f"Failed to clear workspace cache for {customer_id}: {e}")
+
+    @staticmethod
+    def _update_customer_workspaces(
+        customer_id: str, update_data: dict[str, Any]
+    ) -> bool:
+        """Apply billing fields to a customer's workspaces.
+
+        Issues one UPDATE keyed on the indexed stripe_customer_id column,
+        conditional on at least one field differing, so Stripe retries and
+        duplicate events don't rewrite unchanged rows. Only when nothing
+        changed is the (cached) workspace lookup consulted to tell "already
+        up to date" from "no such workspace".
+
+        Args:
+            customer_id: The Stripe customer ID.
+            update_data: Field values to set.
+
+        Returns:
+            True if the customer has a workspace, False otherwise.
+        """
+        updated_count = (
+            Workspace.objects.filter(stripe_customer_id=customer_id)
+            .exclude(**update_data)
+            .update(**update_data)
+        )
+        if updated_count > 0:
+            return True
+        return BillingService.get_workspace_ref(customer_id) is not None
+
     @staticmethod
     def sync_workspace_from_stripe(customer_id: str) -> bool:
         """Sync workspace subscription state from Stripe.
@@ -97,7 +188,7 @@ class BillingService:
             True if sync was successful, False otherwise.
         """
         try:
-            workspace = Workspace.objects.filter(stripe_customer_id=customer_id).first()
+            workspace = BillingService.get_workspace_ref(customer_id)
 
             if not workspace:
                 logger.warning(
@@ -133,10 +224,10 @@ class BillingService:
                     active_sub["current_period_end"], tz=timezone.utc
                 )
 
-            Workspace.objects.filter(id=workspace.id).update(**update_data)
+            BillingService._update_customer_workspaces(customer_id, update_data)
 
             logger.info(
-                f"Synced workspace {workspace.name} from Stripe: "
+                f"Synced workspace {workspace['name']} from Stripe: "
                 f"status={internal_status}, plan={plan_name}"
             )
             return True
@@ -177,14 +268,15 @@ class BillingService:
             # Don't set subscription_plan here - sync_workspace_from_stripe will
             # properly extract and normalize the plan name from the Product.
             # Previously this was setting plan_id (a Price ID) which is wrong.
-            updated_count = Workspace.objects.filter(
-                stripe_customer_id=customer_id
-            ).update(
-                subscription_status="active",
-                billing_cycle_anchor=subscription.get("current_period_start"),
+            found = BillingService._update_customer_workspaces(
+                customer_id,
+                {
+                    "subscription_status": "active",
+                    "billing_cycle_anchor": subscription.get("current_period_start"),
+                },
             )
 
-            if updated_count > 0:
+            if found:
                 logger.info(
                     f"Subscription created for customer {customer_id}, syncing..."
                 )
@@ -225,11 +317,9 @@ class BillingService:
                     "current_period_end"
                 )
 
-            updated_count = Workspace.objects.filter(
-                stripe_customer_id=customer_id
-            ).update(**update_data)
+            found = BillingService._update_customer_workspaces(customer_id, update_data)
 
-            if updated_count > 0:
+            if found:
                 logger.info(
                     f"Updated subscription status to {internal_status} "
                     f"for customer {customer_id}, syncing..."
@@ -254,11 +344,11 @@ class BillingService:
             if not customer_id:
                 return
 
-            updated_count = Workspace.objects.filter(
-                stripe_customer_id=customer_id
-            ).update(subscription_status="cancelled")
+            found = BillingService._update_customer_workspaces(
+                customer_id, {"subscription_status": "cancelled"}
+            )
 
-            if updated_count > 0:
+            if found:
                 logger.info(
                     f"Marked subscription as cancelled for customer {customer_id}"
                 )
@@ -288,11 +378,9 @@ class BillingService:
             if period_end:
                 update_data["billing_cycle_anchor"] = period_end
 
-            updated_count = Workspace.objects.filter(
-                stripe_customer_id=customer_id
-            ).update(**update_data)
+            found = BillingService._update_customer_workspaces(customer_id, update_data)
 
-            if updated_count > 0:
+            if found:
                 logger.info(
                     f"Updated payment status to active for customer {customer_id}"
                 )
@@ -315,11 +403,11 @@ class BillingService:
                 logger.error("Missing customer ID in invoice data")
                 return
 
-            updated_count = Workspace.objects.filter(
-                stripe_customer_id=customer_id
-            ).update(subscription_status="past_due")
+            found = BillingService._update_customer_workspaces(
+                customer_id, {"subscription_status": "past_due"}
+            )
 
-            if updated_count > 0:
+            if found:
                 logger.warning(
                     f"Updated payment status to past_due for customer {customer_id}"
                 )
@@ -365,15 +453,15 @@ class BillingService:
 
             # Find workspace by customer ID or workspace ID from metadata
             if workspace_id:
-                updated_count = Workspace.objects.filter(id=workspace_id).update(
-                    **update_data
+                found = (
+                    Workspace.objects.filter(id=workspace_id).update(**update_data) > 0
                 )
             else:
-                updated_count = Workspace.objects.filter(
-                    stripe_customer_id=customer_id
-                ).update(**update_data)
+                found = BillingService._update_customer_workspaces(
+                    customer_id, update_data
+                )
 
-            if updated_count > 0:
+            if found:
                 logger.info(
                     f"Checkout completed for customer {customer_id}, "
                     f"subscription: {subscription_id}, plan: {plan_name}"
@@ -407,11 +495,11 @@ class BillingService:
             trial_end = subscription.get("trial_end")
 
             # Find workspace and log the event
-            ws = Workspace.objects.filter(stripe_customer_id=customer_id).first()
+            ws = BillingService.get_workspace_ref(customer_id)
 
             if ws:
                 logger.info(
-                    f"Trial ending soon for workspace {ws.name} "
+                    f"Trial ending soon for workspace {ws['name']} "
                     f"(customer: {customer_id}), trial_end: {trial_end}"
                 )
                 # TODO: Send notification email to workspace admins
@@ -449,11 +537,9 @@ class BillingService:
             if period_end:
                 update_data["billing_cycle_anchor"] = period_end
 
-            updated_count = Workspace.objects.filter(
-                stripe_customer_id=customer_id
-            ).update(**update_data)
+            found = BillingService._update_customer_workspaces(customer_id, update_data)
 
-            if updated_count > 0:
+            if found:
                 logger.info(f"Invoice paid for customer {customer_id}")
             else:
                 logger.warning(f"No workspace found for paid invoice: {customer_id}")
@@ -480,11 +566,11 @@ class BillingService:
             hosted_invoice_url = invoice.get("hosted_invoice_url")
 
             # Find workspace and log the event
-            ws = Workspace.objects.filter(stripe_customer_id=customer_id).first()
+            ws = BillingService.get_workspace_ref(customer_id)
 
             if ws:
                 logger.warning(
-                    f"Payment action required for workspace {ws.name} "
+                    f"Payment action required for workspace {ws['name']} "
                     f"(customer: {customer_id}). Invoice URL: {hosted_invoice_url}"
                 )
                 # TODO: Send notification email to workspace admins
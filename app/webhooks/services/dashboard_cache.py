@@ -0,0 +1,175 @@
+"""Per-workspace dashboard snapshot cache.
+
+The dashboard is composed of sections (integration flags, recent activity,
+usage) that change for different reasons and at different rates. Each
+workspace has one cached snapshot holding every section together with the
+version it was built from:
+
+    dashboard_snapshot:{workspace}
+        {section: {"version": ..., "built_at": ..., "data": ...}}
+
+A section's version is made of invalidation keys, one random token per
+kind of change:
+
+    dashboard_version:{workspace}:integrations   integrations changed
+    dashboard_version:{workspace}:activity       new activity stored
+    dashboard_version:{workspace}:usage          usage counted
+    dashboard_version:{workspace}:plan           plan or trial changed
+
+Writers call invalidate() with the keys their change affects. On read, the
+snapshot and all version tokens come back in one get_many, and only the
+sections whose version moved (or that are older than SNAPSHOT_TTL) are
+rebuilt.
+
+Callers can also pass extra version parts they already have in hand. The
+dashboard passes the workspace's plan and subscription status, so plan
+changes written with QuerySet.update() (which skips signals) still
+invalidate the plan-dependent sections.
+
+Usage:
+    from webhooks.services.dashboard_cache import dashboard_cache
+
+    dashboard_cache.invalidate(workspace_id, "activity")
+    sections = dashboard_cache.get_sections(workspace_id, builders)
+"""
+
+import logging
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any, ClassVar
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardCache:
+    """Versioned per-section dashboard snapshots.
+
+    Attributes:
+        SECTION_KEYS: Invalidation keys each section depends on.
+        SNAPSHOT_TTL: Seconds a section is reused at most, even without
+            invalidation (bounds staleness of time-dependent data).
+    """
+
+    SECTION_KEYS: ClassVar[dict[str, tuple[str, ...]]] = {
+        "integrations": ("integrations",),
+        "activity": ("activity",),
+        "usage": ("usage", "plan"),
+    }
+
+    SNAPSHOT_TTL = 5 * 60
+
+    def _get_snapshot_key(self, workspace_id: str) -> str:
+        """Generate the cache key of a workspace's snapshot.
+
+        Args:
+            workspace_id: Workspace UUID string.
+
+        Returns:
+            Cache key for the snapshot.
+        """
+        return f"dashboard_snapshot:{workspace_id}"
+
+    def _get_version_key(self, workspace_id: str, key: str) -> str:
+        """Generate the cache key of an invalidation token.
+
+        Args:
+            workspace_id: Workspace UUID string.
+            key: Invalidation key name.
+
+        Returns:
+            Cache key for the token.
+        """
+        return f"dashboard_version:{workspace_id}:{key}"
+
+    def invalidate(self, workspace_id: str | None, *keys: str) -> None:
+        """Mark the sections depending on the given keys as changed.
+
+        Never raises; a stale dashboard must not fail the write path.
+
+        Args:
+            workspace_id: Workspace UUID string, or None for global events.
+            keys: Invalidation key names (integrations, activity, usage, plan).
+        """
+        if not workspace_id or not keys:
+            return
+        token = uuid.uuid4().hex
+        try:
+            # Outlive any snapshot built before this invalidation
+            cache.set_many(
+                {self._get_version_key(workspace_id, key): token for key in keys},
+                timeout=self.SNAPSHOT_TTL * 2,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to invalidate dashboard {workspace_id}: {e}")
+
+    def get_sections(
+        self,
+        workspace_id: str,
+        builders: dict[str, Callable[[], Any]],
+        extra_versions: dict[str, str] | None = None,
+    ) -> dict[str, Any]:
+        """Get dashboard sections, rebuilding only the ones that changed.
+
+        Args:
+            workspace_id: Workspace UUID string.
+            builders: Section name to a function computing its data.
+            extra_versions: Invalidation key name to a caller-supplied value
+                that is folded into the version of dependent sections.
+
+        Returns:
+            Section name to section data.
+        """
+        extra_versions = extra_versions or {}
+        snapshot_key = self._get_snapshot_key(workspace_id)
+        version_keys = {
+            key: self._get_version_key(workspace_id, key)
+            for section in builders
+            for key in self.SECTION_KEYS.get(section, (section,))
+        }
+
+        try:
+            found = cache.get_many([snapshot_key, *version_keys.values()])
+        except Exception as e:
+            logger.warning(f"Failed to read dashboard snapshot: {e}")
+            return {section: build() for section, build in builders.items()}
+
+        snapshot: dict[str, Any] = found.get(snapshot_key) or {}
+        now = time.time()
+        sections: dict[str, Any] = {}
+        rebuilt = False
+
+        for section, build in builders.items():
+            version = "|".join(
+                f"{found.get(version_keys[key])}:{extra_versions.get(key, '')}"
+                for key in self.SECTION_KEYS.get(section, (section,))
+            )
+            entry = snapshot.get(section)
+            if (
+                entry
+                and entry["version"] == version
+                and now - entry["built_at"] < self.SNAPSHOT_TTL
+            ):
+                sections[section] = entry["data"]
+                continue
+
+            # Version was read before building, so a change made while
+            # building leaves this entry stale for the next read
+            data = build()
+            snapshot[section] = {"version": version, "built_at": now, "data": data}
+            sections[section] = data
+            rebuilt = True
+
+        if rebuilt:
+            try:
+                cache.set(snapshot_key, snapshot, timeout=self.SNAPSHOT_TTL)
+            except Exception as e:
+                logger.warning(f"Failed to store dashboard snapshot: {e}")
+
+        return sections
+
+
+# Module-level singleton instance
+dashboard_cache = DashboardCache()
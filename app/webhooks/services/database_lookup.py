@@ -9,17 +9,44 @@ from __future__ import annotations
 import json
 import logging
 from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
 from decimal import Decimal
 from typing import TYPE_CHECKING, Any
 
 from django.core.cache import cache
 from django.utils import timezone
 
+from .activity_stream import activity_stream
+from .dashboard_cache import dashboard_cache
+from .event_ledger import event_ledger
+from .redis_client import get_redis_client, read_index_page, redis_key
+
 if TYPE_CHECKING:
     from webhooks.models.rich_notification import RichNotification
 
 logger = logging.getLogger(__name__)
 
+# Secondary indexes kept per workspace: lookup field -> record field
+LOOKUP_FIELDS: dict[str, str] = {
+    "customer_id": "customer_id",
+    "external_id": "external_id",
+    "email": "customer_email",
+}
+
+
+def normalize_lookup_value(field: str, value: Any) -> str:
+    """Normalize a value for use in a secondary index key.
+
+    Args:
+        field: Lookup field name (see LOOKUP_FIELDS).
+        value: Raw value.
+
+    Returns:
+        Normalized value (emails are case-insensitive), or "" if empty.
+    """
+    normalized = str(value or "").strip()
+    return normalized.lower() if field == "email" else normalized
+
 
 class DatabaseLookupService:
     """Service for managing webhook records in Redis with TTL.
@@ -35,6 +62,15 @@ class DatabaseLookupService:
     # Default TTL of 7 days for webhook activity records
     DEFAULT_TTL_DAYS = 7
 
+    # Most recent activity records indexed per workspace
+    ACTIVITY_RECORDS_PER_WORKSPACE = 500
+
+    # Most recent activity rollups (customer + event type + day) per workspace
+    ACTIVITY_ROLLUPS_PER_WORKSPACE = 200
+
+    # Most recent records indexed per customer, external ID or email
+    LOOKUP_RECORDS_PER_VALUE = 100
+
     def __init__(self, ttl_days: int | None = None) -> None:
         """Initialize the database lookup service.
 
@@ -57,16 +93,122 @@ class DatabaseLookupService:
         """
         return f"webhook:{webhook_type}:{timestamp}"
 
-    def _get_activity_key(self, date_str: str) -> str:
-        """Generate Redis key for daily activity list.
+    def _get_activity_index_key(self, workspace_id: str | None) -> str:
+        """Generate Redis key for a workspace's activity index.
+
+        Args:
+            workspace_id: Workspace UUID string, or None for global events.
+
+        Returns:
+            Formatted Redis key for the activity sorted set.
+        """
+        return f"activity_index:{workspace_id or 'global'}"
+
+    def _get_rollup_index_key(self, workspace_id: str | None) -> str:
+        """Generate Redis key for a workspace's activity rollup index.
 
         Args:
-            date_str: Date string in YYYY-MM-DD format.
+            workspace_id: Workspace UUID string, or None for global events.
 
         Returns:
-            Formatted Redis key for activity list.
+            Formatted Redis key for the rollup sorted set.
         """
-        return f"webhook_activity:{date_str}"
+        return f"activity_rollups:{workspace_id or 'global'}"
+
+    def _get_rollup_key(self, workspace_id: str | None, group_id: str) -> str:
+        """Generate Redis key for a single activity rollup hash.
+
+        Args:
+            workspace_id: Workspace UUID string, or None for global events.
+            group_id: Rollup group ID (see _get_rollup_group_id).
+
+        Returns:
+            Formatted Redis key for the rollup hash.
+        """
+        return f"activity_rollup:{workspace_id or 'global'}:{group_id}"
+
+    def _get_lookup_index_key(
+        self, workspace_id: str | None, field: str, value: str
+    ) -> str:
+        """Generate Redis key for a secondary index of a workspace's records.
+
+        Args:
+            workspace_id: Workspace UUID string, or None for global events.
+            field: Lookup field name (see LOOKUP_FIELDS).
+            value: Normalized lookup value.
+
+        Returns:
+            Formatted Redis key for the lookup sorted set.
+        """
+        return f"activity_lookup:{workspace_id or 'global'}:{field}:{value}"
+
+    def _get_lookup_index_keys(
+        self, workspace_id: str | None, record: dict[str, Any]
+    ) -> list[str]:
+        """Get the secondary index keys a record belongs in.
+
+        Args:
+            workspace_id: Workspace UUID string, or None for global events.
+            record: Webhook record being stored.
+
+        Returns:
+            Lookup index keys for the record's non-empty lookup fields.
+        """
+        keys = []
+        for field, record_field in LOOKUP_FIELDS.items():
+            value = normalize_lookup_value(field, record.get(record_field))
+            if value:
+                keys.append(self._get_lookup_index_key(workspace_id, field, value))
+        return keys
+
+    def _get_order_xref_key(
+        self, workspace_id: str | None, provider: str, order_ref: str
+    ) -> str:
+        """Generate Redis key for an order cross-reference entry.
+
+        Args:
+            workspace_id: Workspace UUID string, or None for global events.
+            provider: Provider whose reference the entry holds.
+            order_ref: Shopify order number shared by both providers.
+
+        Returns:
+            Formatted Redis key for the cross-reference.
+        """
+        return f"order_xref:{workspace_id or 'global'}:{provider}:{order_ref}"
+
+    def _get_order_xref_entries(
+        self, workspace_id: str | None, record: dict[str, Any]
+    ) -> dict[str, str]:
+        """Get the order cross-reference entries a record provides.
+
+        Shopify order events are indexed under their order number, and
+        Chargify payments under the Shopify order number parsed from their
+        memo, so either side finds the other with a single GET.
+
+        Args:
+            workspace_id: Workspace UUID string, or None for global events.
+            record: Webhook record being stored.
+
+        Returns:
+            Cross-reference key to the record's own reference, or empty.
+        """
+        metadata = record.get("metadata") or {}
+        provider = record.get("provider")
+        if provider == "shopify":
+            order_ref = metadata.get("order_ref") or record.get("order_number")
+            reference = metadata.get("order_id") or record.get("external_id")
+        elif provider == "chargify":
+            order_ref = metadata.get("shopify_order_ref")
+            reference = metadata.get("transaction_id") or record.get("external_id")
+        else:
+            return {}
+
+        order_ref = str(order_ref or "").strip()
+        if not order_ref or not reference:
+            return {}
+        return {
+            self._get_order_xref_key(workspace_id, provider, order_ref): str(reference)
+        }
 
     def _normalize_status(self, status: str | None) -> str:
         """Normalize status string for consistent display.
@@ -112,13 +254,16 @@ class DatabaseLookupService:
         }
         return type_category_map.get(event_type, "payment")
 
-    def store_payment_record(self, event_data: dict[str, Any]) -> bool:
+    def store_payment_record(
+        self, event_data: dict[str, Any], workspace_id: str | None = None
+    ) -> bool:
         """Store a payment/subscription record in Redis with TTL.
 
         Handles all event types including payments, subscriptions, and checkouts.
 
         Args:
             event_data: Dictionary containing event data.
+            workspace_id: Workspace UUID string the event belongs to.
 
         Returns:
             True if storage was successful, False otherwise.
@@ -183,27 +328,9 @@ class DatabaseLookupService:
 
             cache.set(webhook_key, json.dumps(webhook_record), timeout=self.ttl_seconds)
 
-            # Add to daily activity list
-            date_str = now.strftime("%Y-%m-%d")
-            activity_key = self._get_activity_key(date_str)
-
-            # Get current activity list and append new record
-            current_activity = cache.get(activity_key, [])
-            if isinstance(current_activity, str):
-                current_activity = json.loads(current_activity)
-
-            current_activity.append(webhook_key)
-
-            # Keep only last 100 records per day to prevent memory issues
-            if len(current_activity) > 100:
-                # Remove oldest records from cache
-                old_keys = current_activity[:-100]
-                for old_key in old_keys:
-                    cache.delete(old_key)
-                current_activity = current_activity[-100:]
-
-            cache.set(
-                activity_key, json.dumps(current_activity), timeout=self.ttl_seconds
+            # Add to workspace activity and lookup indexes
+            self._add_to_activity_index(
+                webhook_key, now.timestamp(), workspace_id, webhook_record
             )
 
             logger.info(
@@ -314,11 +441,14 @@ class DatabaseLookupService:
             "timestamp": now.timestamp(),
         }
 
-    def store_order_record(self, event_data: dict[str, Any]) -> bool:
+    def store_order_record(
+        self, event_data: dict[str, Any], workspace_id: str | None = None
+    ) -> bool:
         """Store an order record in Redis with TTL.
 
         Args:
             event_data: Dictionary containing order event data.
+            workspace_id: Workspace UUID string the order belongs to.
 
         Returns:
             True if storage was successful, False otherwise.
@@ -339,8 +469,10 @@ class DatabaseLookupService:
 
             cache.set(webhook_key, json.dumps(webhook_record), timeout=self.ttl_seconds)
 
-            # Add to daily activity list
-            self._add_to_activity_list(webhook_key)
+            # Add to workspace activity and lookup indexes
+            self._add_to_activity_index(
+                webhook_key, now.timestamp(), workspace_id, webhook_record
+            )
 
             logger.info(
                 f"Stored order record in Redis: "
@@ -352,37 +484,107 @@ class DatabaseLookupService:
             logger.error(f"Error storing order record in Redis: {e!s}", exc_info=True)
             return False
 
-    def _add_to_activity_list(self, webhook_key: str) -> None:
-        """Add webhook key to daily activity list with cleanup.
+    def _add_to_activity_index(
+        self,
+        webhook_key: str,
+        timestamp: float,
+        workspace_id: str | None,
+        record: dict[str, Any] | None = None,
+    ) -> None:
+        """Add a webhook record to its workspace's activity and lookup indexes.
+
+        The indexes are sorted sets scored by timestamp: the activity index,
+        plus one secondary index per customer ID, external ID and customer
+        email in the record. Adding the record, trimming each index,
+        refreshing TTLs and writing the record's order cross-reference go
+        out as one pipelined round trip. Trimmed records are not deleted;
+        they expire with their own TTL.
 
         Args:
             webhook_key: Redis key for the webhook record.
+            timestamp: Record timestamp (index score).
+            workspace_id: Workspace UUID string, or None for global events.
+            record: Webhook record, for the secondary indexes.
         """
-        now = timezone.now()
-        date_str = now.strftime("%Y-%m-%d")
-        activity_key = self._get_activity_key(date_str)
+        index_key = self._get_activity_index_key(workspace_id)
+        lookup_keys = self._get_lookup_index_keys(workspace_id, record or {})
+        xref_entries = self._get_order_xref_entries(workspace_id, record or {})
+
+        redis_client = get_redis_client()
+        if redis_client is None:
+            self._simple_index_add(
+                index_key, webhook_key, timestamp, self.ACTIVITY_RECORDS_PER_WORKSPACE
+            )
+            for lookup_key in lookup_keys:
+                self._simple_index_add(
+                    lookup_key, webhook_key, timestamp, self.LOOKUP_RECORDS_PER_VALUE
+                )
+            if xref_entries:
+                cache.set_many(xref_entries, timeout=self.ttl_seconds)
+            return
+
+        pipe = redis_client.pipeline(transaction=False)
+        for key, max_entries in [
+            (index_key, self.ACTIVITY_RECORDS_PER_WORKSPACE),
+            *(
+                (lookup_key, self.LOOKUP_RECORDS_PER_VALUE)
+                for lookup_key in lookup_keys
+            ),
+        ]:
+            raw_key = redis_key(key)
+            pipe.zadd(raw_key, {webhook_key: timestamp})
+            pipe.zremrangebyrank(raw_key, 0, -(max_entries + 1))
+            pipe.expire(raw_key, self.ttl_seconds)
+        for xref_key, reference in xref_entries.items():
+            pipe.set(redis_key(xref_key), reference, ex=self.ttl_seconds)
+        pipe.execute()
+
+    def _simple_index_add(
+        self, index_key: str, webhook_key: str, timestamp: float, max_entries: int
+    ) -> None:
+        """Non-atomic index update (fallback for non-Redis backends).
 
-        # Get current activity list and append new record
-        current_activity = cache.get(activity_key, [])
-        if isinstance(current_activity, str):
-            current_activity = json.loads(current_activity)
+        Args:
+            index_key: Cache key for the index.
+            webhook_key: Redis key for the webhook record.
+            timestamp: Record timestamp.
+            max_entries: Number of newest entries to keep.
+        """
+        entries = cache.get(index_key) or []
+        entries.append((timestamp, webhook_key))
+        entries.sort()
+        cache.set(index_key, entries[-max_entries:], timeout=self.ttl_seconds)
 
-        current_activity.append(webhook_key)
+    def _get_indexed_keys(
+        self, workspace_id: str | None, since: float, limit: int
+    ) -> list[str]:
+        """Get the newest webhook keys from a workspace's activity index.
 
-        # Keep only last 100 records per day
-        if len(current_activity) > 100:
-            # Remove oldest records from cache
-            old_keys = current_activity[:-100]
-            for old_key in old_keys:
-                cache.delete(old_key)
-            current_activity = current_activity[-100:]
+        Args:
+            workspace_id: Workspace UUID string, or None for global events.
+            since: Oldest timestamp to include.
+            limit: Maximum number of keys to return.
 
-        cache.set(activity_key, json.dumps(current_activity), timeout=self.ttl_seconds)
+        Returns:
+            Webhook record keys, newest first.
+        """
+        index_key = self._get_activity_index_key(workspace_id)
+        redis_client = get_redis_client()
+        if redis_client is None:
+            entries = cache.get(index_key) or []
+            newest = sorted(entries, reverse=True)
+            return [key for score, key in newest if score >= since][:limit]
+
+        keys = redis_client.zrevrangebyscore(
+            redis_key(index_key), "+inf", since, start=0, num=limit
+        )
+        return [k.decode("utf-8") if isinstance(k, bytes) else k for k in keys]
 
     def store_enriched_record(
         self,
         event_data: dict[str, Any],
         notification: RichNotification,
+        workspace_id: str | None = None,
     ) -> bool:
         """Store an enriched webhook record in Redis with TTL.
 
@@ -392,6 +594,7 @@ class DatabaseLookupService:
         Args:
             event_data: Dictionary containing event data.
             notification: RichNotification with enriched data.
+            workspace_id: Workspace UUID string the event belongs to.
 
         Returns:
             True if storage was successful, False otherwise.
@@ -475,14 +678,24 @@ class DatabaseLookupService:
                 if notification.payment.order_number:
                     webhook_record["order_number"] = notification.payment.order_number
 
+            # Queue for the durable ledger first so a Redis outage loses
+            # only the dashboard copy
+            event_ledger.record(workspace_id, webhook_record)
+
             # Store in Redis with TTL
             timestamp_key = now.strftime("%Y%m%d_%H%M%S_%f")
             webhook_key = self._get_webhook_key(display_type, timestamp_key)
 
             cache.set(webhook_key, json.dumps(webhook_record), timeout=self.ttl_seconds)
 
-            # Add to daily activity list
-            self._add_to_activity_list(webhook_key)
+            # Add to workspace activity and lookup indexes and dashboard
+            # rollup, and push to open dashboards
+            self._add_to_activity_index(
+                webhook_key, now.timestamp(), workspace_id, webhook_record
+            )
+            self._update_activity_rollup(webhook_record, workspace_id)
+            activity_stream.publish(workspace_id, webhook_record)
+            dashboard_cache.invalidate(workspace_id, "activity")
 
             logger.info(
                 f"Stored enriched {event_type} record in Redis: "
@@ -496,45 +709,183 @@ class DatabaseLookupService:
             )
             return False
 
-    def get_recent_webhook_activity(
-        self, days: int = 7, limit: int = 50
+    def _get_rollup_group_id(self, record: dict[str, Any]) -> str:
+        """Get the dashboard grouping key for an activity record.
+
+        Records for the same customer and event type on the same (local)
+        day roll up into one dashboard entry.
+
+        Args:
+            record: Webhook activity record.
+
+        Returns:
+            Group ID in "{date}:{customer}:{event_type}" form.
+        """
+        day = timezone.localtime(
+            datetime.fromtimestamp(record["timestamp"], tz=dt_timezone.utc)
+        ).strftime("%Y-%m-%d")
+        customer = record.get("customer_email") or record.get("customer_id") or ""
+        event_type = record.get("event_type") or record.get("type") or ""
+        return f"{day}:{customer}:{event_type}"
+
+    def _update_activity_rollup(
+        self, record: dict[str, Any], workspace_id: str | None
+    ) -> None:
+        """Fold a record into its workspace's dashboard activity rollup.
+
+        Each rollup is a hash holding the event count, running amount total
+        and latest record, indexed in a sorted set by its latest timestamp.
+        The update is a single MULTI/EXEC pipeline.
+
+        Args:
+            record: Webhook activity record that was just stored.
+            workspace_id: Workspace UUID string, or None for global events.
+        """
+        group_id = self._get_rollup_group_id(record)
+        timestamp = record["timestamp"]
+        amount = record.get("amount") or 0
+
+        redis_client = get_redis_client()
+        if redis_client is None:
+            self._simple_rollup_update(record, workspace_id, group_id)
+            return
+
+        rollup_key = redis_key(self._get_rollup_key(workspace_id, group_id))
+        index_key = redis_key(self._get_rollup_index_key(workspace_id))
+
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.hincrby(rollup_key, "event_count", 1)
+        pipe.hincrbyfloat(rollup_key, "total_amount", amount)
+        pipe.hset(rollup_key, "latest", json.dumps(record))
+        pipe.expire(rollup_key, self.ttl_seconds)
+        pipe.zadd(index_key, {group_id: timestamp}, gt=True)
+        pipe.zremrangebyrank(index_key, 0, -(self.ACTIVITY_ROLLUPS_PER_WORKSPACE + 1))
+        pipe.expire(index_key, self.ttl_seconds)
+        pipe.execute()
+
+    def _simple_rollup_update(
+        self, record: dict[str, Any], workspace_id: str | None, group_id: str
+    ) -> None:
+        """Non-atomic rollup update (fallback for non-Redis backends).
+
+        Args:
+            record: Webhook activity record that was just stored.
+            workspace_id: Workspace UUID string, or None for global events.
+            group_id: Rollup group ID.
+        """
+        index_key = self._get_rollup_index_key(workspace_id)
+        rollups = cache.get(index_key) or {}
+        rollup = rollups.get(group_id) or {"event_count": 0, "total_amount": 0.0}
+        rollup["event_count"] += 1
+        rollup["total_amount"] += record.get("amount") or 0
+        rollup["latest"] = record
+        rollups[group_id] = rollup
+
+        if len(rollups) > self.ACTIVITY_ROLLUPS_PER_WORKSPACE:
+            oldest = min(rollups, key=lambda g: rollups[g]["latest"]["timestamp"])
+            del rollups[oldest]
+        cache.set(index_key, rollups, timeout=self.ttl_seconds)
+
+    def get_activity_rollups(
+        self, workspace_id: str | None, days: int = 7, limit: int = 15
     ) -> list[dict[str, Any]]:
-        """Get recent webhook activity from Redis.
+        """Get a workspace's most recent activity rollups.
+
+        One range query on the rollup index, then one pipelined HGETALL
+        round trip for the rollups themselves.
 
         Args:
+            workspace_id: Workspace UUID string, or None for global events.
             days: Number of days to look back.
-            limit: Maximum number of records to return.
+            limit: Maximum number of rollups to return.
 
         Returns:
-            List of webhook activity records, sorted by timestamp.
+            List of dicts with "latest" (most recent record in the group),
+            "event_count" and "total_amount", most recent first.
         """
         try:
-            activity_records: list[dict[str, Any]] = []
+            since = (timezone.now() - timedelta(days=days)).timestamp()
+            redis_client = get_redis_client()
+            if redis_client is None:
+                rollups = cache.get(self._get_rollup_index_key(workspace_id)) or {}
+                recent = [
+                    r for r in rollups.values() if r["latest"]["timestamp"] >= since
+                ]
+                recent.sort(key=lambda r: r["latest"]["timestamp"], reverse=True)
+                return recent[:limit]
+
+            group_ids = redis_client.zrevrangebyscore(
+                redis_key(self._get_rollup_index_key(workspace_id)),
+                "+inf",
+                since,
+                start=0,
+                num=limit,
+            )
+            if not group_ids:
+                return []
+
+            pipe = redis_client.pipeline(transaction=False)
+            for group_id in group_ids:
+                if isinstance(group_id, bytes):
+                    group_id = group_id.decode("utf-8")
+                pipe.hgetall(redis_key(self._get_rollup_key(workspace_id, group_id)))
+
+            results: list[dict[str, Any]] = []
+            for fields in pipe.execute():
+                fields = {
+                    (k.decode("utf-8") if isinstance(k, bytes) else k): v
+                    for k, v in fields.items()
+                }
+                if "latest" not in fields:
+                    # Rollup hash expired before its index entry was trimmed
+                    continue
+                results.append(
+                    {
+                        "latest": json.loads(fields["latest"]),
+                        "event_count": int(fields.get("event_count", 1)),
+                        "total_amount": float(fields.get("total_amount", 0)),
+                    }
+                )
+            return results
 
-            # Get activity from last N days
-            for i in range(days):
-                date = timezone.now() - timedelta(days=i)
-                date_str = date.strftime("%Y-%m-%d")
-                activity_key = self._get_activity_key(date_str)
+        except Exception as e:
+            logger.error(
+                f"Error retrieving activity rollups from Redis: {e!s}", exc_info=True
+            )
+            return []
 
-                # Get webhook keys for this day
-                webhook_keys = cache.get(activity_key, [])
-                if isinstance(webhook_keys, str):
-                    webhook_keys = json.loads(webhook_keys)
+    def get_recent_webhook_activity(
+        self, days: int = 7, limit: int = 50, workspace_id: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Get recent webhook activity for a workspace from Redis.
 
-                # Fetch webhook records
-                for webhook_key in webhook_keys:
-                    webhook_data = cache.get(webhook_key)
-                    if webhook_data:
-                        if isinstance(webhook_data, str):
-                            webhook_data = json.loads(webhook_data)
-                        activity_records.append(webhook_data)
+        Reads the newest keys from the workspace's activity index and fetches
+        the records with a single MGET.
 
-            # Sort by timestamp (most recent first)
-            activity_records.sort(key=lambda x: x.get("timestamp", 0), reverse=True)
+        Args:
+            days: Number of days to look back.
+            limit: Maximum number of records to return.
+            workspace_id: Workspace UUID string, or None for global events.
 
-            # Return limited results
-            return activity_records[:limit]
+        Returns:
+            List of webhook activity records, most recent first.
+        """
+        try:
+            since = (timezone.now() - timedelta(days=days)).timestamp()
+            webhook_keys = self._get_indexed_keys(workspace_id, since, limit)
+            if not webhook_keys:
+                return []
+
+            records_by_key = cache.get_many(webhook_keys)
+
+            activity_records: list[dict[str, Any]] = []
+            for webhook_key in webhook_keys:
+                webhook_data = records_by_key.get(webhook_key)
+                if webhook_data:
+                    if isinstance(webhook_data, str):
+                        webhook_data = json.loads(webhook_data)
+                    activity_records.append(webhook_data)
+            return activity_records
 
         except Exception as e:
             logger.error(
@@ -542,43 +893,117 @@ class DatabaseLookupService:
             )
             return []
 
-    def lookup_chargify_payment_for_shopify_order(self, order_ref: str) -> str | None:
+    def lookup_records(
+        self,
+        workspace_id: str | None,
+        field: str,
+        value: str,
+        limit: int = 20,
+        before: str | None = None,
+    ) -> dict[str, Any]:
+        """Page through a workspace's records by customer, external ID or email.
+
+        Reads one page of the secondary index and fetches the records with a
+        single MGET, without scanning other records.
+
+        Args:
+            workspace_id: Workspace UUID string, or None for global events.
+            field: Lookup field name (see LOOKUP_FIELDS).
+            value: Value to look up.
+            limit: Maximum number of records per page.
+            before: Cursor from the previous page's next_before.
+
+        Returns:
+            Dictionary with records (most recent first) and next_before
+            (None on the last page).
+
+        Raises:
+            ValueError: If field is not a lookup field.
+        """
+        if field not in LOOKUP_FIELDS:
+            raise ValueError(f"Unknown lookup field: {field}")
+
+        value = normalize_lookup_value(field, value)
+        if not value:
+            return {"records": [], "next_before": None}
+
+        try:
+            webhook_keys, next_before = read_index_page(
+                self._get_lookup_index_key(workspace_id, field, value),
+                max(1, limit),
+                before,
+            )
+            records_by_key = cache.get_many(webhook_keys) if webhook_keys else {}
+
+            records: list[dict[str, Any]] = []
+            for webhook_key in webhook_keys:
+                webhook_data = records_by_key.get(webhook_key)
+                if webhook_data:
+                    if isinstance(webhook_data, str):
+                        webhook_data = json.loads(webhook_data)
+                    records.append(webhook_data)
+            return {"records": records, "next_before": next_before}
+
+        except Exception as e:
+            logger.error(f"Error looking up records in Redis: {e!s}", exc_info=True)
+            return {"records": [], "next_before": None}
+
+    def _get_order_xref(
+        self, workspace_id: str | None, provider: str, order_ref: str
+    ) -> str | None:
+        """Read one order cross-reference entry.
+
+        Args:
+            workspace_id: Workspace UUID string, or None for global events.
+            provider: Provider whose reference to read.
+            order_ref: Shopify order number.
+
+        Returns:
+            The provider's reference for the order, or None if not indexed.
+        """
+        key = self._get_order_xref_key(workspace_id, provider, str(order_ref).strip())
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return cache.get(key)
+
+        reference = redis_client.get(redis_key(key))
+        if isinstance(reference, bytes):
+            return reference.decode("utf-8")
+        return reference
+
+    def lookup_chargify_payment_for_shopify_order(
+        self, order_ref: str, workspace_id: str | None = None
+    ) -> str | None:
         """Look up Chargify payment for Shopify order.
 
         Args:
             order_ref: Shopify order reference.
+            workspace_id: Workspace UUID string the order belongs to.
 
         Returns:
             Related Chargify payment reference, or None if not found.
         """
         try:
-            # For now, just log the lookup attempt
-            # In a full implementation, this would search through recent webhook records
-            logger.info(f"Looking up Chargify payment for Shopify order: {order_ref}")
-            return None
+            return self._get_order_xref(workspace_id, "chargify", order_ref)
 
         except Exception as e:
             logger.error(f"Error looking up payment reference: {e!s}", exc_info=True)
             return None
 
-    def lookup_shopify_order_for_chargify_payment(self, order_ref: str) -> str | None:
+    def lookup_shopify_order_for_chargify_payment(
+        self, order_ref: str, workspace_id: str | None = None
+    ) -> str | None:
         """Look up Shopify order for Chargify payment.
 
         Args:
-            order_ref: Chargify order reference.
+            order_ref: Shopify order reference from the Chargify memo.
+            workspace_id: Workspace UUID string the payment belongs to.
 
         Returns:
             Related Shopify order reference, or None if not found.
         """
         try:
-            # For now, just log the lookup attempt
-            # In a full implementation, this would search through recent webhook records
-            # for matching Shopify orders based on the order reference
-            logger.info(
-                f"Looking up Shopify order for Chargify payment "
-                f"with order ref: {order_ref}"
-            )
-            return None
+            return self._get_order_xref(workspace_id, "shopify", order_ref)
 
         except Exception as e:
             logger.error(f"Error looking up order reference: {e!s}", exc_info=True)
@@ -0,0 +1,551 @@
+"""Write-behind batcher and partition management for the event ledger.
+
+Enriched activity records are appended to core.EventLedgerEntry, the
+durable history behind the 7-day Redis data. Writing a row per event
+would put a database round trip on the notification path, so records are
+buffered in memory and flushed by a background thread every
+EVENT_LEDGER_BATCH_SIZE records or EVENT_LEDGER_FLUSH_MS milliseconds,
+whichever comes first. PostgreSQL flushes use COPY; other databases use a
+multi-row INSERT.
+
+A failed batch stays buffered and is retried with exponential backoff (up
+to MAX_RETRY_SECONDS), so a database outage delays history rather than
+losing it; only when MAX_PENDING_BATCHES batches are waiting are the oldest
+rows dropped. If a batch fails while the database is reachable, its rows
+are written one by one and only the rows that still fail are dropped.
+
+On PostgreSQL the ledger is partitioned by month. Partitions are created
+on demand before a flush and dropped once they fall out of retention;
+expired rows that landed in the DEFAULT partition are deleted (see the
+maintain_event_ledger command).
+
+Usage:
+    from webhooks.services.event_ledger import event_ledger
+
+    event_ledger.record(workspace_id, webhook_record)
+"""
+
+import atexit
+import csv
+import io
+import json
+import logging
+import threading
+import time
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from typing import Any
+
+from core.models import EventLedgerEntry
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+LEDGER_TABLE = EventLedgerEntry._meta.db_table
+DEFAULT_PARTITION = f"{LEDGER_TABLE}_default"
+
+# Batches of rows that may wait for the database before the oldest are dropped
+MAX_PENDING_BATCHES = 20
+
+# Longest wait between retries of a failed batch (seconds)
+MAX_RETRY_SECONDS = 60
+
+# Columns written by COPY, in order
+COPY_COLUMNS: tuple[str, ...] = (
+    "workspace_uuid",
+    "occurred_at",
+    "provider",
+    "event_type",
+    "external_id",
+    "customer_id",
+    "customer_email",
+    "amount",
+    "currency",
+    "status",
+    "record",
+)
+
+# Text columns that are never NULL
+TEXT_COLUMNS: tuple[str, ...] = (
+    "provider",
+    "event_type",
+    "external_id",
+    "customer_id",
+    "customer_email",
+    "currency",
+    "status",
+)
+
+
+def _month_start(value: date) -> date:
+    """Get the first day of a date's month.
+
+    Args:
+        value: Any date or datetime.
+
+    Returns:
+        First day of the month.
+    """
+    return date(value.year, value.month, 1)
+
+
+def _next_month(month: date) -> date:
+    """Get the first day of the following month.
+
+    Args:
+        month: First day of a month.
+
+    Returns:
+        First day of the next month.
+    """
+    if month.month == 12:
+        return date(month.year + 1, 1, 1)
+    return date(month.year, month.month + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Get the table name of a month's ledger partition.
+
+    Args:
+        month: Any date in the month.
+
+    Returns:
+        Partition table name, e.g. core_eventledgerentry_p2026_10.
+    """
+    return f"{LEDGER_TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+def is_partitioned() -> bool:
+    """Check whether the ledger table is partitioned (PostgreSQL only).
+
+    Returns:
+        True on PostgreSQL, where migration 0020 partitions the table.
+    """
+    return connection.vendor == "postgresql"
+
+
+def ensure_partition(month: date) -> None:
+    """Create a month's ledger partition if it doesn't exist.
+
+    Args:
+        month: Any date in the month.
+    """
+    if not is_partitioned():
+        return
+    start = _month_start(month)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(start)} "
+            f"PARTITION OF {LEDGER_TABLE} "
+            f"FOR VALUES FROM (%s) TO (%s)",
+            [start.isoformat(), _next_month(start).isoformat()],
+        )
+
+
+def list_partitions() -> list[date]:
+    """List the months that have a ledger partition.
+
+    Returns:
+        First day of each partitioned month, oldest first.
+    """
+    if not is_partitioned():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = %s",
+            [LEDGER_TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    prefix = f"{LEDGER_TABLE}_p"
+    months: list[date] = []
+    for name in names:
+        if not name.startswith(prefix):
+            continue  # the DEFAULT partition
+        try:
+            year, month = name[len(prefix) :].split("_")
+            months.append(date(int(year), int(month), 1))
+        except ValueError:
+            logger.warning(f"Unexpected event ledger partition name: {name}")
+    return sorted(months)
+
+
+def _prune_default_partition(cutoff_at: datetime, dry_run: bool) -> int:
+    """Delete expired rows from the DEFAULT partition.
+
+    Rows for months without their own partition land in the DEFAULT
+    partition, which is never dropped, so they are deleted row by row.
+
+    Args:
+        cutoff_at: Rows older than this are expired.
+        dry_run: Count the rows without deleting them.
+
+    Returns:
+        Number of rows deleted (or that would be).
+    """
+    with connection.cursor() as cursor:
+        if dry_run:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {DEFAULT_PARTITION} WHERE occurred_at < %s",
+                [cutoff_at],
+            )
+            return cursor.fetchone()[0]
+        cursor.execute(
+            f"DELETE FROM {DEFAULT_PARTITION} WHERE occurred_at < %s", [cutoff_at]
+        )
+        return cursor.rowcount
+
+
+def drop_partitions_before(cutoff: date, dry_run: bool = False) -> list[str]:
+    """Drop ledger partitions for months before the cutoff month.
+
+    On databases without partitioning, deletes the rows instead. On
+    PostgreSQL, expired rows in the DEFAULT partition are deleted too.
+
+    Args:
+        cutoff: Oldest month to keep (any date in it).
+        dry_run: Report what would be dropped without dropping it.
+
+    Returns:
+        Names of the partitions (or a description of rows) removed.
+    """
+    cutoff_month = _month_start(cutoff)
+    cutoff_at = datetime(
+        cutoff_month.year, cutoff_month.month, 1, tzinfo=dt_timezone.utc
+    )
+
+    if not is_partitioned():
+        expired = EventLedgerEntry.objects.filter(occurred_at__lt=cutoff_at)
+        count = expired.count()
+        if count and not dry_run:
+            expired.delete()
+        return [f"{count} rows before {cutoff_month.isoformat()}"] if count else []
+
+    dropped: list[str] = []
+    for month in list_partitions():
+        if month >= cutoff_month:
+            continue
+        name = partition_name(month)
+        if not dry_run:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {name}")
+            logger.info(f"Dropped event ledger partition {name}")
+        dropped.append(name)
+
+    count = _prune_default_partition(cutoff_at, dry_run)
+    if count:
+        if not dry_run:
+            logger.info(f"Deleted {count} expired rows from {DEFAULT_PARTITION}")
+        dropped.append(
+            f"{count} rows before {cutoff_month.isoformat()} from {DEFAULT_PARTITION}"
+        )
+    return dropped
+
+
+class EventLedgerWriter:
+    """Buffers ledger records and writes them in batches.
+
+    Attributes:
+        batch_size: Records that trigger an immediate flush.
+        flush_interval: Seconds between timed flushes.
+        max_pending: Records kept while writes fail; older ones are dropped.
+    """
+
+    def __init__(
+        self, batch_size: int | None = None, flush_interval_ms: int | None = None
+    ) -> None:
+        """Initialize the writer; the flush thread starts on first record.
+
+        Args:
+            batch_size: Defaults to settings.EVENT_LEDGER_BATCH_SIZE.
+            flush_interval_ms: Defaults to settings.EVENT_LEDGER_FLUSH_MS.
+        """
+        self.batch_size = batch_size or getattr(
+            settings, "EVENT_LEDGER_BATCH_SIZE", 500
+        )
+        self.flush_interval = (
+            flush_interval_ms or getattr(settings, "EVENT_LEDGER_FLUSH_MS", 1000)
+        ) / 1000
+        self.max_pending = self.batch_size * MAX_PENDING_BATCHES
+        self._buffer: list[EventLedgerEntry] = []
+        # Consecutive failed flushes, and when the next attempt may run
+        self._failures = 0
+        self._retry_at = 0.0
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._known_partitions: set[date] = set()
+
+    def record(self, workspace_id: str | None, record: dict[str, Any]) -> None:
+        """Queue an enriched activity record for the ledger.
+
+        Never raises; ledger problems must not affect webhook processing.
+
+        Args:
+            workspace_id: Workspace UUID string (events without one are skipped).
+            record: Activity record as built by DatabaseLookupService.
+        """
+        if not workspace_id or not getattr(settings, "EVENT_LEDGER_ENABLED", True):
+            return
+        try:
+            entry = self._build_entry(workspace_id, record)
+        except Exception as e:
+            logger.warning(f"Skipping malformed event ledger record: {e}")
+            return
+
+        with self._condition:
+            self._buffer.append(entry)
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+        self._ensure_flusher()
+
+    def flush(self, force: bool = False) -> int:
+        """Write all buffered records now.
+
+        Args:
+            force: Write even while backing off after a failure.
+
+        Returns:
+            Number of records written.
+        """
+        with self._condition:
+            if not force and time.monotonic() < self._retry_at:
+                return 0
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+
+        started = time.monotonic()
+        with self._flush_lock:
+            written, unwritten = self._write(batch)
+
+        if unwritten:
+            self._retry_later(unwritten)
+            return written
+
+        with self._condition:
+            self._failures = 0
+            self._retry_at = 0.0
+        metrics.increment("event_ledger_written_total", value=written)
+        metrics.observe("event_ledger_flush_seconds", time.monotonic() - started)
+        return written
+
+    def _write(
+        self, batch: list[EventLedgerEntry]
+    ) -> tuple[int, list[EventLedgerEntry]]:
+        """Write a batch, falling back to one row at a time if it fails.
+
+        Args:
+            batch: Rows to write.
+
+        Returns:
+            Tuple of (rows written, rows to retry later). Rows that fail on
+            their own while others succeed are dropped, not retried.
+        """
+        try:
+            self._ensure_partitions(batch)
+            self._insert(batch)
+            return len(batch), []
+        except Exception as e:
+            logger.warning(
+                f"Failed to write {len(batch)} event ledger records, "
+                f"retrying one by one: {e}"
+            )
+
+        try:
+            connection.close_if_unusable_or_obsolete()
+            connection.ensure_connection()
+        except Exception as e:
+            logger.error(f"Event ledger database unavailable: {e}")
+            return 0, batch
+
+        written = 0
+        failed: list[tuple[EventLedgerEntry, Exception]] = []
+        for entry in batch:
+            try:
+                self._insert([entry])
+                written += 1
+            except Exception as e:
+                failed.append((entry, e))
+
+        if not written:
+            # Nothing got through, so the problem isn't the rows
+            return 0, batch
+        for entry, error in failed:
+            logger.error(
+                f"Dropping event ledger record {entry.provider} "
+                f"{entry.external_id}: {error}"
+            )
+        if failed:
+            metrics.increment("event_ledger_dropped_total", value=len(failed))
+        return written, []
+
+    def _insert(self, batch: list[EventLedgerEntry]) -> None:
+        """Insert rows with COPY on PostgreSQL, else a multi-row INSERT.
+
+        Args:
+            batch: Rows to write.
+        """
+        if is_partitioned():
+            self._copy(batch)
+        else:
+            EventLedgerEntry.objects.bulk_create(batch, batch_size=self.batch_size)
+
+    def _retry_later(self, batch: list[EventLedgerEntry]) -> None:
+        """Put unwritten rows back in the buffer and back off.
+
+        Args:
+            batch: Rows to retry, oldest first.
+        """
+        with self._condition:
+            self._buffer = batch + self._buffer
+            overflow = len(self._buffer) - self.max_pending
+            if overflow > 0:
+                del self._buffer[:overflow]
+            self._failures += 1
+            backoff = min(self.flush_interval * 2**self._failures, MAX_RETRY_SECONDS)
+            self._retry_at = time.monotonic() + backoff
+
+        logger.error(
+            f"Failed to write {len(batch)} event ledger records, "
+            f"retrying in {backoff:g}s"
+        )
+        if overflow > 0:
+            metrics.increment("event_ledger_dropped_total", value=overflow)
+            logger.error(f"Dropped {overflow} event ledger records (buffer full)")
+
+    def close(self) -> None:
+        """Stop the flush thread and write anything still buffered."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush(force=True)
+
+    def pending(self) -> int:
+        """Get the number of buffered records.
+
+        Returns:
+            Records waiting to be flushed.
+        """
+        with self._condition:
+            return len(self._buffer)
+
+    def _build_entry(
+        self, workspace_id: str, record: dict[str, Any]
+    ) -> EventLedgerEntry:
+        """Build an unsaved ledger row from an activity record.
+
+        Args:
+            workspace_id: Workspace UUID string.
+            record: Activity record.
+
+        Returns:
+            Unsaved EventLedgerEntry.
+        """
+        amount = record.get("amount")
+        return EventLedgerEntry(
+            workspace_uuid=workspace_id,
+            occurred_at=datetime.fromtimestamp(record["timestamp"], tz=dt_timezone.utc),
+            provider=record.get("provider", ""),
+            event_type=record.get("event_type") or record.get("type", ""),
+            external_id=record.get("external_id", ""),
+            customer_id=record.get("customer_id") or "",
+            customer_email=record.get("customer_email") or "",
+            amount=Decimal(str(amount)) if amount is not None else None,
+            currency=record.get("currency") or "USD",
+            status=record.get("status") or "",
+            record=record,
+        )
+
+    def _ensure_partitions(self, batch: list[EventLedgerEntry]) -> None:
+        """Create partitions for every month in a batch (once per process).
+
+        Args:
+            batch: Rows about to be written.
+        """
+        if not is_partitioned():
+            return
+        for month in {_month_start(entry.occurred_at) for entry in batch}:
+            if month not in self._known_partitions:
+                ensure_partition(month)
+                self._known_partitions.add(month)
+
+    def _copy(self, batch: list[EventLedgerEntry]) -> None:
+        """Write a batch with PostgreSQL COPY.
+
+        Args:
+            batch: Rows to write.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for entry in batch:
+            writer.writerow(
+                [
+                    entry.workspace_uuid,
+                    entry.occurred_at.isoformat(),
+                    entry.provider,
+                    entry.event_type,
+                    entry.external_id,
+                    entry.customer_id,
+                    entry.customer_email,
+                    "" if entry.amount is None else entry.amount,
+                    entry.currency,
+                    entry.status,
+                    json.dumps(entry.record),
+                ]
+            )
+        buffer.seek(0)
+
+        # In CSV format unquoted empty fields are NULL; only amount may be
+        # NULL, so empty text columns are forced to ''
+        columns = ", ".join(COPY_COLUMNS)
+        not_null = ", ".join(TEXT_COLUMNS)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {LEDGER_TABLE} ({columns}) FROM STDIN "
+                f"WITH (FORMAT csv, FORCE_NOT_NULL ({not_null}))",
+                buffer,
+            )
+
+    def _ensure_flusher(self) -> None:
+        """Start the background flush thread if it isn't running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._condition:
+            if self._stopping or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="event-ledger-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Flush loop: wait for a full batch or the flush interval."""
+        while not self._stopping:
+            with self._condition:
+                backoff = self._retry_at - time.monotonic()
+                if not self._stopping and (
+                    len(self._buffer) < self.batch_size or backoff > 0
+                ):
+                    self._condition.wait(max(backoff, self.flush_interval))
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+# Module-level singleton instance
+event_ledger = EventLedgerWriter()
+
+# Don't lose the last partial batch on clean shutdown
+atexit.register(event_ledger.close)
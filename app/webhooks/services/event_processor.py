@@ -2,21 +2,32 @@
 
 This module handles processing events from various providers and
 formatting them into RichNotification objects with company and person enrichment.
+
+Company and person enrichment run concurrently on a shared worker pool under
+a per-event latency budget (see ENRICHMENT_BUDGET_MS). Enrichment that misses
+the budget is left out of the current notification but keeps running in the
+background, so the Company/Person cache is warm for the next event.
 """
 
+import contextvars
 import logging
-from typing import TYPE_CHECKING, Any, ClassVar
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Callable, ClassVar
 
 from core.models import Company, Person
 from core.services.email_enrichment import get_email_enrichment_service
 from core.services.enrichment import DomainEnrichmentService
 from core.utils.email_domain import extract_domain, is_enrichable_domain
+from django.conf import settings
+from django.db import close_old_connections
 from plugins import PluginRegistry, PluginType
 from plugins.destinations.base import BaseDestinationPlugin
 
-from ..models.rich_notification import RichNotification
+from ..models.rich_notification import NotificationSeverity, RichNotification
 from .database_lookup import DatabaseLookupService
-from .notification_builder import NotificationBuilder
+from .metrics import metrics
+from .notification_builder import EVENT_SEVERITY_MAP, NotificationBuilder
 
 if TYPE_CHECKING:
     from core.models import Workspace
@@ -32,8 +43,17 @@ class EventProcessor:
 
     Attributes:
         VALID_EVENT_TYPES: Set of recognized event type strings.
+        ENRICHMENT_WORKERS: Size of the shared enrichment worker pool.
     """
 
+    ENRICHMENT_WORKERS = 8
+
+    # Shared enrichment pool and in-flight lookups, keyed by
+    # "company:{domain}" or "person:{workspace_id}:{email}"
+    _executor: ClassVar[ThreadPoolExecutor | None] = None
+    _in_flight: ClassVar[dict[str, Future]] = {}
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
     VALID_EVENT_TYPES: ClassVar[set[str]] = {
         # Payment events
         "payment_success",
@@ -119,29 +139,15 @@ class EventProcessor:
         if event_type not in self.VALID_EVENT_TYPES:
             raise ValueError(f"Invalid event type: {event_type}")
 
-        # Enrich with cross-references
-        enriched_event_data = self._enrich_with_cross_references(event_data)
-
-        # Enrich company data (domain-based)
-        company = self._enrich_company(customer_data)
-
-        # Enrich person data (email-based, requires workspace with Hunter.io)
-        person = self._enrich_person(customer_data, workspace)
-
-        # Build target-agnostic notification
-        notification = self.notification_builder.build(
-            enriched_event_data, customer_data, company, person
-        )
-
-        # Store enriched record for dashboard display
-        self._store_enriched_record(enriched_event_data, notification)
+        notification = self._build(event_data, customer_data, workspace)
 
         # Format for target platform using destination plugin
         registry = PluginRegistry.instance()
         plugin = registry.get(PluginType.DESTINATION, target)
         if plugin is None or not isinstance(plugin, BaseDestinationPlugin):
             raise ValueError(f"No destination plugin found for target: {target}")
-        return plugin.format(notification)
+        with metrics.time_stage("format", event_data.get("provider"), event_type):
+            return plugin.format(notification)
 
     def build_rich_notification(
         self,
@@ -176,21 +182,47 @@ class EventProcessor:
         if event_type not in self.VALID_EVENT_TYPES:
             raise ValueError(f"Invalid event type: {event_type}")
 
-        # Enrich with cross-references
-        enriched_event_data = self._enrich_with_cross_references(event_data)
+        return self._build(event_data, customer_data, workspace)
 
-        # Enrich company data (domain-based)
-        company = self._enrich_company(customer_data)
+    def _build(
+        self,
+        event_data: dict[str, Any],
+        customer_data: dict[str, Any],
+        workspace: "Workspace | None",
+    ) -> RichNotification:
+        """Enrich and build a notification, timing each pipeline stage.
+
+        Args:
+            event_data: Validated event data.
+            customer_data: Dictionary containing customer information.
+            workspace: Optional workspace for email enrichment.
+
+        Returns:
+            RichNotification object, also stored for dashboard display.
+        """
+        provider = event_data.get("provider")
+        event_type = event_data["type"]
 
-        # Enrich person data (email-based, requires workspace with Hunter.io)
-        person = self._enrich_person(customer_data, workspace)
+        # Enrich with cross-references
+        with metrics.time_stage("cross_reference", provider, event_type):
+            enriched_event_data = self._enrich_with_cross_references(
+                event_data, workspace
+            )
 
-        notification = self.notification_builder.build(
-            enriched_event_data, customer_data, company, person
+        # Enrich company (domain-based) and person (email-based, requires
+        # workspace with Hunter.io) data within the event's latency budget
+        company, person = self._enrich_within_budget(
+            event_type, customer_data, workspace, provider=provider
         )
 
+        # Build target-agnostic notification
+        with metrics.time_stage("build", provider, event_type):
+            notification = self.notification_builder.build(
+                enriched_event_data, customer_data, company, person
+            )
+
         # Store enriched record for dashboard display
-        self._store_enriched_record(enriched_event_data, notification)
+        self._store_enriched_record(enriched_event_data, notification, workspace)
 
         return notification
 
@@ -198,12 +230,14 @@ class EventProcessor:
         self,
         event_data: dict[str, Any],
         notification: RichNotification,
+        workspace: "Workspace | None" = None,
     ) -> None:
         """Store enriched event record for dashboard display.
 
         Args:
             event_data: The event data dictionary.
             notification: The built RichNotification.
+            workspace: Workspace whose activity feed the record belongs to.
         """
         # Determine which events should be stored for activity tracking
         storable_event_types = {
@@ -227,22 +261,29 @@ class EventProcessor:
 
         if event_type in storable_event_types:
             try:
-                self.db_lookup.store_enriched_record(event_data, notification)
+                self.db_lookup.store_enriched_record(
+                    event_data,
+                    notification,
+                    workspace_id=str(workspace.uuid) if workspace else None,
+                )
             except Exception as e:
                 # Don't fail event processing if storage fails
                 logger.warning(f"Failed to store enriched record: {e}")
 
     def _enrich_with_cross_references(
-        self, event_data: dict[str, Any]
+        self, event_data: dict[str, Any], workspace: "Workspace | None" = None
     ) -> dict[str, Any]:
         """Enrich event data with cross-references.
 
         Args:
             event_data: Original event data dictionary.
+            workspace: Workspace whose stored events are searched.
 
         Returns:
             Enriched copy of event data with cross-reference information.
         """
+        workspace_id = str(workspace.uuid) if workspace else None
+
         # Make a copy to avoid modifying the original
         enriched_data = event_data.copy()
 
@@ -257,7 +298,9 @@ class EventProcessor:
         if provider == "shopify" and metadata.get("order_ref"):
             order_ref = metadata["order_ref"]
             related_payment_ref = (
-                self.db_lookup.lookup_chargify_payment_for_shopify_order(order_ref)
+                self.db_lookup.lookup_chargify_payment_for_shopify_order(
+                    order_ref, workspace_id
+                )
             )
             metadata["related_payment_ref"] = related_payment_ref
 
@@ -275,7 +318,9 @@ class EventProcessor:
         elif provider == "chargify" and metadata.get("shopify_order_ref"):
             order_ref = metadata["shopify_order_ref"]
             related_order_ref = (
-                self.db_lookup.lookup_shopify_order_for_chargify_payment(order_ref)
+                self.db_lookup.lookup_shopify_order_for_chargify_payment(
+                    order_ref, workspace_id
+                )
             )
             metadata["related_order_ref"] = related_order_ref
 
@@ -292,6 +337,155 @@ class EventProcessor:
 
         return enriched_data
 
+    def get_enrichment_budget(
+        self, event_type: str, workspace: "Workspace | None"
+    ) -> float | None:
+        """Get the enrichment latency budget for an event.
+
+        Budgets are configured per notification severity in
+        settings.ENRICHMENT_BUDGET_MS and can be overridden per workspace via
+        NotificationSettings.enrichment_budget_ms.
+
+        Args:
+            event_type: The event type being processed.
+            workspace: The workspace the event belongs to, if any.
+
+        Returns:
+            Budget in seconds, or None to wait for enrichment without a limit.
+        """
+        severity = EVENT_SEVERITY_MAP.get(event_type, NotificationSeverity.INFO).value
+        budgets = dict(getattr(settings, "ENRICHMENT_BUDGET_MS", {}))
+
+        if workspace is not None:
+            try:
+                overrides = workspace.notification_settings.enrichment_budget_ms
+                if isinstance(overrides, dict):
+                    budgets.update(_valid_budget_overrides(overrides))
+            except Exception as e:
+                # No NotificationSettings row (or unavailable) - use defaults
+                logger.debug(f"Using default enrichment budget: {e}")
+
+        budget_ms = budgets.get(severity)
+        if budget_ms is None:
+            return None
+        return max(float(budget_ms), 0.0) / 1000
+
+    def _enrich_within_budget(
+        self,
+        event_type: str,
+        customer_data: dict[str, Any],
+        workspace: "Workspace | None",
+        provider: str | None = None,
+    ) -> tuple[Company | None, Person | None]:
+        """Run company and person enrichment concurrently within the budget.
+
+        Lookups that don't finish in time are skipped for this notification,
+        counted in the enrichment_skipped_budget_total metric, and left
+        running in the background to warm the cache for the next event.
+        Each lookup is timed as the company_enrichment or person_enrichment
+        stage for as long as it actually runs; a lookup shared with another
+        event is timed once.
+
+        Args:
+            event_type: The event type being processed.
+            customer_data: Customer data dictionary with email.
+            workspace: The workspace requesting enrichment.
+            provider: The event's provider, for stage metrics.
+
+        Returns:
+            Tuple of (company, person), either of which may be None.
+        """
+
+        def enrich_company() -> Company | None:
+            with metrics.time_stage("company_enrichment", provider, event_type) as t:
+                company = self._enrich_company(customer_data)
+                t.outcome = "ok" if company else "empty"
+            return company
+
+        def enrich_person() -> Person | None:
+            with metrics.time_stage("person_enrichment", provider, event_type) as t:
+                person = self._enrich_person(customer_data, workspace)
+                t.outcome = "ok" if person else "empty"
+            return person
+
+        budget = self.get_enrichment_budget(event_type, workspace)
+        if budget is None:
+            return enrich_company(), enrich_person()
+
+        futures: dict[str, Future] = {}
+        customer_email = customer_data.get("email")
+        if customer_email and is_enrichable_domain(customer_email):
+            domain = extract_domain(customer_email)
+            if domain:
+                futures["company"] = self._submit_enrichment(
+                    f"company:{domain}", enrich_company
+                )
+        if customer_email and workspace:
+            futures["person"] = self._submit_enrichment(
+                f"person:{workspace.pk}:{customer_email.lower().strip()}",
+                enrich_person,
+            )
+
+        if futures:
+            wait(futures.values(), timeout=budget)
+
+        results: dict[str, Any] = {"company": None, "person": None}
+        severity = EVENT_SEVERITY_MAP.get(event_type, NotificationSeverity.INFO).value
+        for name, future in futures.items():
+            if future.done():
+                results[name] = future.result()
+                continue
+            metrics.increment(
+                "enrichment_skipped_budget_total",
+                {"enrichment": name, "severity": severity},
+            )
+            logger.info(
+                f"Skipped {name} enrichment for {event_type}: exceeded "
+                f"{budget * 1000:.0f}ms budget, continuing in background"
+            )
+
+        return results["company"], results["person"]
+
+    def _submit_enrichment(self, key: str, fn: Callable[[], Any]) -> Future:
+        """Submit an enrichment lookup, reusing an in-flight one for the same key.
+
+        Args:
+            key: Identifies the lookup (enrichment kind plus domain/email).
+            fn: Callable performing the lookup.
+
+        Returns:
+            Future for the lookup result.
+        """
+        with self._lock:
+            future = EventProcessor._in_flight.get(key)
+            if future is not None:
+                return future
+
+            if EventProcessor._executor is None:
+                EventProcessor._executor = ThreadPoolExecutor(
+                    max_workers=getattr(
+                        settings, "ENRICHMENT_WORKERS", self.ENRICHMENT_WORKERS
+                    ),
+                    thread_name_prefix="enrichment",
+                )
+            # Run in the caller's context so round trips count towards its event
+            future = EventProcessor._executor.submit(
+                contextvars.copy_context().run, _run_enrichment, fn
+            )
+            EventProcessor._in_flight[key] = future
+
+        future.add_done_callback(lambda _: self._finish_enrichment(key))
+        return future
+
+    def _finish_enrichment(self, key: str) -> None:
+        """Forget a completed in-flight lookup.
+
+        Args:
+            key: The lookup key passed to _submit_enrichment.
+        """
+        with self._lock:
+            EventProcessor._in_flight.pop(key, None)
+
     def _enrich_company(self, customer_data: dict[str, Any]) -> Company | None:
         """Enrich customer data with company branding information.
 
@@ -361,3 +555,46 @@ class EventProcessor:
             # Don't fail webhook processing if enrichment fails
             logger.warning(f"Failed to enrich person for {customer_email}: {e}")
             return None
+
+
+def _valid_budget_overrides(overrides: dict[str, Any]) -> dict[str, Any]:
+    """Keep the workspace budget overrides that are usable.
+
+    Overrides are workspace-supplied JSON; anything other than a number of
+    milliseconds or null (no limit) is ignored so the default applies.
+
+    Args:
+        overrides: Budget in milliseconds by severity.
+
+    Returns:
+        The valid overrides.
+    """
+    valid = {}
+    for severity, budget_ms in overrides.items():
+        if budget_ms is None or (
+            isinstance(budget_ms, (int, float)) and not isinstance(budget_ms, bool)
+        ):
+            valid[severity] = budget_ms
+        else:
+            logger.warning(
+                f"Ignoring invalid enrichment budget for {severity}: {budget_ms!r}"
+            )
+    return valid
+
+
+def _run_enrichment(fn: Callable[[], Any]) -> Any:
+    """Run an enrichment lookup on a pool thread.
+
+    Closes the thread's database connection afterwards so long-lived pool
+    threads don't hold stale connections.
+
+    Args:
+        fn: Callable performing the lookup.
+
+    Returns:
+        The lookup result.
+    """
+    try:
+        return fn()
+    finally:
+        close_old_connections()
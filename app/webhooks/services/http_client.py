@@ -0,0 +1,241 @@
+"""Shared HTTP client for outbound integration calls.
+
+Enrichment plugins, the Slack destination, logo downloads and the Slack
+and Shopify OAuth views all call third-party APIs. They share one
+requests.Session so connections (and TLS sessions) are kept alive and
+reused instead of being opened per call:
+
+    HTTP_CLIENT_POOL_SIZE        keep-alive connections kept per host
+    HTTP_CLIENT_POOL_HOSTS       hosts whose pools are kept at once
+    HTTP_CLIENT_MAX_PER_HOST     requests in flight per host; more wait
+    HTTP_CLIENT_CONNECT_TIMEOUT  connect timeout (seconds)
+    HTTP_CLIENT_READ_TIMEOUT     read timeout unless the caller passes one
+    HTTP_CLIENT_RETRIES          retries of failed connections, and of 502,
+                                 503 and 504 responses to idempotent methods
+    HTTP_CLIENT_BACKOFF          exponential backoff factor between retries
+
+Responses are returned as-is (no raise_for_status), and errors are the
+usual requests exceptions, so callers keep their status and exception
+handling. Cookies are never stored: the session is shared across
+workspaces. A streamed body (stream=True) is read after the request has
+given back its host slot.
+
+Each request is recorded in the metrics registry, labelled by the
+caller's ``service`` name (hosts like shops or logo servers are unbounded):
+
+    http_client_request_seconds      latency histogram by service, outcome
+    http_client_requests_total       count by service, outcome (2xx..5xx, error)
+    http_client_errors_total         exceptions by service and type
+    http_client_saturated_total      requests that waited for a host slot
+    http_client_slot_wait_seconds    how long they waited
+
+Usage:
+    from webhooks.services.http_client import http_client
+
+    response = http_client.get(url, service="hunter", params={...})
+"""
+
+import http.cookiejar
+import logging
+import threading
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Defaults for settings that aren't configured
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_HOSTS = 50
+DEFAULT_MAX_PER_HOST = 10
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+
+# Responses worth retrying for idempotent requests
+RETRY_STATUSES = (502, 503, 504)
+
+
+class HostBusyError(requests.exceptions.ConnectionError):
+    """No request slot for a host became free within the timeout."""
+
+
+class HttpClient:
+    """Pooled, instrumented HTTP client shared by outbound integrations."""
+
+    def __init__(self) -> None:
+        """Initialize without a session; it's created on first use."""
+        self._session: requests.Session | None = None
+        self._lock = threading.Lock()
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+
+    def _get_setting(self, name: str, default: Any) -> Any:
+        """Read an HTTP_CLIENT_* setting.
+
+        Args:
+            name: Setting name without the HTTP_CLIENT_ prefix.
+            default: Value used when the setting isn't defined.
+
+        Returns:
+            The configured value or the default.
+        """
+        return getattr(settings, f"HTTP_CLIENT_{name}", default)
+
+    def _get_session(self) -> requests.Session:
+        """Get the shared session, creating it from settings if needed.
+
+        Returns:
+            The shared requests.Session.
+        """
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> requests.Session:
+        """Create a session with sized pools, retries and no cookie storage."""
+        retry = Retry(
+            total=self._get_setting("RETRIES", DEFAULT_RETRIES),
+            backoff_factor=self._get_setting("BACKOFF", DEFAULT_BACKOFF),
+            status_forcelist=RETRY_STATUSES,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self._get_setting("POOL_HOSTS", DEFAULT_POOL_HOSTS),
+            pool_maxsize=self._get_setting("POOL_SIZE", DEFAULT_POOL_SIZE),
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.cookies.set_policy(
+            http.cookiejar.DefaultCookiePolicy(allowed_domains=[])
+        )
+        return session
+
+    def _get_slot(self, host: str) -> threading.BoundedSemaphore:
+        """Get the semaphore limiting concurrent requests to a host.
+
+        Args:
+            host: Host name (with port, if any).
+
+        Returns:
+            The host's semaphore.
+        """
+        slot = self._slots.get(host)
+        if slot is None:
+            with self._lock:
+                slot = self._slots.get(host)
+                if slot is None:
+                    limit = self._get_setting("MAX_PER_HOST", DEFAULT_MAX_PER_HOST)
+                    slot = self._slots[host] = threading.BoundedSemaphore(limit)
+        return slot
+
+    def _get_timeout(self, timeout: Any) -> tuple[float, float]:
+        """Combine the configured connect timeout with a read timeout.
+
+        Args:
+            timeout: Caller's timeout: None, a read timeout in seconds, or
+                a (connect, read) tuple.
+
+        Returns:
+            (connect, read) timeout tuple.
+        """
+        if isinstance(timeout, tuple):
+            return timeout
+        connect = self._get_setting("CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)
+        if timeout is None:
+            timeout = self._get_setting("READ_TIMEOUT", DEFAULT_READ_TIMEOUT)
+        return min(connect, timeout), timeout
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        service: str = "other",
+        timeout: Any = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Send a request on the shared session.
+
+        Args:
+            method: HTTP method, e.g. "GET".
+            url: Absolute URL.
+            service: Name of the API called, used as the metrics label.
+            timeout: Read timeout in seconds, or a (connect, read) tuple.
+                Defaults to HTTP_CLIENT_READ_TIMEOUT.
+            **kwargs: Passed to requests.Session.request (params, json,
+                headers, stream, ...).
+
+        Returns:
+            The response, whatever its status.
+
+        Raises:
+            HostBusyError: If no slot for the host became free in time.
+            requests.exceptions.RequestException: If the request failed.
+        """
+        timeout = self._get_timeout(timeout)
+        slot = self._get_slot(urlsplit(url).netloc)
+        labels = {"service": service}
+
+        if not slot.acquire(blocking=False):
+            metrics.increment("http_client_saturated_total", labels)
+            waited_from = time.monotonic()
+            acquired = slot.acquire(timeout=sum(timeout))
+            metrics.observe(
+                "http_client_slot_wait_seconds", time.monotonic() - waited_from, labels
+            )
+            if not acquired:
+                metrics.increment(
+                    "http_client_errors_total", {**labels, "error": "busy"}
+                )
+                raise HostBusyError(f"Too many concurrent requests for {service}")
+
+        started = time.monotonic()
+        outcome = "error"
+        try:
+            response = self._get_session().request(
+                method, url, timeout=timeout, **kwargs
+            )
+            outcome = f"{response.status_code // 100}xx"
+            return response
+        except requests.exceptions.RequestException as e:
+            metrics.increment(
+                "http_client_errors_total", {**labels, "error": type(e).__name__}
+            )
+            raise
+        finally:
+            slot.release()
+            outcome_labels = {**labels, "outcome": outcome}
+            metrics.observe(
+                "http_client_request_seconds",
+                time.monotonic() - started,
+                outcome_labels,
+            )
+            metrics.increment("http_client_requests_total", outcome_labels)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a GET request (see request)."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a POST request (see request)."""
+        return self.request("POST", url, **kwargs)
+
+    def delete(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a DELETE request (see request)."""
+        return self.request("DELETE", url, **kwargs)
+
+
+# Module-level singleton instance
+http_client = HttpClient()
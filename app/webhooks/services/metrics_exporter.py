@@ -0,0 +1,230 @@
+"""Prometheus exposition of the metrics registry across worker processes.
+
+Every uvicorn worker keeps its own in-process registry (see
+webhooks.services.metrics). To serve one view of all of them, each
+worker periodically adds what it recorded since its last flush to a
+shared Redis hash, with one field per counter, histogram bucket, sum and
+count:
+
+    HINCRBYFLOAT metrics '["h", "pipeline_stage_seconds", [...], "0.01"]' 3
+
+The /metrics endpoint flushes its own worker, then renders the hash.
+Workers flush every METRICS_FLUSH_SECONDS and at exit, so a scrape can
+lag the other workers by up to that interval. Series keep counting
+across worker restarts, as Prometheus counters should. Without Redis
+(local development), the endpoint serves the current process only.
+
+The hash expires METRICS_TTL_SECONDS after the last flush, and is reset
+if it grows past METRICS_MAX_FIELDS (e.g. a label with unbounded
+values); Prometheus treats either as a counter reset. Series must only
+use labels with a small, fixed set of values.
+
+Usage:
+    from webhooks.services.metrics_exporter import metrics_exporter
+
+    metrics_exporter.ensure_started()   # from code that records metrics
+    text = metrics_exporter.render()
+"""
+
+import atexit
+import json
+import logging
+import threading
+import time
+from typing import Any
+
+from django.conf import settings
+
+from .metrics import MetricsRegistry, measure_stage_overhead, metrics, render_prometheus
+from .redis_client import get_redis_client, redis_key
+
+logger = logging.getLogger(__name__)
+
+# Shared hash holding every worker's flushed series
+METRICS_KEY = "metrics"
+
+# Seconds between background flushes unless METRICS_FLUSH_SECONDS is set
+DEFAULT_FLUSH_SECONDS = 15
+
+# The shared hash expires this long after the last flush from any worker
+METRICS_TTL_SECONDS = 7 * 24 * 3600
+
+# The shared hash is reset once it holds more fields than this
+METRICS_MAX_FIELDS = 20_000
+
+
+def _flatten(snapshot: dict[str, Any]) -> dict[str, float]:
+    """Flatten a registry snapshot into hash fields and values.
+
+    Args:
+        snapshot: Series in the format returned by MetricsRegistry.snapshot.
+
+    Returns:
+        Dict of JSON-encoded field name to value.
+    """
+    fields: dict[str, float] = {}
+    for name, series in snapshot["counters"].items():
+        for sample in series:
+            labels = sorted(sample["labels"].items())
+            fields[json.dumps(["c", name, labels])] = sample["value"]
+    for name, series in snapshot["histograms"].items():
+        for sample in series:
+            labels = sorted(sample["labels"].items())
+            for bound, count in sample["buckets"].items():
+                fields[json.dumps(["h", name, labels, bound])] = count
+            fields[json.dumps(["h", name, labels, "sum"])] = sample["sum"]
+            fields[json.dumps(["h", name, labels, "count"])] = sample["count"]
+    return fields
+
+
+def _unflatten(fields: dict[Any, Any]) -> dict[str, Any]:
+    """Rebuild a snapshot from hash fields and values.
+
+    Args:
+        fields: Hash contents, as returned by HGETALL.
+
+    Returns:
+        Series in the format returned by MetricsRegistry.snapshot.
+    """
+    counters: dict[str, list[dict[str, Any]]] = {}
+    histograms: dict[tuple[str, tuple], dict[str, Any]] = {}
+    for field, raw_value in fields.items():
+        kind, name, labels, *part = json.loads(field)
+        value = float(raw_value)
+        if kind == "c":
+            counters.setdefault(name, []).append(
+                {"labels": dict(labels), "value": value}
+            )
+            continue
+        histogram = histograms.setdefault(
+            (name, tuple(map(tuple, labels))),
+            {"labels": dict(labels), "buckets": {}, "sum": 0.0, "count": 0.0},
+        )
+        if part[0] in ("sum", "count"):
+            histogram[part[0]] = value
+        else:
+            histogram["buckets"][part[0]] = value
+
+    grouped: dict[str, list[dict[str, Any]]] = {}
+    for (name, _), histogram in sorted(histograms.items()):
+        histogram["buckets"] = dict(
+            sorted(histogram["buckets"].items(), key=lambda item: float(item[0]))
+        )
+        grouped.setdefault(name, []).append(histogram)
+    return {"counters": counters, "histograms": grouped}
+
+
+class MetricsExporter:
+    """Merges per-worker metrics in Redis and renders them for Prometheus."""
+
+    def __init__(self, registry: MetricsRegistry = metrics) -> None:
+        """Initialize the exporter.
+
+        Args:
+            registry: The process's metrics registry.
+        """
+        self._registry = registry
+        self._lock = threading.Lock()
+        self._flushed: dict[str, float] = {}
+        self._thread: threading.Thread | None = None
+
+    def ensure_started(self) -> None:
+        """Start the background flush thread if it isn't running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="metrics-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Flush loop."""
+        interval = getattr(settings, "METRICS_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS)
+        while True:
+            time.sleep(interval)
+            self.flush()
+
+    def flush(self) -> int:
+        """Add what this process recorded since the last flush to Redis.
+
+        Returns:
+            Number of fields updated (0 without Redis or on error).
+        """
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return 0
+
+        with self._lock:
+            current = _flatten(self._registry.snapshot())
+            deltas = {}
+            for field, value in current.items():
+                delta = value - self._flushed.get(field, 0.0)
+                if delta < 0:
+                    # The registry was reset; everything since is new
+                    delta = value
+                if delta:
+                    deltas[field] = delta
+            if not deltas:
+                return 0
+
+            try:
+                key = redis_key(METRICS_KEY)
+                pipe = redis_client.pipeline(transaction=False)
+                for field, delta in deltas.items():
+                    pipe.hincrbyfloat(key, field, delta)
+                pipe.expire(key, METRICS_TTL_SECONDS)
+                pipe.hlen(key)
+                size = pipe.execute()[-1]
+                if size > METRICS_MAX_FIELDS:
+                    logger.warning(
+                        f"Shared metrics hash has {size} fields, resetting it"
+                    )
+                    redis_client.delete(key)
+            except Exception as e:
+                logger.warning(f"Failed to flush metrics: {e}")
+                return 0
+
+            self._flushed = current
+            return len(deltas)
+
+    def collect(self) -> dict[str, Any]:
+        """Get the series of all workers.
+
+        Returns:
+            Series in the format returned by MetricsRegistry.snapshot,
+            for this process only if Redis isn't available.
+        """
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return self._registry.snapshot()
+
+        self.flush()
+        try:
+            return _unflatten(redis_client.hgetall(redis_key(METRICS_KEY)))
+        except Exception as e:
+            logger.warning(f"Failed to read shared metrics: {e}")
+            return self._registry.snapshot()
+
+    def render(self) -> str:
+        """Render all workers' series in the Prometheus text format.
+
+        Also reports pipeline_stage_overhead_seconds, what timing one
+        pipeline stage costs in the serving process.
+
+        Returns:
+            The exposition text.
+        """
+        return render_prometheus(
+            self.collect(),
+            gauges={"pipeline_stage_overhead_seconds": measure_stage_overhead()},
+        )
+
+
+# Module-level singleton instance
+metrics_exporter = MetricsExporter()
+
+# Don't lose what was recorded since the last flush on clean shutdown
+atexit.register(metrics_exporter.flush)
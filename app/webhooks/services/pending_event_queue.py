@@ -8,6 +8,25 @@ a single consolidated notification.
 The delay ensures we have complete data (like customer_email from invoice
 events) even when processing subscription events that arrive first.
 
+Events are processed on priority lanes (see processing_lanes):
+- Critical events (payment failures) skip the aggregation delay and run
+  immediately on reserved workers.
+- Informational groups are deferred while the shared lane is congested.
+
+Groups don't always need the full delay: after every append the group is
+checked against the completeness rules for its aggregation type, and a
+complete group (e.g. a signup plus the customer's email) is sent right away
+by whichever worker process saw it complete; the close is recorded in the
+shared cache, so it works across workers. Related events arriving after the
+close, within DELAY_SECONDS of the group's first event, would have been
+merged into the same notification, so they are dropped rather than sent
+as a second one. The timer remains as the fallback for groups that never
+complete.
+
+After a send, only the items that were sent are removed, so an event
+appended while the group was being processed stays queued for the next
+timer.
+
 On server startup, orphaned events (from previous server instances) are
 recovered and processed to prevent data loss on ephemeral infrastructure.
 
@@ -21,12 +40,17 @@ import json
 import logging
 import threading
 import time
-from typing import Any
+from typing import Any, Callable
 
 from core.models import Integration, Workspace
 from django.conf import settings
 from django.core.cache import cache
 
+from .metrics import metrics
+from .processing_lanes import EventPriority, get_event_priority, processing_lanes
+from .round_trips import round_trips
+from .usage_metrics import usage_metrics
+
 logger = logging.getLogger(__name__)
 
 # Minimum age (in seconds) before an orphaned event is processed on startup.
@@ -40,6 +64,65 @@ PROCESSING_LOCK_TTL = 60
 # Maximum retries for storing events (optimistic locking)
 MAX_STORE_RETRIES = 3
 
+# Delay (seconds) applied to an informational group each time it is deferred
+# because the shared processing lane is congested, and the maximum number of
+# deferrals (kept well within TTL_SECONDS)
+INFORMATIONAL_DEFER_SECONDS = 15
+MAX_INFORMATIONAL_DEFERRALS = 8
+
+# Primary event types a signup notification is built around
+SIGNUP_EVENT_TYPES = frozenset({"subscription_created", "trial_started"})
+
+
+def _first_queued_at(stored_items: list[dict[str, Any]]) -> float:
+    """Get when the first event of a group was queued.
+
+    Args:
+        stored_items: Stored items with event_data.
+
+    Returns:
+        The earliest _queued_at timestamp, or 0 if there is none.
+    """
+    return min(
+        (item["event_data"].get("_queued_at", 0) for item in stored_items),
+        default=0,
+    )
+
+
+def _has_signup_with_email(stored_items: list[dict[str, Any]]) -> bool:
+    """Check whether a group has a signup event and the customer's email.
+
+    Subscription events carry no email; it comes from the invoice events of
+    the same request, so a signup group is complete once both have arrived.
+
+    Args:
+        stored_items: Stored items with event_data and customer_data.
+
+    Returns:
+        True if the group has everything a signup notification needs.
+    """
+    has_signup = False
+    has_email = False
+    for item in stored_items:
+        event_data = item.get("event_data", {})
+        if event_data.get("type") in SIGNUP_EVENT_TYPES:
+            has_signup = True
+        if item.get("customer_data", {}).get("email") or event_data.get(
+            "customer_email"
+        ):
+            has_email = True
+    return has_signup and has_email
+
+
+# Rules deciding when a group can be sent before DELAY_SECONDS, keyed by
+# aggregation type: "idempotency" (events from one Stripe request) or
+# "customer" (events for one customer within a time bucket). A group closes
+# early as soon as any rule for its type matches.
+COMPLETENESS_RULES: dict[str, tuple[Callable[[list[dict[str, Any]]], bool], ...]] = {
+    "idempotency": (_has_signup_with_email,),
+    "customer": (_has_signup_with_email,),
+}
+
 
 class PendingEventQueue:
     """Queue for delayed processing of webhook events.
@@ -60,6 +143,10 @@ class PendingEventQueue:
     # Track active timers to avoid duplicate scheduling
     # Key: "{workspace_id}:{idempotency_key}" -> Timer
     _active_timers: dict[str, threading.Timer] = {}
+    # Highest priority of the events queued in each group (same keys)
+    _group_priorities: dict[str, EventPriority] = {}
+    # Why a group was sent before its timer fired ("complete", "critical")
+    _close_reasons: dict[str, str] = {}
     _lock = threading.Lock()
 
     def queue_event(
@@ -82,19 +169,57 @@ class PendingEventQueue:
             provider_name: Name of the provider (e.g., "stripe").
             workspace: Workspace model instance (can be None for global).
         """
-        # For customer-based keys (without Stripe idempotency key), add time bucket
-        # to group related events within a 60-second window
-        is_customer_key = idempotency_key.startswith("customer:")
-        if is_customer_key:
+        priority = get_event_priority(event_data.get("type", ""))
+
+        if priority is EventPriority.CRITICAL:
+            # Critical events are never consolidated, so they gain nothing from
+            # waiting for related events - process them on their own, now
+            external_id = event_data.get("external_id") or idempotency_key
+            storage_key = f"critical:{external_id}"
+            aggregation_type = "critical"
+            delay: float = 0
+        elif idempotency_key.startswith("customer:"):
+            # For customer-based keys (without Stripe idempotency key), add time
+            # bucket to group related events within a 60-second window
             storage_key = self._get_customer_storage_key(idempotency_key, workspace_id)
+            aggregation_type = "customer"
+            delay = self.DELAY_SECONDS
         else:
             storage_key = idempotency_key
+            aggregation_type = "idempotency"
+            delay = self.DELAY_SECONDS
+
+        if aggregation_type != "critical" and self._is_sent_group(
+            storage_key, workspace_id
+        ):
+            # The group already went out as complete; this event would have
+            # been merged into that notification
+            metrics.increment("late_events_dropped_total", {"provider": provider_name})
+            logger.info(
+                f"Dropped late {event_data.get('type')} for idempotency_key "
+                f"{storage_key}, already sent as complete"
+            )
+            return
 
         # Store event in Redis
-        self._store_event(storage_key, workspace_id, event_data, customer_data)
+        stored_items = self._store_event(
+            storage_key, workspace_id, event_data, customer_data
+        )
 
         # Schedule processing (only if not already scheduled)
-        self._schedule_processing(storage_key, workspace_id, provider_name, workspace)
+        self._schedule_processing(
+            storage_key, workspace_id, provider_name, workspace, priority, delay
+        )
+
+        # Send right away if the group already has everything it needs
+        if self._is_group_complete(aggregation_type, stored_items):
+            self._close_early(
+                storage_key,
+                workspace_id,
+                provider_name,
+                workspace,
+                _first_queued_at(stored_items),
+            )
 
         logger.debug(
             f"Queued event {event_data.get('type')} for key "
@@ -137,7 +262,7 @@ class PendingEventQueue:
         workspace_id: str,
         event_data: dict[str, Any],
         customer_data: dict[str, Any],
-    ) -> None:
+    ) -> list[dict[str, Any]]:
         """Store event to Redis keyed by idempotency_key.
 
         Uses atomic Redis operations to prevent race conditions when
@@ -148,6 +273,9 @@ class PendingEventQueue:
             workspace_id: Workspace UUID string.
             event_data: Parsed event data.
             customer_data: Customer data extracted from webhook.
+
+        Returns:
+            All items stored for the key, including the new one.
         """
         key = f"pending_webhook:{workspace_id}:{idempotency_key}"
 
@@ -163,8 +291,7 @@ class PendingEventQueue:
         # Use atomic append with retry loop to handle concurrent writes
         for attempt in range(MAX_STORE_RETRIES):
             try:
-                self._atomic_append(key, new_item)
-                return
+                return self._atomic_append(key, new_item)
             except Exception as e:
                 if attempt == MAX_STORE_RETRIES - 1:
                     logger.error(
@@ -173,8 +300,9 @@ class PendingEventQueue:
                     raise
                 # Small backoff before retry
                 time.sleep(0.01 * (attempt + 1))
+        return []
 
-    def _atomic_append(self, key: str, item: dict[str, Any]) -> None:
+    def _atomic_append(self, key: str, item: dict[str, Any]) -> list[dict[str, Any]]:
         """Atomically append an item to a list in Redis.
 
         Uses Redis WATCH/MULTI/EXEC for optimistic locking to ensure
@@ -186,12 +314,14 @@ class PendingEventQueue:
         Args:
             key: Redis key for the list.
             item: Item to append.
+
+        Returns:
+            The list after appending.
         """
         redis_client = self._get_redis_client_for_atomic()
         if redis_client is None:
             # Fallback to non-atomic append
-            self._simple_append(key, item)
-            return
+            return self._simple_append(key, item)
 
         # Use Redis pipeline with WATCH for optimistic locking
         pipe = redis_client.pipeline(True)  # True = use MULTI/EXEC
@@ -215,6 +345,7 @@ class PendingEventQueue:
             pipe.multi()
             pipe.setex(key, self.TTL_SECONDS, json.dumps(existing))
             pipe.execute()
+            return existing
 
         except Exception as e:
             # WatchError means another client modified the key - retry
@@ -240,16 +371,110 @@ class PendingEventQueue:
         except (AttributeError, Exception):
             return None
 
-    def _simple_append(self, key: str, item: dict[str, Any]) -> None:
+    def _simple_append(self, key: str, item: dict[str, Any]) -> list[dict[str, Any]]:
         """Simple non-atomic append (fallback for non-Redis backends).
 
         Args:
             key: Cache key for the list.
             item: Item to append.
+
+        Returns:
+            The list after appending.
         """
         existing = cache.get(key) or []
         existing.append(item)
         cache.set(key, existing, timeout=self.TTL_SECONDS)
+        return existing
+
+    def _is_group_complete(
+        self, aggregation_type: str, stored_items: list[dict[str, Any]]
+    ) -> bool:
+        """Check a group against the completeness rules for its type.
+
+        Args:
+            aggregation_type: "idempotency", "customer" or "critical".
+            stored_items: All items currently stored for the group.
+
+        Returns:
+            True if the group can be sent without waiting for more events.
+        """
+        rules = COMPLETENESS_RULES.get(aggregation_type, ())
+        return any(rule(stored_items) for rule in rules)
+
+    def _close_early(
+        self,
+        idempotency_key: str,
+        workspace_id: str,
+        provider_name: str,
+        workspace: Workspace | None,
+        opened_at: float = 0,
+    ) -> None:
+        """Send a complete group now instead of waiting for its timer.
+
+        Events of one group often land on different worker processes, each
+        holding its own timer. The close is recorded in the shared cache so
+        exactly one worker, whichever saw the group complete, sends it; the
+        other workers' timers find the group gone when they fire, and late
+        events of the group are dropped (see _is_sent_group).
+
+        Args:
+            idempotency_key: Storage key of the group.
+            workspace_id: Workspace UUID string.
+            provider_name: Name of the provider.
+            workspace: Workspace model instance.
+            opened_at: When the group's first event was queued.
+        """
+        timer_key = f"{workspace_id}:{idempotency_key}"
+
+        with self._lock:
+            if timer_key in self._close_reasons:
+                # Already dispatched by an earlier append
+                return
+
+        if not cache.add(
+            self._closed_key(idempotency_key, workspace_id),
+            opened_at or time.time(),
+            timeout=self.TTL_SECONDS,
+        ):
+            # Another worker already sent it
+            return
+
+        with self._lock:
+            timer = self._active_timers.get(timer_key)
+            if timer is not None:
+                timer.cancel()
+            self._close_reasons[timer_key] = "complete"
+
+        logger.info(
+            f"Group complete, sending idempotency_key {idempotency_key} "
+            f"without waiting {self.DELAY_SECONDS}s"
+        )
+        self._dispatch_events(idempotency_key, workspace_id, provider_name, workspace)
+
+    def _closed_key(self, idempotency_key: str, workspace_id: str) -> str:
+        """Get the shared cache key marking a group as sent early.
+
+        The value is when the group's first event was queued.
+        """
+        return f"pending_closed:{workspace_id}:{idempotency_key}"
+
+    def _is_sent_group(self, idempotency_key: str, workspace_id: str) -> bool:
+        """Check whether an event belongs to a group already sent early.
+
+        Only events within DELAY_SECONDS of the group's first event count;
+        later ones would have started a new group without the early close.
+
+        Args:
+            idempotency_key: Storage key of the group.
+            workspace_id: Workspace UUID string.
+
+        Returns:
+            True if the event should be dropped.
+        """
+        opened_at = cache.get(self._closed_key(idempotency_key, workspace_id))
+        if not isinstance(opened_at, (int, float)):
+            return False
+        return time.time() - opened_at < self.DELAY_SECONDS
 
     def _schedule_processing(
         self,
@@ -257,27 +482,56 @@ class PendingEventQueue:
         workspace_id: str,
         provider_name: str,
         workspace: Workspace | None,
+        priority: EventPriority = EventPriority.STANDARD,
+        delay: float | None = None,
     ) -> None:
-        """Schedule a timer to process events after DELAY_SECONDS.
+        """Schedule a timer to process events after the aggregation delay.
 
-        Only schedules if no timer is already active for this key.
+        Only schedules if no timer is already active for this key. A delay of
+        0 skips the timer and submits the group to its processing lane now.
 
         Args:
             idempotency_key: Stripe idempotency key.
             workspace_id: Workspace UUID string.
             provider_name: Name of the provider.
             workspace: Workspace model instance.
+            priority: Priority of the event being queued.
+            delay: Seconds to wait before processing (default DELAY_SECONDS).
         """
         timer_key = f"{workspace_id}:{idempotency_key}"
+        if delay is None:
+            delay = self.DELAY_SECONDS
 
         with self._lock:
+            current = self._group_priorities.get(timer_key)
+            if current is None or priority.rank > current.rank:
+                self._group_priorities[timer_key] = priority
+
             if timer_key in self._active_timers:
                 # Timer already scheduled for this idempotency_key
                 return
 
+            if delay <= 0:
+                self._close_reasons[timer_key] = "critical"
+                processing_lanes.submit(
+                    priority,
+                    self._process_events,
+                    idempotency_key,
+                    workspace_id,
+                    provider_name,
+                    workspace,
+                    tenant=workspace_id,
+                    plan=workspace.subscription_plan if workspace else None,
+                )
+                logger.info(
+                    f"Dispatched {priority.value} idempotency_key "
+                    f"{idempotency_key} for immediate processing"
+                )
+                return
+
             timer = threading.Timer(
-                self.DELAY_SECONDS,
-                self._process_events,
+                delay,
+                self._dispatch_events,
                 args=[idempotency_key, workspace_id, provider_name, workspace],
             )
             timer.daemon = True  # Don't block shutdown
@@ -286,10 +540,73 @@ class PendingEventQueue:
             self._active_timers[timer_key] = timer
 
             logger.info(
-                f"Scheduled processing in {self.DELAY_SECONDS}s for "
+                f"Scheduled processing in {delay}s for "
                 f"idempotency_key {idempotency_key}"
             )
 
+    def _dispatch_events(
+        self,
+        idempotency_key: str,
+        workspace_id: str,
+        provider_name: str,
+        workspace: Workspace | None,
+        deferrals: int = 0,
+    ) -> None:
+        """Hand a group whose delay has elapsed to its processing lane.
+
+        Informational groups are pushed back by INFORMATIONAL_DEFER_SECONDS
+        while the shared lane is congested, up to MAX_INFORMATIONAL_DEFERRALS
+        times, so they don't compete with more important work.
+
+        Args:
+            idempotency_key: Stripe idempotency key.
+            workspace_id: Workspace UUID string.
+            provider_name: Name of the provider.
+            workspace: Workspace model instance.
+            deferrals: How many times this group has already been deferred.
+        """
+        timer_key = f"{workspace_id}:{idempotency_key}"
+
+        with self._lock:
+            priority = self._group_priorities.get(timer_key, EventPriority.STANDARD)
+
+            if (
+                priority is EventPriority.INFORMATIONAL
+                and deferrals < MAX_INFORMATIONAL_DEFERRALS
+                and processing_lanes.is_congested()
+            ):
+                timer = threading.Timer(
+                    INFORMATIONAL_DEFER_SECONDS,
+                    self._dispatch_events,
+                    args=[
+                        idempotency_key,
+                        workspace_id,
+                        provider_name,
+                        workspace,
+                        deferrals + 1,
+                    ],
+                )
+                timer.daemon = True
+                timer.start()
+                self._active_timers[timer_key] = timer
+                metrics.increment("informational_deferred_total")
+                logger.info(
+                    f"Deferred informational idempotency_key {idempotency_key} "
+                    f"by {INFORMATIONAL_DEFER_SECONDS}s (processing lane congested)"
+                )
+                return
+
+        processing_lanes.submit(
+            priority,
+            self._process_events,
+            idempotency_key,
+            workspace_id,
+            provider_name,
+            workspace,
+            tenant=workspace_id,
+            plan=workspace.subscription_plan if workspace else None,
+        )
+
     def _process_events(
         self,
         idempotency_key: str,
@@ -310,11 +627,14 @@ class PendingEventQueue:
             provider_name: Name of the provider.
             workspace: Workspace model instance.
         """
+        round_trips.set_provider(provider_name.rpartition("_")[2])
         timer_key = f"{workspace_id}:{idempotency_key}"
 
-        # Clean up timer reference
+        # Clean up timer and priority references
         with self._lock:
             self._active_timers.pop(timer_key, None)
+            self._group_priorities.pop(timer_key, None)
+            close_reason = self._close_reasons.pop(timer_key, None)
 
         # Try to acquire distributed lock
         lock_key = f"processing_lock:{workspace_id}:{idempotency_key}"
@@ -330,6 +650,15 @@ class PendingEventQueue:
             key = f"pending_webhook:{workspace_id}:{idempotency_key}"
             stored_items = cache.get(key) or []
 
+            if not stored_items and close_reason is None:
+                # Our timer fired after another worker sent the group early
+                if cache.get(self._closed_key(idempotency_key, workspace_id)):
+                    logger.debug(
+                        f"idempotency_key {idempotency_key} was already sent "
+                        f"as complete by another worker"
+                    )
+                    return
+
             if not stored_items:
                 logger.warning(
                     f"No events found for idempotency_key {idempotency_key} "
@@ -342,8 +671,11 @@ class PendingEventQueue:
                 f"{idempotency_key}"
             )
 
+            close_reason = close_reason or "timeout"
+
             # Aggregate events into ONE notification
             aggregated_event, aggregated_customer = self._aggregate_events(stored_items)
+            self._record_queue_wait(stored_items, aggregated_event, close_reason)
 
             # Send notification - only delete events if successful
             success = self._send_notification(
@@ -351,8 +683,10 @@ class PendingEventQueue:
             )
 
             if success:
-                # Delete pending events only after successful send
-                cache.delete(key)
+                # Delete pending events only after successful send, keeping
+                # any appended since they were read
+                self._remove_sent_items(key, len(stored_items))
+                self._record_time_to_notify(stored_items, provider_name, close_reason)
             else:
                 # Leave events for retry (orphan recovery will pick them up)
                 logger.warning(
@@ -362,6 +696,120 @@ class PendingEventQueue:
             # Always release the lock
             self._release_lock(lock_key)
 
+    def _remove_sent_items(self, key: str, sent_count: int) -> None:
+        """Remove the items a notification was sent for from a group.
+
+        Items are only ever appended, so the sent ones are the first
+        sent_count items; anything after them arrived during processing.
+
+        Args:
+            key: Cache key of the group.
+            sent_count: Number of items that were sent.
+        """
+        for attempt in range(MAX_STORE_RETRIES):
+            try:
+                redis_client = self._get_redis_client_for_atomic()
+                if redis_client is None:
+                    self._simple_remove_prefix(key, sent_count)
+                else:
+                    self._atomic_remove_prefix(redis_client, key, sent_count)
+                return
+            except Exception as e:
+                if attempt == MAX_STORE_RETRIES - 1:
+                    logger.error(
+                        f"Failed to remove sent events from {key} after "
+                        f"{MAX_STORE_RETRIES} attempts: {e}"
+                    )
+                    return
+                time.sleep(0.01 * (attempt + 1))
+
+    def _atomic_remove_prefix(self, redis_client, key: str, count: int) -> None:
+        """Drop the first items of a list in Redis, with optimistic locking.
+
+        Args:
+            redis_client: Raw Redis client.
+            key: Redis key for the list.
+            count: Number of items to drop.
+        """
+        pipe = redis_client.pipeline(True)
+        try:
+            pipe.watch(key)
+            current = pipe.get(key)
+            if isinstance(current, bytes):
+                current = current.decode("utf-8")
+            remaining = json.loads(current)[count:] if current else []
+
+            pipe.multi()
+            if remaining:
+                pipe.setex(key, self.TTL_SECONDS, json.dumps(remaining))
+            else:
+                pipe.delete(key)
+            pipe.execute()
+        except Exception as e:
+            # WatchError means an event was appended meanwhile - retry
+            pipe.reset()
+            raise e
+
+    def _simple_remove_prefix(self, key: str, count: int) -> None:
+        """Drop the first items of a list (fallback for non-Redis backends).
+
+        Args:
+            key: Cache key for the list.
+            count: Number of items to drop.
+        """
+        remaining = (cache.get(key) or [])[count:]
+        if remaining:
+            cache.set(key, remaining, timeout=self.TTL_SECONDS)
+        else:
+            cache.delete(key)
+
+    def _record_time_to_notify(
+        self,
+        stored_items: list[dict[str, Any]],
+        provider_name: str,
+        close_reason: str,
+    ) -> None:
+        """Record time from the first queued event to the notification.
+
+        Args:
+            stored_items: The processed group.
+            provider_name: Name of the provider.
+            close_reason: "complete", "critical" or "timeout".
+        """
+        queued_at = _first_queued_at(stored_items)
+        if queued_at <= 0:
+            return
+        metrics.observe(
+            "time_to_notify_seconds",
+            max(time.time() - queued_at, 0.0),
+            {"provider": provider_name, "close_reason": close_reason},
+        )
+
+    def _record_queue_wait(
+        self,
+        stored_items: list[dict[str, Any]],
+        aggregated_event: dict[str, Any],
+        close_reason: str,
+    ) -> None:
+        """Record the queue_wait stage: first queued event to processing.
+
+        Args:
+            stored_items: The group being processed.
+            aggregated_event: The group's aggregated event.
+            close_reason: "complete", "critical" or "timeout", used as the
+                stage outcome.
+        """
+        queued_at = _first_queued_at(stored_items)
+        if queued_at <= 0:
+            return
+        metrics.observe_stage(
+            "queue_wait",
+            max(time.time() - queued_at, 0.0),
+            aggregated_event.get("provider"),
+            aggregated_event.get("type"),
+            close_reason,
+        )
+
     def _acquire_lock(self, lock_key: str) -> bool:
         """Acquire a distributed lock using Redis SETNX.
 
@@ -528,12 +976,16 @@ class PendingEventQueue:
 
         # Check if this event should be suppressed due to consolidation
         # (e.g., $0 trial invoices)
-        should_notify = event_consolidation_service.should_send_notification(
-            event_type=event_type,
-            customer_id=customer_id,
-            workspace_id=workspace_id,
-            amount=event_data.get("amount"),
-        )
+        provider_label = event_data.get("provider")
+        with metrics.time_stage("consolidation", provider_label, event_type) as stage:
+            should_notify = event_consolidation_service.should_send_notification(
+                event_type=event_type,
+                customer_id=customer_id,
+                workspace_id=workspace_id,
+                amount=event_data.get("amount"),
+            )
+            if not should_notify:
+                stage.outcome = "suppressed"
 
         if not should_notify:
             logger.info(
@@ -545,6 +997,7 @@ class PendingEventQueue:
                 workspace_id=workspace_id,
                 external_id=external_id,
             )
+            self._record_outcome(event_data, provider_name, workspace, "suppressed")
             return True  # Suppressed events count as success
 
         # Build and format rich notification
@@ -554,6 +1007,7 @@ class PendingEventQueue:
             )
         except Exception as e:
             logger.error(f"Failed to build notification: {e}", exc_info=True)
+            self._record_outcome(event_data, provider_name, workspace, "failed")
             return False  # Retry later
 
         # Get Slack webhook URL
@@ -575,8 +1029,10 @@ class PendingEventQueue:
             return False  # Retry later
 
         try:
-            slack_plugin.send(formatted, {"webhook_url": slack_webhook_url})
+            with metrics.time_stage("slack_send", provider_label, event_type):
+                slack_plugin.send(formatted, {"webhook_url": slack_webhook_url})
             logger.info(f"Sent {event_type} notification for customer {customer_id}")
+            self._record_outcome(event_data, provider_name, workspace, "sent")
 
             # Record the event after successful send
             event_consolidation_service.record_event(
@@ -592,8 +1048,33 @@ class PendingEventQueue:
                 f"Failed to send Slack notification for workspace "
                 f"{workspace.uuid if workspace else 'unknown'}: {e}"
             )
+            self._record_outcome(event_data, provider_name, workspace, "failed")
             return False  # Retry later
 
+    def _record_outcome(
+        self,
+        event_data: dict[str, Any],
+        provider_name: str,
+        workspace: Workspace | None,
+        outcome: str,
+    ) -> None:
+        """Count a notification outcome in the workspace's usage metrics.
+
+        Args:
+            event_data: Aggregated event data.
+            provider_name: Name of the provider.
+            workspace: Workspace model instance.
+            outcome: One of usage_metrics.OUTCOMES.
+        """
+        if workspace is None:
+            return
+        usage_metrics.record(
+            str(workspace.uuid),
+            event_data.get("provider") or provider_name,
+            event_data.get("type", ""),
+            outcome,
+        )
+
     def _get_slack_webhook_url(self, workspace: Workspace | None) -> str | None:
         """Get Slack webhook URL for a workspace.
 
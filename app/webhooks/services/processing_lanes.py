@@ -0,0 +1,473 @@
+"""Priority lanes for notification processing.
+
+Notification jobs run on worker pools split by event priority so that
+critical events (payment failures, required payment actions) never wait
+behind a backlog of low-value events:
+
+- CRITICAL events run on a reserved pool that nothing else can use.
+- STANDARD and INFORMATIONAL events share the remaining pool. When its
+  backlog grows past CONGESTION_BACKLOG, informational work is deferred
+  by the caller (see PendingEventQueue) instead of competing for workers.
+
+Within each lane, jobs wait in per-workspace sub-queues and are handed
+to workers by deficit round robin, weighted by the workspace's plan
+(RateLimiter.PLAN_LIMITS). A per-tenant concurrency cap stops one
+workspace's replay or flash sale from holding every worker in a lane.
+
+Time spent waiting for a worker is recorded per priority in the
+queue_wait_seconds histogram. Per-workspace waits are kept in this
+process only, for the dashboard's tenant stats; a workspace label on an
+exported metric would add series for every workspace ever seen.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, ClassVar
+
+from django.db import close_old_connections
+
+from .event_consolidation import EventConsolidationService
+from .metrics import metrics
+from .rate_limiter import RateLimiter
+from .round_trips import round_trips
+
+logger = logging.getLogger(__name__)
+
+
+class EventPriority(Enum):
+    """Processing priority classes, most urgent first."""
+
+    CRITICAL = "critical"
+    STANDARD = "standard"
+    INFORMATIONAL = "informational"
+
+    @property
+    def rank(self) -> int:
+        """Return a sortable rank (higher = more urgent)."""
+        return _PRIORITY_RANKS[self]
+
+
+_PRIORITY_RANKS: dict[EventPriority, int] = {
+    EventPriority.CRITICAL: 2,
+    EventPriority.STANDARD: 1,
+    EventPriority.INFORMATIONAL: 0,
+}
+
+# Low-value events that may be delayed when workers are busy
+INFORMATIONAL_EVENTS: frozenset[str] = frozenset(
+    {
+        "customer_updated",
+        "fulfillment_created",
+        "fulfillment_updated",
+        "subscription_updated",
+        "webhook_received",
+    }
+)
+
+
+def get_event_priority(event_type: str) -> EventPriority:
+    """Get the processing priority for an event type.
+
+    Critical events are the ones consolidation never suppresses
+    (EventConsolidationService.NEVER_SUPPRESS).
+
+    Args:
+        event_type: The normalized event type.
+
+    Returns:
+        The event's priority class.
+    """
+    if event_type in EventConsolidationService.NEVER_SUPPRESS:
+        return EventPriority.CRITICAL
+    if event_type in INFORMATIONAL_EVENTS:
+        return EventPriority.INFORMATIONAL
+    return EventPriority.STANDARD
+
+
+# Tenant key for jobs that don't belong to a workspace
+GLOBAL_TENANT = "global"
+
+
+def get_plan_weight(plan: str | None) -> int:
+    """Get the fair-scheduling weight for a subscription plan.
+
+    Weights grow with the log of the plan's monthly limit relative to the
+    free plan (free=1, basic=3, pro=4, enterprise=5), so larger plans get
+    a bigger share of workers without being able to starve smaller ones.
+
+    Args:
+        plan: Subscription plan name (unknown or None counts as free).
+
+    Returns:
+        Number of jobs the tenant may start per scheduling round.
+    """
+    free_limit = RateLimiter.PLAN_LIMITS["free"]
+    limit = RateLimiter.PLAN_LIMITS.get(plan or "free", free_limit)
+    return 1 + int(math.log10(max(limit, free_limit) / free_limit))
+
+
+class FairScheduler:
+    """Deficit round robin over per-tenant job queues.
+
+    Each tenant with queued jobs sits in a round-robin ring. On its turn a
+    tenant's deficit is topped up by its weight and it may start one job
+    per unit of deficit; tenants at their concurrency cap are skipped. Not
+    thread-safe on its own - ProcessingLanes calls it under its lock.
+
+    Attributes:
+        max_concurrency: Most jobs a single tenant may have running.
+    """
+
+    def __init__(self, max_concurrency: int) -> None:
+        """Initialize an empty scheduler.
+
+        Args:
+            max_concurrency: Most jobs a single tenant may have running.
+        """
+        self.max_concurrency = max_concurrency
+        self._queues: dict[str, deque[Callable[[], Any]]] = {}
+        self._weights: dict[str, int] = {}
+        self._deficits: dict[str, int] = {}
+        self._running: dict[str, int] = {}
+        self._ring: deque[str] = deque()
+
+    @property
+    def running_total(self) -> int:
+        """Number of jobs currently running across all tenants."""
+        return sum(self._running.values())
+
+    def push(self, tenant: str, weight: int, job: Callable[[], Any]) -> None:
+        """Queue a job for a tenant.
+
+        Args:
+            tenant: Tenant (workspace) key.
+            weight: Tenant's scheduling weight (see get_plan_weight).
+            job: Callable to hand to a worker.
+        """
+        self._weights[tenant] = max(1, weight)
+        queue = self._queues.get(tenant)
+        if queue is None:
+            queue = self._queues[tenant] = deque()
+            self._deficits[tenant] = 0
+            self._ring.append(tenant)
+        queue.append(job)
+
+    def pop(self) -> tuple[str, Callable[[], Any]] | None:
+        """Take the next job to run, marking it as running for its tenant.
+
+        Returns:
+            Tuple of (tenant, job), or None if every tenant with queued
+            jobs is at its concurrency cap (or nothing is queued).
+        """
+        for _ in range(len(self._ring)):
+            tenant = self._ring[0]
+            if self._running.get(tenant, 0) >= self.max_concurrency:
+                self._ring.rotate(-1)
+                continue
+
+            if self._deficits[tenant] < 1:
+                self._deficits[tenant] += self._weights[tenant]
+
+            queue = self._queues[tenant]
+            job = queue.popleft()
+            self._deficits[tenant] -= 1
+            self._running[tenant] = self._running.get(tenant, 0) + 1
+
+            if not queue:
+                # Idle tenants don't bank deficit (standard DRR)
+                self._ring.popleft()
+                del self._queues[tenant]
+                del self._deficits[tenant]
+            elif self._deficits[tenant] < 1:
+                self._ring.rotate(-1)
+            return tenant, job
+        return None
+
+    def release(self, tenant: str) -> None:
+        """Mark one of a tenant's running jobs as finished.
+
+        Args:
+            tenant: Tenant (workspace) key.
+        """
+        remaining = self._running.get(tenant, 0) - 1
+        if remaining > 0:
+            self._running[tenant] = remaining
+        else:
+            self._running.pop(tenant, None)
+
+    def queued(self, tenant: str) -> int:
+        """Get the number of jobs a tenant has waiting.
+
+        Args:
+            tenant: Tenant (workspace) key.
+
+        Returns:
+            Queued job count.
+        """
+        queue = self._queues.get(tenant)
+        return len(queue) if queue else 0
+
+    def running(self, tenant: str) -> int:
+        """Get the number of jobs a tenant has running.
+
+        Args:
+            tenant: Tenant (workspace) key.
+
+        Returns:
+            Running job count.
+        """
+        return self._running.get(tenant, 0)
+
+    def tenants(self) -> set[str]:
+        """Get every tenant with queued or running jobs.
+
+        Returns:
+            Set of tenant keys.
+        """
+        return set(self._queues) | set(self._running)
+
+
+class ProcessingLanes:
+    """Worker pools for notification jobs, split by priority.
+
+    Attributes:
+        CRITICAL_WORKERS: Workers reserved for critical events.
+        SHARED_WORKERS: Workers shared by standard and informational events.
+        CONGESTION_BACKLOG: Shared-lane backlog at which the lane counts as
+            congested and informational work should be deferred.
+        TENANT_MAX_CONCURRENCY: Most workers one workspace may hold per lane.
+    """
+
+    CRITICAL_WORKERS: ClassVar[int] = 2
+    SHARED_WORKERS: ClassVar[int] = 8
+    CONGESTION_BACKLOG: ClassVar[int] = 16
+    TENANT_MAX_CONCURRENCY: ClassVar[dict[str, int]] = {"critical": 1, "shared": 4}
+
+    def __init__(self) -> None:
+        """Initialize lanes; worker pools are created on first use."""
+        self._lock = threading.Lock()
+        self._executors: dict[str, ThreadPoolExecutor] = {}
+        self._schedulers: dict[str, FairScheduler] = {}
+        self._backlog: dict[str, int] = {"critical": 0, "shared": 0}
+        # Tenant -> [total seconds waited, jobs started]
+        self._tenant_waits: dict[str, list[float]] = {}
+
+    def submit(
+        self,
+        priority: EventPriority,
+        fn: Callable[..., Any],
+        *args: Any,
+        tenant: str | None = None,
+        plan: str | None = None,
+        **kwargs: Any,
+    ) -> Future:
+        """Queue a job on the lane for its priority.
+
+        Args:
+            priority: Priority of the event(s) being processed.
+            fn: The job to run.
+            *args: Positional arguments for the job.
+            tenant: Workspace UUID the job belongs to (None for global).
+            plan: The workspace's subscription plan, used for its weight.
+            **kwargs: Keyword arguments for the job.
+
+        Returns:
+            Future for the job result.
+        """
+        lane = self._lane_for(priority)
+        tenant = tenant or GLOBAL_TENANT
+        future: Future = Future()
+        enqueued_at = time.monotonic()
+
+        def run() -> None:
+            wait = time.monotonic() - enqueued_at
+            with self._lock:
+                self._backlog[lane] -= 1
+                waits = self._tenant_waits.setdefault(tenant, [0.0, 0])
+                waits[0] += wait
+                waits[1] += 1
+            metrics.observe("queue_wait_seconds", wait, {"priority": priority.value})
+            try:
+                if not future.set_running_or_notify_cancel():
+                    return
+                with round_trips.track("job"):
+                    future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                logger.error(
+                    f"Error in {priority.value} processing job for {tenant}: {e}",
+                    exc_info=True,
+                )
+                future.set_exception(e)
+            finally:
+                close_old_connections()
+                self._job_done(lane, tenant)
+
+        with self._lock:
+            self._get_scheduler(lane).push(tenant, get_plan_weight(plan), run)
+            self._backlog[lane] += 1
+        self._pump(lane)
+        return future
+
+    def backlog(self, priority: EventPriority) -> int:
+        """Get the number of jobs waiting for a worker in a priority's lane.
+
+        Args:
+            priority: The priority whose lane to inspect.
+
+        Returns:
+            Number of submitted jobs that haven't started yet.
+        """
+        with self._lock:
+            return self._backlog[self._lane_for(priority)]
+
+    def is_congested(self) -> bool:
+        """Check whether the shared lane is backed up.
+
+        Returns:
+            True if informational work should be deferred.
+        """
+        return self.backlog(EventPriority.STANDARD) >= self.CONGESTION_BACKLOG
+
+    def tenant_stats(self, tenant: str) -> dict[str, Any]:
+        """Get queue depth and queue wait for one workspace.
+
+        Args:
+            tenant: Workspace UUID string.
+
+        Returns:
+            Dict with queued and running job counts across lanes, plus the
+            workspace's average and the overall average queue wait.
+        """
+        with self._lock:
+            queued = sum(s.queued(tenant) for s in self._schedulers.values())
+            running = sum(s.running(tenant) for s in self._schedulers.values())
+            total, count = self._tenant_waits.get(tenant, (0.0, 0))
+
+        return {
+            "tenant": tenant,
+            "queued": queued,
+            "running": running,
+            "avg_wait_seconds": total / count if count else 0.0,
+            "overall_avg_wait_seconds": self._overall_average_wait(),
+        }
+
+    def all_tenant_stats(self) -> list[dict[str, Any]]:
+        """Get queue stats for every workspace seen by this process.
+
+        Returns:
+            List of tenant_stats dicts, longest average wait first.
+        """
+        with self._lock:
+            tenants = set(self._tenant_waits)
+            for scheduler in self._schedulers.values():
+                tenants |= scheduler.tenants()
+
+        stats = [self.tenant_stats(tenant) for tenant in tenants]
+        stats.sort(key=lambda s: s["avg_wait_seconds"], reverse=True)
+        return stats
+
+    def _overall_average_wait(self) -> float:
+        """Get the average queue wait across all priorities.
+
+        Returns:
+            Mean wait in seconds, or 0 if nothing has run yet.
+        """
+        total = 0.0
+        count = 0
+        for priority in EventPriority:
+            histogram = metrics.get_histogram(
+                "queue_wait_seconds", {"priority": priority.value}
+            )
+            if histogram:
+                total += histogram["sum"]
+                count += histogram["count"]
+        return total / count if count else 0.0
+
+    def _pump(self, lane: str) -> None:
+        """Hand queued jobs to free workers in fair-share order.
+
+        Args:
+            lane: Lane name.
+        """
+        with self._lock:
+            scheduler = self._get_scheduler(lane)
+            executor = self._get_executor(lane)
+            while scheduler.running_total < self._workers_for(lane):
+                item = scheduler.pop()
+                if item is None:
+                    break
+                executor.submit(item[1])
+
+    def _job_done(self, lane: str, tenant: str) -> None:
+        """Release a finished job's slot and start the next one.
+
+        Args:
+            lane: Lane name.
+            tenant: Tenant the finished job belonged to.
+        """
+        with self._lock:
+            self._get_scheduler(lane).release(tenant)
+        self._pump(lane)
+
+    def _lane_for(self, priority: EventPriority) -> str:
+        """Map a priority to its lane name.
+
+        Args:
+            priority: The event priority.
+
+        Returns:
+            "critical" for critical events, "shared" otherwise.
+        """
+        return "critical" if priority is EventPriority.CRITICAL else "shared"
+
+    def _workers_for(self, lane: str) -> int:
+        """Get the worker count for a lane.
+
+        Args:
+            lane: Lane name.
+
+        Returns:
+            Number of workers in the lane's pool.
+        """
+        return self.CRITICAL_WORKERS if lane == "critical" else self.SHARED_WORKERS
+
+    def _get_scheduler(self, lane: str) -> FairScheduler:
+        """Get or create the fair scheduler for a lane (caller holds the lock).
+
+        Args:
+            lane: Lane name.
+
+        Returns:
+            The lane's scheduler.
+        """
+        scheduler = self._schedulers.get(lane)
+        if scheduler is None:
+            scheduler = FairScheduler(self.TENANT_MAX_CONCURRENCY[lane])
+            self._schedulers[lane] = scheduler
+        return scheduler
+
+    def _get_executor(self, lane: str) -> ThreadPoolExecutor:
+        """Get or create the worker pool for a lane (caller holds the lock).
+
+        Args:
+            lane: Lane name.
+
+        Returns:
+            The lane's executor.
+        """
+        executor = self._executors.get(lane)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=self._workers_for(lane), thread_name_prefix=f"lane-{lane}"
+            )
+            self._executors[lane] = executor
+        return executor
+
+
+# Module-level singleton instance
+processing_lanes = ProcessingLanes()
@@ -14,6 +14,8 @@ from django.core.cache import cache
 from django.core.cache.backends.base import InvalidCacheBackendError
 from django.utils import timezone
 
+from .dashboard_cache import dashboard_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -360,6 +362,7 @@ class RateLimiter:
             current_count = self._safe_cache_get(cache_key, 0)
             new_count = current_count + 1
             self._safe_cache_set(cache_key, new_count)
+            dashboard_cache.invalidate(organization_uuid, "usage")
 
             logger.info(
                 f"Incremented webhook usage for org {organization_uuid} to {new_count} "
@@ -438,10 +441,10 @@ class RateLimiter:
         Returns:
             Dictionary mapping month keys to usage counts.
         """
-        stats: dict[str, int] = {}
         current_date = timezone.now()
         organization_uuid = str(organization.uuid)
 
+        cache_keys: dict[str, str] = {}
         for i in range(months):
             # Calculate month
             if current_date.month - i <= 0:
@@ -452,11 +455,26 @@ class RateLimiter:
                 year = current_date.year
 
             month_key = f"{year:04d}-{month:02d}"
-            cache_key = self.get_cache_key(organization_uuid, month_key)
-            usage = self._safe_cache_get(cache_key, 0)
-            stats[month_key] = usage
+            cache_keys[month_key] = self.get_cache_key(organization_uuid, month_key)
 
-        return stats
+        # One MGET for all months
+        try:
+            found = self.circuit_breaker.call_with_circuit_breaker(
+                cache.get_many, list(cache_keys.values())
+            )
+        except (RedisUnavailableError, InvalidCacheBackendError, Exception) as e:
+            logger.warning(
+                f"Cache GET_MANY failed for usage stats, using fallback: {e!s}"
+            )
+            return {
+                month_key: self._get_from_fallback(cache_key, 0)
+                for month_key, cache_key in cache_keys.items()
+            }
+
+        return {
+            month_key: found.get(cache_key, 0)
+            for month_key, cache_key in cache_keys.items()
+        }
 
 
 # Global rate limiter instance
@@ -0,0 +1,154 @@
+"""Access to the raw Redis client behind Django's cache.
+
+Most code talks to Redis through django.core.cache. Data structures the
+cache API doesn't cover (sorted sets, hashes, pipelines) need the
+underlying redis-py client. get_redis_client returns it, or None when the
+cache isn't Redis (tests, local development) so callers can fall back to
+plain cache operations. Async views use get_async_redis_client for the
+same server.
+"""
+
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def get_redis_client() -> Any | None:
+    """Get the redis-py client used by the default cache.
+
+    Supports Django's built-in RedisCache and django-redis.
+
+    Returns:
+        Redis client, or None if the cache backend isn't Redis.
+    """
+    try:
+        backend_client = getattr(cache, "_cache", None)
+        if backend_client is not None and hasattr(backend_client, "get_client"):
+            # django.core.cache.backends.redis.RedisCache
+            client = backend_client.get_client(write=True)
+        else:
+            # django_redis.cache.RedisCache
+            client = cache.client.get_client()
+    except Exception:
+        return None
+    return client if hasattr(client, "pipeline") else None
+
+
+def get_async_redis_client() -> Any | None:
+    """Create an asyncio redis-py client for the default cache's server.
+
+    The client is bound to the running event loop; callers close it with
+    aclose() when done.
+
+    Returns:
+        redis.asyncio.Redis client, or None if the cache backend isn't Redis.
+    """
+    if get_redis_client() is None:
+        return None
+
+    from redis.asyncio import Redis
+
+    location = settings.CACHES["default"]["LOCATION"]
+    if isinstance(location, (list, tuple)):
+        location = location[0]  # primary; replicas are read-only
+    return Redis.from_url(location)
+
+
+def redis_key(key: str) -> str:
+    """Get the full Redis key for a cache key.
+
+    Applies the cache's KEY_PREFIX and version so raw commands address
+    the same keys as cache.get/cache.set.
+
+    Args:
+        key: Cache key as passed to the cache API.
+
+    Returns:
+        Key as stored in Redis.
+    """
+    return cache.make_key(key)
+
+
+def parse_index_cursor(cursor: str) -> tuple[float, int]:
+    """Parse a cursor returned by read_index_page.
+
+    Args:
+        cursor: "<score>:<skip>", the score of the previous page's last
+            member and how many members with that score were returned.
+
+    Returns:
+        Tuple of (score, skip).
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    score, sep, skip = cursor.rpartition(":")
+    if not sep:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    parsed_skip = int(skip)
+    if parsed_skip < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return float(score), parsed_skip
+
+
+def read_index_page(
+    index_key: str, limit: int, before: str | None = None
+) -> tuple[list[str], str | None]:
+    """Read one page of a timestamp-scored index, newest first.
+
+    Works on a Redis sorted set, or on the cache fallback format used by
+    the services (a list of (score, member) tuples). Each page is a
+    single ZREVRANGEBYSCORE, so paging costs O(log n + limit) however
+    large the index grows.
+
+    Members can share a score (webhooks received in the same
+    millisecond), so the cursor holds the last score returned and how
+    many members with that score were returned; the next page starts at
+    that score and skips them.
+
+    Args:
+        index_key: Cache key of the index.
+        limit: Maximum number of members to return.
+        before: Cursor returned with the previous page.
+
+    Returns:
+        Tuple of (members, next cursor). The cursor is None on the last page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    max_score, skip = parse_index_cursor(before) if before else (None, 0)
+
+    redis_client = get_redis_client()
+    if redis_client is None:
+        # Same order as ZREVRANGEBYSCORE: score, then member, descending
+        entries = sorted(cache.get(index_key) or [], reverse=True)
+        page = [
+            (member, score)
+            for score, member in entries
+            if max_score is None or score <= max_score
+        ][skip : skip + limit + 1]
+    else:
+        page = redis_client.zrevrangebyscore(
+            redis_key(index_key),
+            "+inf" if max_score is None else max_score,
+            "-inf",
+            start=skip,
+            num=limit + 1,
+            withscores=True,
+        )
+
+    members = [
+        member.decode("utf-8") if isinstance(member, bytes) else member
+        for member, _ in page[:limit]
+    ]
+    if len(page) <= limit:
+        return members, None
+
+    last_score = float(page[limit - 1][1])
+    returned = sum(1 for _, score in page[:limit] if score == last_score)
+    if last_score == max_score:
+        # The whole page shared the cursor's score
+        returned += skip
+    return members, f"{last_score}:{returned}"
@@ -0,0 +1,359 @@
+"""Redis and database round-trip accounting per webhook and worker job.
+
+A webhook touches Redis and the database from many places (rate limiter,
+consolidation, pending queue, customer email cache, record lookups,
+enrichment), one small call at a time. This module counts, for each
+webhook request or worker job:
+
+    redis_commands     commands sent to Redis
+    redis_round_trips  requests to Redis (a pipeline is one round trip)
+    sql_queries        queries sent to the database
+
+Redis is counted in redis-py, so both the cache and raw clients are
+covered. With a non-Redis cache backend (tests, local development) each
+cache call is counted as one round trip instead, to estimate what Redis
+would see. Enrichment lookups count towards the event that started them.
+
+When a request or job finishes, the counts are recorded as histograms by
+scope and provider (see webhooks.services.metrics). A sample of them,
+ROUND_TRIP_SAMPLE_RATE, is also logged with a breakdown by call site.
+
+Usage:
+    from webhooks.services.round_trips import round_trips
+
+    round_trips.install()  # once, from AppConfig.ready
+
+    @round_trips.tracked("webhook", provider="stripe")
+    def view(request): ...
+
+    with round_trips.track("job") as counts:
+        round_trips.set_provider("stripe")
+        ...
+"""
+
+import contextvars
+import logging
+import os
+import random
+import sys
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Cache methods counted on non-Redis backends
+CACHE_OPS = (
+    "get",
+    "set",
+    "add",
+    "delete",
+    "touch",
+    "incr",
+    "decr",
+    "has_key",
+    "get_many",
+    "set_many",
+    "delete_many",
+)
+
+# Histogram bucket bounds for per-request counts
+COUNT_BUCKETS: tuple[float, ...] = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+
+# Call sites are reported relative to the Django project directory
+APP_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__))) + os.sep
+
+_current: contextvars.ContextVar["RoundTripCounts | None"] = contextvars.ContextVar(
+    "round_trips", default=None
+)
+
+
+def _call_site() -> str:
+    """Find the project code that made the current call.
+
+    Returns:
+        "path/to/module.py:function", relative to the project directory.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(APP_DIR)
+            and filename != __file__
+            and "site-packages" not in filename
+        ):
+            return f"{filename[len(APP_DIR) :]}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "external"
+
+
+class RoundTripCounts:
+    """Round trips made by one webhook request or worker job.
+
+    Attributes:
+        scope: What is being counted, e.g. "webhook" or "job".
+        provider: Event provider, if known.
+        redis_commands: Commands sent to Redis.
+        redis_round_trips: Requests made to Redis.
+        sql_queries: Database queries.
+        call_sites: Round trips by "kind path:function", if sampled.
+    """
+
+    __slots__ = (
+        "scope",
+        "provider",
+        "redis_commands",
+        "redis_round_trips",
+        "sql_queries",
+        "call_sites",
+        "_lock",
+    )
+
+    def __init__(self, scope: str, provider: str | None, sampled: bool) -> None:
+        """Initialize empty counts.
+
+        Args:
+            scope: What is being counted.
+            provider: Event provider, if known.
+            sampled: Whether to record call sites.
+        """
+        self.scope = scope
+        self.provider = provider
+        self.redis_commands = 0
+        self.redis_round_trips = 0
+        self.sql_queries = 0
+        self.call_sites: Counter[str] | None = Counter() if sampled else None
+        # Enrichment threads add to the same counts
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, commands: int = 1) -> None:
+        """Count one round trip.
+
+        Args:
+            kind: "redis" or "sql".
+            commands: Redis commands sent in the round trip.
+        """
+        site = _call_site() if self.call_sites is not None else None
+        with self._lock:
+            if kind == "sql":
+                self.sql_queries += 1
+            else:
+                self.redis_round_trips += 1
+                self.redis_commands += commands
+            if site is not None:
+                self.call_sites[f"{kind} {site}"] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counts, with call sites if sampled.
+
+        Returns:
+            Dict of count name to value.
+        """
+        with self._lock:
+            counts: dict[str, Any] = {
+                "redis_commands": self.redis_commands,
+                "redis_round_trips": self.redis_round_trips,
+                "sql_queries": self.sql_queries,
+            }
+            if self.call_sites is not None:
+                counts["call_sites"] = dict(self.call_sites.most_common())
+        return counts
+
+
+class RoundTripTracker:
+    """Installs the counting hooks and tracks requests and jobs."""
+
+    def __init__(self) -> None:
+        """Initialize without hooks installed."""
+        self._installed = False
+        self._lock = threading.Lock()
+
+    def current(self) -> RoundTripCounts | None:
+        """Get the counts of the request or job being tracked, if any."""
+        return _current.get()
+
+    def set_provider(self, provider: str) -> None:
+        """Label the request or job being tracked, if any, with a provider.
+
+        Args:
+            provider: Event provider, e.g. "stripe".
+        """
+        counts = _current.get()
+        if counts is not None:
+            counts.provider = provider
+
+    def install(self) -> None:
+        """Hook Redis, cache and database calls (idempotent)."""
+        with self._lock:
+            if self._installed:
+                return
+            self._installed = True
+
+        _install_redis()
+        _install_cache()
+        connection_created.connect(_on_connection_created, weak=False)
+        for connection in connections.all(initialized_only=True):
+            _add_query_counter(connection)
+
+    @contextmanager
+    def track(
+        self, scope: str, provider: str | None = None, sample: bool | None = None
+    ) -> Iterator[RoundTripCounts]:
+        """Count round trips made inside the block.
+
+        Nested blocks add to the outermost block's counts.
+
+        Args:
+            scope: What is being counted, e.g. "webhook" or "job".
+            provider: Event provider, if known.
+            sample: Whether to record call sites; defaults to sampling at
+                ROUND_TRIP_SAMPLE_RATE.
+
+        Yields:
+            The counts, complete once the block exits.
+        """
+        counts = _current.get()
+        if counts is not None:
+            if counts.provider is None:
+                counts.provider = provider
+            yield counts
+            return
+
+        if sample is None:
+            sample = random.random() < getattr(settings, "ROUND_TRIP_SAMPLE_RATE", 0)
+        counts = RoundTripCounts(scope, provider, sample)
+        token = _current.set(counts)
+        try:
+            yield counts
+        finally:
+            _current.reset(token)
+            self._emit(counts)
+
+    def tracked(
+        self, scope: str, provider: str | None = None
+    ) -> Callable[[Callable], Callable]:
+        """Decorate a function to count the round trips of each call.
+
+        Args:
+            scope: What is being counted.
+            provider: Event provider, if known.
+
+        Returns:
+            The decorator.
+        """
+
+        def decorator(fn: Callable) -> Callable:
+            @wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.track(scope, provider):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _emit(self, counts: RoundTripCounts) -> None:
+        """Record finished counts as metrics, and log them if sampled."""
+        labels = {"scope": counts.scope, "provider": counts.provider or "unknown"}
+        summary = counts.as_dict()
+        for name in ("redis_commands", "redis_round_trips", "sql_queries"):
+            metrics.observe(name, summary[name], labels, COUNT_BUCKETS)
+
+        if counts.call_sites is not None:
+            logger.info(
+                f"Round trips for {counts.scope} ({labels['provider']}): "
+                f"{summary['redis_round_trips']} Redis, "
+                f"{summary['sql_queries']} SQL",
+                extra={"round_trips": summary, **labels},
+            )
+
+
+def _install_redis() -> None:
+    """Count commands and pipelines sent by redis-py clients."""
+    try:
+        import redis
+        from redis.client import Pipeline
+    except ImportError:
+        return
+
+    execute_command = redis.Redis.execute_command
+    execute_pipeline = Pipeline.execute
+
+    @wraps(execute_command)
+    def counted_execute_command(self: Any, *args: Any, **options: Any) -> Any:
+        counts = _current.get()
+        if counts is not None:
+            counts.record("redis")
+        return execute_command(self, *args, **options)
+
+    @wraps(execute_pipeline)
+    def counted_execute(self: Any, *args: Any, **kwargs: Any) -> Any:
+        counts = _current.get()
+        if counts is not None and self.command_stack:
+            counts.record("redis", commands=len(self.command_stack))
+        return execute_pipeline(self, *args, **kwargs)
+
+    redis.Redis.execute_command = counted_execute_command
+    Pipeline.execute = counted_execute
+
+
+def _install_cache() -> None:
+    """Count calls to non-Redis cache backends as Redis round trips."""
+    from django.core.cache.backends.dummy import DummyCache
+    from django.core.cache.backends.filebased import FileBasedCache
+    from django.core.cache.backends.locmem import LocMemCache
+
+    for backend in (DummyCache, FileBasedCache, LocMemCache):
+        for name in CACHE_OPS:
+            # Inherited methods are built on counted ones
+            method = backend.__dict__.get(name)
+            if method is not None:
+                setattr(backend, name, _count_cache_op(method, name))
+
+
+def _count_cache_op(method: Callable, name: str) -> Callable:
+    """Wrap a cache method to count it as one round trip."""
+
+    @wraps(method)
+    def counted(self: Any, *args: Any, **kwargs: Any) -> Any:
+        counts = _current.get()
+        if counts is not None:
+            keys = args[0] if args and name.endswith("_many") else None
+            counts.record("redis", commands=len(keys) if keys else 1)
+        return method(self, *args, **kwargs)
+
+    return counted
+
+
+def _count_query(
+    execute: Callable, sql: str, params: Any, many: bool, context: dict
+) -> Any:
+    """Database execute wrapper counting each query."""
+    counts = _current.get()
+    if counts is not None:
+        counts.record("sql")
+    return execute(sql, params, many, context)
+
+
+def _add_query_counter(connection: Any) -> None:
+    """Add the query counter to a database connection once."""
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+def _on_connection_created(sender: Any, connection: Any, **kwargs: Any) -> None:
+    """Count queries on every new database connection."""
+    _add_query_counter(connection)
+
+
+# Module-level singleton instance
+round_trips = RoundTripTracker()
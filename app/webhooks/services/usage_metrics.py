@@ -0,0 +1,268 @@
+"""Time-series usage metrics per workspace.
+
+Counts notification outcomes (sent, suppressed, deduped, failed) by
+provider and event type in Redis hashes, one hash per workspace and time
+bucket:
+
+    usage_ts:{workspace}:{resolution}:{bucket_start}
+        "{provider}|{event_type}|{outcome}" -> count
+
+Every event is counted at minute, hour and day resolution in a single
+pipelined round trip (HINCRBY + EXPIRE per resolution), so hour and day
+buckets are rollups maintained at write time rather than by a
+downsampling job. Each resolution has its own retention, which bounds
+memory: fine-grained minute buckets live for two days, hours for five
+weeks and days for about thirteen months.
+
+Usage:
+    from webhooks.services.usage_metrics import usage_metrics
+
+    usage_metrics.record(workspace_id, "stripe", "payment_success", "sent")
+    usage_metrics.get_series(workspace_id, resolution="hour", points=24)
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, ClassVar
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .redis_client import get_redis_client, redis_key
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES: tuple[str, ...] = ("sent", "suppressed", "deduped", "failed")
+
+# Dimensions a series can be grouped by, in field order
+DIMENSIONS: tuple[str, ...] = ("provider", "event_type", "outcome")
+
+
+class UsageMetrics:
+    """Bucketed counters for per-workspace usage charts.
+
+    Attributes:
+        RESOLUTIONS: Resolution name to (bucket seconds, retention seconds).
+        MAX_POINTS: Most buckets a single query may return.
+    """
+
+    RESOLUTIONS: ClassVar[dict[str, tuple[int, int]]] = {
+        "minute": (60, 60 * 60 * 48),
+        "hour": (60 * 60, 60 * 60 * 24 * 35),
+        "day": (60 * 60 * 24, 60 * 60 * 24 * 400),
+    }
+
+    MAX_POINTS = 366
+
+    def _get_bucket_key(
+        self, workspace_id: str, resolution: str, bucket_start: int
+    ) -> str:
+        """Generate the cache key of a bucket hash.
+
+        Args:
+            workspace_id: Workspace UUID string.
+            resolution: Resolution name.
+            bucket_start: Bucket start as a Unix timestamp.
+
+        Returns:
+            Cache key for the bucket.
+        """
+        return f"usage_ts:{workspace_id}:{resolution}:{bucket_start}"
+
+    def _bucket_start(self, timestamp: float, resolution: str) -> int:
+        """Align a timestamp to the start of its bucket.
+
+        Args:
+            timestamp: Unix timestamp.
+            resolution: Resolution name.
+
+        Returns:
+            Bucket start as a Unix timestamp.
+        """
+        bucket_seconds = self.RESOLUTIONS[resolution][0]
+        return int(timestamp) // bucket_seconds * bucket_seconds
+
+    def record(
+        self,
+        workspace_id: str,
+        provider: str,
+        event_type: str,
+        outcome: str,
+        count: int = 1,
+        at: datetime | None = None,
+    ) -> None:
+        """Count an event outcome at every resolution.
+
+        Never raises; metrics problems must not affect webhook processing.
+
+        Args:
+            workspace_id: Workspace UUID string.
+            provider: Provider name (stripe, shopify, chargify).
+            event_type: Normalized event type.
+            outcome: One of OUTCOMES.
+            count: Amount to add.
+            at: Event time (defaults to now).
+        """
+        if not workspace_id:
+            return
+        timestamp = (at or timezone.now()).timestamp()
+        field = f"{provider or 'unknown'}|{event_type or 'unknown'}|{outcome}"
+
+        try:
+            redis_client = get_redis_client()
+            if redis_client is None:
+                self._simple_record(workspace_id, field, count, timestamp)
+                return
+
+            pipe = redis_client.pipeline(transaction=False)
+            for resolution, (_, retention) in self.RESOLUTIONS.items():
+                key = redis_key(
+                    self._get_bucket_key(
+                        workspace_id,
+                        resolution,
+                        self._bucket_start(timestamp, resolution),
+                    )
+                )
+                pipe.hincrby(key, field, count)
+                pipe.expire(key, retention)
+            pipe.execute()
+
+        except Exception as e:
+            logger.warning(f"Failed to record usage metric {field}: {e}")
+
+    def _simple_record(
+        self, workspace_id: str, field: str, count: int, timestamp: float
+    ) -> None:
+        """Non-atomic bucket update (fallback for non-Redis backends).
+
+        Args:
+            workspace_id: Workspace UUID string.
+            field: Hash field ("provider|event_type|outcome").
+            count: Amount to add.
+            timestamp: Event Unix timestamp.
+        """
+        for resolution, (_, retention) in self.RESOLUTIONS.items():
+            key = self._get_bucket_key(
+                workspace_id, resolution, self._bucket_start(timestamp, resolution)
+            )
+            bucket = cache.get(key) or {}
+            bucket[field] = bucket.get(field, 0) + count
+            cache.set(key, bucket, timeout=retention)
+
+    def _fetch_buckets(
+        self, workspace_id: str, resolution: str, starts: list[int]
+    ) -> list[dict[str, int]]:
+        """Read bucket hashes in one round trip.
+
+        Args:
+            workspace_id: Workspace UUID string.
+            resolution: Resolution name.
+            starts: Bucket start timestamps.
+
+        Returns:
+            One {field: count} dict per bucket, in the order of starts.
+        """
+        keys = [self._get_bucket_key(workspace_id, resolution, s) for s in starts]
+
+        redis_client = get_redis_client()
+        if redis_client is None:
+            found = cache.get_many(keys)
+            return [found.get(key) or {} for key in keys]
+
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(redis_key(key))
+
+        buckets: list[dict[str, int]] = []
+        for raw in pipe.execute():
+            bucket: dict[str, int] = {}
+            for field, value in raw.items():
+                if isinstance(field, bytes):
+                    field = field.decode("utf-8")
+                bucket[field] = int(value)
+            buckets.append(bucket)
+        return buckets
+
+    def get_series(
+        self,
+        workspace_id: str,
+        resolution: str = "hour",
+        points: int = 24,
+        group_by: str = "outcome",
+        provider: str | None = None,
+        event_type: str | None = None,
+        outcome: str | None = None,
+        end: datetime | None = None,
+    ) -> dict[str, Any]:
+        """Get aligned count series for charts.
+
+        Every series has one value per bucket, oldest first, with zeros for
+        empty buckets, so they can be plotted against the same timestamps.
+
+        Args:
+            workspace_id: Workspace UUID string.
+            resolution: "minute", "hour" or "day".
+            points: Number of buckets, ending with the current one.
+            group_by: Dimension to split series by (see DIMENSIONS).
+            provider: Optional provider to filter by.
+            event_type: Optional event type to filter by.
+            outcome: Optional outcome to filter by.
+            end: Time inside the last bucket (defaults to now).
+
+        Returns:
+            Dictionary with resolution, bucket_seconds, timestamps (bucket
+            starts), series ({group value: counts}) and totals.
+
+        Raises:
+            ValueError: If resolution or group_by is unknown.
+        """
+        if resolution not in self.RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        if group_by not in DIMENSIONS:
+            raise ValueError(f"Unknown group_by dimension: {group_by}")
+
+        bucket_seconds = self.RESOLUTIONS[resolution][0]
+        points = max(1, min(points, self.MAX_POINTS))
+        last = self._bucket_start((end or timezone.now()).timestamp(), resolution)
+        starts = [last - (points - 1 - i) * bucket_seconds for i in range(points)]
+
+        result: dict[str, Any] = {
+            "resolution": resolution,
+            "bucket_seconds": bucket_seconds,
+            "timestamps": starts,
+            "series": {},
+            "totals": {},
+        }
+        try:
+            buckets = self._fetch_buckets(workspace_id, resolution, starts)
+        except Exception as e:
+            logger.warning(f"Failed to read usage metrics: {e}")
+            return result
+
+        filters = {"provider": provider, "event_type": event_type, "outcome": outcome}
+        group_index = DIMENSIONS.index(group_by)
+        series: dict[str, list[int]] = {}
+        if group_by == "outcome" and not outcome:
+            # Always chart every outcome, even ones with no events
+            series = {name: [0] * points for name in OUTCOMES}
+
+        for i, bucket in enumerate(buckets):
+            for field, count in bucket.items():
+                parts = field.split("|")
+                if len(parts) != len(DIMENSIONS):
+                    continue
+                if any(
+                    filters[name] and parts[index] != filters[name]
+                    for index, name in enumerate(DIMENSIONS)
+                ):
+                    continue
+                values = series.setdefault(parts[group_index], [0] * points)
+                values[i] += count
+
+        result["series"] = series
+        result["totals"] = {name: sum(values) for name, values in series.items()}
+        return result
+
+
+# Module-level singleton instance
+usage_metrics = UsageMetrics()
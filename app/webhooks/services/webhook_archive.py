@@ -0,0 +1,354 @@
+"""Append-only segment file archive for raw webhooks.
+
+An alternative to keeping the raw webhook archive in Redis RAM (see
+WebhookStorageService). Compressed webhook blobs are appended to segment
+files on local disk or a mounted volume, one series of segments per UTC
+day:
+
+    <WEBHOOK_ARCHIVE_DIR>/2026-10-18-000000.seg   frames: key + blob
+    <WEBHOOK_ARCHIVE_DIR>/2026-10-18-000000.idx   fixed-size index entries
+
+A segment is rotated once it reaches WEBHOOK_ARCHIVE_SEGMENT_MB. Each
+index entry holds the frame's timestamp, offset and length plus the
+provider and a digest of the workspace, so filtered reads only touch the
+frames they return. Readers mmap both files rather than loading them.
+Expiry deletes whole segments.
+
+Appends take an exclusive flock on the segment, so several worker
+processes can share one archive directory. The directory must be on a
+filesystem with working POSIX locks (local disk, not NFS).
+"""
+
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import re
+import struct
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+
+# Segment frame header: key length, blob length
+FRAME_HEADER = struct.Struct("<HI")
+
+# Index entry: timestamp_ms, frame offset, frame length, provider, workspace
+INDEX_ENTRY = struct.Struct("<qII8s8s")
+
+_SEGMENT_NAME = re.compile(r"^(\d{4}-\d{2}-\d{2})-(\d{6})$")
+
+
+def _provider_tag(provider: str) -> bytes:
+    """Get the fixed-width provider field of an index entry.
+
+    Args:
+        provider: Webhook provider name.
+
+    Returns:
+        Provider name truncated or NUL-padded to 8 bytes.
+    """
+    return provider.encode("utf-8")[:8].ljust(8, b"\0")
+
+
+def _workspace_digest(workspace_id: str) -> bytes:
+    """Get the fixed-width workspace field of an index entry.
+
+    Args:
+        workspace_id: Workspace UUID or 'global'.
+
+    Returns:
+        8-byte digest of the workspace ID.
+    """
+    return hashlib.blake2b(workspace_id.encode("utf-8"), digest_size=8).digest()
+
+
+def _split_key(webhook_key: str) -> tuple[str, str]:
+    """Get the provider and workspace from a webhook key.
+
+    Args:
+        webhook_key: Key of the form webhook_raw:{provider}:{workspace}:{ms}.
+
+    Returns:
+        Tuple of (provider, workspace_id).
+    """
+    _, provider, workspace_id, _ = webhook_key.split(":", 3)
+    return provider, workspace_id
+
+
+class SegmentArchive:
+    """Rotating append-only segment files with a per-segment offset index.
+
+    Attributes:
+        directory: Directory holding the segment and index files.
+        segment_bytes: Size at which a segment is rotated.
+        retention_days: Days of segments kept by expire().
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        segment_bytes: int = 64 * 1024 * 1024,
+        retention_days: int = 7,
+    ) -> None:
+        """Initialize the archive; the directory is created on first write.
+
+        Args:
+            directory: Directory for segment and index files.
+            segment_bytes: Size at which a segment is rotated.
+            retention_days: Days of segments kept by expire().
+        """
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.retention_days = retention_days
+        # (date, segment number) this process is appending to
+        self._current: tuple[str, int] | None = None
+
+    def _segment_path(self, date_str: str, number: int) -> Path:
+        """Get the path of a segment file.
+
+        Args:
+            date_str: Date string in YYYY-MM-DD format.
+            number: Segment number within the day.
+
+        Returns:
+            Path of the segment file (the index has INDEX_SUFFIX instead).
+        """
+        return self.directory / f"{date_str}-{number:06d}{SEGMENT_SUFFIX}"
+
+    def segments(self, date_str: str) -> list[Path]:
+        """List a day's segment files in write order.
+
+        Args:
+            date_str: Date string in YYYY-MM-DD format.
+
+        Returns:
+            Segment file paths, oldest first.
+        """
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob(f"{date_str}-*{SEGMENT_SUFFIX}"))
+
+    def _current_segment(self, date_str: str) -> int:
+        """Get the number of the segment to append to for a day.
+
+        Args:
+            date_str: Date string in YYYY-MM-DD format.
+
+        Returns:
+            Segment number.
+        """
+        if self._current is not None and self._current[0] == date_str:
+            return self._current[1]
+
+        # First write of a new day in this process: resume the day's last
+        # segment (another worker may have started it) and expire old days
+        existing = self.segments(date_str)
+        number = int(existing[-1].stem.rsplit("-", 1)[1]) if existing else 0
+        self._current = (date_str, number)
+        self.expire(today=date.fromisoformat(date_str))
+        return number
+
+    def append(self, webhook_key: str, blob: bytes, timestamp_ms: int) -> None:
+        """Append a webhook blob to the current segment.
+
+        Args:
+            webhook_key: Webhook key (webhook_raw:{provider}:{workspace}:{ms}).
+            blob: Compressed webhook blob.
+            timestamp_ms: Webhook timestamp in milliseconds.
+        """
+        provider, workspace_id = _split_key(webhook_key)
+        key_bytes = webhook_key.encode("utf-8")
+        frame = FRAME_HEADER.pack(len(key_bytes), len(blob)) + key_bytes + blob
+        date_str = datetime.fromtimestamp(
+            timestamp_ms / 1000, tz=dt_timezone.utc
+        ).strftime("%Y-%m-%d")
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        while True:
+            number = self._current_segment(date_str)
+            segment_path = self._segment_path(date_str, number)
+            with segment_path.open("ab") as segment:
+                fcntl.flock(segment.fileno(), fcntl.LOCK_EX)
+                try:
+                    offset = os.fstat(segment.fileno()).st_size
+                    if offset and offset + len(frame) > self.segment_bytes:
+                        self._current = (date_str, number + 1)
+                        continue
+
+                    segment.write(frame)
+                    segment.flush()
+                    # Written under the segment lock, so index entries are
+                    # in the same order as frames
+                    with segment_path.with_suffix(INDEX_SUFFIX).open("ab") as index:
+                        index.write(
+                            INDEX_ENTRY.pack(
+                                timestamp_ms,
+                                offset,
+                                len(frame),
+                                _provider_tag(provider),
+                                _workspace_digest(workspace_id),
+                            )
+                        )
+                    return
+                finally:
+                    fcntl.flock(segment.fileno(), fcntl.LOCK_UN)
+
+    def _read_index(
+        self,
+        segment_path: Path,
+        provider: str | None,
+        workspace_uuid: str | None,
+    ) -> list[tuple[int, int, int]]:
+        """Read the matching entries of a segment's index.
+
+        Args:
+            segment_path: Segment file path.
+            provider: Optional provider name to filter by.
+            workspace_uuid: Optional workspace UUID to filter by.
+
+        Returns:
+            List of (timestamp_ms, offset, length) in write order.
+        """
+        index_path = segment_path.with_suffix(INDEX_SUFFIX)
+        try:
+            index_file = index_path.open("rb")
+        except FileNotFoundError:
+            return []
+
+        provider_tag = _provider_tag(provider) if provider else None
+        workspace = _workspace_digest(workspace_uuid) if workspace_uuid else None
+
+        with index_file:
+            size = os.fstat(index_file.fileno()).st_size
+            # Ignore a partially written trailing entry
+            usable = size - size % INDEX_ENTRY.size
+            if not usable:
+                return []
+            with mmap.mmap(
+                index_file.fileno(), usable, access=mmap.ACCESS_READ
+            ) as index_map:
+                return [
+                    (entry[0], entry[1], entry[2])
+                    for entry in INDEX_ENTRY.iter_unpack(index_map)
+                    if (provider_tag is None or entry[3] == provider_tag)
+                    and (workspace is None or entry[4] == workspace)
+                ]
+
+    def iter_entries(
+        self,
+        date_str: str,
+        provider: str | None = None,
+        workspace_uuid: str | None = None,
+        newest_first: bool = False,
+    ) -> Iterator[tuple[str, bytes]]:
+        """Stream a day's webhooks, optionally filtered.
+
+        Only the index is scanned; matching frames are read from the mmapped
+        segment one at a time.
+
+        Args:
+            date_str: Date string in YYYY-MM-DD format.
+            provider: Optional provider name to filter by.
+            workspace_uuid: Optional workspace UUID to filter by.
+            newest_first: Yield the most recent webhooks first.
+
+        Yields:
+            Tuples of (webhook_key, blob).
+        """
+        segment_paths = self.segments(date_str)
+        if newest_first:
+            segment_paths.reverse()
+
+        for segment_path in segment_paths:
+            entries = self._read_index(segment_path, provider, workspace_uuid)
+            if not entries:
+                continue
+            if newest_first:
+                entries.sort(reverse=True)
+
+            with segment_path.open("rb") as segment_file:
+                size = os.fstat(segment_file.fileno()).st_size
+                with mmap.mmap(
+                    segment_file.fileno(), size, access=mmap.ACCESS_READ
+                ) as segment_map:
+                    for _, offset, length in entries:
+                        if offset + length > size:
+                            continue  # index entry for a truncated frame
+                        key_length, blob_length = FRAME_HEADER.unpack_from(
+                            segment_map, offset
+                        )
+                        key_start = offset + FRAME_HEADER.size
+                        blob_start = key_start + key_length
+                        webhook_key = segment_map[key_start:blob_start].decode("utf-8")
+
+                        # Index fields are truncated/hashed; confirm on the key
+                        entry_provider, entry_workspace = _split_key(webhook_key)
+                        if provider and entry_provider != provider:
+                            continue
+                        if workspace_uuid and entry_workspace != workspace_uuid:
+                            continue
+
+                        yield (
+                            webhook_key,
+                            segment_map[blob_start : blob_start + blob_length],
+                        )
+
+    def count(
+        self,
+        date_str: str,
+        provider: str | None = None,
+        workspace_uuid: str | None = None,
+    ) -> int:
+        """Count a day's webhooks from the index alone.
+
+        Args:
+            date_str: Date string in YYYY-MM-DD format.
+            provider: Optional provider name to filter by.
+            workspace_uuid: Optional workspace UUID to filter by.
+
+        Returns:
+            Number of indexed webhooks.
+        """
+        return sum(
+            len(self._read_index(path, provider, workspace_uuid))
+            for path in self.segments(date_str)
+        )
+
+    def expire(self, today: date | None = None) -> list[str]:
+        """Delete segments (and their indexes) older than the retention window.
+
+        Args:
+            today: Reference date (defaults to the current UTC date).
+
+        Returns:
+            Names of the deleted segment files.
+        """
+        if not self.directory.is_dir():
+            return []
+        today = today or datetime.now(tz=dt_timezone.utc).date()
+        cutoff = (today - timedelta(days=self.retention_days)).isoformat()
+
+        removed: list[str] = []
+        for path in sorted(self.directory.iterdir()):
+            if path.suffix not in (SEGMENT_SUFFIX, INDEX_SUFFIX):
+                continue
+            match = _SEGMENT_NAME.match(path.stem)
+            if not match or match.group(1) >= cutoff:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue  # another worker got there first
+            if path.suffix == SEGMENT_SUFFIX:
+                removed.append(path.name)
+
+        if removed:
+            logger.info(f"Expired {len(removed)} webhook archive segments")
+        return removed
@@ -1,18 +1,23 @@
+import hmac
 import json
 import logging
 from typing import Any, Dict, Optional
 
 from core.models import Integration, Workspace
 from django.conf import settings
-from django.http import HttpRequest, JsonResponse
+from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
 from .exceptions import WebhookError, WebhookSignatureError
 from .services.event_consolidation import event_consolidation_service
+from .services.metrics import metrics
+from .services.metrics_exporter import metrics_exporter
 from .services.pending_event_queue import pending_event_queue
 from .services.rate_limiter import RateLimitException, rate_limiter
+from .services.round_trips import round_trips
+from .services.usage_metrics import usage_metrics
 from .services.webhook_storage import webhook_storage_service
 
 logger = logging.getLogger(__name__)
@@ -102,6 +107,15 @@ def _log_webhook_payload(
         logger.warning(f"Failed to log webhook payload: {e}")
 
 
+def _provider_label(provider_name: str) -> str:
+    """Get the metrics provider label for a router provider name.
+
+    "customer_stripe" and "billing_stripe" are both "stripe", matching the
+    provider that parsed events carry.
+    """
+    return provider_name.rpartition("_")[2]
+
+
 def create_success_response(message: str) -> dict:
     """Create standardized success response"""
     return {"status": "success", "message": message}
@@ -154,13 +168,21 @@ def _handle_rate_limiting(workspace: Workspace) -> Optional[JsonResponse]:
 
 
 def _validate_and_parse_webhook(
-    request: HttpRequest, provider: Any
+    request: HttpRequest, provider: Any, provider_name: str = ""
 ) -> Optional[Dict[str, Any]]:
     """Validate and parse webhook. Returns None for test webhooks."""
-    if not provider.validate_webhook(request):
-        raise WebhookSignatureError()
-
-    event_data = provider.parse_webhook(request)
+    label = _provider_label(provider_name)
+    with metrics.time_stage("signature_verify", label) as stage:
+        if not provider.validate_webhook(request):
+            stage.outcome = "rejected"
+            raise WebhookSignatureError()
+
+    with metrics.time_stage("parse", label) as stage:
+        event_data = provider.parse_webhook(request)
+        if event_data:
+            stage.event_type = event_data.get("type")
+        else:
+            stage.outcome = "test"
     return event_data
 
 
@@ -197,6 +219,23 @@ def _get_slack_webhook_url(workspace: Optional[Workspace]) -> Optional[str]:
         return None
 
 
+def _record_outcome(
+    event_data: Dict[str, Any],
+    provider_name: str,
+    workspace: Optional[Workspace],
+    outcome: str,
+) -> None:
+    """Count a notification outcome in the workspace's usage metrics."""
+    if workspace is None:
+        return  # Notipus billing events aren't workspace usage
+    usage_metrics.record(
+        str(workspace.uuid),
+        event_data.get("provider") or provider_name,
+        event_data.get("type", ""),
+        outcome,
+    )
+
+
 def _process_webhook_data(
     event_data: Dict[str, Any],
     provider: Any,
@@ -221,10 +260,28 @@ def _process_webhook_data(
     idempotency_key = event_data.get("idempotency_key")
 
     # Check for exact duplicate (same external_id) - applies to all events
-    if event_consolidation_service.is_duplicate(workspace_id, external_id):
+    with metrics.time_stage(
+        "consolidation", event_data.get("provider"), event_type
+    ) as stage:
+        is_duplicate = event_consolidation_service.is_duplicate(
+            workspace_id, external_id
+        )
+        if is_duplicate:
+            stage.outcome = "duplicate"
+        else:
+            # Record event ID to prevent exact duplicates
+            event_consolidation_service.record_event(
+                event_type=event_type,
+                customer_id=event_data.get("customer_id", ""),
+                workspace_id=workspace_id,
+                external_id=external_id,
+            )
+
+    if is_duplicate:
         logger.info(
             f"Skipping duplicate event {external_id} for workspace {workspace_id}"
         )
+        _record_outcome(event_data, provider_name, workspace, "deduped")
         return JsonResponse(
             create_success_response(
                 f"{provider_name} webhook processed (duplicate suppressed)"
@@ -232,14 +289,6 @@ def _process_webhook_data(
             status=200,
         )
 
-    # Record event ID to prevent exact duplicates
-    event_consolidation_service.record_event(
-        event_type=event_type,
-        customer_id=event_data.get("customer_id", ""),
-        workspace_id=workspace_id,
-        external_id=external_id,
-    )
-
     # Providers with complete data in one webhook - process immediately
     if provider_name in _IMMEDIATE_PROCESSING_PROVIDERS:
         return _process_immediately(event_data, customer_data, provider_name, workspace)
@@ -302,14 +351,19 @@ def _process_immediately(
     event_data["workspace_id"] = workspace_id
 
     # Check if this event should be suppressed due to consolidation
-    should_notify = event_consolidation_service.should_send_notification(
-        event_type=event_type,
-        customer_id=customer_id,
-        workspace_id=workspace_id,
-        amount=event_data.get("amount"),
-    )
+    provider_label = event_data.get("provider") or _provider_label(provider_name)
+    with metrics.time_stage("consolidation", provider_label, event_type) as stage:
+        should_notify = event_consolidation_service.should_send_notification(
+            event_type=event_type,
+            customer_id=customer_id,
+            workspace_id=workspace_id,
+            amount=event_data.get("amount"),
+        )
+        if not should_notify:
+            stage.outcome = "suppressed"
 
     if not should_notify:
+        _record_outcome(event_data, provider_name, workspace, "suppressed")
         return JsonResponse(
             create_success_response(
                 f"{provider_name} webhook processed (consolidated)"
@@ -337,12 +391,15 @@ def _process_immediately(
                 status=200,
             )
         try:
-            slack_plugin.send(formatted, {"webhook_url": slack_webhook_url})
+            with metrics.time_stage("slack_send", provider_label, event_type):
+                slack_plugin.send(formatted, {"webhook_url": slack_webhook_url})
+            _record_outcome(event_data, provider_name, workspace, "sent")
         except Exception as e:
             logger.error(
                 f"Failed to send Slack notification for workspace "
                 f"{workspace.uuid if workspace else 'unknown'}: {str(e)}"
             )
+            _record_outcome(event_data, provider_name, workspace, "failed")
     else:
         logger.warning(
             f"No Slack webhook URL configured for workspace "
@@ -391,19 +448,22 @@ def _process_webhook(
 
     Uses workspace-specific Slack integration for notifications.
     """
+    metrics_exporter.ensure_started()
     try:
         # Handle rate limiting
-        rate_limit_response = _handle_rate_limiting(workspace)
-        if rate_limit_response:
-            return rate_limit_response
+        with metrics.time_stage("rate_limit", _provider_label(provider_name)) as stage:
+            rate_limit_response = _handle_rate_limiting(workspace)
+            if rate_limit_response:
+                stage.outcome = "rejected"
+                return rate_limit_response
 
-        # Get rate limit info for headers
-        rate_limit_info = None
-        if workspace:
-            rate_limit_info = rate_limiter.enforce_rate_limit(workspace)
+            # Get rate limit info for headers
+            rate_limit_info = None
+            if workspace:
+                rate_limit_info = rate_limiter.enforce_rate_limit(workspace)
 
         # Validate and parse webhook
-        event_data = _validate_and_parse_webhook(request, provider)
+        event_data = _validate_and_parse_webhook(request, provider, provider_name)
 
         # Handle test webhooks
         if not event_data:
@@ -429,6 +489,30 @@ def health_check(request: HttpRequest) -> JsonResponse:
     return JsonResponse({"status": "healthy", "service": "webhook-processor"})
 
 
+@require_http_methods(["GET"])
+def metrics_endpoint(request: HttpRequest) -> HttpResponse:
+    """Serve pipeline metrics of all workers in the Prometheus text format.
+
+    Requires "Authorization: Bearer <METRICS_TOKEN>". The metrics expose
+    internal operational data (throughput, providers, event types and
+    error rates), so without a token the endpoint is only served in
+    DEBUG mode.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        if not hmac.compare_digest(
+            request.headers.get("Authorization", ""), f"Bearer {token}"
+        ):
+            return HttpResponse(status=401)
+    elif not settings.DEBUG:
+        return HttpResponse(status=404)
+
+    return HttpResponse(
+        metrics_exporter.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 # Legacy webhook endpoints removed to enforce multi-tenancy
 # All webhooks must now use organization-specific endpoints:
 # - /webhook/customer/{uuid}/shopify/
@@ -442,6 +526,7 @@ def health_check(request: HttpRequest) -> JsonResponse:
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@round_trips.tracked("webhook", provider="shopify")
 def customer_shopify_webhook(
     request: HttpRequest, organization_uuid: str
 ) -> JsonResponse:
@@ -483,6 +568,7 @@ def customer_shopify_webhook(
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@round_trips.tracked("webhook", provider="chargify")
 def customer_chargify_webhook(
     request: HttpRequest, organization_uuid: str
 ) -> JsonResponse:
@@ -523,6 +609,7 @@ def customer_chargify_webhook(
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@round_trips.tracked("webhook", provider="stripe")
 def customer_stripe_webhook(
     request: HttpRequest, organization_uuid: str
 ) -> JsonResponse:
@@ -565,6 +652,24 @@ def customer_stripe_webhook(
 # === GLOBAL BILLING WEBHOOKS (Notipus revenue) ===
 
 
+def _refresh_catalog_on_change(request: HttpRequest) -> None:
+    """Mark the Stripe catalog stale for product.* and price.* events.
+
+    The catalog reloads in the background, so the webhook doesn't wait
+    for Stripe.
+    """
+    from core.services.stripe_catalog import is_catalog_event, stripe_catalog
+
+    try:
+        event_type = json.loads(request.body).get("type")
+    except (ValueError, AttributeError):
+        return
+
+    if is_catalog_event(event_type):
+        logger.info(f"Reloading Stripe catalog after {event_type}")
+        stripe_catalog.invalidate()
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def billing_stripe_webhook(request: HttpRequest) -> JsonResponse:
@@ -599,7 +704,12 @@ def billing_stripe_webhook(request: HttpRequest) -> JsonResponse:
 
         provider = StripeSourcePlugin(webhook_secret=billing_integration.webhook_secret)
 
-        return _process_webhook(request, provider, "billing_stripe")
+        response = _process_webhook(request, provider, "billing_stripe")
+        # Only reached with a valid signature; product/price changes reload
+        # the catalog the plan and pricing pages render from
+        if response.status_code == 200:
+            _refresh_catalog_on_change(request)
+        return response
 
     except Exception as e:
         logger.error(f"Error in billing Stripe webhook: {str(e)}", exc_info=True)
@@ -4,7 +4,8 @@ This module provides common fixtures for testing webhook handling,
 authentication, and notification processing.
 """
 
-from typing import Any, Generator
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager, Generator
 from unittest.mock import Mock, patch
 
 import pytest
@@ -28,9 +29,40 @@ def disable_sentry() -> Generator[None, None, None]:
     yield
 
 
+@pytest.fixture(autouse=True)
+def reset_plan_catalog() -> Generator[None, None, None]:
+    """Start every test with an unloaded plan catalog.
+
+    Test transactions roll back without Plan signals, so a snapshot loaded
+    in one test could otherwise leak plans into the next.
+
+    Yields:
+        None
+    """
+    from core.services.plan_catalog import plan_catalog
+
+    plan_catalog.invalidate()
+    yield
+    plan_catalog.invalidate()
+
+
 # Test organization UUID for multi-tenant webhook endpoints
 TEST_ORG_UUID = "12345678-1234-5678-1234-567812345678"
 
+# Most Redis round trips and SQL queries one golden-path webhook request
+# ("webhook") or queued group ("job") may take, by provider. Lower these
+# when a change saves round trips; raising them needs a reason.
+ROUND_TRIP_BUDGETS: dict[str, dict[str, dict[str, int]]] = {
+    "shopify": {"webhook": {"redis_round_trips": 36, "sql_queries": 4}},
+    "chargify": {"webhook": {"redis_round_trips": 32, "sql_queries": 4}},
+    "stripe": {
+        # One read checks whether the event's group was already sent early
+        "webhook": {"redis_round_trips": 16, "sql_queries": 4},
+        # One read keeps events appended while the group was being sent
+        "job": {"redis_round_trips": 29, "sql_queries": 2},
+    },
+}
+
 
 @pytest.fixture
 def mock_webhook_validation() -> Generator[Any, None, None]:
@@ -50,6 +82,40 @@ def mock_webhook_validation() -> Generator[Any, None, None]:
         yield mock_process_event_rich
 
 
+@pytest.fixture
+def round_trip_budget() -> Callable[..., ContextManager[Any]]:
+    """Assert the block stays within a provider's round-trip budget.
+
+    Usage:
+        with round_trip_budget("shopify"):
+            client.post(...)
+
+    Returns:
+        Context manager taking the provider and scope ("webhook" or "job")
+        and yielding the counts. Failures list the calls by call site.
+    """
+    from webhooks.services.round_trips import round_trips
+
+    @contextmanager
+    def check(provider: str, scope: str = "webhook") -> Generator[Any, None, None]:
+        with round_trips.track(scope, provider, sample=True) as counts:
+            yield counts
+
+        budget = ROUND_TRIP_BUDGETS[provider][scope]
+        actual = counts.as_dict()
+        over = {
+            name: f"{actual[name]} > {limit}"
+            for name, limit in budget.items()
+            if actual[name] > limit
+        }
+        assert not over, (
+            f"{provider} {scope} is over its round-trip budget: {over}; "
+            f"calls by site: {actual['call_sites']}"
+        )
+
+    return check
+
+
 @pytest.fixture
 def client() -> Client:
     """Create a Django test client.
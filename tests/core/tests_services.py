@@ -563,8 +563,8 @@ class DashboardServiceTest(TestCase):
 
         self.assertIsNone(result)
 
-    def test_get_integration_data(self):
-        """Test integration data retrieval"""
+    def test_get_integration_flags(self):
+        """Test integration flags retrieval"""
         from core.services.dashboard import DashboardService
 
         # Create some integrations
@@ -580,13 +580,31 @@ class DashboardServiceTest(TestCase):
         )
 
         service = DashboardService()
-        result = service._get_integration_data(self.workspace)
+        result = service._get_integration_flags(self.workspace)
 
         self.assertTrue(result["has_slack"])
         self.assertTrue(result["has_shopify"])
         self.assertFalse(result["has_chargify"])
         self.assertFalse(result["has_stripe"])
 
+    def test_get_queue_stats_staff_only_tenant_list(self) -> None:
+        """Test only staff users get every workspace's queue stats."""
+        from core.services.dashboard import DashboardService
+
+        service = DashboardService()
+        with patch("core.services.dashboard.processing_lanes") as mock_lanes:
+            mock_lanes.tenant_stats.return_value = {"avg_wait_seconds": 0.5}
+            mock_lanes.all_tenant_stats.return_value = [{"tenant": "other"}]
+
+            result = service._get_queue_stats(self.workspace, self.user)
+            self.assertEqual(result["queue_stats"], {"avg_wait_seconds": 0.5})
+            self.assertEqual(result["tenant_queue_stats"], [])
+            mock_lanes.tenant_stats.assert_called_once_with(str(self.workspace.uuid))
+
+            self.user.is_staff = True
+            result = service._get_queue_stats(self.workspace, self.user)
+            self.assertEqual(result["tenant_queue_stats"], [{"tenant": "other"}])
+
     def test_get_trial_info_active_trial(self) -> None:
         """Test trial info for active trial."""
         from core.services.dashboard import DashboardService
@@ -962,3 +980,68 @@ class DashboardServiceTest(TestCase):
 
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0]["event_count"], 2)
+
+    @patch("core.services.dashboard.DatabaseLookupService")
+    def test_recent_activity_reads_rollups(self, mock_db_service):
+        """Test recent activity comes from write-time rollups when present"""
+        from core.services.dashboard import DashboardService
+
+        mock_db_instance = Mock()
+        mock_db_instance.get_activity_rollups.return_value = [
+            {
+                "latest": {
+                    "type": "payment",
+                    "event_type": "payment_success",
+                    "timestamp": 1234567890,
+                    "customer_email": "a@example.com",
+                    "amount": 50.0,
+                },
+                "event_count": 3,
+                "total_amount": 150.0,
+            },
+            {
+                "latest": {
+                    "type": "subscription",
+                    "event_type": "subscription_created",
+                    "timestamp": 1234567800,
+                    "customer_email": "b@example.com",
+                },
+                "event_count": 1,
+                "total_amount": 0.0,
+            },
+        ]
+        mock_db_service.return_value = mock_db_instance
+
+        service = DashboardService()
+        result = service._get_recent_activity(self.workspace)
+
+        mock_db_instance.get_activity_rollups.assert_called_once_with(
+            str(self.workspace.uuid), days=7, limit=15
+        )
+        mock_db_instance.get_recent_webhook_activity.assert_not_called()
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0]["event_count"], 3)
+        self.assertEqual(result[0]["total_amount"], 150.0)
+        self.assertEqual(result[1]["event_count"], 1)
+        self.assertNotIn("total_amount", result[1])
+
+    @patch("core.services.dashboard.DatabaseLookupService")
+    def test_recent_activity_falls_back_without_rollups(self, mock_db_service):
+        """Test raw records are grouped when no rollups exist yet"""
+        from core.services.dashboard import DashboardService
+
+        mock_db_instance = Mock()
+        mock_db_instance.get_activity_rollups.return_value = []
+        mock_db_instance.get_recent_webhook_activity.return_value = [
+            {"event_type": "payment_success", "timestamp": 1234567890},
+        ]
+        mock_db_service.return_value = mock_db_instance
+
+        service = DashboardService()
+        result = service._get_recent_activity(self.workspace)
+
+        mock_db_instance.get_recent_webhook_activity.assert_called_once_with(
+            days=7, limit=100, workspace_id=str(self.workspace.uuid)
+        )
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]["event_count"], 1)
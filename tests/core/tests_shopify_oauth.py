@@ -13,6 +13,7 @@ from unittest.mock import Mock, patch
 import pytest
 import requests
 from core.models import Integration, UserProfile, Workspace
+from core.services.shopify_webhooks import shopify_webhooks
 from core.views.integrations.shopify import (
     _is_valid_shop_domain,
     _normalize_shop_domain,
@@ -23,6 +24,23 @@ from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 
+@pytest.fixture
+def webhook_session():
+    """Replace the webhook jobs' HTTP client with a mock; jobs run inline."""
+    mock_session = Mock()
+    with (
+        patch("core.services.shopify_webhooks.http_client", mock_session),
+        patch.object(
+            shopify_webhooks,
+            "_start",
+            side_effect=lambda action, target, args: shopify_webhooks._run(
+                action, target, args
+            ),
+        ),
+    ):
+        yield mock_session
+
+
 class TestShopifyOAuthHelpers(TestCase):
     """Test helper functions for Shopify OAuth."""
 
@@ -387,7 +405,7 @@ class TestShopifyConnectCallbackView:
         SHOPIFY_API_VERSION="2025-01",
         BASE_URL="http://localhost:8000",
     )
-    @patch("core.views.integrations.shopify.requests.post")
+    @patch("core.views.integrations.shopify.http_client.post")
     def test_callback_token_exchange_success(
         self, mock_post: Mock, client: Client, setup_user: tuple
     ) -> None:
@@ -445,7 +463,7 @@ class TestShopifyConnectCallbackView:
         SHOPIFY_CLIENT_ID="test_client_id",
         SHOPIFY_CLIENT_SECRET="test_secret",
     )
-    @patch("core.views.integrations.shopify.requests.post")
+    @patch("core.views.integrations.shopify.http_client.post")
     def test_callback_token_exchange_failure(
         self, mock_post: Mock, client: Client, setup_user: tuple
     ) -> None:
@@ -546,18 +564,23 @@ class TestDisconnectShopifyView:
         assert any("no active" in str(m).lower() for m in messages)
 
     @override_settings(SHOPIFY_API_VERSION="2025-01")
-    @patch("core.views.integrations.shopify.requests.delete")
     def test_disconnect_success(
-        self, mock_delete: Mock, client: Client, setup_user_with_integration: tuple
+        self,
+        client: Client,
+        setup_user_with_integration: tuple,
+        webhook_session: Mock,
+        django_capture_on_commit_callbacks,
     ) -> None:
         """Test successful disconnection."""
         user, workspace, _, integration = setup_user_with_integration
         client.force_login(user)
 
         # Mock webhook deletion
+        mock_delete = webhook_session.delete
         mock_delete.return_value = Mock(status_code=200)
 
-        response = client.post(reverse("core:disconnect_shopify"))
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(reverse("core:disconnect_shopify"))
 
         assert response.status_code == 302
         assert response.url == reverse("core:integrations")
@@ -573,18 +596,24 @@ class TestDisconnectShopifyView:
         assert any("disconnected" in str(m).lower() for m in messages)
 
     @override_settings(SHOPIFY_API_VERSION="2025-01")
-    @patch("core.views.integrations.shopify.requests.delete")
     def test_disconnect_webhook_deletion_failure(
-        self, mock_delete: Mock, client: Client, setup_user_with_integration: tuple
+        self,
+        client: Client,
+        setup_user_with_integration: tuple,
+        webhook_session: Mock,
+        django_capture_on_commit_callbacks,
     ) -> None:
         """Test disconnection succeeds even if webhook deletion fails."""
         user, workspace, _, integration = setup_user_with_integration
         client.force_login(user)
 
         # Mock webhook deletion failure
-        mock_delete.side_effect = requests.exceptions.RequestException("API error")
+        webhook_session.delete.side_effect = requests.exceptions.RequestException(
+            "API error"
+        )
 
-        response = client.post(reverse("core:disconnect_shopify"))
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(reverse("core:disconnect_shopify"))
 
         assert response.status_code == 302
         assert response.url == reverse("core:integrations")
@@ -622,9 +651,14 @@ class TestWebhookCreation:
         SHOPIFY_API_VERSION="2025-01",
         BASE_URL="http://localhost:8000",
     )
-    @patch("core.views.integrations.shopify.requests.post")
+    @patch("core.views.integrations.shopify.http_client.post")
     def test_webhook_creation_all_topics(
-        self, mock_post: Mock, client: Client, setup_user: tuple
+        self,
+        mock_post: Mock,
+        client: Client,
+        setup_user: tuple,
+        webhook_session: Mock,
+        django_capture_on_commit_callbacks,
     ) -> None:
         """Test that all webhook topics are created."""
         user, workspace, _ = setup_user
@@ -649,24 +683,26 @@ class TestWebhookCreation:
         webhook_response.status_code = 201
         webhook_response.json.return_value = {"webhook": {"id": 12345}}
 
-        # Token exchange + 5 webhook creations
-        mock_post.side_effect = [token_response] + [webhook_response] * 5
+        # Token exchange, then 7 webhook creations in the background job
+        mock_post.return_value = token_response
+        webhook_session.post.return_value = webhook_response
 
-        response = client.get(
-            reverse("core:shopify_connect_callback"),
-            {
-                "code": "test_code",
-                "state": "test_state",
-                "shop": "teststore.myshopify.com",
-            },
-        )
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.get(
+                reverse("core:shopify_connect_callback"),
+                {
+                    "code": "test_code",
+                    "state": "test_state",
+                    "shop": "teststore.myshopify.com",
+                },
+            )
 
         assert response.status_code == 302
 
-        # Verify all 5 webhook topics were requested
-        # First call is token exchange, next 5 are webhooks
-        webhook_calls = mock_post.call_args_list[1:]
-        assert len(webhook_calls) == 5
+        # Verify all 7 webhook topics were requested
+        assert mock_post.call_count == 1
+        webhook_calls = webhook_session.post.call_args_list
+        assert len(webhook_calls) == 7
 
         # Verify webhook URL format
         for call in webhook_calls:
@@ -681,9 +717,14 @@ class TestWebhookCreation:
         SHOPIFY_API_VERSION="2025-01",
         BASE_URL="http://localhost:8000",
     )
-    @patch("core.views.integrations.shopify.requests.post")
+    @patch("core.views.integrations.shopify.http_client.post")
     def test_webhook_creation_handles_existing(
-        self, mock_post: Mock, client: Client, setup_user: tuple
+        self,
+        mock_post: Mock,
+        client: Client,
+        setup_user: tuple,
+        webhook_session: Mock,
+        django_capture_on_commit_callbacks,
     ) -> None:
         """Test that existing webhooks (422) are handled gracefully."""
         user, workspace, _ = setup_user
@@ -713,23 +754,26 @@ class TestWebhookCreation:
         exists_response.status_code = 422
         exists_response.text = "Webhook already exists"
 
-        mock_post.side_effect = [
-            token_response,
+        mock_post.return_value = token_response
+        webhook_session.post.side_effect = [
             success_response,
             exists_response,
             success_response,
             exists_response,
             success_response,
+            exists_response,
+            exists_response,
         ]
 
-        response = client.get(
-            reverse("core:shopify_connect_callback"),
-            {
-                "code": "test_code",
-                "state": "test_state",
-                "shop": "teststore.myshopify.com",
-            },
-        )
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.get(
+                reverse("core:shopify_connect_callback"),
+                {
+                    "code": "test_code",
+                    "state": "test_state",
+                    "shop": "teststore.myshopify.com",
+                },
+            )
 
         assert response.status_code == 302
         assert response.url == reverse("core:integrations")
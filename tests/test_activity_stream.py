@@ -0,0 +1,280 @@
+"""Tests for the live dashboard activity stream.
+
+This module tests publishing activity records to the per-workspace channel
+and backlog, Last-Event-ID replay, de-duplication of live messages, and
+the server-sent events view.
+"""
+
+import asyncio
+import json
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from core.models import Workspace, WorkspaceMember
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from webhooks.services.activity_stream import PUBLISH_SCRIPT, ActivityStream
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+WORKSPACE_ID = str(uuid.uuid4())
+
+
+def make_record(timestamp: float, **overrides) -> dict:
+    """Build an activity record like DatabaseLookupService stores."""
+    record = {
+        "type": "payment",
+        "event_type": "payment_success",
+        "provider": "stripe",
+        "external_id": f"pi_{int(timestamp)}",
+        "customer_id": "cus_123",
+        "amount": 49.0,
+        "currency": "USD",
+        "status": "success",
+        "headline": "$49.00 from Acme",
+        "severity": "success",
+        "timestamp": timestamp,
+    }
+    record.update(overrides)
+    return record
+
+
+def collect(stream: ActivityStream, workspace_id: str, last_event_id=None) -> list:
+    """Run a stream to completion and return everything it yielded."""
+
+    async def run() -> list:
+        return [item async for item in stream.stream(workspace_id, last_event_id)]
+
+    return asyncio.run(run())
+
+
+def message(event_id: int, record: dict) -> dict:
+    """Build a pub/sub message like PUBLISH_SCRIPT sends."""
+    return {"data": json.dumps({"id": event_id, "record": record})}
+
+
+def fake_redis(live: list[dict], backlog: list[dict]) -> tuple:
+    """Build an async Redis client with live messages and a backlog."""
+    pubsub = MagicMock()
+    pubsub.subscribe = AsyncMock()
+    pubsub.aclose = AsyncMock()
+    pubsub.get_message = AsyncMock(side_effect=[*live, None])
+    redis_client = MagicMock()
+    redis_client.pubsub.return_value = pubsub
+    redis_client.aclose = AsyncMock()
+    redis_client.zrangebyscore = AsyncMock(
+        return_value=[item["data"] for item in backlog]
+    )
+    return redis_client, pubsub
+
+
+def run_redis_stream(redis_client: MagicMock, last_event_id: int) -> list:
+    """Stream from a fake Redis client until the first heartbeat."""
+    stream = ActivityStream()
+    stream.MAX_STREAM_SECONDS = 60
+
+    async def run() -> list:
+        items = []
+        async for item in stream.stream(WORKSPACE_ID, last_event_id):
+            items.append(item)
+            if item is None:
+                break
+        return items
+
+    with patch(
+        "webhooks.services.activity_stream.get_async_redis_client",
+        return_value=redis_client,
+    ):
+        return asyncio.run(run())
+
+
+@pytest.fixture
+def stream() -> ActivityStream:
+    """Create a short-lived stream backed by a local-memory cache."""
+    with override_settings(CACHES=LOCMEM_CACHES):
+        cache.clear()
+        activity = ActivityStream()
+        activity.MAX_STREAM_SECONDS = 0
+        activity.POLL_SECONDS = 0
+        yield activity
+
+
+class TestPublish:
+    """Test publishing records."""
+
+    def test_backlog_keeps_latest_records(self, stream: ActivityStream) -> None:
+        """Test the fallback backlog is capped at BACKLOG_SIZE."""
+        stream.BACKLOG_SIZE = 2
+        for second in (1, 2, 3):
+            stream.publish(WORKSPACE_ID, make_record(1_700_000_000 + second))
+
+        backlog = cache.get(stream._get_backlog_key(WORKSPACE_ID))
+
+        assert [event_id for event_id, _ in backlog] == [2, 3]
+
+    def test_global_events_are_not_published(self, stream: ActivityStream) -> None:
+        """Test records without a workspace aren't streamed."""
+        with patch("webhooks.services.activity_stream.get_redis_client") as client:
+            stream.publish(None, make_record(1_700_000_000))
+        client.assert_not_called()
+
+    def test_redis_publish_is_one_script(self) -> None:
+        """Test the ID, backlog update and PUBLISH go out in a single script."""
+        redis_client = MagicMock()
+        record = make_record(1_700_000_000.5)
+
+        with patch(
+            "webhooks.services.activity_stream.get_redis_client",
+            return_value=redis_client,
+        ):
+            ActivityStream().publish(WORKSPACE_ID, record)
+
+        redis_client.eval.assert_called_once()
+        script, num_keys, backlog_key, sequence_key, *args = (
+            redis_client.eval.call_args[0]
+        )
+        assert script == PUBLISH_SCRIPT
+        assert num_keys == 2
+        assert backlog_key.endswith(f"activity_stream_backlog:{WORKSPACE_ID}")
+        assert sequence_key.endswith(f"activity_stream_seq:{WORKSPACE_ID}")
+        assert json.loads(args[0]) == record
+        assert args[3].endswith(f"activity_stream:{WORKSPACE_ID}")
+
+    def test_ids_follow_publish_order(self, stream: ActivityStream) -> None:
+        """Test IDs come from the sequence, not the record timestamps."""
+        stream.publish(WORKSPACE_ID, make_record(1_700_000_002))
+        stream.publish(WORKSPACE_ID, make_record(1_700_000_001))
+
+        backlog = cache.get(stream._get_backlog_key(WORKSPACE_ID))
+
+        assert [(event_id, r["timestamp"]) for event_id, r in backlog] == [
+            (1, 1_700_000_002),
+            (2, 1_700_000_001),
+        ]
+
+    def test_publish_never_raises(self) -> None:
+        """Test Redis errors don't escape into webhook processing."""
+        with patch(
+            "webhooks.services.activity_stream.get_redis_client",
+            side_effect=Exception("redis down"),
+        ):
+            ActivityStream().publish(WORKSPACE_ID, make_record(1_700_000_000))
+
+
+class TestStream:
+    """Test streaming and Last-Event-ID resume."""
+
+    def test_resume_replays_events_after_last_id(self, stream: ActivityStream) -> None:
+        """Test a reconnecting client gets only the events it missed."""
+        for second in (1, 2, 3):
+            stream.publish(WORKSPACE_ID, make_record(1_700_000_000 + second))
+
+        items = collect(stream, WORKSPACE_ID, last_event_id=1)
+
+        assert [event_id for event_id, _ in items] == [2, 3]
+        assert items[0][1]["external_id"] == "pi_1700000002"
+
+    def test_new_client_starts_with_live_events(self, stream: ActivityStream) -> None:
+        """Test a first connection doesn't replay the backlog."""
+        stream.publish(WORKSPACE_ID, make_record(1_700_000_001))
+
+        assert collect(stream, WORKSPACE_ID) == []
+
+    def test_idle_stream_yields_heartbeat(self, stream: ActivityStream) -> None:
+        """Test None is yielded after HEARTBEAT_SECONDS without events."""
+        stream.HEARTBEAT_SECONDS = 0
+
+        assert collect(stream, WORKSPACE_ID) == [None]
+
+    def test_redis_stream_replays_then_drops_duplicates(self) -> None:
+        """Test backlog replay, then live messages not already replayed."""
+        first = message(2, make_record(1_700_000_001))
+        second = message(3, make_record(1_700_000_002))
+        # The second record arrived while the backlog was being read
+        redis_client, pubsub = fake_redis([second, first], [first, second])
+
+        items = run_redis_stream(redis_client, last_event_id=1)
+
+        assert [item[1]["external_id"] for item in items[:-1]] == [
+            "pi_1700000001",
+            "pi_1700000002",
+        ]
+        assert items[-1] is None
+        pubsub.subscribe.assert_awaited_once()
+        pubsub.aclose.assert_awaited_once()
+        redis_client.aclose.assert_awaited_once()
+
+    def test_redis_stream_keeps_live_events_with_lower_ids(self) -> None:
+        """Test live messages aren't dropped for arriving out of ID order."""
+        replayed = message(5, make_record(1_700_000_005))
+        later = message(7, make_record(1_700_000_007))
+        earlier = message(6, make_record(1_700_000_006))
+        redis_client, _ = fake_redis([later, earlier], [replayed])
+
+        items = run_redis_stream(redis_client, last_event_id=4)
+
+        assert [item[0] for item in items[:-1]] == [5, 7, 6]
+
+
+@pytest.mark.django_db
+class TestActivityStreamView:
+    """Test the server-sent events endpoint."""
+
+    @pytest.fixture
+    def member(self) -> WorkspaceMember:
+        """Create a user who is a member of a workspace."""
+        user = User.objects.create_user(username="owner", password="pw")
+        workspace = Workspace.objects.create(name="Acme")
+        return WorkspaceMember.objects.create(
+            user=user, workspace=workspace, role="owner"
+        )
+
+    def test_streams_rendered_activity(self, member: WorkspaceMember) -> None:
+        """Test events carry the ID, record and rendered list item."""
+        record = make_record(1_700_000_001)
+        fake_stream = MagicMock()
+        seen: dict = {}
+
+        async def events(workspace_id, last_event_id):
+            seen.update(workspace_id=workspace_id, last_event_id=last_event_id)
+            yield 1_700_000_001_000_000, record
+            yield None
+
+        fake_stream.stream = events
+        client = AsyncClient()
+        client.force_login(member.user)
+
+        async def fetch():
+            response = await client.get(
+                reverse("core:activity_stream"), headers={"Last-Event-ID": "42"}
+            )
+            body = b"".join([chunk async for chunk in response.streaming_content])
+            return response, body.decode()
+
+        with patch("webhooks.services.activity_stream.activity_stream", fake_stream):
+            response, body = async_to_sync(fetch)()
+
+        assert response["Content-Type"] == "text/event-stream"
+        assert response["Cache-Control"] == "no-cache"
+        assert seen == {
+            "workspace_id": str(member.workspace.uuid),
+            "last_event_id": 42,
+        }
+        chunks = body.split("\n\n")
+        assert chunks[0] == "retry: 3000"
+        assert chunks[1].startswith("id: 1700000001000000\nevent: activity\ndata: ")
+        data = json.loads(chunks[1].split("data: ", 1)[1])
+        assert data["record"]["external_id"] == "pi_1700000001"
+        assert "$49.00 from Acme" in data["html"]
+        assert chunks[2] == ": keepalive"
+
+    def test_requires_login(self) -> None:
+        """Test anonymous users are redirected to log in."""
+        response = async_to_sync(AsyncClient().get)(reverse("core:activity_stream"))
+        assert response.status_code == 302
@@ -0,0 +1,168 @@
+"""Tests for resolving billing webhooks to workspaces by Stripe customer.
+
+This module tests the indexed stripe_customer_id lookup, the cached
+customer -> workspace mapping and its invalidation, the conditional
+UPDATEs issued by BillingService handlers, and a benchmark against
+100k workspaces.
+"""
+
+import statistics
+import time
+
+import pytest
+from core.models import Workspace
+from django.core.cache import cache
+from django.test import override_settings
+from webhooks.services.billing import BillingService
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache():
+    """Run every test against an empty local-memory cache."""
+    with override_settings(CACHES=LOCMEM_CACHES):
+        cache.clear()
+        yield
+
+
+@pytest.fixture
+def workspace(db) -> Workspace:
+    """Create a workspace linked to a Stripe customer."""
+    return Workspace.objects.create(
+        name="Acme", stripe_customer_id="cus_1", subscription_status="active"
+    )
+
+
+@pytest.mark.django_db
+class TestCustomerWorkspaceLookup:
+    """Test BillingService.get_workspace_ref."""
+
+    def test_column_is_indexed(self) -> None:
+        """Test the lookup column has a database index."""
+        assert Workspace._meta.get_field("stripe_customer_id").db_index
+
+    def test_lookup_is_cached(
+        self, workspace: Workspace, django_assert_num_queries
+    ) -> None:
+        """Test repeat lookups don't query the database."""
+        BillingService.get_workspace_ref("cus_1")
+
+        with django_assert_num_queries(0):
+            ref = BillingService.get_workspace_ref("cus_1")
+
+        assert ref == {"id": workspace.id, "name": "Acme"}
+
+    def test_misses_are_not_cached(self, db) -> None:
+        """Test a workspace linked after a miss is found."""
+        assert BillingService.get_workspace_ref("cus_new") is None
+
+        Workspace.objects.create(name="New", stripe_customer_id="cus_new")
+
+        assert BillingService.get_workspace_ref("cus_new")["name"] == "New"
+
+    def test_saving_workspace_drops_cached_ref(self, workspace: Workspace) -> None:
+        """Test renaming a workspace refreshes the cached name."""
+        BillingService.get_workspace_ref("cus_1")
+
+        workspace.name = "Acme Inc"
+        workspace.save()
+
+        assert BillingService.get_workspace_ref("cus_1")["name"] == "Acme Inc"
+
+
+@pytest.mark.django_db
+class TestConditionalUpdates:
+    """Test handlers write with one conditional UPDATE."""
+
+    def test_change_is_a_single_update(
+        self, workspace: Workspace, django_assert_num_queries
+    ) -> None:
+        """Test a status change costs one query."""
+        with django_assert_num_queries(1):
+            BillingService.handle_payment_failed({"customer": "cus_1"})
+
+        workspace.refresh_from_db()
+        assert workspace.subscription_status == "past_due"
+
+    def test_duplicate_event_changes_no_rows(
+        self, workspace: Workspace, django_assert_num_queries
+    ) -> None:
+        """Test a retried event matches no rows and reuses the cached lookup."""
+        BillingService.get_workspace_ref("cus_1")
+
+        with django_assert_num_queries(1) as captured:
+            BillingService.handle_payment_success(
+                {"customer": "cus_1", "period_end": None}
+            )
+
+        assert captured.captured_queries[0]["sql"].startswith("UPDATE")
+        assert BillingService._update_customer_workspaces(
+            "cus_1", {"subscription_status": "active"}
+        )
+
+    def test_unknown_customer_is_not_found(self, db) -> None:
+        """Test a customer without a workspace reports no match."""
+        assert not BillingService._update_customer_workspaces(
+            "cus_missing", {"subscription_status": "active"}
+        )
+
+
+@pytest.mark.slow
+@pytest.mark.django_db
+class TestCustomerLookupBenchmark:
+    """Benchmark customer resolution against 100k workspaces."""
+
+    WORKSPACES = 100_000
+    LOOKUPS = 200
+
+    @pytest.fixture
+    def many_workspaces(self) -> None:
+        """Insert WORKSPACES workspaces with distinct customers."""
+        Workspace.objects.bulk_create(
+            (
+                Workspace(
+                    name=f"Workspace {i}",
+                    slug=f"workspace-{i}",
+                    stripe_customer_id=f"cus_{i:06d}",
+                )
+                for i in range(self.WORKSPACES)
+            ),
+            batch_size=5000,
+        )
+
+    def _time(self, lookup) -> float:
+        """Return the median seconds per lookup over several rounds."""
+        customers = [
+            f"cus_{i * 499 % self.WORKSPACES:06d}" for i in range(self.LOOKUPS)
+        ]
+        rounds = []
+        for _ in range(3):
+            start = time.perf_counter()
+            for customer_id in customers:
+                assert lookup(customer_id)
+            rounds.append((time.perf_counter() - start) / len(customers))
+        return statistics.median(rounds)
+
+    def test_indexed_lookup_beats_scan(self, many_workspaces: None) -> None:
+        """Test indexed and cached lookups stay far below a table scan."""
+        plan = Workspace.objects.filter(stripe_customer_id="cus_000001").explain()
+        assert "INDEX" in plan.upper(), plan
+
+        def scan(customer_id: str) -> bool:
+            # name isn't indexed, so this is the pre-index query cost
+            number = int(customer_id.removeprefix("cus_"))
+            return Workspace.objects.filter(name=f"Workspace {number}").exists()
+
+        def indexed(customer_id: str) -> bool:
+            return Workspace.objects.filter(stripe_customer_id=customer_id).exists()
+
+        scanned = self._time(scan)
+        seeked = self._time(indexed)
+        self._time(BillingService.get_workspace_ref)  # Warm the cache
+        cached = self._time(BillingService.get_workspace_ref)
+
+        assert seeked < scanned / 5, f"{scanned * 1e6:.0f}us -> {seeked * 1e6:.0f}us"
+        assert cached < seeked, f"{seeked * 1e6:.0f}us -> {cached * 1e6:.0f}us"
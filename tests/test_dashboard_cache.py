@@ -0,0 +1,220 @@
+"""Tests for the per-workspace dashboard snapshot cache.
+
+This module tests section reuse and selective rebuilds, the invalidation
+hooks on writes, and DashboardService composing the dashboard from the
+snapshot with a single integration flags query.
+"""
+
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from core.models import Integration, UserProfile, Workspace
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from webhooks.services.dashboard_cache import DashboardCache, dashboard_cache
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+WORKSPACE_ID = str(uuid.uuid4())
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache():
+    """Run every test against an empty local-memory cache."""
+    with override_settings(CACHES=LOCMEM_CACHES):
+        cache.clear()
+        yield
+
+
+def counting_builders() -> tuple[dict, dict]:
+    """Create section builders that count how often they run."""
+    calls = {"integrations": 0, "activity": 0, "usage": 0}
+
+    def builder(section: str):
+        def build():
+            calls[section] += 1
+            return f"{section}-{calls[section]}"
+
+        return build
+
+    return {section: builder(section) for section in calls}, calls
+
+
+class TestDashboardCache:
+    """Test snapshot reuse and invalidation."""
+
+    def test_sections_are_reused_until_invalidated(self) -> None:
+        """Test only the invalidated section is rebuilt."""
+        builders, calls = counting_builders()
+
+        first = dashboard_cache.get_sections(WORKSPACE_ID, builders)
+        second = dashboard_cache.get_sections(WORKSPACE_ID, builders)
+        dashboard_cache.invalidate(WORKSPACE_ID, "activity")
+        third = dashboard_cache.get_sections(WORKSPACE_ID, builders)
+
+        assert first == second
+        assert third == {
+            "integrations": "integrations-1",
+            "activity": "activity-2",
+            "usage": "usage-1",
+        }
+        assert calls == {"integrations": 1, "activity": 2, "usage": 1}
+
+    def test_plan_change_rebuilds_usage(self) -> None:
+        """Test sections depending on the plan key follow its version."""
+        builders, calls = counting_builders()
+
+        dashboard_cache.get_sections(WORKSPACE_ID, builders)
+        dashboard_cache.invalidate(WORKSPACE_ID, "plan")
+        dashboard_cache.get_sections(WORKSPACE_ID, builders)
+
+        assert calls == {"integrations": 1, "activity": 1, "usage": 2}
+
+    def test_extra_versions_invalidate_dependent_sections(self) -> None:
+        """Test a changed caller-supplied plan version rebuilds usage."""
+        builders, calls = counting_builders()
+
+        dashboard_cache.get_sections(WORKSPACE_ID, builders, {"plan": "free:trial"})
+        dashboard_cache.get_sections(WORKSPACE_ID, builders, {"plan": "free:trial"})
+        dashboard_cache.get_sections(WORKSPACE_ID, builders, {"plan": "pro:active"})
+
+        assert calls == {"integrations": 1, "activity": 1, "usage": 2}
+
+    def test_sections_expire_after_ttl(self) -> None:
+        """Test a section is rebuilt once it is older than SNAPSHOT_TTL."""
+        builders, calls = counting_builders()
+        snapshots = DashboardCache()
+
+        with patch("webhooks.services.dashboard_cache.time") as mock_time:
+            mock_time.time.return_value = 1000.0
+            snapshots.get_sections(WORKSPACE_ID, builders)
+            mock_time.time.return_value = 1000.0 + snapshots.SNAPSHOT_TTL
+            snapshots.get_sections(WORKSPACE_ID, builders)
+
+        assert calls == {"integrations": 2, "activity": 2, "usage": 2}
+
+    def test_cache_errors_fall_back_to_building(self) -> None:
+        """Test an unreadable cache still produces a dashboard."""
+        builders, calls = counting_builders()
+
+        with patch("webhooks.services.dashboard_cache.cache") as mock_cache:
+            mock_cache.get_many.side_effect = Exception("redis down")
+            sections = dashboard_cache.get_sections(WORKSPACE_ID, builders)
+
+        assert sections["activity"] == "activity-1"
+
+    def test_global_events_are_ignored(self) -> None:
+        """Test invalidating without a workspace is a no-op."""
+        with patch("webhooks.services.dashboard_cache.cache") as mock_cache:
+            dashboard_cache.invalidate(None, "activity")
+        mock_cache.set_many.assert_not_called()
+
+
+@pytest.mark.django_db
+class TestInvalidationHooks:
+    """Test writes invalidate the sections they affect."""
+
+    @pytest.fixture
+    def workspace(self) -> Workspace:
+        """Create a workspace."""
+        return Workspace.objects.create(name="Acme")
+
+    def test_integration_changes_invalidate_flags(self, workspace: Workspace) -> None:
+        """Test saving and deleting integrations bump the integrations key."""
+        key = dashboard_cache._get_version_key(str(workspace.uuid), "integrations")
+
+        integration = Integration.objects.create(
+            workspace=workspace, integration_type="shopify"
+        )
+        after_create = cache.get(key)
+        integration.delete()
+
+        assert after_create
+        assert cache.get(key) != after_create
+
+    def test_workspace_save_invalidates_plan(self, workspace: Workspace) -> None:
+        """Test plan changes saved on the workspace bump the plan key."""
+        key = dashboard_cache._get_version_key(str(workspace.uuid), "plan")
+        before = cache.get(key)
+
+        workspace.subscription_plan = "pro"
+        workspace.save()
+
+        assert cache.get(key) != before
+
+    def test_usage_increment_invalidates_usage(self, workspace: Workspace) -> None:
+        """Test counting a webhook bumps the usage key."""
+        from webhooks.services.rate_limiter import RateLimiter
+
+        RateLimiter().increment_usage(workspace)
+
+        key = dashboard_cache._get_version_key(str(workspace.uuid), "usage")
+        assert cache.get(key)
+
+
+@pytest.mark.django_db
+class TestDashboardServiceSnapshot:
+    """Test DashboardService reads the snapshot."""
+
+    @pytest.fixture
+    def user(self) -> User:
+        """Create a user with a workspace profile."""
+        user = User.objects.create_user(username="owner", password="pw")
+        workspace = Workspace.objects.create(name="Acme")
+        UserProfile.objects.create(user=user, workspace=workspace)
+        Integration.objects.create(
+            workspace=workspace, integration_type="slack_notifications"
+        )
+        return user
+
+    def test_integration_flags_use_one_query(self, user: User) -> None:
+        """Test the four has_* flags come from a single aggregate query."""
+        from core.services.dashboard import DashboardService
+
+        workspace = user.userprofile.workspace
+        with CaptureQueriesContext(connection) as queries:
+            flags = DashboardService()._get_integration_flags(workspace)
+
+        assert len(queries) == 1
+        assert flags == {
+            "has_slack": True,
+            "has_shopify": False,
+            "has_chargify": False,
+            "has_stripe": False,
+        }
+
+    def test_repeat_views_reuse_snapshot(self, user: User) -> None:
+        """Test a second page view skips the Redis and database reads."""
+        from core.services.dashboard import DashboardService
+
+        with (
+            patch("core.services.dashboard.rate_limiter") as mock_limiter,
+            patch("core.services.dashboard.DatabaseLookupService") as mock_lookup,
+        ):
+            mock_limiter.check_rate_limit.return_value = (True, {"limit": 20})
+            mock_limiter.get_usage_stats.return_value = {}
+            mock_lookup.return_value = MagicMock(
+                get_activity_rollups=MagicMock(return_value=[]),
+                get_recent_webhook_activity=MagicMock(return_value=[]),
+            )
+            service = DashboardService()
+
+            first = service.get_dashboard_data(user)
+            second = service.get_dashboard_data(user)
+
+            Integration.objects.create(
+                workspace=first["workspace"], integration_type="shopify"
+            )
+            third = service.get_dashboard_data(user)
+
+        assert mock_limiter.check_rate_limit.call_count == 1
+        assert mock_lookup.return_value.get_activity_rollups.call_count == 1
+        assert second["integrations"]["has_slack"] is True
+        assert second["integrations"]["has_shopify"] is False
+        assert third["integrations"]["has_shopify"] is True
@@ -200,7 +200,7 @@ class TestHunterPluginNormalization:
 class TestHunterPluginAPICall:
     """Tests for Hunter API calls."""
 
-    @patch("plugins.enrichment.hunter.requests.get")
+    @patch("plugins.enrichment.hunter.http_client.get")
     def test_enrich_email_success(
         self,
         mock_get: Mock,
@@ -218,7 +218,7 @@ class TestHunterPluginAPICall:
         assert result["last_name"] == "Doe"
         mock_get.assert_called_once()
 
-    @patch("plugins.enrichment.hunter.requests.get")
+    @patch("plugins.enrichment.hunter.http_client.get")
     def test_enrich_email_not_found(
         self, mock_get: Mock, hunter_plugin: HunterPlugin
     ) -> None:
@@ -228,7 +228,7 @@ class TestHunterPluginAPICall:
         with pytest.raises(EmailNotFoundError):
             hunter_plugin.enrich_email("notfound@example.com", "test-api-key")
 
-    @patch("plugins.enrichment.hunter.requests.get")
+    @patch("plugins.enrichment.hunter.http_client.get")
     def test_enrich_email_gdpr_claimed(
         self, mock_get: Mock, hunter_plugin: HunterPlugin
     ) -> None:
@@ -238,7 +238,7 @@ class TestHunterPluginAPICall:
         with pytest.raises(GDPRClaimedError):
             hunter_plugin.enrich_email("gdpr@example.com", "test-api-key")
 
-    @patch("plugins.enrichment.hunter.requests.get")
+    @patch("plugins.enrichment.hunter.http_client.get")
     def test_enrich_email_rate_limit(
         self, mock_get: Mock, hunter_plugin: HunterPlugin
     ) -> None:
@@ -256,7 +256,7 @@ class TestHunterPluginAPICall:
         result = hunter_plugin.enrich_email("test@example.com", "")
         assert result == {}
 
-    @patch("plugins.enrichment.hunter.requests.get")
+    @patch("plugins.enrichment.hunter.http_client.get")
     def test_enrich_email_free_email_provider(
         self, mock_get: MagicMock, hunter_plugin: HunterPlugin
     ) -> None:
@@ -265,7 +265,7 @@ class TestHunterPluginAPICall:
             hunter_plugin.enrich_email("user@gmail.com", "test-api-key")
         mock_get.assert_not_called()
 
-    @patch("plugins.enrichment.hunter.requests.get")
+    @patch("plugins.enrichment.hunter.http_client.get")
     def test_enrich_email_yahoo_filtered(
         self, mock_get: MagicMock, hunter_plugin: HunterPlugin
     ) -> None:
@@ -274,7 +274,7 @@ class TestHunterPluginAPICall:
             hunter_plugin.enrich_email("user@yahoo.com", "test-api-key")
         mock_get.assert_not_called()
 
-    @patch("plugins.enrichment.hunter.requests.get")
+    @patch("plugins.enrichment.hunter.http_client.get")
     def test_enrich_email_disposable_filtered(
         self, mock_get: MagicMock, hunter_plugin: HunterPlugin
     ) -> None:
@@ -283,7 +283,7 @@ class TestHunterPluginAPICall:
             hunter_plugin.enrich_email("user@mailinator.com", "test-api-key")
         mock_get.assert_not_called()
 
-    @patch("plugins.enrichment.hunter.requests.get")
+    @patch("plugins.enrichment.hunter.http_client.get")
     def test_enrich_email_400_bad_request(
         self, mock_get: MagicMock, hunter_plugin: HunterPlugin
     ) -> None:
@@ -1,7 +1,8 @@
 """Tests for enriched webhook record storage.
 
 This module tests the store_enriched_record method in DatabaseLookupService
-that stores RichNotification data for dashboard display.
+that stores RichNotification data for dashboard display, and the
+per-workspace activity index the dashboard reads it back from.
 """
 
 import json
@@ -287,3 +288,210 @@ class TestStoreEnrichedRecord:
         service = DatabaseLookupService(ttl_days=14)
         expected_ttl = 60 * 60 * 24 * 14  # 14 days in seconds
         assert service.ttl_seconds == expected_ttl
+
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+class TestActivityIndex:
+    """Tests for the per-workspace activity index."""
+
+    def _store(
+        self,
+        db_service: DatabaseLookupService,
+        key: str,
+        timestamp: float,
+        workspace_id: str,
+    ) -> None:
+        """Store a minimal record and index it for a workspace."""
+        from django.core.cache import cache
+
+        cache.set(key, json.dumps({"external_id": key, "timestamp": timestamp}))
+        db_service._add_to_activity_index(key, timestamp, workspace_id)
+
+    def test_activity_is_isolated_per_workspace(
+        self, db_service: DatabaseLookupService
+    ) -> None:
+        """Test a workspace only sees its own activity, newest first."""
+        from django.test import override_settings
+        from django.utils import timezone
+
+        now = timezone.now().timestamp()
+        with override_settings(CACHES=LOCMEM_CACHES):
+            self._store(db_service, "webhook:payment:a1", now - 20, "ws-a")
+            self._store(db_service, "webhook:payment:b1", now - 10, "ws-b")
+            self._store(db_service, "webhook:payment:a2", now, "ws-a")
+
+            records = db_service.get_recent_webhook_activity(workspace_id="ws-a")
+
+        assert [r["external_id"] for r in records] == [
+            "webhook:payment:a2",
+            "webhook:payment:a1",
+        ]
+
+    def test_retention_is_per_workspace(
+        self, db_service: DatabaseLookupService
+    ) -> None:
+        """Test a busy workspace can't evict another workspace's history."""
+        from django.test import override_settings
+        from django.utils import timezone
+
+        db_service.ACTIVITY_RECORDS_PER_WORKSPACE = 3
+        now = timezone.now().timestamp()
+        with override_settings(CACHES=LOCMEM_CACHES):
+            self._store(db_service, "webhook:order:quiet", now - 100, "ws-quiet")
+            for i in range(10):
+                self._store(db_service, f"webhook:order:busy{i}", now - i, "ws-busy")
+
+            busy = db_service.get_recent_webhook_activity(workspace_id="ws-busy")
+            quiet = db_service.get_recent_webhook_activity(workspace_id="ws-quiet")
+
+        assert [r["external_id"] for r in busy] == [
+            "webhook:order:busy0",
+            "webhook:order:busy1",
+            "webhook:order:busy2",
+        ]
+        assert [r["external_id"] for r in quiet] == ["webhook:order:quiet"]
+
+    def test_redis_write_is_one_pipeline(
+        self, db_service: DatabaseLookupService
+    ) -> None:
+        """Test indexing issues ZADD, trim and EXPIRE in a single pipeline."""
+        redis_client = MagicMock()
+        pipe = redis_client.pipeline.return_value
+
+        with patch(
+            "webhooks.services.database_lookup.get_redis_client",
+            return_value=redis_client,
+        ):
+            db_service._add_to_activity_index("webhook:payment:1", 123.0, "ws-a")
+
+        redis_client.pipeline.assert_called_once_with(transaction=False)
+        pipe.zadd.assert_called_once()
+        assert pipe.zadd.call_args[0][1] == {"webhook:payment:1": 123.0}
+        pipe.zremrangebyrank.assert_called_once()
+        assert pipe.zremrangebyrank.call_args[0][1:] == (
+            0,
+            -(db_service.ACTIVITY_RECORDS_PER_WORKSPACE + 1),
+        )
+        pipe.expire.assert_called_once()
+        pipe.execute.assert_called_once()
+
+    def test_redis_read_uses_single_mget(
+        self, db_service: DatabaseLookupService
+    ) -> None:
+        """Test records are fetched with one get_many after the range query."""
+        redis_client = MagicMock()
+        redis_client.zrevrangebyscore.return_value = [b"webhook:b", b"webhook:a"]
+
+        with (
+            patch(
+                "webhooks.services.database_lookup.get_redis_client",
+                return_value=redis_client,
+            ),
+            patch("webhooks.services.database_lookup.cache") as mock_cache,
+        ):
+            mock_cache.get_many.return_value = {
+                "webhook:a": json.dumps({"external_id": "a"}),
+                "webhook:b": json.dumps({"external_id": "b"}),
+            }
+            records = db_service.get_recent_webhook_activity(
+                limit=2, workspace_id="ws-a"
+            )
+
+        assert [r["external_id"] for r in records] == ["b", "a"]
+        mock_cache.get_many.assert_called_once_with(["webhook:b", "webhook:a"])
+        mock_cache.get.assert_not_called()
+        assert redis_client.zrevrangebyscore.call_args[1] == {"start": 0, "num": 2}
+
+
+class TestActivityRollups:
+    """Tests for write-time dashboard activity rollups."""
+
+    def test_rollup_groups_by_customer_type_and_day(
+        self,
+        db_service: DatabaseLookupService,
+        sample_event_data: dict,
+        sample_notification: RichNotification,
+    ) -> None:
+        """Test repeated events for a customer fold into one rollup."""
+        from django.test import override_settings
+
+        other_event = {**sample_event_data, "type": "subscription_created"}
+        with override_settings(CACHES=LOCMEM_CACHES):
+            for _ in range(3):
+                db_service.store_enriched_record(
+                    sample_event_data, sample_notification, workspace_id="ws-a"
+                )
+            db_service.store_enriched_record(
+                other_event, sample_notification, workspace_id="ws-a"
+            )
+            db_service.store_enriched_record(
+                sample_event_data, sample_notification, workspace_id="ws-b"
+            )
+
+            rollups = db_service.get_activity_rollups("ws-a")
+
+        assert [r["latest"]["event_type"] for r in rollups] == [
+            "subscription_created",
+            "payment_success",
+        ]
+        payments = rollups[1]
+        assert payments["event_count"] == 3
+        assert payments["total_amount"] == pytest.approx(897.0)
+        assert payments["latest"]["customer_email"] == "billing@acme.com"
+
+    def test_redis_rollup_update_is_one_transaction(
+        self, db_service: DatabaseLookupService
+    ) -> None:
+        """Test the rollup hash and index are updated in one MULTI/EXEC."""
+        redis_client = MagicMock()
+        pipe = redis_client.pipeline.return_value
+        record = {
+            "event_type": "payment_success",
+            "customer_email": "a@example.com",
+            "amount": 10.0,
+            "timestamp": 1234567890.0,
+        }
+
+        with patch(
+            "webhooks.services.database_lookup.get_redis_client",
+            return_value=redis_client,
+        ):
+            db_service._update_activity_rollup(record, "ws-a")
+
+        redis_client.pipeline.assert_called_once_with(transaction=True)
+        pipe.hincrby.assert_called_once()
+        assert pipe.hincrbyfloat.call_args[0][1:] == ("total_amount", 10.0)
+        assert pipe.zadd.call_args[1] == {"gt": True}
+        pipe.execute.assert_called_once()
+
+    def test_redis_rollup_read_pipelines_hashes(
+        self, db_service: DatabaseLookupService
+    ) -> None:
+        """Test rollups are read with one range query and one pipeline."""
+        redis_client = MagicMock()
+        redis_client.zrevrangebyscore.return_value = [b"g2", b"g1"]
+        pipe = redis_client.pipeline.return_value
+        pipe.execute.return_value = [
+            {
+                b"event_count": b"2",
+                b"total_amount": b"30.5",
+                b"latest": json.dumps({"external_id": "two"}).encode(),
+            },
+            {},  # expired hash
+        ]
+
+        with patch(
+            "webhooks.services.database_lookup.get_redis_client",
+            return_value=redis_client,
+        ):
+            rollups = db_service.get_activity_rollups("ws-a", limit=2)
+
+        assert rollups == [
+            {"latest": {"external_id": "two"}, "event_count": 2, "total_amount": 30.5}
+        ]
+        assert pipe.hgetall.call_count == 2
+        pipe.execute.assert_called_once()
@@ -458,7 +458,7 @@ class TestBrandfetchPlugin:
         plugin = BrandfetchPlugin()
         assert plugin.get_plugin_name() == "brandfetch"
 
-    @patch("plugins.enrichment.brandfetch.requests.get")
+    @patch("plugins.enrichment.brandfetch.http_client.get")
     def test_enrich_domain_handles_404_gracefully(self, mock_get: MagicMock) -> None:
         """Test that 404 responses are handled gracefully without error logging."""
         mock_response = MagicMock()
@@ -473,7 +473,7 @@ class TestBrandfetchPlugin:
         assert result == {}
         mock_get.assert_called_once()
 
-    @patch("plugins.enrichment.brandfetch.requests.get")
+    @patch("plugins.enrichment.brandfetch.http_client.get")
     def test_enrich_domain_handles_429_rate_limit(self, mock_get: MagicMock) -> None:
         """Test that 429 rate limit responses are handled with warning."""
         mock_response = MagicMock()
@@ -489,7 +489,7 @@ class TestBrandfetchPlugin:
         assert result == {}
         mock_get.assert_called_once()
 
-    @patch("plugins.enrichment.brandfetch.requests.get")
+    @patch("plugins.enrichment.brandfetch.http_client.get")
     def test_enrich_domain_handles_timeout(self, mock_get: MagicMock) -> None:
         """Test that timeout exceptions are handled gracefully."""
         import requests
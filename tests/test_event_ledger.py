@@ -0,0 +1,360 @@
+"""Tests for the event ledger write-behind batcher and retention.
+
+This module tests buffering and batched flushes of ledger records, the
+PostgreSQL COPY path, and partition/row retention in the
+maintain_event_ledger command.
+"""
+
+import time
+import uuid
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+from core.models import EventLedgerEntry
+from django.core.management import call_command
+from django.db import connection
+from webhooks.services.event_ledger import (
+    EventLedgerWriter,
+    drop_partitions_before,
+    ensure_partition,
+    list_partitions,
+    partition_name,
+)
+
+WORKSPACE_ID = str(uuid.uuid4())
+
+
+def make_record(**overrides) -> dict:
+    """Build an activity record like DatabaseLookupService stores."""
+    record = {
+        "type": "payment",
+        "event_type": "payment_success",
+        "provider": "stripe",
+        "external_id": "pi_123",
+        "customer_id": "cus_123",
+        "customer_email": "billing@acme.com",
+        "amount": 49.99,
+        "currency": "USD",
+        "status": "success",
+        "timestamp": datetime(2026, 10, 18, 12, tzinfo=dt_timezone.utc).timestamp(),
+    }
+    record.update(overrides)
+    return record
+
+
+@pytest.fixture
+def writer(settings) -> EventLedgerWriter:
+    """Create a writer with the ledger enabled and no flush thread."""
+    settings.EVENT_LEDGER_ENABLED = True
+    ledger_writer = EventLedgerWriter(batch_size=3, flush_interval_ms=50)
+    with patch.object(ledger_writer, "_ensure_flusher"):
+        yield ledger_writer
+
+
+@pytest.mark.django_db
+class TestEventLedgerWriter:
+    """Test buffering and batched writes."""
+
+    def test_records_are_buffered_until_flush(self, writer: EventLedgerWriter) -> None:
+        """Test nothing is written per event; flush writes the batch."""
+        writer.record(WORKSPACE_ID, make_record())
+        writer.record(WORKSPACE_ID, make_record(external_id="pi_456", amount=None))
+
+        assert writer.pending() == 2
+        assert EventLedgerEntry.objects.count() == 0
+
+        assert writer.flush() == 2
+
+        assert writer.pending() == 0
+        entries = EventLedgerEntry.objects.order_by("external_id")
+        assert [e.external_id for e in entries] == ["pi_123", "pi_456"]
+        first = entries[0]
+        assert str(first.workspace_uuid) == WORKSPACE_ID
+        assert first.event_type == "payment_success"
+        assert str(first.amount) == "49.99"
+        assert first.occurred_at == datetime(2026, 10, 18, 12, tzinfo=dt_timezone.utc)
+        assert first.record["customer_email"] == "billing@acme.com"
+        assert entries[1].amount is None
+
+    def test_batch_uses_one_insert(self, writer: EventLedgerWriter) -> None:
+        """Test a flush writes all rows with a single multi-row INSERT."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        for i in range(3):
+            writer.record(WORKSPACE_ID, make_record(external_id=f"pi_{i}"))
+
+        with CaptureQueriesContext(connection) as queries:
+            writer.flush()
+
+        inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+        assert len(inserts) == 1
+        assert EventLedgerEntry.objects.count() == 3
+
+    def test_full_batch_wakes_flusher(self, writer: EventLedgerWriter) -> None:
+        """Test reaching batch_size notifies the flush thread."""
+        with patch.object(writer, "_condition") as condition:
+            for _ in range(3):
+                writer.record(WORKSPACE_ID, make_record())
+
+        condition.notify.assert_called_once()
+
+    def test_events_without_workspace_are_skipped(
+        self, writer: EventLedgerWriter
+    ) -> None:
+        """Test global events don't go into the per-workspace ledger."""
+        writer.record(None, make_record())
+        assert writer.pending() == 0
+
+    def test_disabled_ledger_records_nothing(
+        self, writer: EventLedgerWriter, settings
+    ) -> None:
+        """Test EVENT_LEDGER_ENABLED=False turns recording off."""
+        settings.EVENT_LEDGER_ENABLED = False
+        writer.record(WORKSPACE_ID, make_record())
+        assert writer.pending() == 0
+
+    def test_failed_flush_is_retried_after_backoff(
+        self, writer: EventLedgerWriter
+    ) -> None:
+        """Test a failed batch stays buffered and is written on a later flush."""
+        writer.record(WORKSPACE_ID, make_record())
+        with patch.object(
+            EventLedgerEntry.objects, "bulk_create", side_effect=Exception("db down")
+        ):
+            assert writer.flush() == 0
+        assert writer.pending() == 1
+
+        # Still backing off
+        assert writer.flush() == 0
+        assert EventLedgerEntry.objects.count() == 0
+
+        writer._retry_at = 0.0
+        assert writer.flush() == 1
+        assert writer.pending() == 0
+        assert EventLedgerEntry.objects.count() == 1
+
+    def test_bad_row_does_not_sink_the_batch(self, writer: EventLedgerWriter) -> None:
+        """Test a failed batch is written row by row, dropping only bad rows."""
+        bulk_create = EventLedgerEntry.objects.bulk_create
+
+        def fail_on_bad_row(batch, **kwargs):
+            if any(entry.external_id == "pi_bad" for entry in batch):
+                raise ValueError("bad row")
+            return bulk_create(batch, **kwargs)
+
+        for external_id in ("pi_1", "pi_bad", "pi_2"):
+            writer.record(WORKSPACE_ID, make_record(external_id=external_id))
+        with patch.object(
+            EventLedgerEntry.objects, "bulk_create", side_effect=fail_on_bad_row
+        ):
+            assert writer.flush() == 2
+
+        assert writer.pending() == 0
+        remaining = EventLedgerEntry.objects.values_list("external_id", flat=True)
+        assert sorted(remaining) == ["pi_1", "pi_2"]
+
+    def test_pending_records_are_bounded(self, writer: EventLedgerWriter) -> None:
+        """Test the oldest rows are dropped once max_pending rows wait."""
+        writer.max_pending = 2
+        for i in range(3):
+            writer.record(WORKSPACE_ID, make_record(external_id=f"pi_{i}"))
+        with patch.object(
+            EventLedgerEntry.objects, "bulk_create", side_effect=Exception("db down")
+        ):
+            writer.flush()
+
+        assert [entry.external_id for entry in writer._buffer] == ["pi_1", "pi_2"]
+
+    def test_background_thread_flushes_on_interval(self, settings) -> None:
+        """Test the flush thread writes a partial batch after the interval."""
+        settings.EVENT_LEDGER_ENABLED = True
+        ledger_writer = EventLedgerWriter(batch_size=100, flush_interval_ms=10)
+
+        with (
+            patch("webhooks.services.event_ledger.close_old_connections"),
+            patch.object(EventLedgerEntry.objects, "bulk_create") as bulk_create,
+        ):
+            ledger_writer.record(WORKSPACE_ID, make_record())
+            deadline = time.monotonic() + 2
+            while ledger_writer.pending() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            ledger_writer.close()
+
+        assert ledger_writer.pending() == 0
+        bulk_create.assert_called_once()
+        assert not ledger_writer._thread.is_alive()
+
+
+class TestPostgresCopy:
+    """Test the COPY path used on PostgreSQL."""
+
+    def test_copy_writes_csv_with_not_null_text(self, settings) -> None:
+        """Test COPY gets one CSV row per entry and keeps empty text non-NULL."""
+        settings.EVENT_LEDGER_ENABLED = True
+        ledger_writer = EventLedgerWriter(batch_size=10)
+        batch = [
+            ledger_writer._build_entry(WORKSPACE_ID, make_record()),
+            ledger_writer._build_entry(
+                WORKSPACE_ID, make_record(customer_email="", amount=None)
+            ),
+        ]
+
+        cursor = MagicMock()
+        with patch("webhooks.services.event_ledger.connection") as connection:
+            connection.cursor.return_value.__enter__.return_value = cursor
+            ledger_writer._copy(batch)
+
+        sql, buffer = cursor.copy_expert.call_args[0]
+        assert sql.startswith("COPY core_eventledgerentry (workspace_uuid,")
+        assert "FORCE_NOT_NULL (provider" in sql
+        rows = buffer.getvalue().splitlines()
+        assert len(rows) == 2
+        assert rows[0].startswith(f"{WORKSPACE_ID},2026-10-18T12:00:00+00:00,stripe")
+        # Empty email, then an unquoted empty (NULL) amount
+        assert "billing@acme.com" not in rows[1]
+        assert ",,,USD," in rows[1]
+
+
+class TestPartitionRetention:
+    """Test retention on PostgreSQL, where the ledger is partitioned."""
+
+    def _drop(self, cursor: MagicMock, dry_run: bool = False) -> list[str]:
+        with (
+            patch("webhooks.services.event_ledger.is_partitioned", return_value=True),
+            patch("webhooks.services.event_ledger.connection") as connection,
+        ):
+            connection.cursor.return_value.__enter__.return_value = cursor
+            return drop_partitions_before(date(2026, 2, 20), dry_run=dry_run)
+
+    def test_expired_default_partition_rows_are_deleted(self) -> None:
+        """Test old partitions are dropped and the DEFAULT partition pruned."""
+        cursor = MagicMock(rowcount=4)
+        cursor.fetchall.return_value = [
+            ("core_eventledgerentry_p2026_01",),
+            ("core_eventledgerentry_p2026_02",),
+            ("core_eventledgerentry_default",),
+        ]
+
+        removed = self._drop(cursor)
+
+        assert removed == [
+            "core_eventledgerentry_p2026_01",
+            "4 rows before 2026-02-01 from core_eventledgerentry_default",
+        ]
+        statements = [call.args[0] for call in cursor.execute.call_args_list]
+        assert "DROP TABLE IF EXISTS core_eventledgerentry_p2026_01" in statements
+        assert statements[-1] == (
+            "DELETE FROM core_eventledgerentry_default WHERE occurred_at < %s"
+        )
+        assert cursor.execute.call_args.args[1] == [
+            datetime(2026, 2, 1, tzinfo=dt_timezone.utc)
+        ]
+
+    def test_dry_run_counts_default_partition_rows(self) -> None:
+        """Test a dry run counts expired DEFAULT rows without deleting them."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [("core_eventledgerentry_default",)]
+        cursor.fetchone.return_value = (2,)
+
+        removed = self._drop(cursor, dry_run=True)
+
+        assert removed == [
+            "2 rows before 2026-02-01 from core_eventledgerentry_default"
+        ]
+        statements = [call.args[0] for call in cursor.execute.call_args_list]
+        assert not any(sql.startswith(("DELETE", "DROP")) for sql in statements)
+
+
+@pytest.mark.django_db
+class TestLedgerRetention:
+    """Test retention on databases without partitioning."""
+
+    def test_partition_name(self) -> None:
+        """Test partition names are zero-padded by month."""
+        assert partition_name(date(2026, 3, 15)) == "core_eventledgerentry_p2026_03"
+
+    def test_drop_before_cutoff_deletes_old_rows(self) -> None:
+        """Test rows before the cutoff month are removed; newer rows stay."""
+        for month in (1, 2, 3):
+            EventLedgerEntry.objects.create(
+                workspace_uuid=WORKSPACE_ID,
+                occurred_at=datetime(2026, month, 10, tzinfo=dt_timezone.utc),
+                provider="stripe",
+                event_type="payment_success",
+                external_id=f"pi_{month}",
+            )
+
+        assert drop_partitions_before(date(2026, 2, 1), dry_run=True)
+        assert EventLedgerEntry.objects.count() == 3
+
+        removed = drop_partitions_before(date(2026, 2, 20))
+
+        assert removed == ["1 rows before 2026-02-01"]
+        remaining = EventLedgerEntry.objects.values_list("external_id", flat=True)
+        assert sorted(remaining) == ["pi_2", "pi_3"]
+
+    def test_maintain_command_applies_retention(self) -> None:
+        """Test the command keeps --retention-months of history."""
+        EventLedgerEntry.objects.create(
+            workspace_uuid=WORKSPACE_ID,
+            occurred_at=datetime(2020, 1, 1, tzinfo=dt_timezone.utc),
+            provider="stripe",
+            event_type="payment_success",
+            external_id="pi_old",
+        )
+        out = StringIO()
+
+        call_command("maintain_event_ledger", "--retention-months", "3", stdout=out)
+
+        assert "Dropped 1 rows before" in out.getvalue()
+        assert not EventLedgerEntry.objects.exists()
+
+
+@pytest.mark.postgres
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="the ledger is partitioned on PostgreSQL"
+)
+@pytest.mark.django_db
+class TestPostgresPartitions:
+    """Test COPY and partition maintenance against a real PostgreSQL database.
+
+    Run with TEST_DATABASE_URL pointing at a PostgreSQL server.
+    """
+
+    def test_copy_partition_and_drop(self, settings) -> None:
+        """Test rows are copied into a new partition that retention drops."""
+        settings.EVENT_LEDGER_ENABLED = True
+        ledger_writer = EventLedgerWriter(batch_size=10)
+        with patch.object(ledger_writer, "_ensure_flusher"):
+            ledger_writer.record(WORKSPACE_ID, make_record())
+            ledger_writer.record(
+                WORKSPACE_ID, make_record(external_id="pi_456", customer_email="")
+            )
+            assert ledger_writer.flush() == 2
+
+        assert date(2026, 10, 1) in list_partitions()
+        entry = EventLedgerEntry.objects.get(external_id="pi_456")
+        assert entry.customer_email == ""
+
+        # September has no partition, so this row lands in the DEFAULT one
+        EventLedgerEntry.objects.create(
+            workspace_uuid=WORKSPACE_ID,
+            provider="stripe",
+            event_type="payment_success",
+            external_id="pi_789",
+            occurred_at=datetime(2026, 9, 30, tzinfo=dt_timezone.utc),
+        )
+
+        ensure_partition(date(2026, 11, 1))
+        ensure_partition(date(2026, 11, 1))  # Idempotent
+        dropped = drop_partitions_before(date(2026, 11, 1))
+
+        assert partition_name(date(2026, 10, 1)) in dropped
+        assert any("core_eventledgerentry_default" in item for item in dropped)
+        assert date(2026, 10, 1) not in list_partitions()
+        assert date(2026, 11, 1) in list_partitions()
+        assert not EventLedgerEntry.objects.exists()
@@ -4,7 +4,10 @@ This module tests the EventProcessor class for handling various
 webhook events and generating properly formatted RichNotification objects.
 """
 
+import threading
+import time
 from typing import Any
+from unittest.mock import MagicMock
 
 import pytest
 from webhooks.models.rich_notification import (
@@ -13,6 +16,7 @@ from webhooks.models.rich_notification import (
     RichNotification,
 )
 from webhooks.services.event_processor import EventProcessor
+from webhooks.services.metrics import metrics
 
 
 def test_notification_formatting() -> None:
@@ -334,3 +338,114 @@ def test_display_name_ignores_individual() -> None:
     # Customer info should have email, and company_name should be set to "Individual"
     assert notification.customer is not None
     assert notification.customer.email == "billing@enterprise.com"
+
+
+def _budget_event() -> dict[str, Any]:
+    """Build a payment success event for enrichment budget tests."""
+    return {
+        "type": "payment_success",
+        "customer_id": "cust_123",
+        "amount": 29.99,
+        "currency": "USD",
+        "provider": "stripe",
+        "external_id": "evt_budget",
+        "metadata": {},
+    }
+
+
+def test_enrichment_budget_defaults_by_severity(settings: Any) -> None:
+    """Test the budget is taken from settings by notification severity."""
+    settings.ENRICHMENT_BUDGET_MS = {"error": 1000, "success": 4000, "info": None}
+    processor = EventProcessor()
+
+    assert processor.get_enrichment_budget("payment_failure", None) == 1.0
+    assert processor.get_enrichment_budget("payment_success", None) == 4.0
+    assert processor.get_enrichment_budget("trial_started", None) is None
+
+
+def test_enrichment_budget_workspace_override(settings: Any) -> None:
+    """Test workspace NotificationSettings override the default budget."""
+    settings.ENRICHMENT_BUDGET_MS = {"error": 1000}
+    workspace = MagicMock()
+    workspace.notification_settings.enrichment_budget_ms = {"error": 250}
+    processor = EventProcessor()
+
+    assert processor.get_enrichment_budget("payment_failure", workspace) == 0.25
+
+
+def test_enrichment_budget_invalid_override(settings: Any) -> None:
+    """Test unusable workspace overrides fall back to the default budget."""
+    settings.ENRICHMENT_BUDGET_MS = {"error": 1000, "success": 4000}
+    workspace = MagicMock()
+    workspace.notification_settings.enrichment_budget_ms = {
+        "error": "fast",
+        "success": [250],
+    }
+    processor = EventProcessor()
+
+    assert processor.get_enrichment_budget("payment_failure", workspace) == 1.0
+    assert processor.get_enrichment_budget("payment_success", workspace) == 4.0
+
+
+def test_slow_enrichment_skipped_within_budget(settings: Any) -> None:
+    """Test enrichment missing the budget is skipped and counted."""
+    settings.ENRICHMENT_BUDGET_MS = {"success": 50}
+    processor = EventProcessor()
+    release = threading.Event()
+    processor._enrich_company = lambda customer_data: release.wait(5)  # type: ignore[method-assign]
+    skipped_before = metrics.get_counter(
+        "enrichment_skipped_budget_total",
+        {"enrichment": "company", "severity": "success"},
+    )
+
+    start = time.monotonic()
+    notification = processor.build_rich_notification(
+        _budget_event(), {"email": "billing@slow-budget-test.io"}
+    )
+    elapsed = time.monotonic() - start
+    release.set()
+
+    assert elapsed < 1.0
+    assert notification.company is None
+    skipped_after = metrics.get_counter(
+        "enrichment_skipped_budget_total",
+        {"enrichment": "company", "severity": "success"},
+    )
+    assert skipped_after == skipped_before + 1
+
+
+def test_in_flight_enrichment_is_reused(settings: Any) -> None:
+    """Test a lookup still running in the background is not started twice."""
+    settings.ENRICHMENT_BUDGET_MS = {"success": 20}
+    processor = EventProcessor()
+    release = threading.Event()
+    calls: list[str] = []
+
+    def slow_company(customer_data: dict[str, Any]) -> None:
+        calls.append(customer_data["email"])
+        release.wait(5)
+
+    processor._enrich_company = slow_company  # type: ignore[method-assign]
+    customer = {"email": "billing@warmup-budget-test.io"}
+
+    processor.build_rich_notification(_budget_event(), customer)
+    processor.build_rich_notification(_budget_event(), customer)
+    release.set()
+
+    assert calls == ["billing@warmup-budget-test.io"]
+
+
+def test_no_budget_runs_enrichment_inline(settings: Any) -> None:
+    """Test enrichment without a budget runs in the calling thread."""
+    settings.ENRICHMENT_BUDGET_MS = {}
+    processor = EventProcessor()
+    threads: list[str] = []
+    processor._enrich_company = lambda customer_data: threads.append(  # type: ignore[method-assign]
+        threading.current_thread().name
+    )
+
+    processor.build_rich_notification(
+        _budget_event(), {"email": "billing@inline-budget-test.io"}
+    )
+
+    assert threads == [threading.current_thread().name]
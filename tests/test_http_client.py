@@ -0,0 +1,171 @@
+"""Tests for the shared outbound HTTP client.
+
+This module tests session pooling and retry configuration, timeout
+defaults, per-host concurrency limits and the metrics recorded for each
+request.
+"""
+
+import threading
+import urllib.request
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from django.test import override_settings
+from webhooks.services.http_client import HostBusyError, HttpClient
+from webhooks.services.metrics import metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    """Start every test with an empty metrics registry."""
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+@pytest.fixture
+def client() -> HttpClient:
+    """Create a client whose session is a mock."""
+    client = HttpClient()
+    client._session = Mock()
+    client._session.request.return_value = Mock(status_code=200)
+    return client
+
+
+class TestSession:
+    """Test the shared session's configuration."""
+
+    @override_settings(
+        HTTP_CLIENT_POOL_SIZE=4, HTTP_CLIENT_POOL_HOSTS=7, HTTP_CLIENT_RETRIES=3
+    )
+    def test_pools_and_retries_follow_settings(self) -> None:
+        """Test adapters are sized and retry as configured."""
+        session = HttpClient()._get_session()
+        adapter = session.get_adapter("https://api.hunter.io/v2/account")
+
+        assert adapter._pool_maxsize == 4
+        assert adapter._pool_connections == 7
+        assert adapter.max_retries.total == 3
+        assert 503 in adapter.max_retries.status_forcelist
+
+    def test_session_is_shared(self) -> None:
+        """Test every request reuses the same session."""
+        client = HttpClient()
+
+        assert client._get_session() is client._get_session()
+
+    def test_cookies_are_not_stored(self) -> None:
+        """Test a response's cookies would never enter the shared jar."""
+        session = HttpClient()._get_session()
+        cookie = requests.cookies.create_cookie("session", "abc", domain="slack.com")
+        request = urllib.request.Request("https://slack.com/api/test")
+
+        assert not session.cookies.get_policy().set_ok(cookie, request)
+
+
+class TestRequest:
+    """Test HttpClient.request."""
+
+    @override_settings(HTTP_CLIENT_CONNECT_TIMEOUT=2, HTTP_CLIENT_READ_TIMEOUT=20)
+    def test_timeouts(self, client: HttpClient) -> None:
+        """Test the connect timeout is added to the caller's read timeout."""
+        client.get("https://api.hunter.io/v2/account")
+        client.get("https://api.hunter.io/v2/account", timeout=10)
+
+        timeouts = [
+            call.kwargs["timeout"] for call in client._session.request.mock_calls
+        ]
+        assert timeouts == [(2, 20), (2, 10)]
+
+    def test_records_latency_and_outcome(self, client: HttpClient) -> None:
+        """Test each response is counted by service and status class."""
+        client._session.request.return_value = Mock(status_code=404)
+
+        response = client.get("https://api.hunter.io/v2/x", service="hunter")
+
+        assert response.status_code == 404
+        labels = {"service": "hunter", "outcome": "4xx"}
+        assert metrics.get_counter("http_client_requests_total", labels) == 1
+        assert (
+            metrics.get_histogram("http_client_request_seconds", labels)["count"] == 1
+        )
+
+    def test_errors_are_counted_and_raised(self, client: HttpClient) -> None:
+        """Test exceptions reach the caller and are counted by type."""
+        client._session.request.side_effect = requests.exceptions.ConnectTimeout()
+
+        with pytest.raises(requests.exceptions.Timeout):
+            client.post("https://hooks.slack.com/x", service="slack")
+
+        assert (
+            metrics.get_counter(
+                "http_client_errors_total",
+                {"service": "slack", "error": "ConnectTimeout"},
+            )
+            == 1
+        )
+        assert (
+            metrics.get_counter(
+                "http_client_requests_total", {"service": "slack", "outcome": "error"}
+            )
+            == 1
+        )
+
+
+class TestHostLimit:
+    """Test per-host concurrency limits."""
+
+    @override_settings(HTTP_CLIENT_MAX_PER_HOST=1)
+    def test_requests_beyond_limit_wait(self, client: HttpClient) -> None:
+        """Test a second request to a busy host waits for the first."""
+        started = threading.Event()
+        release = threading.Event()
+        in_flight = []
+
+        def request(method, url, **kwargs):
+            in_flight.append(url)
+            if len(in_flight) == 1:
+                started.set()
+                release.wait(5)
+            return Mock(status_code=200)
+
+        client._session.request.side_effect = request
+        first = threading.Thread(
+            target=client.get, args=("https://shop.example/a",), kwargs={"service": "s"}
+        )
+        first.start()
+        assert started.wait(5)
+
+        # Other hosts aren't affected
+        client.get("https://other.example/b", service="s")
+        second = threading.Thread(
+            target=client.get, args=("https://shop.example/c",), kwargs={"service": "s"}
+        )
+        second.start()
+        second.join(0.2)
+        assert second.is_alive()
+
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        assert in_flight == [
+            "https://shop.example/a",
+            "https://other.example/b",
+            "https://shop.example/c",
+        ]
+        assert metrics.get_counter("http_client_saturated_total", {"service": "s"}) == 1
+
+    @override_settings(HTTP_CLIENT_MAX_PER_HOST=1)
+    def test_busy_host_times_out(self, client: HttpClient) -> None:
+        """Test waiting for a slot is bounded by the request's timeout."""
+        client._get_slot("shop.example").acquire()
+
+        with (
+            patch.object(client._session, "request") as mock_request,
+            pytest.raises(HostBusyError),
+        ):
+            client.get("https://shop.example/a", timeout=(0.01, 0.01))
+
+        mock_request.assert_not_called()
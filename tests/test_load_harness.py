@@ -0,0 +1,245 @@
+"""Tests for the webhook load-testing harness.
+
+This module tests synthetic payloads and their signatures, rewriting of
+recorded webhooks, the Slack sink, the report's percentiles, and a short
+in-process run from webhook to Slack for every scenario.
+"""
+
+import json
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+import requests
+from core.models import Integration
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from webhooks.management.load_harness import (
+    LoadReport,
+    LoadRunner,
+    SlackSink,
+    TrafficGenerator,
+    client_sender,
+    percentile,
+    prepare_workspace,
+    release_workspace,
+    rewrite_recorded,
+)
+from webhooks.services.event_processor import EventProcessor
+from webhooks.services.pending_event_queue import pending_event_queue
+from webhooks.services.processing_lanes import processing_lanes
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+SECRET = "whsec_load"
+
+
+@pytest.fixture
+def sink():
+    """Run a Slack sink for the test."""
+    sink = SlackSink()
+    sink.start()
+    yield sink
+    sink.stop()
+
+
+@pytest.fixture
+def worker_threads():
+    """Give the test its own enrichment and lane threads, stopped afterwards.
+
+    Pool threads keep their database connections, which later tests
+    without database access would trip over.
+    """
+    lanes: dict = {}
+    with (
+        patch.object(EventProcessor, "_executor", None),
+        patch.object(processing_lanes, "_executors", lanes),
+    ):
+        yield
+        if EventProcessor._executor is not None:
+            EventProcessor._executor.shutdown()
+        for executor in lanes.values():
+            executor.shutdown()
+
+
+class TestTrafficGenerator:
+    """Test the synthetic notifications."""
+
+    def test_stripe_signup_fan_out(self) -> None:
+        """Test a signup's events share an idempotency key and customer."""
+        generator = TrafficGenerator({"stripe_signup": 1})
+
+        scenario, webhooks = generator.notification(7)
+
+        events = [json.loads(webhook.body) for webhook in webhooks]
+        assert scenario == "stripe_signup"
+        assert [event["type"] for event in events][1:3] == [
+            "customer.subscription.created",
+            "invoice.created",
+        ]
+        assert len({event["request"]["idempotency_key"] for event in events}) == 1
+        assert len({event["id"] for event in events}) == len(events)
+        assert events[-1]["data"]["object"]["customer_email"] == (
+            "loadtest-7@gmail.com"
+        )
+
+    def test_signatures(self) -> None:
+        """Test each provider's signature header is added when sending."""
+        generator = TrafficGenerator(
+            {"stripe_payment": 1, "shopify_order": 1, "chargify_payment": 1}, seed=1
+        )
+        headers = {}
+        for seq in range(20):
+            for webhook in generator.notification(seq)[1]:
+                headers[webhook.provider] = webhook.signed_headers(SECRET)
+
+        assert headers["stripe"]["Stripe-Signature"].startswith("t=")
+        assert headers["shopify"]["X-Shopify-Topic"] == "orders/paid"
+        assert "X-Shopify-Hmac-SHA256" in headers["shopify"]
+        assert "X-Chargify-Webhook-Signature-Hmac-Sha-256" in headers["chargify"]
+
+    def test_unknown_scenario(self) -> None:
+        """Test a mix naming an unknown scenario is rejected."""
+        with pytest.raises(ValueError, match="paypal"):
+            TrafficGenerator({"paypal": 1})
+
+    def test_rewrite_recorded(self) -> None:
+        """Test recorded webhooks get new ids and the marker email."""
+        record = {
+            "provider": "customer_shopify",
+            "headers": {
+                "X-Shopify-Topic": "orders/paid",
+                "X-Shopify-Webhook-Id": "abc",
+                "X-Shopify-Hmac-SHA256": "stale",
+                "Content-Type": "application/json",
+            },
+            "body": json.dumps(
+                {"id": 100, "email": "jane@acme.com", "customer": {"id": "c_1"}}
+            ),
+        }
+
+        webhook = rewrite_recorded(record, 3, offset=50)
+
+        assert webhook.provider == "shopify"
+        assert webhook.headers == {
+            "X-Shopify-Topic": "orders/paid",
+            "X-Shopify-Webhook-Id": "abc-lt50",
+        }
+        assert json.loads(webhook.body) == {
+            "id": 150,
+            "email": "loadtest-3@gmail.com",
+            "customer": {"id": "c_1_lt50"},
+        }
+
+
+class TestReport:
+    """Test the measurements."""
+
+    def test_percentile(self) -> None:
+        """Test the nearest-rank percentile."""
+        values = [float(value) for value in range(1, 101)]
+
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([0.2], 95) == 0.2
+        assert percentile([], 50) is None
+
+    def test_summary(self) -> None:
+        """Test the summary reports rates and milliseconds."""
+        report = LoadReport(seconds=2.0, response_times=[0.01, 0.02, 0.03, 0.04])
+        report.statuses.update({200: 3, 0: 1})
+
+        summary = report.summary()
+
+        assert summary["requests_per_second"] == 2.0
+        assert summary["response_ms"] == {"p50": 20.0, "p95": 40.0, "p99": 40.0}
+        assert summary["statuses"] == {0: 1, 200: 3}
+        assert summary["time_to_slack_ms"]["p50"] is None
+
+
+class TestSlackSink:
+    """Test the stub Slack webhook."""
+
+    def test_records_first_arrival(self, sink: SlackSink) -> None:
+        """Test messages are matched to notifications by marker email."""
+        requests.post(sink.url, json={"text": "loadtest-4@gmail.com"}, timeout=5)
+        first = sink.arrivals[4]
+        requests.post(sink.url, json={"text": "loadtest-4@gmail.com"}, timeout=5)
+        response = requests.post(sink.url, json={"text": "hello"}, timeout=5)
+
+        assert response.text == "ok"
+        assert sink.arrivals == {4: first}
+        assert (sink.messages, sink.unmatched) == (3, 1)
+        assert sink.delivered([4, 5]) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("worker_threads")
+class TestLoadRunner:
+    """Test a short run through the real webhook endpoints."""
+
+    @override_settings(CACHES=LOCMEM_CACHES, DISABLE_BILLING=False)
+    def test_every_scenario_reaches_slack(self, sink: SlackSink) -> None:
+        """Test every notification is accepted and delivered to the sink."""
+        cache.clear()
+        workspace = prepare_workspace(sink.url, SECRET)
+        runner = LoadRunner(
+            client_sender(workspace, SECRET),
+            TrafficGenerator(seed=2),
+            sink,
+            rate=200,
+            concurrency=1,
+        )
+
+        with patch.object(pending_event_queue, "DELAY_SECONDS", 0.2):
+            report = runner.run(count=8, drain=10)
+
+        summary = report.summary()
+        assert summary["statuses"] == {200: report.requests}
+        assert summary["delivered"] == 8
+        assert set(summary["scenarios"]) == {
+            "stripe_payment",
+            "stripe_signup",
+            "shopify_order",
+            "chargify_payment",
+        }
+        assert summary["time_to_slack_ms"]["p99"] is not None
+        assert release_workspace(workspace) == 4
+        assert not Integration.objects.filter(
+            workspace=workspace, is_active=True
+        ).exists()
+
+    @override_settings(DEBUG=True)
+    def test_command(self) -> None:
+        """Test the management command runs against a fake Redis."""
+        out = StringIO()
+
+        call_command(
+            "load_test_webhooks",
+            "--fake-redis",
+            "--count=3",
+            "--rate=100",
+            "--mix=shopify_order=2,chargify_payment=1",
+            "--drain=10",
+            "--json",
+            stdout=out,
+        )
+
+        summary = json.loads(out.getvalue()[out.getvalue().index("{") :])
+        assert summary["requests"] == 3
+        assert summary["delivered"] == 3
+        assert not Integration.objects.filter(
+            workspace__slug="load-test", is_active=True
+        ).exists()
+
+    @override_settings(DEBUG=False)
+    def test_command_refuses_without_debug(self) -> None:
+        """Test the command won't touch the database with DEBUG off."""
+        with pytest.raises(CommandError, match="--allow-production"):
+            call_command("load_test_webhooks", "--fake-redis", "--count=1")
+
+        assert not Integration.objects.exists()
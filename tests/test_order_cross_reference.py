@@ -0,0 +1,225 @@
+"""Tests for the Shopify order / Chargify payment cross-reference index.
+
+This module tests the order reference entries written when orders and
+payments are stored, the per-workspace lookups EventProcessor uses to link
+them, and a benchmark showing lookup cost doesn't grow with stored volume.
+"""
+
+import statistics
+import time
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from webhooks.services.database_lookup import DatabaseLookupService
+from webhooks.services.event_processor import EventProcessor
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 100_000},
+    }
+}
+
+WORKSPACE_ID = str(uuid.uuid4())
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache():
+    """Run every test against an empty local-memory cache."""
+    with override_settings(CACHES=LOCMEM_CACHES):
+        cache.clear()
+        yield
+
+
+def shopify_order(order_number: int, order_id: int) -> dict:
+    """Build a Shopify order event like the Shopify source emits."""
+    return {
+        "type": "order_created",
+        "provider": "shopify",
+        "external_id": str(order_id),
+        "customer_id": "7",
+        "amount": 49.0,
+        "metadata": {"order_number": order_number, "order_ref": str(order_number)},
+    }
+
+
+def chargify_payment(order_number: int, transaction_id: str) -> dict:
+    """Build a Chargify payment event whose memo names a Shopify order."""
+    return {
+        "type": "payment_success",
+        "provider": "chargify",
+        "customer_id": "55",
+        "amount": 49.0,
+        "metadata": {
+            "transaction_id": transaction_id,
+            "shopify_order_ref": str(order_number),
+        },
+    }
+
+
+class TestOrderCrossReference:
+    """Test writing and reading the cross-reference index."""
+
+    def test_both_directions_resolve(self) -> None:
+        """Test an order and a payment find each other by order number."""
+        service = DatabaseLookupService()
+        assert service.store_order_record(
+            shopify_order(1001, 555), workspace_id=WORKSPACE_ID
+        )
+        assert service.store_payment_record(
+            chargify_payment(1001, "tr_9"), workspace_id=WORKSPACE_ID
+        )
+
+        assert (
+            service.lookup_chargify_payment_for_shopify_order("1001", WORKSPACE_ID)
+            == "tr_9"
+        )
+        assert (
+            service.lookup_shopify_order_for_chargify_payment("1001", WORKSPACE_ID)
+            == "555"
+        )
+
+    def test_workspaces_are_isolated(self) -> None:
+        """Test another workspace's order number doesn't match."""
+        service = DatabaseLookupService()
+        service.store_order_record(
+            shopify_order(1001, 555), workspace_id=str(uuid.uuid4())
+        )
+
+        assert (
+            service.lookup_shopify_order_for_chargify_payment("1001", WORKSPACE_ID)
+            is None
+        )
+
+    def test_events_without_order_ref_write_nothing(self) -> None:
+        """Test records without an order number add no entries."""
+        service = DatabaseLookupService()
+
+        assert (
+            service._get_order_xref_entries(WORKSPACE_ID, {"provider": "stripe"}) == {}
+        )
+        assert (
+            service._get_order_xref_entries(
+                WORKSPACE_ID, {"provider": "chargify", "metadata": {}}
+            )
+            == {}
+        )
+
+    def test_redis_write_joins_index_pipeline(self) -> None:
+        """Test the entry is written in the activity index round trip."""
+        redis_client = MagicMock()
+        pipe = redis_client.pipeline.return_value
+        service = DatabaseLookupService()
+        record = {
+            "provider": "chargify",
+            "external_id": "evt_1",
+            "metadata": {"transaction_id": "tr_9", "shopify_order_ref": "1001"},
+        }
+
+        with patch(
+            "webhooks.services.database_lookup.get_redis_client",
+            return_value=redis_client,
+        ):
+            service._add_to_activity_index(
+                "webhook:payment:1", 1.0, WORKSPACE_ID, record
+            )
+
+        key, reference = pipe.set.call_args[0]
+        assert key.endswith(f"order_xref:{WORKSPACE_ID}:chargify:1001")
+        assert reference == "tr_9"
+        assert pipe.set.call_args[1] == {"ex": service.ttl_seconds}
+        pipe.execute.assert_called_once()
+
+    def test_redis_lookup_is_one_get(self) -> None:
+        """Test a lookup is a single GET, decoded to str."""
+        redis_client = MagicMock()
+        redis_client.get.return_value = b"555"
+
+        with patch(
+            "webhooks.services.database_lookup.get_redis_client",
+            return_value=redis_client,
+        ):
+            reference = (
+                DatabaseLookupService().lookup_shopify_order_for_chargify_payment(
+                    "1001", WORKSPACE_ID
+                )
+            )
+
+        assert reference == "555"
+        redis_client.get.assert_called_once()
+        assert redis_client.get.call_args[0][0].endswith(
+            f"order_xref:{WORKSPACE_ID}:shopify:1001"
+        )
+
+    def test_lookup_errors_return_none(self) -> None:
+        """Test cache errors don't fail event processing."""
+        with patch(
+            "webhooks.services.database_lookup.get_redis_client",
+            side_effect=Exception("redis down"),
+        ):
+            assert (
+                DatabaseLookupService().lookup_chargify_payment_for_shopify_order("1")
+                is None
+            )
+
+    def test_processor_links_payment_to_stored_order(self) -> None:
+        """Test EventProcessor adds the related order for the workspace."""
+        processor = EventProcessor()
+        processor.db_lookup.store_order_record(
+            shopify_order(1001, 555), workspace_id=WORKSPACE_ID
+        )
+        workspace = MagicMock(uuid=WORKSPACE_ID)
+
+        enriched = processor._enrich_with_cross_references(
+            chargify_payment(1001, "tr_9"), workspace
+        )
+
+        assert enriched["metadata"]["related_order_ref"] == "555"
+
+
+@pytest.mark.slow
+class TestOrderCrossReferenceBenchmark:
+    """Benchmark lookup cost against stored volume."""
+
+    LOOKUPS = 2000
+
+    def _store_orders(self, service: DatabaseLookupService, count: int) -> None:
+        """Index count Shopify orders the way store_order_record does."""
+        for number in range(count):
+            record = {
+                "provider": "shopify",
+                "external_id": str(number),
+                "metadata": {"order_ref": str(number)},
+            }
+            cache.set_many(
+                service._get_order_xref_entries(WORKSPACE_ID, record),
+                timeout=service.ttl_seconds,
+            )
+
+    def _time_lookups(self, service: DatabaseLookupService, count: int) -> float:
+        """Return the median seconds per lookup over several rounds."""
+        refs = [str(i % count) for i in range(self.LOOKUPS)]
+        rounds = []
+        for _ in range(5):
+            start = time.perf_counter()
+            for ref in refs:
+                assert service.lookup_shopify_order_for_chargify_payment(
+                    ref, WORKSPACE_ID
+                )
+            rounds.append((time.perf_counter() - start) / self.LOOKUPS)
+        return statistics.median(rounds)
+
+    def test_lookup_cost_is_flat_as_volume_grows(self) -> None:
+        """Test 100x more stored orders doesn't make lookups slower."""
+        service = DatabaseLookupService()
+
+        self._store_orders(service, 100)
+        small = self._time_lookups(service, 100)
+        self._store_orders(service, 10_000)
+        large = self._time_lookups(service, 10_000)
+
+        # A scan would be ~100x slower; allow generous noise for CI
+        assert large < small * 3, f"{small * 1e6:.1f}us -> {large * 1e6:.1f}us"
@@ -6,10 +6,23 @@ a single notification.
 """
 
 import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
-from webhooks.services.pending_event_queue import PendingEventQueue
+from django.core.cache import cache
+from django.test import override_settings
+from webhooks.services.metrics import metrics
+from webhooks.services.pending_event_queue import (
+    MAX_INFORMATIONAL_DEFERRALS,
+    PendingEventQueue,
+    _has_signup_with_email,
+)
+from webhooks.services.processing_lanes import EventPriority, processing_lanes
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
 
 
 class TestPendingEventQueueStorage:
@@ -947,3 +960,296 @@ class TestCustomerBasedAggregation:
         # Current bucket should NOT have been created
         curr_key = f"pending_webhook:ws_456:customer:cus_123:t{current_bucket}"
         assert mock_cache.get(curr_key) is None
+
+
+class TestPendingEventQueuePriorities:
+    """Test priority lanes for queued events."""
+
+    @pytest.fixture
+    def queue(self) -> PendingEventQueue:
+        """Create a fresh queue instance with short delay."""
+        queue = PendingEventQueue()
+        queue.DELAY_SECONDS = 0.1
+        with queue._lock:
+            queue._active_timers.clear()
+            queue._group_priorities.clear()
+        return queue
+
+    @pytest.fixture
+    def mock_cache(self):
+        """Mock Django cache."""
+        cache_data: dict = {}
+
+        with patch("webhooks.services.pending_event_queue.cache") as mock:
+            mock.get = lambda key, default=None: cache_data.get(key, default)
+            mock.set = lambda key, value, timeout=None: cache_data.update({key: value})
+            mock.delete = lambda key: cache_data.pop(key, None)
+            yield mock
+
+    def test_critical_event_bypasses_delay(
+        self, queue: PendingEventQueue, mock_cache
+    ) -> None:
+        """Test payment failures are processed immediately on their own."""
+        processed = threading.Event()
+        calls: list[tuple] = []
+
+        def record(*args) -> None:
+            calls.append(args)
+            processed.set()
+
+        queue.DELAY_SECONDS = 60
+        with patch.object(queue, "_process_events", side_effect=record):
+            queue.queue_event(
+                idempotency_key="idem_123",
+                workspace_id="ws_456",
+                event_data={"type": "payment_failure", "external_id": "evt_fail"},
+                customer_data={"email": "test@example.com"},
+                provider_name="stripe",
+                workspace=None,
+            )
+            assert processed.wait(timeout=2)
+
+        assert calls[0][:2] == ("critical:evt_fail", "ws_456")
+        assert mock_cache.get("pending_webhook:ws_456:critical:evt_fail")
+        assert "ws_456:critical:evt_fail" not in queue._active_timers
+
+    def test_group_priority_tracks_highest_event(
+        self, queue: PendingEventQueue, mock_cache
+    ) -> None:
+        """Test a group's priority is the highest of its events."""
+        with patch.object(queue, "_process_events"):
+            for event_type in ("fulfillment_updated", "subscription_created"):
+                queue.queue_event(
+                    idempotency_key="idem_123",
+                    workspace_id="ws_456",
+                    event_data={"type": event_type},
+                    customer_data={},
+                    provider_name="stripe",
+                    workspace=None,
+                )
+
+            assert queue._group_priorities["ws_456:idem_123"] is EventPriority.STANDARD
+            queue._active_timers["ws_456:idem_123"].cancel()
+
+    def test_informational_group_deferred_when_congested(
+        self, queue: PendingEventQueue
+    ) -> None:
+        """Test informational groups are pushed back under load."""
+        timer_key = "ws_456:idem_123"
+        queue._group_priorities[timer_key] = EventPriority.INFORMATIONAL
+
+        with (
+            patch.object(processing_lanes, "is_congested", return_value=True),
+            patch.object(processing_lanes, "submit") as mock_submit,
+        ):
+            queue._dispatch_events("idem_123", "ws_456", "stripe", None)
+
+        mock_submit.assert_not_called()
+        assert timer_key in queue._active_timers
+        queue._active_timers[timer_key].cancel()
+
+    def test_informational_group_dispatched_after_max_deferrals(
+        self, queue: PendingEventQueue
+    ) -> None:
+        """Test deferral is bounded so informational events still go out."""
+        queue._group_priorities["ws_456:idem_123"] = EventPriority.INFORMATIONAL
+
+        with (
+            patch.object(processing_lanes, "is_congested", return_value=True),
+            patch.object(processing_lanes, "submit") as mock_submit,
+        ):
+            queue._dispatch_events(
+                "idem_123", "ws_456", "stripe", None, MAX_INFORMATIONAL_DEFERRALS
+            )
+
+        mock_submit.assert_called_once()
+        assert mock_submit.call_args[0][0] is EventPriority.INFORMATIONAL
+
+
+class TestPendingEventQueueEarlyClose:
+    """Test sending complete groups before the aggregation delay."""
+
+    @pytest.fixture
+    def queue(self) -> PendingEventQueue:
+        """Create a fresh queue instance with a long delay."""
+        queue = PendingEventQueue()
+        queue.DELAY_SECONDS = 60
+        with queue._lock:
+            queue._active_timers.clear()
+            queue._group_priorities.clear()
+            queue._close_reasons.clear()
+        return queue
+
+    @pytest.fixture
+    def mock_cache(self):
+        """Mock Django cache."""
+        cache_data: dict = {}
+
+        def mock_add(key, value, timeout=None):
+            if key in cache_data:
+                return False
+            cache_data[key] = value
+            return True
+
+        with patch("webhooks.services.pending_event_queue.cache") as mock:
+            mock.get = lambda key, default=None: cache_data.get(key, default)
+            mock.set = lambda key, value, timeout=None: cache_data.update({key: value})
+            mock.delete = lambda key: cache_data.pop(key, None)
+            mock.add = mock_add
+            yield mock
+
+    def _queue(self, queue: PendingEventQueue, event_type: str, email: str) -> None:
+        queue.queue_event(
+            idempotency_key="idem_123",
+            workspace_id="ws_456",
+            event_data={"type": event_type, "customer_id": "cus_123"},
+            customer_data={"email": email},
+            provider_name="stripe",
+            workspace=None,
+        )
+
+    def test_signup_rule_requires_email(self) -> None:
+        """Test the signup rule needs both the primary event and an email."""
+        signup = {"event_data": {"type": "subscription_created"}, "customer_data": {}}
+        invoice = {
+            "event_data": {"type": "invoice_paid"},
+            "customer_data": {"email": "a@example.com"},
+        }
+        assert not _has_signup_with_email([signup])
+        assert not _has_signup_with_email([invoice])
+        assert _has_signup_with_email([signup, invoice])
+
+    def test_incomplete_group_waits_for_timer(
+        self, queue: PendingEventQueue, mock_cache
+    ) -> None:
+        """Test a signup without an email keeps waiting."""
+        with patch.object(queue, "_process_events") as mock_process:
+            self._queue(queue, "subscription_created", "")
+
+        mock_process.assert_not_called()
+        timer = queue._active_timers["ws_456:idem_123"]
+        assert timer.is_alive()
+        timer.cancel()
+
+    def test_complete_group_sent_early(
+        self, queue: PendingEventQueue, mock_cache
+    ) -> None:
+        """Test a signup plus invoice email is sent without the full delay."""
+        processed = threading.Event()
+
+        with patch.object(
+            queue, "_process_events", side_effect=lambda *args: processed.set()
+        ):
+            self._queue(queue, "subscription_created", "")
+            timer = queue._active_timers["ws_456:idem_123"]
+            self._queue(queue, "invoice_paid", "found@example.com")
+            assert processed.wait(timeout=2)
+
+        assert timer.finished.is_set()
+        assert queue._close_reasons["ws_456:idem_123"] == "complete"
+
+    def test_complete_group_dispatched_once(
+        self, queue: PendingEventQueue, mock_cache
+    ) -> None:
+        """Test further appends to a closed group don't dispatch it again."""
+        with patch.object(queue, "_dispatch_events") as mock_dispatch:
+            self._queue(queue, "subscription_created", "")
+            self._queue(queue, "invoice_paid", "found@example.com")
+            self._queue(queue, "payment_success", "found@example.com")
+
+        mock_dispatch.assert_called_once()
+
+    def test_complete_group_sent_without_local_timer(
+        self, queue: PendingEventQueue, mock_cache
+    ) -> None:
+        """Test the worker completing a group sends it without owning a timer."""
+        with patch.object(queue, "_dispatch_events") as mock_dispatch:
+            queue._close_early("idem_123", "ws_456", "stripe", None)
+
+        mock_dispatch.assert_called_once_with("idem_123", "ws_456", "stripe", None)
+        assert isinstance(mock_cache.get("pending_closed:ws_456:idem_123"), float)
+
+    def test_group_closed_by_another_worker(
+        self, queue: PendingEventQueue, mock_cache
+    ) -> None:
+        """Test a group another worker sent early isn't sent or warned about."""
+        mock_cache.add("pending_closed:ws_456:idem_123", time.time())
+
+        with (
+            patch.object(queue, "_dispatch_events") as mock_dispatch,
+            patch("webhooks.services.pending_event_queue.logger") as mock_logger,
+        ):
+            queue._close_early("idem_123", "ws_456", "stripe", None)
+            # This worker's timer fires after the group was sent
+            queue._process_events("idem_123", "ws_456", "stripe", None)
+
+        mock_dispatch.assert_not_called()
+        mock_logger.warning.assert_not_called()
+
+    def test_time_to_notify_recorded_with_close_reason(
+        self, queue: PendingEventQueue, mock_cache
+    ) -> None:
+        """Test a sent group records time-to-notify labelled by close reason."""
+        labels = {"provider": "stripe", "close_reason": "complete"}
+        before = metrics.get_histogram("time_to_notify_seconds", labels)
+        before_count = before["count"] if before else 0
+
+        with (
+            patch.object(queue, "_dispatch_events"),
+            patch.object(queue, "_send_notification", return_value=True),
+        ):
+            self._queue(queue, "subscription_created", "")
+            self._queue(queue, "invoice_paid", "found@example.com")
+            queue._process_events("idem_123", "ws_456", "stripe", None)
+
+        after = metrics.get_histogram("time_to_notify_seconds", labels)
+        assert after["count"] == before_count + 1
+        assert mock_cache.get("pending_webhook:ws_456:idem_123") is None
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_late_event_after_close_is_not_sent_again(
+        self, queue: PendingEventQueue
+    ) -> None:
+        """Test an event arriving after an early close doesn't notify twice."""
+        cache.clear()
+        sent = []
+
+        def send(event, customer, provider_name, workspace):
+            sent.append(event["type"])
+            return True
+
+        with (
+            patch.object(
+                processing_lanes,
+                "submit",
+                side_effect=lambda priority, fn, *args, **kwargs: fn(*args),
+            ),
+            patch.object(queue, "_send_notification", side_effect=send),
+        ):
+            self._queue(queue, "subscription_created", "")
+            self._queue(queue, "payment_success", "found@example.com")
+            self._queue(queue, "payment_success", "found@example.com")
+
+        assert sent == ["subscription_created"]
+        assert "ws_456:idem_123" not in queue._active_timers
+        assert cache.get("pending_webhook:ws_456:idem_123") is None
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_event_appended_during_send_is_kept(self, queue: PendingEventQueue) -> None:
+        """Test only the sent items are removed from the group."""
+        cache.clear()
+        key = "pending_webhook:ws_456:idem_123"
+        late = {"event_data": {"type": "invoice_paid"}, "customer_data": {}}
+
+        def send(*args):
+            # Another worker appends while the notification is being sent
+            queue._simple_append(key, late)
+            return True
+
+        queue._simple_append(
+            key, {"event_data": {"type": "payment_success"}, "customer_data": {}}
+        )
+        with patch.object(queue, "_send_notification", side_effect=send):
+            queue._process_events("idem_123", "ws_456", "stripe", None)
+
+        assert cache.get(key) == [late]
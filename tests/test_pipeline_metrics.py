@@ -0,0 +1,253 @@
+"""Tests for pipeline stage timing and the Prometheus metrics endpoint.
+
+This module tests stage timers and their labels, the cost of timing a
+stage, Prometheus text rendering, merging of several workers' series
+through Redis, and the /metrics endpoint's authorization.
+"""
+
+from typing import Any
+from unittest.mock import Mock, patch
+
+import pytest
+from django.test import override_settings
+from webhooks.exceptions import WebhookSignatureError
+from webhooks.services.metrics import (
+    STAGE_METRIC,
+    MetricsRegistry,
+    measure_stage_overhead,
+    metrics,
+    render_prometheus,
+)
+from webhooks.services.metrics_exporter import METRICS_TTL_SECONDS, MetricsExporter
+from webhooks.webhook_router import _validate_and_parse_webhook
+
+
+class FakeRedis:
+    """Just enough of a Redis client for the shared metrics hash."""
+
+    def __init__(self) -> None:
+        """Initialize with no hashes."""
+        self.hashes: dict[str, dict[str, float]] = {}
+        self.ttls: dict[str, int] = {}
+        self._results: list[Any] = []
+
+    def pipeline(self, transaction: bool = True) -> "FakeRedis":
+        """Commands run immediately; execute() returns their results."""
+        return self
+
+    def hincrbyfloat(self, key: str, field: str, amount: float) -> None:
+        """Add to a hash field."""
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = fields.get(field, 0.0) + amount
+        self._results.append(fields[field])
+
+    def expire(self, key: str, seconds: int) -> None:
+        """Record a key's time to live."""
+        self.ttls[key] = seconds
+        self._results.append(True)
+
+    def hlen(self, key: str) -> None:
+        """Count a hash's fields."""
+        self._results.append(len(self.hashes.get(key, {})))
+
+    def delete(self, key: str) -> None:
+        """Remove a key."""
+        self.hashes.pop(key, None)
+
+    def execute(self) -> list[Any]:
+        """Return the results of the commands since the last execute()."""
+        results, self._results = self._results, []
+        return results
+
+    def hgetall(self, key: str) -> dict[bytes, bytes]:
+        """Return a hash the way redis-py does."""
+        return {
+            field.encode(): str(value).encode()
+            for field, value in self.hashes.get(key, {}).items()
+        }
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    """Start every test with an empty metrics registry."""
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def stage_count(registry: MetricsRegistry, **labels: Any) -> float:
+    """Count observations of a stage series."""
+    histogram = registry.get_histogram(STAGE_METRIC, labels)
+    return histogram["count"] if histogram else 0
+
+
+class TestStageTimer:
+    """Test MetricsRegistry.time_stage."""
+
+    def test_records_labels_and_outcome(self) -> None:
+        """Test labels set inside the block are recorded."""
+        registry = MetricsRegistry()
+
+        with registry.time_stage("parse", "stripe") as stage:
+            stage.event_type = "payment_success"
+        with registry.time_stage("consolidation", "stripe", "trial_started") as stage:
+            stage.outcome = "suppressed"
+
+        assert stage_count(
+            registry,
+            stage="parse",
+            provider="stripe",
+            event_type="payment_success",
+            outcome="ok",
+        )
+        assert stage_count(
+            registry,
+            stage="consolidation",
+            provider="stripe",
+            event_type="trial_started",
+            outcome="suppressed",
+        )
+
+    def test_exceptions_are_errors(self) -> None:
+        """Test a raising block is recorded with the error outcome."""
+        registry = MetricsRegistry()
+
+        with pytest.raises(RuntimeError), registry.time_stage("slack_send", "shopify"):
+            raise RuntimeError("boom")
+
+        assert stage_count(
+            registry,
+            stage="slack_send",
+            provider="shopify",
+            event_type="unknown",
+            outcome="error",
+        )
+
+    def test_overhead_is_small(self) -> None:
+        """Test timing a stage costs microseconds, not milliseconds."""
+        assert measure_stage_overhead(2000) < 50e-6
+
+    def test_router_times_rejected_signatures(self) -> None:
+        """Test an invalid signature is recorded as a rejected stage."""
+        provider = Mock()
+        provider.validate_webhook.return_value = False
+
+        with pytest.raises(WebhookSignatureError):
+            _validate_and_parse_webhook(Mock(), provider, "customer_stripe")
+
+        assert stage_count(
+            metrics,
+            stage="signature_verify",
+            provider="stripe",
+            event_type="unknown",
+            outcome="rejected",
+        )
+        provider.parse_webhook.assert_not_called()
+
+
+class TestRenderPrometheus:
+    """Test the Prometheus text format."""
+
+    def test_counters_histograms_and_gauges(self) -> None:
+        """Test each metric type renders with its TYPE line and samples."""
+        registry = MetricsRegistry()
+        registry.increment("events_total", {"provider": 'say "hi"\n'}, 3)
+        registry.observe("wait_seconds", 0.2, buckets=(0.1, 1.0))
+
+        text = render_prometheus(registry.snapshot(), gauges={"overhead": 1.5e-06})
+
+        assert text.splitlines() == [
+            "# TYPE notipus_events_total counter",
+            'notipus_events_total{provider="say \\"hi\\"\\n"} 3',
+            "# TYPE notipus_wait_seconds histogram",
+            'notipus_wait_seconds_bucket{le="0.1"} 0',
+            'notipus_wait_seconds_bucket{le="1.0"} 1',
+            'notipus_wait_seconds_bucket{le="+Inf"} 1',
+            "notipus_wait_seconds_sum 0.2",
+            "notipus_wait_seconds_count 1",
+            "# TYPE notipus_overhead gauge",
+            "notipus_overhead 1.5e-06",
+        ]
+
+
+class TestMetricsExporter:
+    """Test merging workers' series through Redis."""
+
+    def test_workers_are_summed(self) -> None:
+        """Test two processes' series add up, and flushes send deltas."""
+        redis_client = FakeRedis()
+        first, second = MetricsRegistry(), MetricsRegistry()
+        first.increment("events_total", {"provider": "stripe"}, 2)
+        first.observe_stage("parse", 0.002, "stripe", "payment_success")
+        second.increment("events_total", {"provider": "stripe"})
+        second.observe_stage("parse", 0.004, "stripe", "payment_success")
+
+        with patch(
+            "webhooks.services.metrics_exporter.get_redis_client",
+            return_value=redis_client,
+        ):
+            first_exporter = MetricsExporter(first)
+            first_exporter.flush()
+            assert first_exporter.flush() == 0  # Nothing new
+            merged = MetricsExporter(second).collect()
+
+        assert merged["counters"]["events_total"] == [
+            {"labels": {"provider": "stripe"}, "value": 3.0}
+        ]
+        (histogram,) = merged["histograms"][STAGE_METRIC]
+        assert histogram["count"] == 2
+        assert histogram["sum"] == pytest.approx(0.006)
+        assert list(histogram["buckets"])[-1] == "+Inf"
+
+    def test_shared_hash_expires_and_is_bounded(self) -> None:
+        """Test flushes refresh the hash's TTL and reset it when too large."""
+        redis_client = FakeRedis()
+        registry = MetricsRegistry()
+        registry.increment("events_total", {"provider": "stripe"})
+        exporter = MetricsExporter(registry)
+
+        with patch(
+            "webhooks.services.metrics_exporter.get_redis_client",
+            return_value=redis_client,
+        ):
+            exporter.flush()
+            (key,) = redis_client.hashes
+            assert redis_client.ttls[key] == METRICS_TTL_SECONDS
+
+            for provider in ("shopify", "chargify"):
+                registry.increment("events_total", {"provider": provider})
+            with patch("webhooks.services.metrics_exporter.METRICS_MAX_FIELDS", 2):
+                exporter.flush()
+
+        assert key not in redis_client.hashes
+
+    def test_without_redis_serves_local_process(self) -> None:
+        """Test the exporter falls back to the process's own registry."""
+        registry = MetricsRegistry()
+        registry.increment("events_total")
+
+        text = MetricsExporter(registry).render()
+
+        assert "notipus_events_total 1" in text
+        assert "notipus_pipeline_stage_overhead_seconds" in text
+
+
+class TestMetricsEndpoint:
+    """Test the /metrics view."""
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_requires_token(self, client) -> None:
+        """Test scrapes must present the configured token."""
+        metrics.observe_stage("build", 0.01, "stripe", "payment_success")
+
+        assert client.get("/metrics").status_code == 401
+        response = client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert 'stage="build"' in response.content.decode()
+
+    @override_settings(METRICS_TOKEN="", DEBUG=False)
+    def test_hidden_without_token(self, client) -> None:
+        """Test the endpoint isn't served without a token outside DEBUG."""
+        assert client.get("/metrics").status_code == 404
@@ -0,0 +1,177 @@
+"""Tests for the in-process plan catalog and cached seat counts.
+
+This module tests plan snapshots and their invalidation through Plan
+signals, the shared version and pub/sub announcements, and seat checks in
+core.permissions that run without database queries once warm.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from core.models import Plan, Workspace, WorkspaceMember
+from core.permissions import can_invite_user, get_remaining_seats
+from core.services.plan_catalog import PlanCatalog, plan_catalog
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache():
+    """Run every test against an empty local-memory cache."""
+    with override_settings(CACHES=LOCMEM_CACHES):
+        cache.clear()
+        yield
+
+
+@pytest.fixture
+def team_plan(db) -> Plan:
+    """Create an active plan allowing two users."""
+    plan, _ = Plan.objects.update_or_create(
+        name="basic",
+        defaults={
+            "display_name": "Basic",
+            "price_monthly": 29,
+            "max_users": 2,
+            "is_active": True,
+        },
+    )
+    return plan
+
+
+@pytest.mark.django_db
+class TestPlanCatalog:
+    """Test PlanCatalog snapshots."""
+
+    def test_reads_are_served_from_memory(
+        self, team_plan: Plan, django_assert_num_queries
+    ) -> None:
+        """Test only the first read queries the Plan table."""
+        catalog = PlanCatalog()
+        catalog.get("basic")
+
+        with django_assert_num_queries(0):
+            plan = catalog.get("basic")
+
+        assert plan.max_users == 2
+        assert catalog.get("missing") is None
+
+    def test_snapshot_is_immutable(self, team_plan: Plan) -> None:
+        """Test callers can't modify the shared snapshot."""
+        snapshot = PlanCatalog().snapshot()
+
+        with pytest.raises(TypeError):
+            snapshot.plans["basic"] = None
+        with pytest.raises(AttributeError):
+            snapshot.plans["basic"].max_users = 10
+
+    def test_inactive_plans_are_excluded(self, team_plan: Plan) -> None:
+        """Test deactivating a plan removes it on the next read."""
+        plan_catalog.get("basic")
+
+        team_plan.is_active = False
+        team_plan.save()
+
+        assert plan_catalog.get("basic") is None
+
+    def test_plan_save_reloads_catalog(self, team_plan: Plan) -> None:
+        """Test saving a plan is seen by the next read."""
+        assert plan_catalog.get("basic").max_users == 2
+
+        team_plan.max_users = 5
+        team_plan.save()
+
+        assert plan_catalog.get("basic").max_users == 5
+
+    def test_publish_change_bumps_version_and_notifies(self) -> None:
+        """Test committed changes are announced to other processes."""
+        redis_client = MagicMock()
+        catalog = PlanCatalog()
+
+        with patch(
+            "core.services.plan_catalog.get_redis_client", return_value=redis_client
+        ):
+            catalog.publish_change()
+            catalog.publish_change()
+
+        assert cache.get(catalog.VERSION_KEY) == 2
+        channel, version = redis_client.publish.call_args[0]
+        assert channel.endswith(catalog.CHANNEL)
+        assert version == 2
+
+    def test_version_check_catches_missed_messages(self, team_plan: Plan) -> None:
+        """Test a newer shared version reloads the snapshot."""
+        catalog = PlanCatalog()
+        assert catalog.snapshot().version == 0
+
+        cache.set(catalog.VERSION_KEY, 3)
+        assert catalog.snapshot().version == 0  # Not due for a check yet
+        catalog._checked_at -= catalog.VERSION_CHECK_SECONDS + 1
+
+        assert catalog.snapshot().version == 3
+
+    def test_listener_drops_snapshot_on_message(self, team_plan: Plan) -> None:
+        """Test a pub/sub message makes the next read reload."""
+        catalog = PlanCatalog()
+        catalog.snapshot()
+        redis_client = MagicMock()
+        redis_client.pubsub.return_value.listen.return_value = iter(
+            [{"type": "message", "data": b"4"}]
+        )
+
+        with (
+            patch.object(catalog, "invalidate") as mock_invalidate,
+            patch("core.services.plan_catalog.time.sleep", side_effect=SystemExit),
+            pytest.raises(SystemExit),
+        ):
+            catalog._listen(redis_client)
+
+        # Once on (re)subscribe, once for the message
+        assert mock_invalidate.call_count == 2
+
+
+@pytest.mark.django_db
+class TestSeatChecks:
+    """Test seat checks read cached counts and plans."""
+
+    @pytest.fixture
+    def workspace(self, team_plan: Plan) -> Workspace:
+        """Create a basic-plan workspace with one member."""
+        workspace = Workspace.objects.create(name="Acme", subscription_plan="basic")
+        WorkspaceMember.objects.create(
+            user=User.objects.create_user(username="owner"),
+            workspace=workspace,
+            role="owner",
+        )
+        return workspace
+
+    def test_warm_checks_need_no_queries(
+        self, workspace: Workspace, django_assert_num_queries
+    ) -> None:
+        """Test repeated seat checks don't touch the database."""
+        get_remaining_seats(workspace)
+
+        with django_assert_num_queries(0):
+            assert can_invite_user(workspace) == (True, "")
+            assert get_remaining_seats(workspace) == 1
+
+    def test_membership_changes_update_count(self, workspace: Workspace) -> None:
+        """Test adding and deactivating members is reflected."""
+        assert get_remaining_seats(workspace) == 1
+
+        member = WorkspaceMember.objects.create(
+            user=User.objects.create_user(username="second"),
+            workspace=workspace,
+            role="user",
+        )
+        allowed, message = can_invite_user(workspace)
+        assert not allowed
+        assert "allows up to 2 users" in message
+
+        member.is_active = False
+        member.save()
+        assert get_remaining_seats(workspace) == 1
@@ -0,0 +1,220 @@
+"""Tests for priority processing lanes.
+
+This module tests event priority classification, lane separation, fair
+per-workspace scheduling and the queue wait metrics recorded per priority
+and per workspace.
+"""
+
+import threading
+
+import pytest
+from webhooks.services.metrics import metrics
+from webhooks.services.processing_lanes import (
+    EventPriority,
+    FairScheduler,
+    ProcessingLanes,
+    get_event_priority,
+    get_plan_weight,
+)
+
+
+class TestEventPriority:
+    """Test event type to priority classification."""
+
+    @pytest.mark.parametrize(
+        "event_type", ["payment_failure", "payment_action_required"]
+    )
+    def test_never_suppress_events_are_critical(self, event_type: str) -> None:
+        """Test NEVER_SUPPRESS events are critical."""
+        assert get_event_priority(event_type) is EventPriority.CRITICAL
+
+    def test_fulfillment_updates_are_informational(self) -> None:
+        """Test low-value logistics updates are informational."""
+        assert get_event_priority("fulfillment_updated") is EventPriority.INFORMATIONAL
+
+    def test_other_events_are_standard(self) -> None:
+        """Test everything else is standard priority."""
+        assert get_event_priority("subscription_created") is EventPriority.STANDARD
+        assert get_event_priority("unknown_event") is EventPriority.STANDARD
+
+    def test_rank_orders_priorities(self) -> None:
+        """Test critical outranks standard outranks informational."""
+        assert (
+            EventPriority.CRITICAL.rank
+            > EventPriority.STANDARD.rank
+            > EventPriority.INFORMATIONAL.rank
+        )
+
+
+class TestProcessingLanes:
+    """Test lane scheduling and metrics."""
+
+    @pytest.fixture
+    def lanes(self) -> ProcessingLanes:
+        """Create lanes with a single shared worker."""
+        lanes = ProcessingLanes()
+        lanes.SHARED_WORKERS = 1
+        lanes.CONGESTION_BACKLOG = 2
+        return lanes
+
+    def test_submit_runs_job(self, lanes: ProcessingLanes) -> None:
+        """Test a submitted job runs and returns its result."""
+        future = lanes.submit(EventPriority.STANDARD, lambda x: x * 2, 21)
+        assert future.result(timeout=5) == 42
+
+    def test_critical_lane_not_blocked_by_shared_backlog(
+        self, lanes: ProcessingLanes
+    ) -> None:
+        """Test critical jobs run while the shared lane is saturated."""
+        release = threading.Event()
+        blockers = [
+            lanes.submit(EventPriority.INFORMATIONAL, release.wait, 5) for _ in range(3)
+        ]
+
+        critical = lanes.submit(EventPriority.CRITICAL, lambda: "sent")
+
+        assert critical.result(timeout=2) == "sent"
+        assert lanes.is_congested()
+        release.set()
+        for blocker in blockers:
+            blocker.result(timeout=5)
+        assert lanes.backlog(EventPriority.STANDARD) == 0
+        assert not lanes.is_congested()
+
+    def test_queue_wait_recorded_per_priority(self, lanes: ProcessingLanes) -> None:
+        """Test queue wait is observed in the histogram for the job's priority."""
+        before = metrics.get_histogram("queue_wait_seconds", {"priority": "critical"})
+        before_count = before["count"] if before else 0
+
+        lanes.submit(EventPriority.CRITICAL, lambda: None).result(timeout=5)
+
+        after = metrics.get_histogram("queue_wait_seconds", {"priority": "critical"})
+        assert after is not None
+        assert after["count"] == before_count + 1
+
+    def test_tenant_queue_wait_recorded(self, lanes: ProcessingLanes) -> None:
+        """Test queue wait shows in tenant stats but isn't exported per workspace."""
+        lanes.submit(
+            EventPriority.STANDARD, lambda: None, tenant="ws-wait", plan="pro"
+        ).result(timeout=5)
+
+        assert lanes._tenant_waits["ws-wait"][1] == 1
+        histograms = metrics.snapshot()["histograms"]
+        assert not any(
+            "workspace" in series["labels"]
+            for samples in histograms.values()
+            for series in samples
+        )
+
+        stats = lanes.tenant_stats("ws-wait")
+        assert stats["queued"] == 0
+        assert stats["running"] == 0
+        assert "ws-wait" in {s["tenant"] for s in lanes.all_tenant_stats()}
+
+    def test_job_exception_is_set_on_future(self, lanes: ProcessingLanes) -> None:
+        """Test a failing job surfaces its exception and frees its worker."""
+
+        def fail() -> None:
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            lanes.submit(EventPriority.STANDARD, fail).result(timeout=5)
+        assert lanes.submit(EventPriority.STANDARD, lambda: 1).result(timeout=5) == 1
+
+    def test_noisy_tenant_does_not_block_others(self) -> None:
+        """Test a quiet workspace runs before a noisy workspace's backlog."""
+        lanes = ProcessingLanes()
+        lanes.SHARED_WORKERS = 2
+        lanes.TENANT_MAX_CONCURRENCY = {"critical": 1, "shared": 1}
+        release = threading.Event()
+        order: list[str] = []
+
+        def job(name: str) -> None:
+            release.wait(5)
+            order.append(name)
+
+        noisy = [
+            lanes.submit(EventPriority.STANDARD, job, f"noisy-{i}", tenant="noisy")
+            for i in range(5)
+        ]
+        # The noisy tenant is capped at one worker, so the quiet one gets the other
+        quiet = lanes.submit(EventPriority.STANDARD, lambda: "quiet", tenant="quiet")
+
+        assert quiet.result(timeout=2) == "quiet"
+        assert lanes.tenant_stats("noisy")["running"] == 1
+        assert lanes.tenant_stats("noisy")["queued"] == 4
+        release.set()
+        for future in noisy:
+            future.result(timeout=5)
+        assert order == [f"noisy-{i}" for i in range(5)]
+
+
+class TestFairScheduler:
+    """Test deficit round robin ordering and concurrency caps."""
+
+    def drain(self, scheduler: FairScheduler) -> list[str]:
+        """Pop every job, releasing each as soon as it starts."""
+        order = []
+        while (item := scheduler.pop()) is not None:
+            tenant, job = item
+            order.append(job())
+            scheduler.release(tenant)
+        return order
+
+    def test_round_robin_between_equal_weights(self) -> None:
+        """Test equal-weight tenants alternate regardless of arrival order."""
+        scheduler = FairScheduler(max_concurrency=10)
+        for i in range(3):
+            scheduler.push("a", 1, lambda i=i: f"a{i}")
+        for i in range(3):
+            scheduler.push("b", 1, lambda i=i: f"b{i}")
+
+        assert self.drain(scheduler) == ["a0", "b0", "a1", "b1", "a2", "b2"]
+
+    def test_weight_sets_share_per_round(self) -> None:
+        """Test a tenant with weight 3 starts three jobs per round."""
+        scheduler = FairScheduler(max_concurrency=10)
+        for i in range(6):
+            scheduler.push("big", 3, lambda i=i: f"big{i}")
+        for i in range(2):
+            scheduler.push("small", 1, lambda i=i: f"small{i}")
+
+        assert self.drain(scheduler) == [
+            "big0",
+            "big1",
+            "big2",
+            "small0",
+            "big3",
+            "big4",
+            "big5",
+            "small1",
+        ]
+
+    def test_tenant_at_cap_is_skipped(self) -> None:
+        """Test a tenant at its concurrency cap yields to other tenants."""
+        scheduler = FairScheduler(max_concurrency=1)
+        scheduler.push("a", 5, lambda: "a0")
+        scheduler.push("a", 5, lambda: "a1")
+        scheduler.push("b", 1, lambda: "b0")
+
+        assert scheduler.pop()[0] == "a"
+        assert scheduler.pop()[0] == "b"
+        assert scheduler.pop() is None  # "a" still has one running
+        scheduler.release("a")
+        assert scheduler.pop()[0] == "a"
+
+
+class TestPlanWeight:
+    """Test plan-based scheduling weights."""
+
+    def test_weights_increase_with_plan(self) -> None:
+        """Test larger plans get larger but bounded weights."""
+        weights = [get_plan_weight(p) for p in ("free", "basic", "pro", "enterprise")]
+        assert weights == sorted(weights)
+        assert weights[0] == 1
+        assert weights[-1] <= 5
+
+    def test_unknown_plan_is_free(self) -> None:
+        """Test missing or unknown plans get the free weight."""
+        assert get_plan_weight(None) == get_plan_weight("free")
+        assert get_plan_weight("legacy") == get_plan_weight("free")
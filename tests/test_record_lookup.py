@@ -0,0 +1,409 @@
+"""Tests for secondary lookup indexes on stored events.
+
+This module tests the customer, external ID and email indexes written by
+DatabaseLookupService and WebhookStorageService, cursor pagination over
+them, and the lookup API and page.
+"""
+
+import json
+import uuid
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from urllib.parse import urlencode
+
+import pytest
+from core.models import Workspace, WorkspaceMember
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from django.test.client import RequestFactory
+from django.urls import reverse
+from webhooks.services.database_lookup import DatabaseLookupService
+from webhooks.services.webhook_storage import WebhookStorageService
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+WORKSPACE_ID = str(uuid.uuid4())
+DAY = datetime(2026, 10, 18, 9, tzinfo=dt_timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache():
+    """Run every test against an empty local-memory cache."""
+    with override_settings(CACHES=LOCMEM_CACHES):
+        cache.clear()
+        yield
+
+
+def store_record(
+    service: DatabaseLookupService,
+    timestamp: float,
+    workspace_id: str | None = WORKSPACE_ID,
+    **fields,
+) -> dict:
+    """Store an activity record and index it like the store methods do."""
+    record = {
+        "type": "payment",
+        "event_type": "payment_success",
+        "provider": "stripe",
+        "external_id": f"pi_{int(timestamp)}",
+        "customer_id": "cus_123",
+        "amount": 49.0,
+        "currency": "USD",
+        "status": "success",
+        "timestamp": timestamp,
+        **fields,
+    }
+    webhook_key = f"webhook:payment:{timestamp}"
+    cache.set(webhook_key, json.dumps(record))
+    service._add_to_activity_index(webhook_key, timestamp, workspace_id, record)
+    return record
+
+
+def store_webhook(
+    service: WebhookStorageService,
+    provider: str,
+    body: str,
+    at: datetime,
+    content_type: str = "application/json",
+    workspace_id: str = WORKSPACE_ID,
+) -> None:
+    """Store a raw webhook received at a given time."""
+    request = RequestFactory().post(
+        f"/webhook/customer/{workspace_id}/{provider}/",
+        data=body,
+        content_type=content_type,
+    )
+    with patch("webhooks.services.webhook_storage.timezone") as mock_timezone:
+        mock_timezone.now.return_value = at
+        assert service.store_webhook(request, provider, workspace_id)
+
+
+class TestRecordLookup:
+    """Test DatabaseLookupService.lookup_records."""
+
+    def test_pages_through_customer_records(self) -> None:
+        """Test cursor pages are newest first and don't overlap."""
+        service = DatabaseLookupService()
+        for second in range(5):
+            store_record(service, 1_700_000_000.0 + second)
+        store_record(service, 1_700_000_010.0, customer_id="cus_other")
+
+        first = service.lookup_records(WORKSPACE_ID, "customer_id", "cus_123", 2)
+        second = service.lookup_records(
+            WORKSPACE_ID, "customer_id", "cus_123", 2, before=first["next_before"]
+        )
+        last = service.lookup_records(
+            WORKSPACE_ID, "customer_id", "cus_123", 2, before=second["next_before"]
+        )
+
+        assert [r["external_id"] for r in first["records"]] == [
+            "pi_1700000004",
+            "pi_1700000003",
+        ]
+        assert [r["external_id"] for r in second["records"]] == [
+            "pi_1700000002",
+            "pi_1700000001",
+        ]
+        assert [r["external_id"] for r in last["records"]] == ["pi_1700000000"]
+        assert last["next_before"] is None
+
+    def test_email_lookup_ignores_case(self) -> None:
+        """Test emails are indexed and looked up lowercased."""
+        service = DatabaseLookupService()
+        store_record(service, 1_700_000_000.0, customer_email="Jane@Example.com")
+
+        page = service.lookup_records(WORKSPACE_ID, "email", " jane@EXAMPLE.com ")
+
+        assert [r["external_id"] for r in page["records"]] == ["pi_1700000000"]
+
+    def test_external_id_lookup(self) -> None:
+        """Test a single event is found by its provider ID."""
+        service = DatabaseLookupService()
+        store_record(service, 1_700_000_000.0)
+        store_record(service, 1_700_000_001.0)
+
+        page = service.lookup_records(WORKSPACE_ID, "external_id", "pi_1700000001")
+
+        assert [r["timestamp"] for r in page["records"]] == [1_700_000_001.0]
+
+    def test_workspaces_are_isolated(self) -> None:
+        """Test another workspace's records aren't returned."""
+        service = DatabaseLookupService()
+        store_record(service, 1_700_000_000.0, workspace_id=str(uuid.uuid4()))
+
+        page = service.lookup_records(WORKSPACE_ID, "customer_id", "cus_123")
+
+        assert page == {"records": [], "next_before": None}
+
+    def test_unknown_field_raises(self) -> None:
+        """Test lookups are limited to the indexed fields."""
+        with pytest.raises(ValueError):
+            DatabaseLookupService().lookup_records(WORKSPACE_ID, "amount", "49")
+
+    def test_indexes_are_written_in_the_activity_pipeline(self) -> None:
+        """Test the lookup indexes share the activity index's round trip."""
+        redis_client = MagicMock()
+        pipe = redis_client.pipeline.return_value
+        record = {
+            "customer_id": "cus_123",
+            "external_id": "pi_1",
+            "customer_email": "jane@example.com",
+        }
+
+        with patch(
+            "webhooks.services.database_lookup.get_redis_client",
+            return_value=redis_client,
+        ):
+            DatabaseLookupService()._add_to_activity_index(
+                "webhook:payment:1", 123.0, WORKSPACE_ID, record
+            )
+
+        assert pipe.zadd.call_count == 4
+        index_keys = [c[0][0] for c in pipe.zadd.call_args_list]
+        assert index_keys[1].endswith(
+            f"activity_lookup:{WORKSPACE_ID}:customer_id:cus_123"
+        )
+        pipe.execute.assert_called_once()
+
+    def test_redis_pages_resume_from_cursor(self) -> None:
+        """Test a page is one ZREVRANGEBYSCORE from the cursor's position."""
+        redis_client = MagicMock()
+        redis_client.zrevrangebyscore.return_value = [
+            (b"webhook:payment:2", 2.0),
+            (b"webhook:payment:1", 1.0),
+        ]
+
+        with (
+            patch(
+                "webhooks.services.redis_client.get_redis_client",
+                return_value=redis_client,
+            ),
+            patch("webhooks.services.database_lookup.cache") as mock_cache,
+        ):
+            mock_cache.get_many.return_value = {}
+            page = DatabaseLookupService().lookup_records(
+                WORKSPACE_ID, "customer_id", "cus_123", limit=1, before="3.0:1"
+            )
+
+        args, kwargs = redis_client.zrevrangebyscore.call_args
+        assert args[1:] == (3.0, "-inf")
+        assert kwargs == {"start": 1, "num": 2, "withscores": True}
+        mock_cache.get_many.assert_called_once_with(["webhook:payment:2"])
+        assert page["next_before"] == "2.0:1"
+
+    def test_pages_split_members_with_the_same_score(self) -> None:
+        """Test members sharing a score at a page boundary aren't skipped."""
+        service = DatabaseLookupService()
+        for index in range(5):
+            record = {"external_id": f"pi_{index}", "customer_id": "cus_123"}
+            webhook_key = f"webhook:payment:{index}"
+            cache.set(webhook_key, json.dumps(record))
+            service._add_to_activity_index(
+                webhook_key, 1_700_000_000.0, WORKSPACE_ID, record
+            )
+
+        seen = []
+        cursor = None
+        while True:
+            page = service.lookup_records(
+                WORKSPACE_ID, "customer_id", "cus_123", 2, before=cursor
+            )
+            seen += [record["external_id"] for record in page["records"]]
+            cursor = page["next_before"]
+            if cursor is None:
+                break
+
+        assert sorted(seen) == [f"pi_{index}" for index in range(5)]
+
+
+class TestWebhookLookup:
+    """Test WebhookStorageService.lookup_webhooks."""
+
+    def test_extracts_stripe_ids(self) -> None:
+        """Test Stripe events are indexed by event, object and customer."""
+        body = json.dumps(
+            {
+                "id": "evt_1",
+                "data": {
+                    "object": {
+                        "id": "in_1",
+                        "object": "invoice",
+                        "customer": "cus_123",
+                        "customer_email": "Jane@Example.com",
+                    }
+                },
+            }
+        ).encode()
+
+        values = WebhookStorageService()._extract_lookup_values("stripe", body)
+
+        assert values == [
+            ("external_id", "evt_1"),
+            ("external_id", "in_1"),
+            ("customer_id", "cus_123"),
+            ("email", "jane@example.com"),
+        ]
+
+    def test_extracts_shopify_and_chargify_ids(self) -> None:
+        """Test Shopify JSON and Chargify form bodies are both understood."""
+        service = WebhookStorageService()
+        shopify = json.dumps(
+            {"id": 42, "email": "a@b.co", "customer": {"id": 7}}
+        ).encode()
+        chargify = urlencode(
+            {
+                "id": "99",
+                "payload[subscription][customer][id]": "55",
+                "payload[subscription][customer][email]": "c@d.co",
+            }
+        ).encode()
+
+        assert service._extract_lookup_values("shopify", shopify) == [
+            ("external_id", "42"),
+            ("customer_id", "7"),
+            ("email", "a@b.co"),
+        ]
+        assert service._extract_lookup_values("chargify", chargify) == [
+            ("external_id", "99"),
+            ("customer_id", "55"),
+            ("email", "c@d.co"),
+        ]
+        assert service._extract_lookup_values("shopify", b"not json") == []
+
+    def test_pages_through_cached_webhooks(self) -> None:
+        """Test the cache backend serves paginated lookups."""
+        service = WebhookStorageService()
+        for minute in range(3):
+            body = json.dumps({"id": minute, "customer": {"id": 7}})
+            store_webhook(service, "shopify", body, DAY + timedelta(minutes=minute))
+
+        first = service.lookup_webhooks(WORKSPACE_ID, "customer_id", "7", limit=2)
+        rest = service.lookup_webhooks(
+            WORKSPACE_ID, "customer_id", "7", limit=2, before=first["next_before"]
+        )
+
+        assert [json.loads(w["body"])["id"] for w in first["webhooks"]] == [2, 1]
+        assert [json.loads(w["body"])["id"] for w in rest["webhooks"]] == [0]
+        assert rest["next_before"] is None
+
+    def test_segment_backend_reads_from_archive(self, settings, tmp_path: Path) -> None:
+        """Test lookups read matching webhooks back from the segment files."""
+        settings.WEBHOOK_ARCHIVE_BACKEND = "segments"
+        settings.WEBHOOK_ARCHIVE_DIR = str(tmp_path / "webhooks")
+        service = WebhookStorageService()
+        store_webhook(service, "shopify", json.dumps({"id": 1}), DAY)
+        store_webhook(
+            service, "shopify", json.dumps({"id": 2}), DAY + timedelta(days=1)
+        )
+
+        page = service.lookup_webhooks(WORKSPACE_ID, "external_id", "2")
+
+        assert [json.loads(w["body"])["id"] for w in page["webhooks"]] == [2]
+
+
+@pytest.mark.django_db
+class TestLookupViews:
+    """Test the lookup API and page."""
+
+    @pytest.fixture
+    def member(self) -> WorkspaceMember:
+        """Create a user who is a member of a workspace."""
+        user = User.objects.create_user(username="owner", password="pw")
+        workspace = Workspace.objects.create(name="Acme")
+        return WorkspaceMember.objects.create(
+            user=user, workspace=workspace, role="owner"
+        )
+
+    def test_api_returns_records_page(self, client, member: WorkspaceMember) -> None:
+        """Test the API looks up the member's workspace with the cursor."""
+        client.force_login(member.user)
+
+        with patch(
+            "webhooks.services.database_lookup.DatabaseLookupService.lookup_records",
+            return_value={"records": [{"external_id": "pi_1"}], "next_before": "1.5:1"},
+        ) as mock_lookup:
+            response = client.get(
+                reverse("core:lookup_api"),
+                {
+                    "field": "email",
+                    "value": "a@b.co",
+                    "before": "2.5:1",
+                    "limit": "500",
+                },
+            )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "results": [{"external_id": "pi_1"}],
+            "next_before": "1.5:1",
+        }
+        mock_lookup.assert_called_once_with(
+            str(member.workspace.uuid), "email", "a@b.co", limit=100, before="2.5:1"
+        )
+
+    def test_api_rejects_bad_parameters(self, client, member: WorkspaceMember) -> None:
+        """Test unknown fields, sources and cursors return 400."""
+        client.force_login(member.user)
+        url = reverse("core:lookup_api")
+
+        assert client.get(url, {"field": "amount", "value": "1"}).status_code == 400
+        assert client.get(url, {"source": "orders", "value": "1"}).status_code == 400
+        assert client.get(url, {"value": "1", "before": "x"}).status_code == 400
+
+    def test_page_renders_matching_activity(
+        self, client, member: WorkspaceMember
+    ) -> None:
+        """Test the lookup page shows records found in the index."""
+        client.force_login(member.user)
+        store_record(
+            DatabaseLookupService(),
+            1_700_000_000.0,
+            workspace_id=str(member.workspace.uuid),
+        )
+
+        response = client.get(
+            reverse("core:activity_lookup"),
+            {"field": "customer_id", "value": "cus_123"},
+        )
+
+        assert response.status_code == 200
+        assert len(response.context["activities"]) == 1
+        assert response.context["webhooks"] == []
+
+    def test_page_follows_webhook_cursor(self, client, member: WorkspaceMember) -> None:
+        """Test the "older webhooks" link loads the next page of webhooks."""
+        client.force_login(member.user)
+        service = WebhookStorageService()
+        for minute in range(25):
+            body = json.dumps({"id": minute, "customer": {"id": 7}})
+            store_webhook(
+                service,
+                "shopify",
+                body,
+                DAY + timedelta(minutes=minute),
+                workspace_id=str(member.workspace.uuid),
+            )
+        url = reverse("core:activity_lookup")
+        query = {"field": "customer_id", "value": "7"}
+
+        first = client.get(url, query)
+        cursor = first.context["webhooks_next_before"]
+        second = client.get(url, {**query, "webhooks_before": cursor})
+
+        assert len(first.context["webhooks"]) == 20
+        assert cursor is not None
+        assert second.status_code == 200
+        assert not list(second.context["messages"])
+        assert [json.loads(w["body"])["id"] for w in second.context["webhooks"]] == [
+            4,
+            3,
+            2,
+            1,
+            0,
+        ]
+        assert second.context["webhooks_next_before"] is None
@@ -0,0 +1,265 @@
+"""Tests for Redis and database round-trip accounting.
+
+This module tests how SQL queries, cache calls and redis-py commands are
+counted, sampled call-site breakdowns, and keeps each provider's
+golden-path webhook within its round-trip budget (see ROUND_TRIP_BUDGETS
+in conftest).
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any
+from unittest.mock import Mock, patch
+
+import pytest
+import redis
+from core.models import Integration, Workspace
+from django.core.cache import cache
+from django.test import override_settings
+from webhooks.services.metrics import metrics
+from webhooks.services.pending_event_queue import pending_event_queue
+from webhooks.services.round_trips import round_trips
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+SECRET = "whsec_test"
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache():
+    """Run every test against an empty local-memory cache."""
+    with override_settings(CACHES=LOCMEM_CACHES):
+        cache.clear()
+        metrics.reset()
+        yield
+    metrics.reset()
+
+
+@pytest.fixture
+def workspace(db) -> Workspace:
+    """Create a workspace with Slack notifications."""
+    workspace = Workspace.objects.create(name="Acme", subscription_plan="basic")
+    Integration.objects.create(
+        workspace=workspace,
+        integration_type="slack_notifications",
+        oauth_credentials={"incoming_webhook": {"url": "https://hooks.slack.com/x"}},
+        is_active=True,
+    )
+    return workspace
+
+
+@pytest.fixture
+def slack() -> Mock:
+    """Replace Slack delivery with a mock."""
+    with patch("plugins.destinations.slack.http_client.post") as mock_post:
+        mock_post.return_value = Mock(status_code=200, text="ok")
+        yield mock_post
+
+
+def connect(workspace: Workspace, integration_type: str) -> None:
+    """Connect a source integration with the test secret."""
+    Integration.objects.create(
+        workspace=workspace,
+        integration_type=integration_type,
+        webhook_secret=SECRET,
+        is_active=True,
+    )
+
+
+class TestCounting:
+    """Test what is counted."""
+
+    @pytest.mark.django_db
+    def test_sql_queries(self) -> None:
+        """Test each query is counted."""
+        with round_trips.track("test") as counts:
+            list(Workspace.objects.all())
+            Workspace.objects.filter(name="x").exists()
+
+        assert counts.sql_queries == 2
+
+    def test_cache_calls(self) -> None:
+        """Test cache calls count as round trips, keys as commands."""
+        with round_trips.track("test") as counts:
+            cache.set("a", 1)
+            cache.get("a")
+            cache.set_many({"b": 2, "c": 3})
+
+        # LocMemCache.set_many is built on set
+        assert counts.redis_round_trips == 4
+        assert counts.redis_commands == 4
+
+    def test_redis_commands_and_pipelines(self) -> None:
+        """Test redis-py commands and pipelines are counted."""
+        client = redis.Redis(connection_pool=Mock())
+        connection = client.connection_pool.get_connection.return_value
+        connection.retry.call_with_retry.side_effect = lambda fn, _: fn()
+
+        with (
+            patch.object(redis.Redis, "_execute_command", return_value=b"1"),
+            patch.object(redis.client.Pipeline, "_execute_pipeline", return_value=[]),
+            round_trips.track("test") as counts,
+        ):
+            client.get("a")
+            pipe = client.pipeline(transaction=False)
+            pipe.incr("a")
+            pipe.expire("a", 60)
+            pipe.execute()
+
+        assert counts.redis_round_trips == 2
+        assert counts.redis_commands == 3
+
+    def test_untracked_calls_are_ignored(self) -> None:
+        """Test calls outside a tracked block cost nothing to count."""
+        cache.get("a")
+
+        assert round_trips.current() is None
+
+    def test_nested_blocks_share_counts(self) -> None:
+        """Test an inner block adds to the outer one and labels it."""
+        with round_trips.track("job") as outer:
+            with round_trips.track("job", "stripe") as inner:
+                cache.get("a")
+
+        assert inner is outer
+        assert outer.provider == "stripe"
+        assert outer.redis_round_trips == 1
+
+    def test_sampled_breakdown_and_metrics(self) -> None:
+        """Test sampled counts list call sites and all are recorded."""
+        with (
+            patch("webhooks.services.round_trips.logger") as mock_logger,
+            round_trips.track("webhook", "shopify", sample=True) as counts,
+        ):
+            pending_event_queue._acquire_lock("lock")
+
+        assert counts.as_dict()["call_sites"] == {
+            "redis webhooks/services/pending_event_queue.py:_acquire_lock": 1
+        }
+        assert mock_logger.info.call_args.kwargs["extra"]["round_trips"]["call_sites"]
+        labels = {"scope": "webhook", "provider": "shopify"}
+        assert metrics.get_histogram("redis_round_trips", labels)["sum"] == 1
+
+
+@pytest.mark.django_db
+class TestGoldenPathBudgets:
+    """Keep each provider's golden-path webhook within its budget."""
+
+    def test_shopify_order(
+        self, client, workspace: Workspace, slack: Mock, round_trip_budget
+    ) -> None:
+        """Test a paid Shopify order is notified within budget."""
+        connect(workspace, "shopify")
+        body = json.dumps(
+            {
+                "id": 820982911946154508,
+                "order_number": 1001,
+                "email": "jon@gmail.com",
+                "total_price": "29.99",
+                "currency": "USD",
+                "financial_status": "paid",
+                "customer": {"id": 115310627314723954, "email": "jon@gmail.com"},
+            }
+        ).encode()
+        signature = base64.b64encode(
+            hmac.new(SECRET.encode(), body, hashlib.sha256).digest()
+        ).decode()
+
+        with round_trip_budget("shopify"):
+            response = client.post(
+                f"/webhook/customer/{workspace.uuid}/shopify/",
+                data=body,
+                content_type="application/json",
+                HTTP_X_SHOPIFY_TOPIC="orders/paid",
+                HTTP_X_SHOPIFY_SHOP_DOMAIN="acme.myshopify.com",
+                HTTP_X_SHOPIFY_HMAC_SHA256=signature,
+                HTTP_X_SHOPIFY_WEBHOOK_ID="b54557e4-bdd9-4b37-8a5f-bf7d70bcd043",
+            )
+
+        assert response.status_code == 200
+        slack.assert_called_once()
+
+    def test_chargify_payment(
+        self, client, workspace: Workspace, slack: Mock, round_trip_budget
+    ) -> None:
+        """Test a Chargify payment is notified within budget."""
+        connect(workspace, "chargify")
+        body = (
+            "event=payment_success&id=12345"
+            "&payload[subscription][id]=sub_789"
+            "&payload[subscription][customer][id]=cust_123"
+            "&payload[subscription][customer][email]=jon@gmail.com"
+            "&payload[subscription][product][name]=Pro"
+            "&payload[transaction][id]=txn_1"
+            "&payload[transaction][amount_in_cents]=10000"
+        ).encode()
+        signature = hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+        with round_trip_budget("chargify"):
+            response = client.post(
+                f"/webhook/customer/{workspace.uuid}/chargify/",
+                data=body,
+                content_type="application/x-www-form-urlencoded",
+                HTTP_X_CHARGIFY_WEBHOOK_ID="wh_1",
+                HTTP_X_CHARGIFY_WEBHOOK_SIGNATURE_HMAC_SHA_256=signature,
+            )
+
+        assert response.status_code == 200
+        slack.assert_called_once()
+
+    @override_settings(DISABLE_BILLING=False)
+    def test_stripe_payment(
+        self, client, workspace: Workspace, slack: Mock, round_trip_budget
+    ) -> None:
+        """Test a Stripe payment is queued, then notified, within budget."""
+        connect(workspace, "stripe_customer")
+        body = json.dumps(stripe_event("invoice.payment_succeeded")).encode()
+        timestamp = int(time.time())
+        signature = hmac.new(
+            SECRET.encode(), f"{timestamp}.".encode() + body, hashlib.sha256
+        ).hexdigest()
+
+        with (
+            patch.object(pending_event_queue, "_schedule_processing") as schedule,
+            round_trip_budget("stripe"),
+        ):
+            response = client.post(
+                f"/webhook/customer/{workspace.uuid}/stripe/",
+                data=body,
+                content_type="application/json",
+                HTTP_STRIPE_SIGNATURE=f"t={timestamp},v1={signature}",
+            )
+
+        assert response.status_code == 200
+        with round_trip_budget("stripe", "job"):
+            pending_event_queue._process_events(*schedule.call_args.args[:4])
+
+        slack.assert_called_once()
+
+
+def stripe_event(event_type: str) -> dict[str, Any]:
+    """Build a Stripe invoice event."""
+    return {
+        "id": "evt_1",
+        "object": "event",
+        "type": event_type,
+        "created": int(time.time()),
+        "request": {"id": "req_1", "idempotency_key": "idem_1"},
+        "data": {
+            "object": {
+                "id": "in_1",
+                "object": "invoice",
+                "customer": "cus_1",
+                "customer_email": "jon@gmail.com",
+                "amount_paid": 2900,
+                "currency": "usd",
+                "billing_reason": "subscription_cycle",
+                "lines": {"data": [{"plan": {"amount": 2900}}]},
+            }
+        },
+    }
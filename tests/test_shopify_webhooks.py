@@ -0,0 +1,276 @@
+"""Tests for background provisioning of Shopify webhook subscriptions.
+
+This module tests that the OAuth callback, event updates and disconnects
+return before any webhook request is sent, that the queued jobs create and
+delete subscriptions concurrently on the shared session, and the status
+endpoint the integration page polls.
+"""
+
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from core.models import Integration, Workspace, WorkspaceMember
+from core.services.shopify_webhooks import shopify_webhooks
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+SHOP = "teststore.myshopify.com"
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache():
+    """Run every test against an empty local-memory cache."""
+    with override_settings(
+        CACHES=LOCMEM_CACHES,
+        SHOPIFY_CLIENT_ID="test_client_id",
+        SHOPIFY_CLIENT_SECRET="test_secret",
+        SHOPIFY_API_VERSION="2025-01",
+        BASE_URL="http://localhost:8000",
+    ):
+        cache.clear()
+        yield
+
+
+@pytest.fixture
+def session():
+    """Replace the HTTP client with a mock; jobs run inline."""
+    mock_session = Mock()
+    mock_session.delete.return_value = Mock(status_code=200)
+    with (
+        patch("core.services.shopify_webhooks.http_client", mock_session),
+        patch.object(
+            shopify_webhooks,
+            "_start",
+            side_effect=lambda action, target, args: shopify_webhooks._run(
+                action, target, args
+            ),
+        ),
+    ):
+        yield mock_session
+
+
+def created(webhook_id: int) -> Mock:
+    """Build a 201 response for a created webhook."""
+    response = Mock(status_code=201)
+    response.json.return_value = {"webhook": {"id": webhook_id}}
+    return response
+
+
+@pytest.fixture
+def workspace(db) -> Workspace:
+    """Create a workspace."""
+    return Workspace.objects.create(name="Shop Co")
+
+
+@pytest.fixture
+def owner(workspace: Workspace) -> User:
+    """Create the owner of the workspace."""
+    user = User.objects.create_user(username="owner", password="pw")
+    WorkspaceMember.objects.create(user=user, workspace=workspace, role="owner")
+    return user
+
+
+@pytest.fixture
+def integration(workspace: Workspace) -> Integration:
+    """Create a Shopify integration subscribed to order events."""
+    return Integration.objects.create(
+        workspace=workspace,
+        integration_type="shopify",
+        oauth_credentials={"access_token": "token"},
+        integration_settings={
+            "shop_domain": SHOP,
+            "webhook_ids": [1, 2],
+            "enabled_categories": ["orders"],
+        },
+        is_active=True,
+    )
+
+
+@pytest.mark.django_db
+class TestShopifyWebhookJobs:
+    """Test the subscription requests themselves."""
+
+    def test_subscriptions_are_created_concurrently(self, session: Mock) -> None:
+        """Test topics are posted in parallel, not one after another."""
+        topics = ["orders/create", "orders/paid", "orders/cancelled"]
+        # Each request waits for the others; sequential calls would time out
+        barrier = threading.Barrier(len(topics), timeout=5)
+
+        def post(url, json, **kwargs):
+            barrier.wait()
+            return created(topics.index(json["webhook"]["topic"]) + 10)
+
+        session.post.side_effect = post
+
+        webhook_ids = shopify_webhooks.create_subscriptions(
+            SHOP, "token", "https://example.com/hook", topics
+        )
+
+        assert webhook_ids == [10, 11, 12]
+
+    def test_failed_and_existing_topics_are_skipped(self, session: Mock) -> None:
+        """Test 422 and error responses don't yield IDs."""
+        session.post.side_effect = [
+            created(10),
+            Mock(status_code=422),
+            Mock(status_code=500, text="error"),
+        ]
+
+        with patch.object(shopify_webhooks, "MAX_WORKERS", 1):
+            webhook_ids = shopify_webhooks.create_subscriptions(
+                SHOP, "token", "https://example.com/hook", ["a", "b", "c"]
+            )
+
+        assert webhook_ids == [10]
+
+    def test_interrupted_job_reads_as_failed(self) -> None:
+        """Test a job that stopped updating (e.g. a restart) isn't pending forever."""
+        shopify_webhooks._set_status(1, "subscribe", "running")
+        assert shopify_webhooks.get_status(1)["state"] == "running"
+
+        later = time.time() + shopify_webhooks.STALE_AFTER + 1
+        with patch("core.services.shopify_webhooks.time.time", return_value=later):
+            status = shopify_webhooks.get_status(1)
+
+        assert status["state"] == "failed"
+        assert "interrupted" in status["error"]
+
+
+@pytest.mark.django_db
+class TestShopifyWebhookViews:
+    """Test the views queue jobs and return immediately."""
+
+    @patch("core.views.integrations.shopify.http_client.post")
+    def test_callback_returns_before_subscribing(
+        self,
+        mock_post: Mock,
+        client,
+        owner: User,
+        session: Mock,
+        django_capture_on_commit_callbacks,
+    ) -> None:
+        """Test the callback saves the integration and defers webhooks."""
+        mock_post.return_value.json.return_value = {"access_token": "token"}
+        session.post.side_effect = [created(i) for i in range(10, 17)]
+        client.force_login(owner)
+        client_session = client.session
+        client_session["shopify_oauth_state"] = "state"
+        client_session["shopify_shop_domain"] = SHOP
+        client_session.save()
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = client.get(
+                reverse("core:shopify_connect_callback"),
+                {"code": "code", "state": "state", "shop": SHOP},
+            )
+
+        assert response.status_code == 302
+        session.post.assert_not_called()
+        integration = Integration.objects.get(integration_type="shopify")
+        assert integration.integration_settings["webhook_ids"] == []
+        assert shopify_webhooks.get_status(integration.id)["state"] == "pending"
+
+        for callback in callbacks:
+            callback()
+
+        integration.refresh_from_db()
+        assert len(integration.integration_settings["webhook_ids"]) == 7
+        assert shopify_webhooks.get_status(integration.id)["state"] == "succeeded"
+
+    def test_update_replaces_old_subscriptions(
+        self,
+        client,
+        owner: User,
+        integration: Integration,
+        session: Mock,
+        django_capture_on_commit_callbacks,
+    ) -> None:
+        """Test new webhooks are saved before the old ones are deleted."""
+        session.post.return_value = created(20)
+        client.force_login(owner)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(
+                reverse("core:update_shopify_events"),
+                {"event_categories": ["customers"]},
+            )
+
+        integration.refresh_from_db()
+        assert integration.integration_settings["webhook_ids"] == [20]
+        assert integration.integration_settings["enabled_categories"] == ["customers"]
+        deleted = sorted(call.args[0] for call in session.delete.call_args_list)
+        assert deleted == [
+            "https://teststore.myshopify.com/admin/api/2025-01/webhooks/1.json",
+            "https://teststore.myshopify.com/admin/api/2025-01/webhooks/2.json",
+        ]
+
+    def test_failed_update_keeps_configuration(
+        self,
+        client,
+        owner: User,
+        integration: Integration,
+        session: Mock,
+        django_capture_on_commit_callbacks,
+    ) -> None:
+        """Test old webhooks survive if no new one could be created."""
+        session.post.return_value = Mock(status_code=500, text="error")
+        client.force_login(owner)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(
+                reverse("core:update_shopify_events"),
+                {"event_categories": ["customers"]},
+            )
+
+        integration.refresh_from_db()
+        assert integration.integration_settings["webhook_ids"] == [1, 2]
+        assert integration.integration_settings["enabled_categories"] == ["orders"]
+        session.delete.assert_not_called()
+
+        response = client.get(reverse("core:shopify_webhook_status"))
+        assert response.json()["state"] == "failed"
+        assert "manually" in response.json()["error"]
+
+    def test_disconnect_deletes_in_background(
+        self,
+        client,
+        owner: User,
+        integration: Integration,
+        session: Mock,
+        django_capture_on_commit_callbacks,
+    ) -> None:
+        """Test disconnecting deactivates first and deletes after commit."""
+        client.force_login(owner)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            client.post(reverse("core:disconnect_shopify"))
+
+        integration.refresh_from_db()
+        assert integration.is_active is False
+        session.delete.assert_not_called()
+
+        for callback in callbacks:
+            callback()
+
+        assert session.delete.call_count == 2
+        response = client.get(reverse("core:shopify_webhook_status"))
+        assert response.json()["action"] == "unsubscribe"
+        assert response.json()["deleted"] == 2
+
+    def test_status_without_job(
+        self, client, owner: User, integration: Integration
+    ) -> None:
+        """Test the status endpoint reports idle when no job ran."""
+        client.force_login(owner)
+
+        response = client.get(reverse("core:shopify_webhook_status"))
+
+        assert response.json() == {"state": "idle", "webhook_count": 2}
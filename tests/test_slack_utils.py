@@ -4,14 +4,56 @@ This module tests the html_to_slack_mrkdwn function that converts
 HTML content to Slack's mrkdwn format.
 """
 
+from unittest.mock import patch
+
+import pytest
+from plugins.destinations import slack_utils
 from plugins.destinations.slack_utils import (
     _clean_control_characters,
+    _clear_conversion_cache,
     _escape_slack_mrkdwn,
+    _finalize_mrkdwn,
+    _parse_html,
     _sanitize_slack_injection,
     _sanitize_url,
+    _tokenize_simple_html,
     html_to_slack_mrkdwn,
 )
 
+# Benchmark corpus modelled on company descriptions returned by Brandfetch:
+# mostly plain text, some with the common tag subset, a few with markup that
+# needs the full parser, plus injection attempts.
+BRANDFETCH_DESCRIPTIONS = [
+    "Stripe is a technology company that builds economic infrastructure for "
+    "the internet. Businesses of every size use the company's software to "
+    "accept payments and manage their businesses online.",
+    "Shopify is a leading global commerce company, providing trusted tools to "
+    "start, grow, market, and manage a retail business of any size.",
+    "Notion is the connected workspace where better, faster work happens.\n\n"
+    "Millions of teams use it for docs, wikis and projects.",
+    "Acme Corp\xa0builds rockets > everyone else's rockets.",
+    "Ben & Jerry's makes ice cream with a mission.",
+    "<p>Linear is a better way to build products.</p>"
+    "<p>Meet the new standard for modern software development.</p>",
+    "<p>We build <strong>developer tools</strong> for <em>fast</em> teams. "
+    'Learn more at <a href="https://example.com/about">our site</a>.</p>',
+    "<p>Founded in 2012<br>Headquartered in Berlin<br/>Remote-friendly</p>",
+    "<b>Tom &amp; Jerry Ltd</b> &mdash; animation since 1940.",
+    '<div class="bio"><span>Figma</span> is a collaborative interface design '
+    "tool.</div>",
+    "<p>Pricing &lt;$10&gt; per seat &#8212; cancel anytime.</p>",
+    "<ul><li>Payments</li><li>Billing</li><li>Connect</li></ul>",
+    "<p>Great company <!channel> click here</p>",
+    "Hey <@U123ABC> and <#C456DEF> see <!here|here>",
+    '<a href="javascript:alert(1)">Click</a> for a prize',
+    "<a href='https://example.com/a|b'>Pipe | link</a>",
+    '<P>Upper <STRONG>case</STRONG> <A HREF="https://example.com">tags</A></P>',
+    "Unclosed <b>bold and <i>italic",
+    "Trailing ampersand &",
+    "Null\x00byte and bell\x07 control characters",
+    "<p>\n\n\n\nLots of newlines\n\n\n\n</p>",
+]
+
 
 class TestHtmlToSlackMrkdwnBasic:
     """Test basic HTML to mrkdwn conversion."""
@@ -545,3 +587,93 @@ class TestCleanControlCharacters:
     def test_remove_delete_character(self) -> None:
         """Test DEL character (0x7f) is removed."""
         assert _clean_control_characters("a\x7fb") == "ab"
+
+
+class TestHtmlToSlackMrkdwnFastPaths:
+    """Test the plain-text fast path, single-pass tokenizer and cache."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        """Start every test with an empty conversion cache."""
+        _clear_conversion_cache()
+
+    @pytest.mark.parametrize("html", BRANDFETCH_DESCRIPTIONS)
+    def test_matches_full_parser(self, html: str) -> None:
+        """Test every path produces the same output as the full parser."""
+        cleaned = _clean_control_characters(html)
+        expected = _finalize_mrkdwn(_parse_html(cleaned), 2000)
+        assert html_to_slack_mrkdwn(html) == expected
+        # Second call is served from the cache
+        assert html_to_slack_mrkdwn(html) == expected
+
+    @pytest.mark.parametrize("html", BRANDFETCH_DESCRIPTIONS)
+    def test_truncation_matches_full_parser(self, html: str) -> None:
+        """Test truncation is applied identically on every path."""
+        cleaned = _clean_control_characters(html)
+        expected = _finalize_mrkdwn(_parse_html(cleaned), 20)
+        assert html_to_slack_mrkdwn(html, max_length=20) == expected
+
+    def test_tokenizer_handles_common_subset(self) -> None:
+        """Test the tokenizer accepts the common tag subset."""
+        html = '<p>A <b>bold</b> <a href="https://x.com">link</a><br/></p>'
+        assert _tokenize_simple_html(html) is not None
+
+    def test_tokenizer_rejects_other_markup(self) -> None:
+        """Test the tokenizer defers unknown tags and entities to the parser."""
+        assert _tokenize_simple_html("<span>text</span>") is None
+        assert _tokenize_simple_html("a &mdash; b") is None
+        assert _tokenize_simple_html("a &#60; b") is None
+        assert _tokenize_simple_html('<a href="x" target="_blank">y</a>') is None
+        assert _tokenize_simple_html("1 < 2") is None
+
+    def test_tokenizer_neutralizes_injection(self) -> None:
+        """Test injection attempts are neutralized on the tokenizer path."""
+        result = html_to_slack_mrkdwn("<p>Hi <!channel> and <@U123ABC></p>")
+        assert "<!channel>" not in result
+        assert "<@U123ABC>" not in result
+
+    def test_tokenizer_blocks_dangerous_urls(self) -> None:
+        """Test dangerous link schemes are dropped on the tokenizer path."""
+        result = html_to_slack_mrkdwn('<a href="javascript:alert(1)">x</a>')
+        assert "javascript" not in result
+        assert result == "x"
+
+    def test_plain_text_escapes_greater_than(self) -> None:
+        """Test the plain-text fast path still escapes special characters."""
+        assert html_to_slack_mrkdwn("a > b") == "a &gt; b"
+
+    def test_plain_text_not_cached(self) -> None:
+        """Test plain text bypasses the cache."""
+        html_to_slack_mrkdwn("Just a plain description.")
+        assert len(slack_utils._conversion_cache) == 0
+
+    def test_cache_is_bounded(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the cache evicts least recently used entries."""
+        monkeypatch.setattr(slack_utils, "CONVERSION_CACHE_SIZE", 3)
+        for index in range(5):
+            html_to_slack_mrkdwn(f"<b>{index}</b>")
+        assert len(slack_utils._conversion_cache) == 3
+
+    def test_cache_keyed_by_max_length(self) -> None:
+        """Test the same input with different limits is cached separately."""
+        html = "<p>Some description text</p>"
+        assert html_to_slack_mrkdwn(html, max_length=4) == "Some"
+        assert html_to_slack_mrkdwn(html) == "Some description text"
+
+    def test_repeats_skip_the_full_parser(self) -> None:
+        """Test converting the corpus again never runs the full parser."""
+        expected = [html_to_slack_mrkdwn(html) for html in BRANDFETCH_DESCRIPTIONS]
+
+        with patch.object(slack_utils, "_parse_html", wraps=_parse_html) as parser:
+            results = [html_to_slack_mrkdwn(html) for html in BRANDFETCH_DESCRIPTIONS]
+
+        assert results == expected
+        parser.assert_not_called()
+
+    def test_simple_markup_skips_the_full_parser(self) -> None:
+        """Test plain text and the common tag subset never reach the parser."""
+        with patch.object(slack_utils, "_parse_html", wraps=_parse_html) as parser:
+            html_to_slack_mrkdwn("Acme builds rockets > everyone else's.")
+            html_to_slack_mrkdwn("<p>We build <strong>tools</strong>.</p>")
+
+        parser.assert_not_called()
@@ -0,0 +1,292 @@
+"""Tests for the cached Stripe product and price catalog.
+
+This module tests two-level catalog reads, background and webhook-driven
+reloads, the Plan table fallback on cold start, and the billing webhook
+hook for product.* and price.* events.
+"""
+
+import hashlib
+import hmac
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from core.services.stripe_catalog import StripeCatalog, is_catalog_event
+from django.core.cache import cache
+from django.test import override_settings
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+PRO_PRICE = {
+    "id": "price_pro",
+    "product_id": "prod_pro",
+    "product_name": "Pro",
+    "product_description": "For growing teams",
+    "unit_amount": 4900,
+    "currency": "usd",
+    "recurring": {"interval": "month", "interval_count": 1},
+    "metadata": {"plan_name": "pro"},
+    "features": ["Unlimited webhooks"],
+}
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache():
+    """Run every test against an empty local-memory cache."""
+    with override_settings(CACHES=LOCMEM_CACHES):
+        cache.clear()
+        yield
+
+
+@pytest.fixture
+def mock_stripe_api():
+    """Patch StripeAPI so reloads return PRO_PRICE."""
+    with patch("core.services.stripe.StripeAPI") as mock_api:
+        mock_api.return_value.list_prices.return_value = [PRO_PRICE]
+        yield mock_api.return_value
+
+
+class TestStripeCatalog:
+    """Test catalog reads and reloads."""
+
+    def test_cold_start_returns_none_and_reloads_in_background(self) -> None:
+        """Test an empty cache doesn't call Stripe on the read path."""
+        catalog = StripeCatalog()
+
+        with patch.object(catalog, "_refresh_in_background") as mock_refresh:
+            assert catalog.get_prices() is None
+
+        mock_refresh.assert_called_once()
+
+    def test_reads_are_served_locally(self, mock_stripe_api: MagicMock) -> None:
+        """Test reads after a reload need neither Stripe nor the cache."""
+        catalog = StripeCatalog()
+        assert catalog.refresh()
+
+        with patch("core.services.stripe_catalog.cache") as mock_cache:
+            prices = catalog.get_prices()
+
+        assert prices == [PRO_PRICE]
+        mock_cache.get.assert_not_called()
+        mock_stripe_api.list_prices.assert_called_once_with(active_only=True)
+
+    def test_other_workers_read_the_shared_copy(
+        self, mock_stripe_api: MagicMock
+    ) -> None:
+        """Test a reload in one process is visible to a fresh process."""
+        StripeCatalog().refresh()
+
+        assert StripeCatalog().get_prices() == [PRO_PRICE]
+
+    def test_empty_listing_keeps_catalog(self, mock_stripe_api: MagicMock) -> None:
+        """Test a failed Stripe listing doesn't wipe the cached catalog."""
+        catalog = StripeCatalog()
+        catalog.refresh()
+        mock_stripe_api.list_prices.return_value = []
+
+        assert catalog.refresh() is False
+        assert StripeCatalog().get_prices() == [PRO_PRICE]
+
+    def test_aging_catalog_is_served_while_reloading(
+        self, mock_stripe_api: MagicMock
+    ) -> None:
+        """Test an old catalog is returned and a reload is started."""
+        catalog = StripeCatalog()
+        catalog.refresh()
+        catalog._local["refreshed_at"] -= catalog.REFRESH_SECONDS + 1
+
+        with patch.object(catalog, "_refresh_in_background") as mock_refresh:
+            assert catalog.get_prices() == [PRO_PRICE]
+
+        mock_refresh.assert_called_once()
+
+    def test_invalidation_reloads_in_background(
+        self, mock_stripe_api: MagicMock
+    ) -> None:
+        """Test invalidation marks the catalog stale without calling Stripe."""
+        catalog = StripeCatalog()
+        catalog.refresh()
+
+        with patch.object(catalog, "_refresh_in_background") as mock_refresh:
+            catalog.invalidate()
+
+        mock_refresh.assert_called_once()
+        mock_stripe_api.list_prices.assert_called_once()  # Only the first load
+        assert cache.get(catalog.CACHE_KEY)["refreshed_at"] == 0.0
+        assert catalog._local["refreshed_at"] == 0.0
+
+    def test_failed_reload_keeps_catalog_stale(
+        self, mock_stripe_api: MagicMock
+    ) -> None:
+        """Test the next read retries when the background reload fails."""
+        catalog = StripeCatalog()
+        catalog.refresh()
+        mock_stripe_api.list_prices.return_value = []
+
+        with patch("core.services.stripe_catalog.threading.Thread") as mock_thread:
+            catalog.invalidate()
+        catalog._refresh_and_unlock()
+
+        mock_thread.assert_called_once()
+        assert cache.get(catalog.CACHE_KEY)["refreshed_at"] == 0.0
+        with patch.object(catalog, "_refresh_in_background") as mock_refresh:
+            assert catalog.get_prices() == [PRO_PRICE]
+        mock_refresh.assert_called_once()
+
+    def test_invalidation_during_reload_lists_again(
+        self, mock_stripe_api: MagicMock
+    ) -> None:
+        """Test a reload doesn't store a listing that predates a change."""
+        catalog = StripeCatalog()
+        new_price = {**PRO_PRICE, "unit_amount": 5900}
+
+        def change_during_listing(active_only: bool) -> list[dict]:
+            if mock_stripe_api.list_prices.call_count == 1:
+                catalog.invalidate()  # The running reload holds the lock
+                return [PRO_PRICE]
+            return [new_price]
+
+        mock_stripe_api.list_prices.side_effect = change_during_listing
+        cache.add(catalog.LOCK_KEY, 1)
+        with patch("core.services.stripe_catalog.threading.Thread") as mock_thread:
+            catalog._refresh_and_unlock()
+
+        mock_thread.assert_not_called()
+        assert mock_stripe_api.list_prices.call_count == 2
+        assert StripeCatalog().get_prices() == [new_price]
+        assert cache.get(catalog.CACHE_KEY)["refreshed_at"] > 0
+
+    def test_constant_invalidation_stores_catalog_stale(
+        self, mock_stripe_api: MagicMock
+    ) -> None:
+        """Test a reload gives up listing but leaves the next read to retry."""
+        catalog = StripeCatalog()
+
+        def change_during_listing(active_only: bool) -> list[dict]:
+            catalog.invalidate()
+            return [PRO_PRICE]
+
+        mock_stripe_api.list_prices.side_effect = change_during_listing
+        with patch.object(catalog, "_refresh_in_background"):
+            assert catalog.refresh()
+
+        assert mock_stripe_api.list_prices.call_count == catalog.REFRESH_ATTEMPTS
+        assert cache.get(catalog.CACHE_KEY)["refreshed_at"] == 0.0
+
+    def test_one_background_reload_at_a_time(self) -> None:
+        """Test the refresh lock keeps concurrent reads from piling up."""
+        catalog = StripeCatalog()
+
+        with patch("core.services.stripe_catalog.threading.Thread") as mock_thread:
+            catalog._refresh_in_background()
+            catalog._refresh_in_background()
+
+        mock_thread.assert_called_once()
+
+    def test_catalog_event_types(self) -> None:
+        """Test only product and price events reload the catalog."""
+        assert is_catalog_event("price.updated")
+        assert is_catalog_event("product.deleted")
+        assert not is_catalog_event("invoice.paid")
+        assert not is_catalog_event(None)
+
+
+@pytest.mark.django_db
+class TestAvailablePlans:
+    """Test BillingService reads plans from the catalog."""
+
+    def test_plans_come_from_cached_catalog(self) -> None:
+        """Test plan pages render from the catalog without calling Stripe."""
+        from core.services.dashboard import BillingService
+
+        with (
+            patch(
+                "core.services.stripe_catalog.stripe_catalog.get_prices",
+                return_value=[PRO_PRICE],
+            ),
+            patch("core.services.stripe.StripeAPI") as mock_api,
+        ):
+            plans = BillingService().get_available_plans("free")
+
+        mock_api.assert_not_called()
+        assert [(p["id"], p["price"]) for p in plans] == [("pro", 49)]
+
+    def test_cold_start_falls_back_to_plan_table(self) -> None:
+        """Test an uncached catalog serves plans from the database."""
+        from core.models import Plan
+        from core.services.dashboard import BillingService
+
+        Plan.objects.update_or_create(
+            name="basic",
+            defaults={
+                "display_name": "Basic",
+                "price_monthly": 19,
+                "is_active": True,
+            },
+        )
+
+        with patch(
+            "core.services.stripe_catalog.stripe_catalog.get_prices",
+            return_value=None,
+        ):
+            plans = BillingService().get_available_plans("free")
+
+        assert "basic" in [p["id"] for p in plans]
+
+
+@pytest.mark.django_db
+class TestBillingWebhookInvalidation:
+    """Test the billing webhook reloads the catalog."""
+
+    @pytest.fixture(autouse=True)
+    def billing_integration(self) -> None:
+        """Configure the global Stripe billing integration."""
+        from core.models import GlobalBillingIntegration
+
+        GlobalBillingIntegration.objects.update_or_create(
+            integration_type="stripe_billing",
+            defaults={"webhook_secret": "whsec_test", "is_active": True},
+        )
+
+    def post(self, client, event_type: str, valid: bool = True):
+        """Post a Stripe-signed billing webhook."""
+        payload = json.dumps(
+            {"id": "evt_1", "type": event_type, "data": {"object": {}}}
+        )
+        timestamp = int(time.time())
+        digest = hmac.new(
+            b"whsec_test", f"{timestamp}.{payload}".encode(), hashlib.sha256
+        ).hexdigest()
+        with patch(
+            "plugins.sources.stripe.StripeSourcePlugin.validate_webhook",
+            return_value=valid,
+        ):
+            return client.post(
+                "/webhook/billing/stripe/",
+                data=payload,
+                content_type="application/json",
+                HTTP_STRIPE_SIGNATURE=f"t={timestamp},v1={digest}",
+            )
+
+    def test_price_events_reload_catalog(self, client) -> None:
+        """Test a signed price.updated event invalidates the catalog."""
+        with patch(
+            "core.services.stripe_catalog.stripe_catalog.invalidate"
+        ) as mock_invalidate:
+            response = self.post(client, "price.updated")
+
+        assert response.status_code == 200
+        mock_invalidate.assert_called_once()
+
+    def test_unsigned_events_are_ignored(self, client) -> None:
+        """Test a bad signature can't trigger Stripe calls."""
+        with patch(
+            "core.services.stripe_catalog.stripe_catalog.invalidate"
+        ) as mock_invalidate:
+            response = self.post(client, "product.updated", valid=False)
+
+        assert response.status_code == 400
+        mock_invalidate.assert_not_called()
@@ -384,3 +384,109 @@ class TestSyncStripeSubscriptionsCommand:
 
         output = out.getvalue()
         assert "SYNCED" in output or "already in sync" in output
+
+
+def make_subscription(
+    sub_id: str, customer_id: str, status: str = "active", product: str = "prod_pro"
+) -> dict:
+    """Build a subscription as Stripe lists it, with an unexpanded product."""
+    return {
+        "id": sub_id,
+        "customer": customer_id,
+        "status": status,
+        "current_period_end": 1702592000,
+        "items": {"data": [{"price": {"product": product}}]},
+    }
+
+
+def make_page(subscriptions: list, has_more: bool = False) -> MagicMock:
+    """Build a Stripe list response."""
+    page = MagicMock()
+    page.data = [MagicMock(**s) for s in subscriptions]
+    for mock, sub in zip(page.data, subscriptions, strict=True):
+        mock.get.side_effect = sub.get
+    page.has_more = has_more
+    return page
+
+
+@pytest.mark.django_db
+class TestStreamingSync:
+    """Tests for the paged, bulk-applied subscription sync."""
+
+    def run_sync(self, pages: list, *args: str) -> tuple[MagicMock, MagicMock, str]:
+        """Run the command against the given Stripe pages."""
+        product = MagicMock()
+        product.name = "Notipus Pro Plan"
+        with (
+            patch("stripe.Account.retrieve", return_value=MagicMock(id="acct_test")),
+            patch("stripe.Subscription.list", side_effect=pages) as mock_list,
+            patch("stripe.Product.retrieve", return_value=product) as mock_product,
+        ):
+            out = StringIO()
+            call_command("sync_stripe_subscriptions", *args, stdout=out)
+        return mock_list, mock_product, out.getvalue()
+
+    def test_pages_are_applied_in_bulk(self, django_assert_max_num_queries) -> None:
+        """Test each page costs one workspace query and one bulk update."""
+        for i in range(4):
+            Workspace.objects.create(
+                name=f"W{i}",
+                stripe_customer_id=f"cus_{i}",
+                subscription_status="cancelled",
+                subscription_plan="basic",
+            )
+        pages = [
+            make_page(
+                [
+                    make_subscription("sub_0", "cus_0"),
+                    make_subscription("sub_1", "cus_1"),
+                ],
+                has_more=True,
+            ),
+            make_page(
+                [
+                    make_subscription("sub_2", "cus_2", status="trialing"),
+                    make_subscription("sub_3", "cus_3"),
+                ]
+            ),
+        ]
+
+        with django_assert_max_num_queries(4):
+            mock_list, mock_product, output = self.run_sync(pages)
+
+        assert mock_list.call_args_list[1].kwargs["starting_after"] == "sub_1"
+        mock_product.assert_called_once_with("prod_pro")
+        assert output.count("SYNCED") == 4
+        assert "Found 4 subscription(s)" in output
+        assert "cursor sub_3" in output
+        workspace = Workspace.objects.get(stripe_customer_id="cus_2")
+        assert workspace.subscription_status == "trial"
+        assert workspace.subscription_plan == "pro"
+        assert workspace.billing_cycle_anchor == 1702592000
+        assert Workspace.objects.get(
+            stripe_customer_id="cus_3"
+        ).subscription_status == ("active")
+
+    def test_later_active_subscription_wins(self) -> None:
+        """Test an active subscription on a later page replaces a canceled one."""
+        Workspace.objects.create(
+            name="W", stripe_customer_id="cus_1", subscription_status="active"
+        )
+        pages = [
+            make_page([make_subscription("sub_1", "cus_1", "canceled")], True),
+            make_page([make_subscription("sub_2", "cus_1", "active")]),
+        ]
+
+        self.run_sync(pages)
+
+        workspace = Workspace.objects.get(stripe_customer_id="cus_1")
+        assert workspace.subscription_status == "active"
+
+    def test_resumes_from_cursor(self) -> None:
+        """Test --starting-after is passed to the first page request."""
+        mock_list, _, output = self.run_sync(
+            [make_page([])], "--starting-after", "sub_42", "--concurrency", "1"
+        )
+
+        assert mock_list.call_args.kwargs["starting_after"] == "sub_42"
+        assert "Resuming after sub_42" in output
@@ -0,0 +1,285 @@
+"""Tests for bucketed per-workspace usage metrics.
+
+This module tests recording outcomes at minute, hour and day resolution,
+aligned series queries, the Redis pipeline paths, the webhook router
+outcome hooks, batched monthly usage stats and the usage series API view.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+from core.models import Workspace, WorkspaceMember
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from webhooks.services.usage_metrics import OUTCOMES, UsageMetrics
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+WORKSPACE_ID = str(uuid.uuid4())
+NOW = datetime(2026, 10, 18, 12, 30, tzinfo=dt_timezone.utc)
+HOUR = int(datetime(2026, 10, 18, 12, tzinfo=dt_timezone.utc).timestamp())
+
+
+@pytest.fixture
+def metrics() -> UsageMetrics:
+    """Create a UsageMetrics instance backed by a local-memory cache."""
+    with override_settings(CACHES=LOCMEM_CACHES):
+        cache.clear()
+        yield UsageMetrics()
+
+
+class TestUsageMetrics:
+    """Test recording and series queries without Redis."""
+
+    def test_series_are_aligned_with_zeros(self, metrics: UsageMetrics) -> None:
+        """Test every outcome gets one value per bucket, oldest first."""
+        metrics.record(WORKSPACE_ID, "stripe", "payment_success", "sent", at=NOW)
+        metrics.record(
+            WORKSPACE_ID,
+            "stripe",
+            "payment_success",
+            "sent",
+            at=NOW - timedelta(hours=2),
+        )
+        metrics.record(WORKSPACE_ID, "shopify", "order_created", "deduped", at=NOW)
+
+        result = metrics.get_series(WORKSPACE_ID, "hour", points=3, end=NOW)
+
+        assert result["bucket_seconds"] == 3600
+        assert result["timestamps"] == [HOUR - 7200, HOUR - 3600, HOUR]
+        assert set(result["series"]) == set(OUTCOMES)
+        assert result["series"]["sent"] == [1, 0, 1]
+        assert result["series"]["deduped"] == [0, 0, 1]
+        assert result["series"]["failed"] == [0, 0, 0]
+        assert result["totals"]["sent"] == 2
+
+    def test_events_roll_up_into_every_resolution(self, metrics: UsageMetrics) -> None:
+        """Test one record is counted in minute, hour and day buckets."""
+        for minute in (0, 1, 2):
+            metrics.record(
+                WORKSPACE_ID,
+                "stripe",
+                "payment_success",
+                "sent",
+                at=NOW + timedelta(minutes=minute),
+            )
+
+        end = NOW + timedelta(minutes=2)
+        minutes = metrics.get_series(WORKSPACE_ID, "minute", points=3, end=end)
+        hours = metrics.get_series(WORKSPACE_ID, "hour", points=1, end=end)
+        days = metrics.get_series(WORKSPACE_ID, "day", points=1, end=end)
+
+        assert minutes["series"]["sent"] == [1, 1, 1]
+        assert hours["series"]["sent"] == [3]
+        assert days["series"]["sent"] == [3]
+
+    def test_group_by_and_filters(self, metrics: UsageMetrics) -> None:
+        """Test series can be split by provider and filtered by outcome."""
+        metrics.record(WORKSPACE_ID, "stripe", "payment_success", "sent", at=NOW)
+        metrics.record(WORKSPACE_ID, "stripe", "payment_failure", "failed", at=NOW)
+        metrics.record(WORKSPACE_ID, "shopify", "order_created", "sent", at=NOW)
+
+        by_provider = metrics.get_series(
+            WORKSPACE_ID, points=1, group_by="provider", outcome="sent", end=NOW
+        )
+        by_event = metrics.get_series(
+            WORKSPACE_ID, points=1, group_by="event_type", provider="stripe", end=NOW
+        )
+
+        assert by_provider["series"] == {"stripe": [1], "shopify": [1]}
+        assert by_event["series"] == {"payment_success": [1], "payment_failure": [1]}
+
+    def test_workspaces_are_isolated(self, metrics: UsageMetrics) -> None:
+        """Test another workspace's events don't show up."""
+        metrics.record(str(uuid.uuid4()), "stripe", "payment_success", "sent", at=NOW)
+
+        result = metrics.get_series(WORKSPACE_ID, points=1, end=NOW)
+
+        assert result["totals"] == dict.fromkeys(OUTCOMES, 0)
+
+    def test_invalid_query_raises(self, metrics: UsageMetrics) -> None:
+        """Test unknown resolutions and dimensions are rejected."""
+        with pytest.raises(ValueError):
+            metrics.get_series(WORKSPACE_ID, resolution="week")
+        with pytest.raises(ValueError):
+            metrics.get_series(WORKSPACE_ID, group_by="workspace")
+
+    def test_points_are_clamped(self, metrics: UsageMetrics) -> None:
+        """Test a query returns at most MAX_POINTS buckets."""
+        result = metrics.get_series(WORKSPACE_ID, "day", points=10_000, end=NOW)
+        assert len(result["timestamps"]) == UsageMetrics.MAX_POINTS
+
+    def test_record_never_raises(self) -> None:
+        """Test cache errors are logged, not raised into webhook handling."""
+        with patch(
+            "webhooks.services.usage_metrics.get_redis_client",
+            side_effect=Exception("redis down"),
+        ):
+            UsageMetrics().record(WORKSPACE_ID, "stripe", "payment_success", "sent")
+
+
+class TestUsageMetricsRedis:
+    """Test the pipelined Redis paths."""
+
+    def test_record_pipelines_all_resolutions(self) -> None:
+        """Test one execute() carries HINCRBY + EXPIRE per resolution."""
+        redis_client = MagicMock()
+        pipe = redis_client.pipeline.return_value
+
+        with patch(
+            "webhooks.services.usage_metrics.get_redis_client",
+            return_value=redis_client,
+        ):
+            UsageMetrics().record(
+                WORKSPACE_ID, "stripe", "payment_success", "sent", at=NOW
+            )
+
+        redis_client.pipeline.assert_called_once_with(transaction=False)
+        assert pipe.hincrby.call_count == 3
+        assert pipe.expire.call_count == 3
+        pipe.execute.assert_called_once()
+        key, field, count = pipe.hincrby.call_args_list[1][0]
+        assert key.endswith(f"usage_ts:{WORKSPACE_ID}:hour:{HOUR}")
+        assert (field, count) == ("stripe|payment_success|sent", 1)
+
+    def test_series_reads_buckets_in_one_round_trip(self) -> None:
+        """Test get_series pipelines one HGETALL per bucket."""
+        redis_client = MagicMock()
+        pipe = redis_client.pipeline.return_value
+        pipe.execute.return_value = [
+            {},
+            {b"stripe|payment_success|failed": b"2"},
+        ]
+
+        with patch(
+            "webhooks.services.usage_metrics.get_redis_client",
+            return_value=redis_client,
+        ):
+            result = UsageMetrics().get_series(WORKSPACE_ID, points=2, end=NOW)
+
+        assert pipe.hgetall.call_count == 2
+        pipe.execute.assert_called_once()
+        assert result["series"]["failed"] == [0, 2]
+
+
+class TestOutcomeHooks:
+    """Test notification paths record their outcome."""
+
+    def test_duplicate_events_count_as_deduped(self) -> None:
+        """Test the router records 'deduped' for duplicate events."""
+        from webhooks import webhook_router
+
+        workspace = MagicMock(uuid=WORKSPACE_ID)
+        event_data = {
+            "type": "payment_success",
+            "provider": "stripe",
+            "external_id": "pi_1",
+        }
+
+        with (
+            patch.object(
+                webhook_router.event_consolidation_service,
+                "is_duplicate",
+                return_value=True,
+            ),
+            patch.object(webhook_router, "usage_metrics") as mock_metrics,
+        ):
+            webhook_router._process_webhook_data(
+                event_data, MagicMock(), "stripe", workspace
+            )
+
+        mock_metrics.record.assert_called_once_with(
+            WORKSPACE_ID, "stripe", "payment_success", "deduped"
+        )
+
+    def test_global_events_are_not_counted(self) -> None:
+        """Test events without a workspace aren't recorded."""
+        from webhooks import webhook_router
+
+        with patch.object(webhook_router, "usage_metrics") as mock_metrics:
+            webhook_router._record_outcome({}, "stripe", None, "sent")
+
+        mock_metrics.record.assert_not_called()
+
+
+class TestUsageStats:
+    """Test RateLimiter.get_usage_stats."""
+
+    def test_months_are_read_with_one_get_many(self) -> None:
+        """Test monthly counters are fetched in one round trip."""
+        from webhooks.services.rate_limiter import RateLimiter
+
+        limiter = RateLimiter()
+        organization = MagicMock(uuid=WORKSPACE_ID)
+        current_key = limiter.get_cache_key(WORKSPACE_ID, "2026-10")
+
+        with (
+            patch("webhooks.services.rate_limiter.timezone") as mock_timezone,
+            patch("webhooks.services.rate_limiter.cache") as mock_cache,
+        ):
+            mock_timezone.now.return_value = NOW
+            mock_cache.get_many.return_value = {current_key: 42}
+            stats = limiter.get_usage_stats(organization, months=3)
+
+        mock_cache.get_many.assert_called_once()
+        mock_cache.get.assert_not_called()
+        assert stats == {"2026-10": 42, "2026-09": 0, "2026-08": 0}
+
+
+@pytest.mark.django_db
+class TestUsageSeriesView:
+    """Test the usage series JSON endpoint."""
+
+    @pytest.fixture
+    def member(self) -> WorkspaceMember:
+        """Create a user who is a member of a workspace."""
+        user = User.objects.create_user(username="owner", password="pw")
+        workspace = Workspace.objects.create(name="Acme")
+        return WorkspaceMember.objects.create(
+            user=user, workspace=workspace, role="owner"
+        )
+
+    def test_returns_series_for_member_workspace(
+        self, client, member: WorkspaceMember
+    ) -> None:
+        """Test the view queries the logged-in user's workspace."""
+        client.force_login(member.user)
+
+        with patch("webhooks.services.usage_metrics.usage_metrics") as mock_metrics:
+            mock_metrics.get_series.return_value = {"series": {}}
+            response = client.get(
+                reverse("core:usage_series"),
+                {"resolution": "day", "points": "7", "provider": "stripe"},
+            )
+
+        assert response.status_code == 200
+        mock_metrics.get_series.assert_called_once_with(
+            str(member.workspace.uuid),
+            resolution="day",
+            points=7,
+            group_by="outcome",
+            provider="stripe",
+            event_type=None,
+            outcome=None,
+        )
+
+    def test_invalid_parameters_are_rejected(
+        self, client, member: WorkspaceMember
+    ) -> None:
+        """Test bad query parameters return 400."""
+        client.force_login(member.user)
+
+        bad_points = client.get(reverse("core:usage_series"), {"points": "lots"})
+        bad_resolution = client.get(
+            reverse("core:usage_series"), {"resolution": "week"}
+        )
+
+        assert bad_points.status_code == 400
+        assert bad_resolution.status_code == 400
@@ -0,0 +1,213 @@
+"""Tests for the segment file webhook archive.
+
+This module tests appending to and streaming from rotating segment files,
+the per-segment offset index, expiry, and WebhookStorageService using the
+segment backend.
+"""
+
+import json
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from django.test.client import RequestFactory
+from webhooks.services.webhook_archive import INDEX_ENTRY, SegmentArchive
+from webhooks.services.webhook_storage import WebhookStorageService
+
+DAY = datetime(2026, 10, 18, 9, tzinfo=dt_timezone.utc)
+DATE = "2026-10-18"
+TS = int(DAY.timestamp() * 1000)
+
+
+def key(provider: str, workspace: str, timestamp_ms: int) -> str:
+    """Build a webhook key like WebhookStorageService does."""
+    return f"webhook_raw:{provider}:{workspace}:{timestamp_ms}"
+
+
+@pytest.fixture
+def archive(tmp_path: Path) -> SegmentArchive:
+    """Create an archive in a temporary directory."""
+    return SegmentArchive(tmp_path / "archive", segment_bytes=1024)
+
+
+class TestSegmentArchive:
+    """Test appending, indexing and streaming."""
+
+    def test_append_and_iterate_in_order(self, archive: SegmentArchive) -> None:
+        """Test entries stream back in write order, or newest first."""
+        for i in range(3):
+            archive.append(key("shopify", "ws-a", TS + i), f"blob{i}".encode(), TS + i)
+
+        entries = list(archive.iter_entries(DATE))
+        newest = list(archive.iter_entries(DATE, newest_first=True))
+
+        assert entries == [
+            (key("shopify", "ws-a", TS), b"blob0"),
+            (key("shopify", "ws-a", TS + 1), b"blob1"),
+            (key("shopify", "ws-a", TS + 2), b"blob2"),
+        ]
+        assert newest == list(reversed(entries))
+
+    def test_filters_by_provider_and_workspace(self, archive: SegmentArchive) -> None:
+        """Test the index narrows reads to matching entries."""
+        archive.append(key("shopify", "ws-a", TS), b"a", TS)
+        archive.append(key("stripe", "ws-a", TS + 1), b"b", TS + 1)
+        archive.append(key("shopify", "ws-b", TS + 2), b"c", TS + 2)
+
+        shopify_a = list(archive.iter_entries(DATE, "shopify", "ws-a"))
+        stripe = list(archive.iter_entries(DATE, provider="stripe"))
+
+        assert [blob for _, blob in shopify_a] == [b"a"]
+        assert [blob for _, blob in stripe] == [b"b"]
+        assert archive.count(DATE) == 3
+        assert archive.count(DATE, workspace_uuid="ws-b") == 1
+
+    def test_days_use_separate_segments(self, archive: SegmentArchive) -> None:
+        """Test each UTC day is written to its own segments."""
+        next_day = TS + 24 * 60 * 60 * 1000
+        archive.append(key("shopify", "ws-a", TS), b"today", TS)
+        archive.append(key("shopify", "ws-a", next_day), b"tomorrow", next_day)
+
+        assert [b for _, b in archive.iter_entries(DATE)] == [b"today"]
+        assert [b for _, b in archive.iter_entries("2026-10-19")] == [b"tomorrow"]
+
+    def test_segments_rotate_at_size_limit(self, archive: SegmentArchive) -> None:
+        """Test a full segment is closed and writing moves to the next one."""
+        blob = b"x" * 400
+        for i in range(5):
+            archive.append(key("shopify", "ws-a", TS + i), blob, TS + i)
+
+        segments = archive.segments(DATE)
+        assert [p.name for p in segments] == [
+            f"{DATE}-000000.seg",
+            f"{DATE}-000001.seg",
+            f"{DATE}-000002.seg",
+        ]
+        assert all(p.stat().st_size <= 1024 for p in segments)
+        assert [k for k, _ in archive.iter_entries(DATE, newest_first=True)] == [
+            key("shopify", "ws-a", TS + i) for i in reversed(range(5))
+        ]
+
+    def test_new_writer_resumes_last_segment(self, archive: SegmentArchive) -> None:
+        """Test another process appends to the day's latest segment."""
+        for i in range(3):
+            archive.append(key("shopify", "ws-a", TS + i), b"x" * 400, TS + i)
+
+        other_worker = SegmentArchive(archive.directory, segment_bytes=1024)
+        other_worker.append(key("shopify", "ws-a", TS + 9), b"late", TS + 9)
+
+        assert len(archive.segments(DATE)) == 2
+        assert archive.count(DATE) == 4
+
+    def test_partial_writes_are_ignored(self, archive: SegmentArchive) -> None:
+        """Test a torn index entry or truncated frame doesn't break reads."""
+        archive.append(key("shopify", "ws-a", TS), b"complete", TS)
+        archive.append(key("shopify", "ws-a", TS + 1), b"truncated", TS + 1)
+        segment = archive.segments(DATE)[0]
+        index = segment.with_suffix(".idx")
+
+        with segment.open("r+b") as f:
+            f.truncate(segment.stat().st_size - 3)
+        with index.open("ab") as f:
+            f.write(b"\x01" * (INDEX_ENTRY.size // 2))
+
+        assert list(archive.iter_entries(DATE)) == [
+            (key("shopify", "ws-a", TS), b"complete")
+        ]
+
+    def test_missing_day_is_empty(self, archive: SegmentArchive) -> None:
+        """Test reading a day with no segments (or no directory)."""
+        assert list(archive.iter_entries(DATE)) == []
+        assert archive.count(DATE) == 0
+        assert archive.expire() == []
+
+    def test_expire_deletes_whole_old_segments(self, archive: SegmentArchive) -> None:
+        """Test segments older than the retention window are removed."""
+        # Write with long retention so appends don't expire anything yet
+        writer = SegmentArchive(archive.directory, retention_days=365)
+        for days_ago in (0, 7, 8, 30):
+            ts = TS - days_ago * 24 * 60 * 60 * 1000
+            writer.append(key("shopify", "ws-a", ts), b"x", ts)
+
+        removed = archive.expire(today=date(2026, 10, 18))
+
+        assert removed == ["2026-09-18-000000.seg", "2026-10-10-000000.seg"]
+        remaining = sorted(p.name for p in archive.directory.iterdir())
+        assert remaining == [
+            "2026-10-11-000000.idx",
+            "2026-10-11-000000.seg",
+            f"{DATE}-000000.idx",
+            f"{DATE}-000000.seg",
+        ]
+
+
+@pytest.fixture
+def segment_settings(settings, tmp_path: Path):
+    """Configure WebhookStorageService to use the segment backend."""
+    settings.WEBHOOK_ARCHIVE_BACKEND = "segments"
+    settings.WEBHOOK_ARCHIVE_DIR = str(tmp_path / "webhooks")
+    return settings
+
+
+def store(
+    service: WebhookStorageService, provider: str, workspace: str, at: datetime
+) -> None:
+    """Store a small Shopify-style webhook received at a given time."""
+    request = RequestFactory().post(
+        f"/webhook/customer/{workspace}/{provider}/",
+        data=json.dumps({"id": int(at.timestamp())}),
+        content_type="application/json",
+        HTTP_X_SHOPIFY_TOPIC="orders/create",
+    )
+    with patch("webhooks.services.webhook_storage.timezone") as mock_timezone:
+        mock_timezone.now.return_value = at
+        assert service.store_webhook(request, provider, workspace)
+
+
+class TestSegmentBackend:
+    """Test WebhookStorageService with WEBHOOK_ARCHIVE_BACKEND=segments."""
+
+    def test_store_and_read_by_date(self, segment_settings) -> None:
+        """Test webhooks go to disk, not the cache, and read back newest first."""
+        service = WebhookStorageService()
+
+        with patch("webhooks.services.webhook_storage.cache") as mock_cache:
+            store(service, "shopify", "ws-a", DAY)
+            store(service, "shopify", "ws-a", DAY + timedelta(minutes=1))
+            store(service, "stripe", "ws-a", DAY + timedelta(minutes=2))
+
+            records = service.get_webhooks_by_date(DATE, provider="shopify", limit=5)
+
+        # Only the small lookup indexes live in the cache, never the bodies
+        assert not [
+            call
+            for call in mock_cache.set.call_args_list
+            if call.args[0].startswith("webhook_raw:")
+        ]
+        assert [json.loads(r["body"])["id"] for r in records] == [
+            int((DAY + timedelta(minutes=1)).timestamp()),
+            int(DAY.timestamp()),
+        ]
+        assert records[0]["headers"]["X-Shopify-Topic"] == "orders/create"
+        assert service.get_webhook_count_by_date(DATE) == 3
+        assert Path(segment_settings.WEBHOOK_ARCHIVE_DIR).is_dir()
+
+    def test_iter_webhooks_streams_oldest_first(self, segment_settings) -> None:
+        """Test replay iteration walks the days in the order received."""
+        service = WebhookStorageService()
+        store(service, "shopify", "ws-a", DAY - timedelta(days=1))
+        store(service, "shopify", "ws-b", DAY - timedelta(hours=1))
+        store(service, "shopify", "ws-a", DAY)
+
+        with patch("webhooks.services.webhook_storage.timezone") as mock_timezone:
+            mock_timezone.now.return_value = DAY
+            webhooks = list(
+                service.iter_webhooks(days=2, provider="shopify", workspace_uuid="ws-a")
+            )
+
+        assert [w["timestamp_ms"] for w in webhooks] == [
+            int((DAY - timedelta(days=1)).timestamp() * 1000),
+            TS,
+        ]
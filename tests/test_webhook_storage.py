@@ -5,12 +5,13 @@ for debugging and analysis purposes.
 """
 
 import json
-from datetime import timedelta
-from typing import Any
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
 from unittest.mock import MagicMock, patch
 
 import pytest
 from django.http import HttpRequest
+from django.test import override_settings
 from django.test.client import RequestFactory
 from django.utils import timezone
 from webhooks.services.webhook_storage import (
@@ -18,6 +19,42 @@ from webhooks.services.webhook_storage import (
     webhook_storage_service,
 )
 
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+DATE = "2026-01-25"
+STORED_AT = datetime(2026, 1, 25, 12, tzinfo=dt_timezone.utc)
+TS_BASE = int(STORED_AT.timestamp() * 1000)
+
+
+def store_at(
+    service: WebhookStorageService,
+    factory: RequestFactory,
+    provider: str,
+    workspace_uuid: str | None,
+    offset_ms: int,
+) -> None:
+    """Store a small webhook as if received offset_ms after STORED_AT."""
+    stored_at = STORED_AT + timedelta(milliseconds=offset_ms)
+    request = factory.post(
+        f"/webhook/customer/{workspace_uuid}/{provider}/",
+        data=json.dumps({"id": f"evt_{TS_BASE + offset_ms}"}),
+        content_type="application/json",
+    )
+    with patch("webhooks.services.webhook_storage.timezone") as mock_timezone:
+        mock_timezone.now.return_value = stored_at
+        assert service.store_webhook(request, provider, workspace_uuid)
+
+
+@pytest.fixture(autouse=True)
+def clear_locmem_cache() -> None:
+    """Start every test with an empty local-memory cache."""
+    from django.core.cache import cache
+
+    with override_settings(CACHES=LOCMEM_CACHES):
+        cache.clear()
+
 
 @pytest.fixture
 def storage_service() -> WebhookStorageService:
@@ -98,8 +135,10 @@ class TestWebhookStorageService:
 
     def test_get_index_key_format(self, storage_service: WebhookStorageService) -> None:
         """Test index key generation format."""
-        key = storage_service._get_index_key("2026-01-25")
-        assert key == "webhook_raw_index:2026-01-25"
+        key = storage_service._get_index_key("2026-01-25", "workspace123")
+        assert key == "webhook_raw_index:2026-01-25:workspace123"
+        workspaces_key = storage_service._get_workspaces_key("2026-01-25")
+        assert workspaces_key == "webhook_raw_workspaces:2026-01-25"
 
     def test_extract_safe_headers(
         self,
@@ -136,16 +175,18 @@ class TestWebhookStorageService:
         # Verify cache.set was called for the webhook record
         assert mock_cache.set.call_count >= 1
 
-        # Check the webhook record structure
+        # Check the stored blob decodes back to the request
         first_call_args = mock_cache.set.call_args_list[0]
         webhook_key = first_call_args[0][0]
-        webhook_data = json.loads(first_call_args[0][1])
+        webhook_data = storage_service._decode_record(
+            webhook_key, first_call_args[0][1]
+        )
 
         assert webhook_key.startswith("webhook_raw:stripe:workspace123:")
         assert webhook_data["provider"] == "stripe"
         assert webhook_data["workspace_uuid"] == "workspace123"
-        assert "body" in webhook_data
-        assert "headers" in webhook_data
+        assert webhook_data["body"] == mock_webhook_request.body.decode("utf-8")
+        assert webhook_data["headers"]["Stripe-Signature"] == "[PRESENT]"
         assert webhook_data["method"] == "POST"
 
     @patch("webhooks.services.webhook_storage.cache")
@@ -167,7 +208,9 @@ class TestWebhookStorageService:
         assert result is True
         first_call_args = mock_cache.set.call_args_list[0]
         webhook_key = first_call_args[0][0]
-        webhook_data = json.loads(first_call_args[0][1])
+        webhook_data = storage_service._decode_record(
+            webhook_key, first_call_args[0][1]
+        )
 
         assert "global" in webhook_key
         assert webhook_data["workspace_uuid"] == "global"
@@ -201,218 +244,168 @@ class TestWebhookStorageService:
         result = storage_service.get_webhooks_by_date("2026-01-25")
 
         assert result == []
+        mock_cache.get_many.assert_not_called()
 
-    @patch("webhooks.services.webhook_storage.cache")
     def test_get_webhooks_by_date_with_results(
         self,
-        mock_cache: MagicMock,
         storage_service: WebhookStorageService,
+        request_factory: RequestFactory,
     ) -> None:
-        """Test getting webhooks with existing records."""
-        webhook_record = {
-            "provider": "stripe",
-            "workspace_uuid": "workspace123",
-            "timestamp_ms": 1706234567890,
-            "body": "{}",
-        }
-
-        def cache_get_side_effect(key: str) -> Any:
-            if key == "webhook_raw_index:2026-01-25":
-                return json.dumps(["webhook_raw:stripe:workspace123:1706234567890"])
-            if key == "webhook_raw:stripe:workspace123:1706234567890":
-                return json.dumps(webhook_record)
-            return None
-
-        mock_cache.get.side_effect = cache_get_side_effect
-
-        result = storage_service.get_webhooks_by_date("2026-01-25")
-
-        assert len(result) == 1
+        """Test stored webhooks are returned newest first."""
+        with override_settings(CACHES=LOCMEM_CACHES):
+            store_at(storage_service, request_factory, "stripe", "ws-a", 1000)
+            store_at(storage_service, request_factory, "stripe", "ws-a", 3000)
+            store_at(storage_service, request_factory, "stripe", "ws-a", 2000)
+
+            result = storage_service.get_webhooks_by_date(DATE)
+
+        assert [r["timestamp_ms"] for r in result] == [
+            TS_BASE + 3000,
+            TS_BASE + 2000,
+            TS_BASE + 1000,
+        ]
+        assert json.loads(result[0]["body"]) == {"id": f"evt_{TS_BASE + 3000}"}
         assert result[0]["provider"] == "stripe"
+        assert result[0]["timestamp"].startswith(DATE)
 
-    @patch("webhooks.services.webhook_storage.cache")
     def test_get_webhooks_by_date_with_provider_filter(
         self,
-        mock_cache: MagicMock,
         storage_service: WebhookStorageService,
+        request_factory: RequestFactory,
     ) -> None:
         """Test filtering webhooks by provider."""
-        stripe_record = {
-            "provider": "stripe",
-            "workspace_uuid": "workspace123",
-            "timestamp_ms": 1706234567890,
-        }
-        shopify_record = {
-            "provider": "shopify",
-            "workspace_uuid": "workspace123",
-            "timestamp_ms": 1706234567891,
-        }
-
-        def cache_get_side_effect(key: str) -> Any:
-            if key == "webhook_raw_index:2026-01-25":
-                return json.dumps(
-                    [
-                        "webhook_raw:stripe:workspace123:1706234567890",
-                        "webhook_raw:shopify:workspace123:1706234567891",
-                    ]
-                )
-            if key == "webhook_raw:stripe:workspace123:1706234567890":
-                return json.dumps(stripe_record)
-            if key == "webhook_raw:shopify:workspace123:1706234567891":
-                return json.dumps(shopify_record)
-            return None
-
-        mock_cache.get.side_effect = cache_get_side_effect
+        with override_settings(CACHES=LOCMEM_CACHES):
+            store_at(storage_service, request_factory, "stripe", "ws-a", 1000)
+            store_at(storage_service, request_factory, "shopify", "ws-a", 2000)
 
-        result = storage_service.get_webhooks_by_date("2026-01-25", provider="stripe")
+            result = storage_service.get_webhooks_by_date(DATE, provider="stripe")
 
         assert len(result) == 1
         assert result[0]["provider"] == "stripe"
 
-    @patch("webhooks.services.webhook_storage.cache")
     def test_get_webhooks_by_date_with_workspace_filter(
         self,
-        mock_cache: MagicMock,
         storage_service: WebhookStorageService,
+        request_factory: RequestFactory,
     ) -> None:
         """Test filtering webhooks by workspace."""
-        record1 = {
-            "provider": "stripe",
-            "workspace_uuid": "workspace123",
-            "timestamp_ms": 1706234567890,
-        }
-        record2 = {
-            "provider": "stripe",
-            "workspace_uuid": "workspace456",
-            "timestamp_ms": 1706234567891,
-        }
-
-        def cache_get_side_effect(key: str) -> Any:
-            if key == "webhook_raw_index:2026-01-25":
-                return json.dumps(
-                    [
-                        "webhook_raw:stripe:workspace123:1706234567890",
-                        "webhook_raw:stripe:workspace456:1706234567891",
-                    ]
+        with override_settings(CACHES=LOCMEM_CACHES):
+            store_at(storage_service, request_factory, "stripe", "ws-a", 1000)
+            store_at(storage_service, request_factory, "stripe", "ws-b", 2000)
+            store_at(storage_service, request_factory, "stripe", None, 3000)
+
+            result = storage_service.get_webhooks_by_date(DATE, workspace_uuid="ws-a")
+            everything = storage_service.get_webhooks_by_date(DATE)
+
+        assert len(result) == 1
+        assert result[0]["workspace_uuid"] == "ws-a"
+        assert [r["workspace_uuid"] for r in everything] == ["global", "ws-b", "ws-a"]
+
+    def test_get_webhooks_by_date_reads_with_one_get_many(
+        self,
+        storage_service: WebhookStorageService,
+        request_factory: RequestFactory,
+    ) -> None:
+        """Test records are fetched in one batch, limited before fetching."""
+        from django.core.cache import cache
+
+        with override_settings(CACHES=LOCMEM_CACHES):
+            for offset in range(5):
+                store_at(storage_service, request_factory, "stripe", "ws-a", offset)
+
+            with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+                result = storage_service.get_webhooks_by_date(
+                    DATE, workspace_uuid="ws-a", limit=2
                 )
-            if key == "webhook_raw:stripe:workspace123:1706234567890":
-                return json.dumps(record1)
-            if key == "webhook_raw:stripe:workspace456:1706234567891":
-                return json.dumps(record2)
-            return None
 
-        mock_cache.get.side_effect = cache_get_side_effect
+        assert len(result) == 2
+        get_many.assert_called_once()
+        assert len(get_many.call_args[0][0]) == 2
 
-        result = storage_service.get_webhooks_by_date(
-            "2026-01-25", workspace_uuid="workspace123"
-        )
+    def test_expired_records_are_skipped(
+        self,
+        storage_service: WebhookStorageService,
+        request_factory: RequestFactory,
+    ) -> None:
+        """Test index entries whose record has expired are ignored."""
+        from django.core.cache import cache
 
-        assert len(result) == 1
-        assert result[0]["workspace_uuid"] == "workspace123"
+        with override_settings(CACHES=LOCMEM_CACHES):
+            store_at(storage_service, request_factory, "stripe", "ws-a", 1000)
+            store_at(storage_service, request_factory, "stripe", "ws-a", 2000)
+            cache.delete(f"webhook_raw:stripe:ws-a:{TS_BASE + 2000}")
+
+            result = storage_service.get_webhooks_by_date(DATE)
+
+        assert [r["timestamp_ms"] for r in result] == [TS_BASE + 1000]
 
-    @patch("webhooks.services.webhook_storage.cache")
     @patch("webhooks.services.webhook_storage.timezone")
     def test_get_recent_webhooks(
         self,
         mock_timezone: MagicMock,
-        mock_cache: MagicMock,
         storage_service: WebhookStorageService,
+        request_factory: RequestFactory,
     ) -> None:
         """Test getting recent webhooks across multiple days."""
-        now = timezone.now()
+        now = STORED_AT + timedelta(hours=1)
         mock_timezone.now.return_value = now
 
-        today = now.strftime("%Y-%m-%d")
-        yesterday = (now - timedelta(days=1)).strftime("%Y-%m-%d")
-
-        today_record = {
-            "provider": "stripe",
-            "workspace_uuid": "workspace123",
-            "timestamp_ms": 1706234567890,
-        }
-        yesterday_record = {
-            "provider": "stripe",
-            "workspace_uuid": "workspace123",
-            "timestamp_ms": 1706148167890,
-        }
-
-        def cache_get_side_effect(key: str) -> Any:
-            if key == f"webhook_raw_index:{today}":
-                return json.dumps(["webhook_raw:stripe:workspace123:1706234567890"])
-            if key == f"webhook_raw_index:{yesterday}":
-                return json.dumps(["webhook_raw:stripe:workspace123:1706148167890"])
-            if key == "webhook_raw:stripe:workspace123:1706234567890":
-                return json.dumps(today_record)
-            if key == "webhook_raw:stripe:workspace123:1706148167890":
-                return json.dumps(yesterday_record)
-            return None
-
-        mock_cache.get.side_effect = cache_get_side_effect
-
-        result = storage_service.get_recent_webhooks(days=2)
+        with override_settings(CACHES=LOCMEM_CACHES):
+            store_at(storage_service, request_factory, "stripe", "ws-a", 0)
+            store_at(
+                storage_service,
+                request_factory,
+                "stripe",
+                "ws-a",
+                -int(timedelta(days=1).total_seconds() * 1000),
+            )
+
+            result = storage_service.get_recent_webhooks(days=2)
 
         assert len(result) == 2
         # Should be sorted by timestamp, most recent first
         assert result[0]["timestamp_ms"] > result[1]["timestamp_ms"]
 
-    @patch("webhooks.services.webhook_storage.cache")
     @patch("webhooks.services.webhook_storage.timezone")
     def test_get_recent_webhooks_with_limit(
         self,
         mock_timezone: MagicMock,
-        mock_cache: MagicMock,
         storage_service: WebhookStorageService,
+        request_factory: RequestFactory,
     ) -> None:
         """Test that limit is respected."""
-        now = timezone.now()
-        mock_timezone.now.return_value = now
-        today = now.strftime("%Y-%m-%d")
-
-        # Create 5 records
-        records = [
-            {
-                "provider": "stripe",
-                "workspace_uuid": "workspace123",
-                "timestamp_ms": 1706234567890 + i,
-            }
-            for i in range(5)
-        ]
-        keys = [
-            f"webhook_raw:stripe:workspace123:{1706234567890 + i}" for i in range(5)
-        ]
-
-        def cache_get_side_effect(key: str) -> Any:
-            if key == f"webhook_raw_index:{today}":
-                return json.dumps(keys)
-            for i, k in enumerate(keys):
-                if key == k:
-                    return json.dumps(records[i])
-            return None
+        mock_timezone.now.return_value = STORED_AT + timedelta(hours=1)
 
-        mock_cache.get.side_effect = cache_get_side_effect
+        with override_settings(CACHES=LOCMEM_CACHES):
+            for offset in range(5):
+                store_at(storage_service, request_factory, "stripe", "ws-a", offset)
 
-        result = storage_service.get_recent_webhooks(days=1, limit=3)
+            result = storage_service.get_recent_webhooks(days=1, limit=3)
 
-        assert len(result) == 3
+        assert [r["timestamp_ms"] for r in result] == [
+            TS_BASE + 4,
+            TS_BASE + 3,
+            TS_BASE + 2,
+        ]
 
-    @patch("webhooks.services.webhook_storage.cache")
     def test_get_webhook_count_by_date(
         self,
-        mock_cache: MagicMock,
         storage_service: WebhookStorageService,
+        request_factory: RequestFactory,
     ) -> None:
         """Test counting webhooks for a date."""
-        mock_cache.get.return_value = json.dumps(
-            [
-                "webhook_raw:stripe:workspace123:1706234567890",
-                "webhook_raw:stripe:workspace123:1706234567891",
-                "webhook_raw:shopify:workspace123:1706234567892",
-            ]
-        )
+        with override_settings(CACHES=LOCMEM_CACHES):
+            store_at(storage_service, request_factory, "stripe", "ws-a", 1)
+            store_at(storage_service, request_factory, "stripe", "ws-a", 2)
+            store_at(storage_service, request_factory, "shopify", "ws-b", 3)
 
-        count = storage_service.get_webhook_count_by_date("2026-01-25")
+            count = storage_service.get_webhook_count_by_date(DATE)
+            workspace_count = storage_service.get_webhook_count_by_date(
+                DATE, workspace_uuid="ws-a"
+            )
 
         assert count == 3
+        assert workspace_count == 2
 
     @patch("webhooks.services.webhook_storage.cache")
     def test_get_webhook_count_by_date_empty(
@@ -428,6 +421,111 @@ class TestWebhookStorageService:
         assert count == 0
 
 
+class TestWebhookCompression:
+    """Tests for the compressed blob format."""
+
+    @pytest.mark.parametrize("provider", ["shopify", "stripe", "chargify", "other"])
+    def test_round_trip_keeps_body_bytes(
+        self, storage_service: WebhookStorageService, provider: str
+    ) -> None:
+        """Test the raw body comes back byte for byte, with or without a dictionary."""
+        body = b'{\n  "id": "evt_1",\n  "amount": 4900\n}\xff'
+        header = {"method": "POST", "path": "/webhook/", "headers": {}}
+
+        blob = storage_service._compress(provider, header, body)
+
+        assert storage_service._decompress(blob) == (header, body)
+
+    def test_blob_names_its_dictionary(
+        self, storage_service: WebhookStorageService
+    ) -> None:
+        """Test blobs record the dictionary they need for decompression."""
+        blob = storage_service._compress("shopify", {}, b"{}")
+        assert blob.startswith(b"shopify-1|")
+        assert storage_service._compress("other", {}, b"{}").startswith(b"|")
+
+    def test_dictionary_improves_small_payloads(
+        self, storage_service: WebhookStorageService
+    ) -> None:
+        """Test the preset dictionary beats plain zlib on a typical event."""
+        body = json.dumps(
+            {
+                "id": "evt_1",
+                "object": "event",
+                "type": "invoice.paid",
+                "livemode": False,
+                "pending_webhooks": 1,
+                "data": {"object": {"object": "invoice", "customer": "cus_1"}},
+            }
+        ).encode()
+
+        with_dictionary = storage_service._compress("stripe", {}, body)
+        without = storage_service._compress("other", {}, body)
+
+        assert len(with_dictionary) < len(without)
+
+    def test_non_utf8_body_is_decoded_as_latin1(
+        self, storage_service: WebhookStorageService
+    ) -> None:
+        """Test bodies that aren't UTF-8 still produce a readable record."""
+        blob = storage_service._compress("chargify", {}, b"name=Caf\xe9")
+
+        record = storage_service._decode_record(
+            "webhook_raw:chargify:ws-a:1706234567890", blob
+        )
+
+        assert record["body"] == "name=Caf\xe9"
+        assert record["body_size"] == 9
+
+
+class TestWebhookIndexRedis:
+    """Tests for the Redis sorted-set index."""
+
+    def test_index_update_is_one_pipeline(
+        self, storage_service: WebhookStorageService
+    ) -> None:
+        """Test indexing is ZADD + SADD with TTLs in one round trip."""
+        redis_client = MagicMock()
+        pipe = redis_client.pipeline.return_value
+
+        with patch(
+            "webhooks.services.webhook_storage.get_redis_client",
+            return_value=redis_client,
+        ):
+            storage_service._add_to_index(DATE, "ws-a", "webhook_raw:stripe:ws-a:1", 1)
+
+        redis_client.pipeline.assert_called_once_with(transaction=False)
+        index_key = pipe.zadd.call_args[0][0]
+        assert index_key.endswith(f"webhook_raw_index:{DATE}:ws-a")
+        assert pipe.zadd.call_args[0][1] == {"webhook_raw:stripe:ws-a:1": 1}
+        assert pipe.sadd.call_args[0][1] == "ws-a"
+        assert pipe.expire.call_count == 2
+        pipe.execute.assert_called_once()
+
+    def test_indexed_keys_merge_workspaces(
+        self, storage_service: WebhookStorageService
+    ) -> None:
+        """Test unfiltered reads merge every workspace's index, newest first."""
+        redis_client = MagicMock()
+        redis_client.smembers.return_value = {b"ws-a", b"ws-b"}
+        redis_client.pipeline.return_value.execute.return_value = [
+            [(b"webhook_raw:stripe:ws-x:1", 1.0), (b"webhook_raw:stripe:ws-x:3", 3.0)],
+            [(b"webhook_raw:stripe:ws-y:2", 2.0)],
+        ]
+
+        with patch(
+            "webhooks.services.webhook_storage.get_redis_client",
+            return_value=redis_client,
+        ):
+            entries = storage_service._get_indexed_keys(DATE)
+
+        assert entries == [
+            (3, "webhook_raw:stripe:ws-x:3"),
+            (2, "webhook_raw:stripe:ws-y:2"),
+            (1, "webhook_raw:stripe:ws-x:1"),
+        ]
+
+
 class TestWebhookStorageServiceSingleton:
     """Tests for the module-level singleton instance."""
 
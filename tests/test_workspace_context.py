@@ -0,0 +1,165 @@
+"""Tests for request-scoped workspace and membership resolution.
+
+This module tests WorkspaceContext resolution (sync and async), its
+memoization on the request, and the permission helpers and views that read
+from it instead of querying again.
+"""
+
+import pytest
+from asgiref.sync import async_to_sync
+from core.models import UserProfile, Workspace, WorkspaceMember
+from core.permissions import admin_required
+from core.views.integrations.base import get_user_workspace, require_admin_role
+from core.workspace_context import (
+    aresolve_workspace_context,
+    get_workspace_context,
+    resolve_workspace_context,
+)
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.http import HttpRequest, HttpResponse
+from django.test.client import RequestFactory
+from django.urls import reverse
+
+
+@pytest.fixture
+def member(db) -> WorkspaceMember:
+    """Create an admin member of a workspace."""
+    user = User.objects.create_user(username="admin", password="pw")
+    workspace = Workspace.objects.create(name="Acme")
+    return WorkspaceMember.objects.create(user=user, workspace=workspace, role="admin")
+
+
+def make_request(user) -> HttpRequest:
+    """Build a GET request for a user, with message storage."""
+    request = RequestFactory().get("/")
+    request.user = user
+    request.session = {}
+    request._messages = FallbackStorage(request)
+    return request
+
+
+@pytest.mark.django_db
+class TestResolveWorkspaceContext:
+    """Test resolve_workspace_context."""
+
+    def test_member_and_workspace_in_one_query(
+        self, member: WorkspaceMember, django_assert_num_queries
+    ) -> None:
+        """Test the membership is fetched with its workspace."""
+        with django_assert_num_queries(1):
+            context = resolve_workspace_context(member.user)
+            assert context.workspace.name == "Acme"
+
+        assert context.member == member
+        assert context.role == "admin"
+
+    def test_falls_back_to_user_profile(self) -> None:
+        """Test legacy users without a membership get their profile workspace."""
+        user = User.objects.create_user(username="legacy")
+        workspace = Workspace.objects.create(name="Legacy")
+        UserProfile.objects.create(user=user, workspace=workspace)
+
+        context = resolve_workspace_context(user)
+
+        assert context.member is None
+        assert context.workspace == workspace
+        assert context.user_profile.user == user
+
+    def test_anonymous_user_needs_no_query(self, django_assert_num_queries) -> None:
+        """Test anonymous requests resolve to an empty context."""
+        with django_assert_num_queries(0):
+            context = resolve_workspace_context(AnonymousUser())
+
+        assert context.workspace is None
+        assert context.user_profile is None
+
+
+@pytest.mark.django_db
+class TestAresolveWorkspaceContext:
+    """Test aresolve_workspace_context."""
+
+    def test_member_and_workspace_in_one_query(
+        self, member: WorkspaceMember, django_assert_num_queries
+    ) -> None:
+        """Test async views get the same context as sync ones."""
+        with django_assert_num_queries(1):
+            context = async_to_sync(aresolve_workspace_context)(member.user)
+            assert context.workspace.name == "Acme"
+
+        assert context.member == member
+        assert context.role == "admin"
+
+    def test_falls_back_to_user_profile(self) -> None:
+        """Test legacy users without a membership get their profile workspace."""
+        user = User.objects.create_user(username="legacy")
+        workspace = Workspace.objects.create(name="Legacy")
+        UserProfile.objects.create(user=user, workspace=workspace)
+
+        context = async_to_sync(aresolve_workspace_context)(user)
+
+        assert context.member is None
+        assert context.workspace == workspace
+        assert context.user_profile.user == user
+
+    def test_anonymous_user_needs_no_query(self, django_assert_num_queries) -> None:
+        """Test anonymous users resolve to an empty context."""
+        with django_assert_num_queries(0):
+            context = async_to_sync(aresolve_workspace_context)(AnonymousUser())
+
+        assert context.workspace is None
+
+
+@pytest.mark.django_db
+class TestRequestMemoization:
+    """Test the context is resolved once per request."""
+
+    def test_helpers_share_one_resolution(
+        self, member: WorkspaceMember, django_assert_num_queries
+    ) -> None:
+        """Test a decorator and view helpers don't query again."""
+        request = make_request(member.user)
+
+        @admin_required
+        def view(request):
+            assert get_user_workspace(request) == member.workspace
+            assert require_admin_role(request) == (member.workspace, None)
+            return HttpResponse("ok")
+
+        with django_assert_num_queries(1):
+            response = view(request)
+
+        assert response.status_code == 200
+        assert request.workspace_member == member
+
+    def test_user_change_resolves_again(self, member: WorkspaceMember) -> None:
+        """Test a login mid-request doesn't reuse the anonymous context."""
+        request = make_request(AnonymousUser())
+        assert get_workspace_context(request).workspace is None
+
+        request.user = member.user
+
+        assert get_workspace_context(request).workspace == member.workspace
+
+
+@pytest.mark.django_db
+class TestViews:
+    """Test the views using the workspace context."""
+
+    def test_view_resolves_context_once(self, client, member: WorkspaceMember) -> None:
+        """Test a view's context is memoized on the request."""
+        client.force_login(member.user)
+
+        response = client.get(reverse("core:workspace_settings"))
+
+        assert response.status_code == 200
+        assert response.wsgi_request._workspace_context.workspace == member.workspace
+
+    def test_settings_api_without_workspace(self, client) -> None:
+        """Test users without a workspace get a 404 from the settings API."""
+        user = User.objects.create_user(username="new")
+        client.force_login(user)
+
+        response = client.get(reverse("core:get_notification_settings"))
+
+        assert response.status_code == 404